@@ -8,7 +8,7 @@ from django.utils.translation import gettext as _
 from django.contrib import messages
 from django.db.models import Count, Avg
 from resumes.models import Resume
-from matching.services.matcher import batch_match_jobs_to_resume
+from matching.services.match_store import get_matches
 from ..forms import RegisterForm
 from resumes.models import Resume
 from jobs.models import Job, Application
@@ -54,10 +54,8 @@ def dashboard_candidate_enhanced(request):
     jobs = Job.objects.filter(is_active=True)
     all_match_scores = []
     
-    for resume in resumes.filter(is_processed=True):
-        matches = batch_match_jobs_to_resume(resume, jobs)
-        for match in matches:
-            all_match_scores.append(match['match']['score'])
+    for match in get_matches(resumes.filter(is_processed=True), jobs, min_score=10, strict=True):
+        all_match_scores.append(match['match']['score'])
     
     # 4. حساب الإحصائيات
     match_stats = {
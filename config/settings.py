@@ -56,6 +56,7 @@ INSTALLED_APPS = [
     'jobs',
     'resumes',
     'matching',
+    'tasks',
 ]
 
 MIDDLEWARE = [
@@ -68,6 +69,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'matching.middleware.MatchingContextMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -205,3 +207,92 @@ ML_SERVICE_URL = config('ML_SERVICE_URL', default=None)
 HF_TOKEN = config('HF_TOKEN', default=None)
 ML_SERVICE_TIMEOUT = config('ML_SERVICE_TIMEOUT', default=10, cast=int)
 ML_SERVICE_CACHE_TTL = config('ML_SERVICE_CACHE_TTL', default=3600, cast=int)
+# Concurrent predictions per batch call, client health-check interval, circuit breaker (failures / seconds open)
+ML_SERVICE_MAX_WORKERS = config('ML_SERVICE_MAX_WORKERS', default=8, cast=int)
+ML_SERVICE_HEALTH_INTERVAL = config('ML_SERVICE_HEALTH_INTERVAL', default=60, cast=int)
+ML_SERVICE_BREAKER_THRESHOLD = config('ML_SERVICE_BREAKER_THRESHOLD', default=5, cast=int)
+ML_SERVICE_BREAKER_RESET = config('ML_SERVICE_BREAKER_RESET', default=30, cast=int)
+
+# Embeddings: "local" (in-process hashed n-grams, default) or "remote" (hosted similarity service)
+EMBEDDING_BACKEND = config('EMBEDDING_BACKEND', default='local')
+EMBEDDING_DIM = config('EMBEDDING_DIM', default=512, cast=int)
+ML_SIMILARITY_URL = config('ML_SIMILARITY_URL', default=None)
+# Remote similarity client: per-request timeout, budget for a whole batch call, parallel requests, pairs per request
+ML_SIMILARITY_TIMEOUT = config('ML_SIMILARITY_TIMEOUT', default=20, cast=float)
+ML_SIMILARITY_TOTAL_TIMEOUT = config('ML_SIMILARITY_TOTAL_TIMEOUT', default=60, cast=float)
+ML_SIMILARITY_MAX_WORKERS = config('ML_SIMILARITY_MAX_WORKERS', default=8, cast=int)
+ML_SIMILARITY_BATCH_SIZE = config('ML_SIMILARITY_BATCH_SIZE', default=32, cast=int)
+# Seconds before retrying batch requests after the service rejected one (a transient 400/422 must not disable batching forever)
+ML_SIMILARITY_BATCH_REPROBE_INTERVAL = config('ML_SIMILARITY_BATCH_REPROBE_INTERVAL', default=300, cast=float)
+EMBEDDING_CACHE_SIZE = config('EMBEDDING_CACHE_SIZE', default=10000, cast=int)
+EMBEDDING_CACHE_PERSIST = config('EMBEDDING_CACHE_PERSIST', default=True, cast=bool)
+EMBEDDING_MATRIX_DIR = config('EMBEDDING_MATRIX_DIR', default=str(BASE_DIR / 'var' / 'embeddings'))
+
+# Approximate nearest-neighbour index over resume vectors (ann_index.shortlist_resume_ids; not used to cut match lists)
+ANN_N_PROBE = config('ANN_N_PROBE', default=8, cast=int)
+ANN_INDEX_TTL = config('ANN_INDEX_TTL', default=300, cast=int)
+
+# In-process inverted skill index (pruning pairs that cannot reach a page threshold)
+SKILL_INDEX_TTL = config('SKILL_INDEX_TTL', default=300, cast=int)
+# Stable skill -> id map used for bitset overlap scoring (new skills are appended)
+SKILL_VOCABULARY_PATH = config('SKILL_VOCABULARY_PATH', default=str(BASE_DIR / 'var' / 'skill_vocabulary.json'))
+# Skills seen only at match time (not saved to the file) kept per process before the vocabulary is reloaded
+SKILL_VOCABULARY_MAX_TRANSIENT = config('SKILL_VOCABULARY_MAX_TRANSIENT', default=10000, cast=int)
+
+# Two-stage matching for limited reads (get_matches(limit=...)): structured ranking for all candidates,
+# then full scoring in batches of N by that ranking until no remaining candidate can enter the top results
+MATCH_PIPELINE_TOP_N = config('MATCH_PIPELINE_TOP_N', default=50, cast=int)
+
+# Single-flight: identical concurrent similarity/embedding lookups run once (lease seconds / max wait for another worker)
+SINGLE_FLIGHT_LEASE_TTL = config('SINGLE_FLIGHT_LEASE_TTL', default=30, cast=int)
+SINGLE_FLIGHT_WAIT = config('SINGLE_FLIGHT_WAIT', default=30, cast=int)
+
+# Caches: per-process default, plus a cache shared by all workers for ML results and single-flight leases
+# (file-based stand-in by default; point SHARED_CACHE_BACKEND/LOCATION at Redis or a database cache table in production).
+# Leases need an atomic add(): Redis and DatabaseCache provide one; on FileBasedCache they use O_EXCL files under LOCATION/leases
+SHARED_CACHE_ALIAS = 'shared'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    SHARED_CACHE_ALIAS: {
+        'BACKEND': config('SHARED_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('SHARED_CACHE_LOCATION', default=str(BASE_DIR / 'var' / 'cache' / 'shared')),
+        'TIMEOUT': ML_SERVICE_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': config('SHARED_CACHE_MAX_ENTRIES', default=100000, cast=int)},
+    },
+}
+# In-process tier in front of the shared cache (entries / seconds)
+ML_LOCAL_CACHE_SIZE = config('ML_LOCAL_CACHE_SIZE', default=10000, cast=int)
+ML_LOCAL_CACHE_TTL = config('ML_LOCAL_CACHE_TTL', default=300, cast=int)
+
+# Database-backed background task queue (manage.py run_workers; no external broker)
+TASK_WORKER_PROCESSES = config('TASK_WORKER_PROCESSES', default=2, cast=int)
+TASK_POLL_INTERVAL = config('TASK_POLL_INTERVAL', default=1.0, cast=float)
+# Seconds a claimed task stays hidden from other workers before it is considered abandoned
+TASK_VISIBILITY_TIMEOUT = config('TASK_VISIBILITY_TIMEOUT', default=300, cast=int)
+TASK_MAX_ATTEMPTS = config('TASK_MAX_ATTEMPTS', default=3, cast=int)
+# Base retry delay in seconds (doubled after each failed attempt)
+TASK_RETRY_DELAY = config('TASK_RETRY_DELAY', default=10, cast=int)
+# Priority lanes: share of claims when several lanes have work (weight) and max running tasks
+# across all workers (concurrency, 0 = unlimited) so bulk sweeps never starve interactive uploads
+TASK_LANES = {
+    'interactive': {
+        'weight': config('TASK_INTERACTIVE_WEIGHT', default=6, cast=int),
+        'concurrency': config('TASK_INTERACTIVE_CONCURRENCY', default=0, cast=int),
+    },
+    'recompute': {
+        'weight': config('TASK_RECOMPUTE_WEIGHT', default=3, cast=int),
+        'concurrency': config('TASK_RECOMPUTE_CONCURRENCY', default=2, cast=int),
+    },
+    'backfill': {
+        'weight': config('TASK_BACKFILL_WEIGHT', default=1, cast=int),
+        'concurrency': config('TASK_BACKFILL_CONCURRENCY', default=1, cast=int),
+    },
+}
+
+# manage.py reprocess_resumes: resume point written after every chunk
+REPROCESS_CHECKPOINT_PATH = config('REPROCESS_CHECKPOINT_PATH', default=str(BASE_DIR / 'var' / 'reprocess_resumes.json'))
+
+# Embedding fallback skill extraction: also score the canonical skills of SkillSynonyms (not only the built-in list)
+AI_FALLBACK_SYNONYM_SKILLS = config('AI_FALLBACK_SYNONYM_SKILLS', default=True, cast=bool)
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_application'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='normalized_languages',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='normalized_preferred_skills',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='normalized_required_skills',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -53,13 +53,36 @@ class Job(models.Model):
         help_text=_("Required years of experience")
     )
 
+    # نسخ موحدة (SkillSynonyms) تُحسب عند الحفظ حتى لا تُعاد في كل مطابقة
+    # None = لم تُحسب بعد (manage.py backfill_normalized_skills)
+    normalized_required_skills = models.JSONField(null=True, blank=True, editable=False)
+    normalized_preferred_skills = models.JSONField(null=True, blank=True, editable=False)
+    normalized_languages = models.JSONField(null=True, blank=True, editable=False)
+
     is_active = models.BooleanField(default=True, verbose_name=_("Active"))
     created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
     updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
 
+    NORMALIZED_FIELDS = ('normalized_required_skills', 'normalized_preferred_skills', 'normalized_languages')
+    SKILL_FIELDS = ('normalized_required_skills', 'normalized_preferred_skills')
+
     def __str__(self):
         return f"{self.title} - {self.employer}"
 
+    def sync_normalized_fields(self):
+        """تحديث الحقول الموحدة من required_skills / preferred_skills / languages"""
+        from resumes.services.skill_synonyms import SkillSynonyms
+
+        self.normalized_required_skills = SkillSynonyms.normalize_set(self.required_skills)
+        self.normalized_preferred_skills = SkillSynonyms.normalize_set(self.preferred_skills)
+        self.normalized_languages = sorted({lang.lower() for lang in self.languages or []})
+
+    def save(self, *args, **kwargs):
+        self.sync_normalized_fields()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *self.NORMALIZED_FIELDS}
+        super().save(*args, **kwargs)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = _("Job")
@@ -3,7 +3,7 @@ from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from jobs.models import Job, Application
 from resumes.models import Resume
-from matching.services.matcher import calculate_match_score
+from matching.services.match_store import get_match
 from django.db.models import Count, Avg
 from django.shortcuts import redirect
 
@@ -34,7 +34,7 @@ def job_analytics(request):
         for app in applications:
             resume = app.candidate.resumes.filter(is_processed=True).first()
             if resume:
-                match = calculate_match_score(resume.parsed_data, job)
+                match = get_match(resume, job)
                 if match['score'] >= 80:
                     excellent_apps += 1
                 elif match['score'] >= 60:
@@ -1,3 +1,12 @@
+# matching/admin.py
 from django.contrib import admin
+from .models import MatchResult
 
-# Register your models here.
+
+@admin.register(MatchResult)
+class MatchResultAdmin(admin.ModelAdmin):
+    list_display = ("id", "job", "resume_type", "resume", "built_resume", "score", "engine_version", "computed_at")
+    list_filter = ("resume_type", "engine_version", "computed_at")
+    search_fields = ("job__title", "resume__candidate__username", "built_resume__candidate__username")
+    readonly_fields = ("breakdown", "computed_at")
+    raw_id_fields = ("job", "resume", "built_resume")
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MatchingConfig(AppConfig):
     name = 'matching'
+
+    def ready(self):
+        # تسجيل signals إعادة حساب نتائج المطابقة
+        from . import signals  # noqa: F401
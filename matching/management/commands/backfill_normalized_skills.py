@@ -0,0 +1,56 @@
+# matching/management/commands/backfill_normalized_skills.py
+from django.core.management.base import BaseCommand
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.services.skill_vocabulary import get_vocabulary, save_vocabulary, vocabulary_path
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the normalized skill/language fields on jobs and uploaded resumes "
+        "and register them in the skill vocabulary (run after deploying or after editing SkillSynonyms)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--missing-only", action="store_true",
+            help="Only rows whose normalized fields were never computed",
+        )
+
+    def _backfill(self, model, missing_field, batch_size, missing_only):
+        queryset = model.objects.order_by('pk')
+        if missing_only:
+            queryset = queryset.filter(**{f"{missing_field}__isnull": True})
+
+        # bulk_update بدلاً من save(): لا signals ولا إعادة حساب المطابقات
+        batch, total = [], 0
+        for obj in queryset.iterator(chunk_size=batch_size):
+            obj.sync_normalized_fields()
+            batch.append(obj)
+            if len(batch) >= batch_size:
+                total += self._write(model, batch)
+                batch = []
+        if batch:
+            total += self._write(model, batch)
+        return total
+
+    @staticmethod
+    def _write(model, batch):
+        model.objects.bulk_update(batch, model.NORMALIZED_FIELDS)
+        # حفظ المفردات مع كل دفعة: المهارات العابرة محدودة وقد تُسقط قبل نهاية التشغيل
+        vocabulary = get_vocabulary()
+        vocabulary.encode([getattr(obj, field) for obj in batch for field in model.SKILL_FIELDS])
+        vocabulary.save(vocabulary_path())
+        return len(batch)
+
+    def handle(self, *args, **options):
+        batch_size, missing_only = options["batch_size"], options["missing_only"]
+        jobs = self._backfill(Job, 'normalized_required_skills', batch_size, missing_only)
+        resumes = self._backfill(Resume, 'normalized_skills', batch_size, missing_only)
+        terms = save_vocabulary()
+        self.stdout.write(self.style.SUCCESS(
+            f"Normalized skills for {jobs} jobs and {resumes} resumes; "
+            f"{terms} skills in {vocabulary_path()}"
+        ))
@@ -0,0 +1,66 @@
+# matching/management/commands/benchmark_ann.py
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from matching.services.ann_index import IVFIndex, _load_resume_vectors, brute_force, recall_at_k
+
+
+class Command(BaseCommand):
+    help = "Measure recall@k and query time of the IVF resume index against brute force"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", choices=["synthetic", "db"], default="synthetic")
+        parser.add_argument("--size", type=int, default=50000, help="Synthetic vectors")
+        parser.add_argument("--dim", type=int, default=512)
+        parser.add_argument("--clusters", type=int, default=200, help="Synthetic topic clusters")
+        parser.add_argument("--queries", type=int, default=200)
+        parser.add_argument("--k", type=int, default=50)
+        parser.add_argument("--n-probe", type=int, default=8)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _synthetic(self, options):
+        rng = np.random.RandomState(options["seed"])
+        centers = rng.randn(options["clusters"], options["dim"]).astype(np.float32)
+        labels = rng.randint(options["clusters"], size=options["size"])
+        vectors = centers[labels] + 1.5 * rng.randn(options["size"], options["dim"]).astype(np.float32)
+        return vectors, list(range(options["size"]))
+
+    def handle(self, *args, **options):
+        if options["source"] == "db":
+            vectors, ids = _load_resume_vectors()
+        else:
+            vectors, ids = self._synthetic(options)
+        if not ids:
+            self.stdout.write("No vectors to index")
+            return
+
+        rng = np.random.RandomState(options["seed"] + 1)
+        queries = vectors[rng.choice(len(ids), min(options["queries"], len(ids)), replace=False)]
+        queries = queries + 0.1 * rng.randn(*queries.shape).astype(np.float32)
+        k = options["k"]
+
+        start = time.perf_counter()
+        index = IVFIndex(n_probe=options["n_probe"], seed=options["seed"]).build(vectors, ids)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for query in queries:
+            index.query(query, k)
+        ivf_time = (time.perf_counter() - start) / len(queries)
+
+        normalized = IVFIndex._normalize(vectors)
+        start = time.perf_counter()
+        for query in queries:
+            brute_force(normalized, ids, query, k)
+        brute_time = (time.perf_counter() - start) / len(queries)
+
+        recall = recall_at_k(index, normalized, ids, queries, k)
+        self.stdout.write(
+            f"vectors={len(ids)} lists={len(index.centroids)} n_probe={index.n_probe} k={k}\n"
+            f"build: {build_time:.2f}s\n"
+            f"query: ivf {ivf_time * 1000:.2f}ms, brute force {brute_time * 1000:.2f}ms "
+            f"({brute_time / ivf_time:.1f}x)\n"
+            f"recall@{k}: {recall:.3f}"
+        )
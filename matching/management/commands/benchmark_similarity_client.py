@@ -0,0 +1,165 @@
+# matching/management/commands/benchmark_similarity_client.py
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from matching.services.similarity_client import SimilarityClient
+
+
+def stand_in_score(cv: str, job: str) -> float:
+    """Jaccard على الكلمات: درجة ثابتة لنفس الزوج تكفي للمقارنة"""
+    a, b = set(cv.lower().split()), set(job.lower().split())
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+class StandInSimilarityServer:
+    """
+    خادم محلي يحاكي مسار /similarity لخدمة التشابه
+    latency: تأخير لكل طلب (شبكة + نموذج)، per_pair: تأخير إضافي لكل زوج داخل الدفعة
+    batches=False: يرفض أجسام الدفعات بـ 422 مثل النسخة الحالية من الخدمة
+    """
+
+    def __init__(self, latency: float = 0.0, per_pair: float = 0.0, batches: bool = True):
+        self.latency = latency
+        self.per_pair = per_pair
+        self.batches = batches
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/similarity"
+
+    def _count(self, attribute: str) -> None:
+        with self._lock:
+            setattr(self, attribute, getattr(self, attribute) + 1)
+
+    def _respond(self, payload: dict):
+        """(status, body) لجسم طلب واحد"""
+        if "pairs" in payload or "jobs" in payload:
+            if not self.batches:
+                return 422, {"detail": "cv and job are required"}
+            if "pairs" in payload:
+                pairs = [(pair["cv"], pair["job"]) for pair in payload["pairs"]]
+            else:
+                pairs = [(payload["cv"], job) for job in payload["jobs"]]
+            time.sleep(self.latency + self.per_pair * len(pairs))
+            return 200, {"scores": [stand_in_score(cv, job) for cv, job in pairs]}
+        time.sleep(self.latency + self.per_pair)
+        return 200, {"score": stand_in_score(payload["cv"], payload["job"])}
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # الرؤوس والجسم يُكتبان منفصلين: بدون هذا يتأخر كل رد keep-alive بسبب Nagle
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server._count("connections")
+
+            def do_POST(self):
+                server._count("requests")
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if self.path.rstrip("/") != "/similarity":
+                    status, data = 404, {"detail": "Not Found"}
+                else:
+                    status, data = server._respond(json.loads(body or b"{}"))
+                encoded = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StandInSimilarityServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class Command(BaseCommand):
+    help = "Compare per-pair requests.post against the pooled, batched similarity client on a local stand-in server"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairs", type=int, default=400)
+        parser.add_argument("--latency-ms", type=float, default=20, help="Stand-in latency per request")
+        parser.add_argument("--per-pair-ms", type=float, default=0.5, help="Stand-in cost per scored pair")
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--batch-size", type=int, default=32)
+
+    def _pairs(self, count):
+        words = ["python", "django", "sql", "docker", "react", "aws", "linux", "git", "rest", "redis"]
+        return [
+            (" ".join(words[i % 7:i % 7 + 4]), " ".join(words[(i * 3) % 6:(i * 3) % 6 + 5]) + f" job{i}")
+            for i in range(count)
+        ]
+
+    def _run(self, label, server, func, expected):
+        server.requests = server.connections = 0
+        start = time.perf_counter()
+        scores = func()
+        elapsed = time.perf_counter() - start
+        mismatches = sum(abs(a - b) > 1e-9 for a, b in zip(scores, expected))
+        self.stdout.write(
+            f"{label:<28} {elapsed:7.2f}s  requests={server.requests:<5} "
+            f"connections={server.connections:<4} mismatches={mismatches}"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        pairs = self._pairs(options["pairs"])
+        expected = [stand_in_score(cv, job) for cv, job in pairs]
+        latency = options["latency_ms"] / 1000
+        per_pair = options["per_pair_ms"] / 1000
+
+        def client(url, workers, batches):
+            instance = SimilarityClient(url, max_workers=workers, batch_size=options["batch_size"], total_timeout=None)
+            if not batches:
+                instance.supports_batches = False
+            return instance
+
+        with StandInSimilarityServer(latency, per_pair) as server:
+            self.stdout.write(f"pairs={len(pairs)} latency={options['latency_ms']}ms workers={options['workers']} "
+                              f"batch_size={options['batch_size']}")
+            legacy = self._run("requests.post per pair", server, lambda: [
+                requests.post(server.url, json={"cv": cv, "job": job}, timeout=20).json()["score"]
+                for cv, job in pairs
+            ], expected)
+
+            serial = client(server.url, 1, False)
+            self._run("pooled session, serial", server, lambda: serial.similarity_many(pairs), expected)
+            concurrent = client(server.url, options["workers"], False)
+            self._run("pooled session, concurrent", server, lambda: concurrent.similarity_many(pairs), expected)
+            batched = client(server.url, options["workers"], True)
+            best = self._run("batched + concurrent", server, lambda: batched.similarity_many(pairs), expected)
+            for instance in (serial, concurrent, batched):
+                instance.close()
+
+        self.stdout.write(f"speedup (batched vs per-pair post): {legacy / best:.1f}x")
@@ -0,0 +1,25 @@
+# matching/management/commands/export_embeddings.py
+from django.core.management.base import BaseCommand
+
+from matching.services import embedding_matrix, stored_embeddings
+
+
+class Command(BaseCommand):
+    help = "Export job/resume embeddings to read-only .npy matrices shared by all workers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--refresh", action="store_true",
+            help="Fill missing or stale stored embeddings before exporting",
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"]:
+            updated = stored_embeddings.refresh_all()
+            self.stdout.write(f"Refreshed {updated} embeddings")
+
+        for kind in embedding_matrix.KINDS:
+            count = embedding_matrix.export_matrix(kind)
+            self.stdout.write(self.style.SUCCESS(
+                f"Exported {count} {kind} vectors to {embedding_matrix.matrix_dir()}"
+            ))
@@ -0,0 +1,25 @@
+# matching/management/commands/rebuild_matches.py
+from django.core.management.base import BaseCommand
+
+from matching.services import match_store
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored MatchResult table for the current engine version"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--background", action="store_true",
+            help="Queue one recompute task per active job in the backfill lane instead of rebuilding here",
+        )
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            total = match_store.enqueue_rebuild_all()
+            self.stdout.write(self.style.SUCCESS(f"Queued {total} job recomputes in the backfill lane"))
+            return
+
+        total = match_store.rebuild_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Stored {total} match results (engine {match_store.ENGINE_VERSION})"
+        ))
@@ -0,0 +1,16 @@
+# matching/middleware.py
+from matching.services.match_context import matching_context
+
+
+class MatchingContextMiddleware:
+    """
+    ذاكرة مطابقة لكل طلب (match_context): خصائص المستندات والمتجهات ونتائج الأزواج
+    تُحسب مرة واحدة طوال الطلب، وتُهمل عند انتهائه
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with matching_context():
+            return self.get_response(request)
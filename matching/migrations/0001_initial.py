@@ -0,0 +1,39 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:13
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('jobs', '0004_application'),
+        ('resumes', '0008_merge_20260124_1805'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MatchResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resume_type', models.CharField(choices=[('uploaded', 'Uploaded Resume'), ('built', 'Built Resume')], max_length=10, verbose_name='Resume Type')),
+                ('engine_version', models.CharField(max_length=32, verbose_name='Engine Version')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('breakdown', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Full match result: details, strengths, recommendations...', verbose_name='Breakdown')),
+                ('computed_at', models.DateTimeField(auto_now=True, verbose_name='Computed At')),
+                ('built_resume', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='match_results', to='resumes.builtresume', verbose_name='Built Resume')),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_results', to='jobs.job', verbose_name='Job')),
+                ('resume', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='match_results', to='resumes.resume', verbose_name='Uploaded Resume')),
+            ],
+            options={
+                'verbose_name': 'Match Result',
+                'verbose_name_plural': 'Match Results',
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['job', 'engine_version', '-score'], name='match_job_rank_idx'), models.Index(fields=['resume', 'engine_version', '-score'], name='match_resume_rank_idx'), models.Index(fields=['built_resume', 'engine_version', '-score'], name='match_built_rank_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('built_resume__isnull', True), ('resume__isnull', False)), models.Q(('built_resume__isnull', False), ('resume__isnull', True)), _connector='OR'), name='match_result_single_resume'), models.UniqueConstraint(condition=models.Q(('resume__isnull', False)), fields=('resume', 'job', 'engine_version'), name='unique_uploaded_resume_match'), models.UniqueConstraint(condition=models.Q(('built_resume__isnull', False)), fields=('built_resume', 'job', 'engine_version'), name='unique_built_resume_match')],
+            },
+        ),
+    ]
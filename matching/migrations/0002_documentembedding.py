@@ -0,0 +1,29 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('matching', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Content Hash')),
+                ('model_id', models.CharField(max_length=64, verbose_name='Model')),
+                ('dim', models.PositiveIntegerField(verbose_name='Dimensions')),
+                ('vector', models.BinaryField(verbose_name='Vector')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+            ],
+            options={
+                'verbose_name': 'Document Embedding',
+                'verbose_name_plural': 'Document Embeddings',
+                'constraints': [models.UniqueConstraint(fields=('content_hash', 'model_id'), name='unique_document_embedding')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0004_application'),
+        ('matching', '0002_documentembedding'),
+        ('resumes', '0008_merge_20260124_1805'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_id', models.CharField(max_length=64, verbose_name='Model')),
+                ('dim', models.PositiveIntegerField(verbose_name='Dimensions')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='Text Hash')),
+                ('vector', models.BinaryField(verbose_name='Vector')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('job', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='jobs.job', verbose_name='Job')),
+            ],
+            options={
+                'verbose_name': 'Job Embedding',
+                'verbose_name_plural': 'Job Embeddings',
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumeEmbedding',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model_id', models.CharField(max_length=64, verbose_name='Model')),
+                ('dim', models.PositiveIntegerField(verbose_name='Dimensions')),
+                ('text_hash', models.CharField(max_length=64, verbose_name='Text Hash')),
+                ('vector', models.BinaryField(verbose_name='Vector')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Updated At')),
+                ('resume_type', models.CharField(choices=[('uploaded', 'Uploaded Resume'), ('built', 'Built Resume')], max_length=10, verbose_name='Resume Type')),
+                ('built_resume', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='resumes.builtresume', verbose_name='Built Resume')),
+                ('resume', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='embedding', to='resumes.resume', verbose_name='Uploaded Resume')),
+            ],
+            options={
+                'verbose_name': 'Resume Embedding',
+                'verbose_name_plural': 'Resume Embeddings',
+                'constraints': [models.CheckConstraint(condition=models.Q(models.Q(('built_resume__isnull', True), ('resume__isnull', False)), models.Q(('built_resume__isnull', False), ('resume__isnull', True)), _connector='OR'), name='resume_embedding_single_resume')],
+            },
+        ),
+    ]
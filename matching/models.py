@@ -1,3 +1,178 @@
+# matching/models.py
 from django.db import models
+from django.db.models import Q
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.translation import gettext_lazy as _
 
-# Create your models here.
+
+class MatchResult(models.Model):
+    """
+    نتيجة مطابقة مخزنة بين سيرة ذاتية (مرفوعة أو مبنية) ووظيفة
+    تُحسب مرة واحدة عند حفظ الوظيفة أو السيرة، وتقرأها الصفحات مرتبة بدلاً من الحساب المباشر
+    """
+    RESUME_TYPES = [
+        ('uploaded', _('Uploaded Resume')),
+        ('built', _('Built Resume')),
+    ]
+
+    job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.CASCADE,
+        related_name='match_results',
+        verbose_name=_("Job")
+    )
+    resume = models.ForeignKey(
+        'resumes.Resume',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='match_results',
+        verbose_name=_("Uploaded Resume")
+    )
+    built_resume = models.ForeignKey(
+        'resumes.BuiltResume',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='match_results',
+        verbose_name=_("Built Resume")
+    )
+    resume_type = models.CharField(max_length=10, choices=RESUME_TYPES, verbose_name=_("Resume Type"))
+
+    # نسخة محرك المطابقة التي أنتجت النتيجة (النتائج القديمة تُهمل وتُعاد)
+    engine_version = models.CharField(max_length=32, verbose_name=_("Engine Version"))
+
+    score = models.FloatField(verbose_name=_("Score"))
+    breakdown = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        verbose_name=_("Breakdown"),
+        help_text=_("Full match result: details, strengths, recommendations...")
+    )
+    computed_at = models.DateTimeField(auto_now=True, verbose_name=_("Computed At"))
+
+    class Meta:
+        ordering = ['-score']
+        verbose_name = _("Match Result")
+        verbose_name_plural = _("Match Results")
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    Q(resume__isnull=False, built_resume__isnull=True) |
+                    Q(resume__isnull=True, built_resume__isnull=False)
+                ),
+                name='match_result_single_resume',
+            ),
+            models.UniqueConstraint(
+                fields=['resume', 'job', 'engine_version'],
+                condition=Q(resume__isnull=False),
+                name='unique_uploaded_resume_match',
+            ),
+            models.UniqueConstraint(
+                fields=['built_resume', 'job', 'engine_version'],
+                condition=Q(built_resume__isnull=False),
+                name='unique_built_resume_match',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'engine_version', '-score'], name='match_job_rank_idx'),
+            models.Index(fields=['resume', 'engine_version', '-score'], name='match_resume_rank_idx'),
+            models.Index(fields=['built_resume', 'engine_version', '-score'], name='match_built_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.resume_type}:{self.resume_id or self.built_resume_id} ↔ {self.job_id} ({self.score})"
+
+    @property
+    def resume_key(self):
+        """(النوع، المعرف) للسيرة الذاتية بغض النظر عن نوعها"""
+        return (self.resume_type, self.resume_id or self.built_resume_id)
+
+
+class DocumentEmbedding(models.Model):
+    """
+    متجه تضمين لمستند واحد مفتاحه hash المحتوى ومعرف النموذج
+    الطبقة الدائمة لـ embedding_cache: كل نص يُحسب متجهه مرة واحدة ثم يُقرأ
+    """
+    content_hash = models.CharField(max_length=64, verbose_name=_("Content Hash"))
+    model_id = models.CharField(max_length=64, verbose_name=_("Model"))
+    dim = models.PositiveIntegerField(verbose_name=_("Dimensions"))
+    # float32 بترتيب البايتات الأصلي (np.ndarray.tobytes)
+    vector = models.BinaryField(verbose_name=_("Vector"))
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name=_("Created At"))
+
+    class Meta:
+        verbose_name = _("Document Embedding")
+        verbose_name_plural = _("Document Embeddings")
+        constraints = [
+            models.UniqueConstraint(fields=['content_hash', 'model_id'], name='unique_document_embedding'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_id}:{self.content_hash[:12]}"
+
+
+class StoredVectorMixin(models.Model):
+    """حقول مشتركة لمتجه مخزن: float32 blob + النموذج + hash النص الذي أنتجه"""
+    model_id = models.CharField(max_length=64, verbose_name=_("Model"))
+    dim = models.PositiveIntegerField(verbose_name=_("Dimensions"))
+    text_hash = models.CharField(max_length=64, verbose_name=_("Text Hash"))
+    vector = models.BinaryField(verbose_name=_("Vector"))
+    updated_at = models.DateTimeField(auto_now=True, verbose_name=_("Updated At"))
+
+    class Meta:
+        abstract = True
+
+
+class JobEmbedding(StoredVectorMixin):
+    """متجه الوظيفة: يُحدَّث عند حفظها إذا تغيّر hash النص"""
+    job = models.OneToOneField(
+        'jobs.Job',
+        on_delete=models.CASCADE,
+        related_name='embedding',
+        verbose_name=_("Job")
+    )
+
+    class Meta:
+        verbose_name = _("Job Embedding")
+        verbose_name_plural = _("Job Embeddings")
+
+    def __str__(self):
+        return f"job:{self.job_id} ({self.model_id})"
+
+
+class ResumeEmbedding(StoredVectorMixin):
+    """متجه السيرة (مرفوعة أو مبنية): يُحدَّث عند حفظها إذا تغيّر hash النص"""
+    resume = models.OneToOneField(
+        'resumes.Resume',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='embedding',
+        verbose_name=_("Uploaded Resume")
+    )
+    built_resume = models.OneToOneField(
+        'resumes.BuiltResume',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='embedding',
+        verbose_name=_("Built Resume")
+    )
+    resume_type = models.CharField(max_length=10, choices=MatchResult.RESUME_TYPES, verbose_name=_("Resume Type"))
+
+    class Meta:
+        verbose_name = _("Resume Embedding")
+        verbose_name_plural = _("Resume Embeddings")
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    Q(resume__isnull=False, built_resume__isnull=True) |
+                    Q(resume__isnull=True, built_resume__isnull=False)
+                ),
+                name='resume_embedding_single_resume',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.resume_type}:{self.resume_id or self.built_resume_id} ({self.model_id})"
@@ -0,0 +1,247 @@
+# matching/services/ann_index.py
+"""
+فهرس بحث تقريبي عن أقرب الجيران (ANN) بـ NumPy فقط: IVF مع مراكز k-means
+
+- build: تجميع المتجهات المطبعة في n_lists مجموعة (spherical k-means)
+- query: مقارنة المتجه بالمراكز ثم فحص أقرب n_probe مجموعات فقط،
+  فالتكلفة ≈ N × n_probe / n_lists بدلاً من N
+- add / remove: تحديث تزايدي دون إعادة التدريب (يُعاد البناء عند تغيّر الكتالوج كثيراً)
+
+Usage:
+    index = IVFIndex().build(vectors, ids)
+    index.query(vector, k=50)   # [(id, score)] تنازلياً
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class IVFIndex:
+    """Inverted file index: كل متجه في قائمة أقرب مركز"""
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: int = 8, iterations: int = 10, seed: int = 0):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[Dict[Hashable, np.ndarray]] = []
+        self._list_of: Dict[Hashable, int] = {}
+        # نسخة مصفوفية لكل قائمة تُبنى عند أول استعلام بعد التعديل
+        self._packed: Dict[int, Tuple[List[Hashable], np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self._list_of)
+
+    def __contains__(self, key) -> bool:
+        return key in self._list_of
+
+    # ------------------------------------------------------------------
+    # Build
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def _kmeans(self, vectors: np.ndarray, n_lists: int) -> np.ndarray:
+        rng = np.random.RandomState(self.seed)
+        centroids = vectors[rng.choice(len(vectors), n_lists, replace=False)].copy()
+        for _ in range(self.iterations):
+            assignment = np.argmax(vectors @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, vectors)
+            counts = np.bincount(assignment, minlength=n_lists)
+            empty = counts == 0
+            if empty.any():
+                # مجموعة فارغة: إعادة تعيين مركزها لنقطة عشوائية
+                sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+            centroids = self._normalize(sums)
+        return centroids
+
+    def build(self, vectors: np.ndarray, ids: Sequence[Hashable]) -> "IVFIndex":
+        vectors = self._normalize(vectors)
+        n = len(ids)
+        n_lists = self.n_lists or max(1, int(np.sqrt(n)))
+        n_lists = max(1, min(n_lists, n))
+
+        self._lists, self._list_of, self._packed = [], {}, {}
+        if n == 0:
+            self.centroids = None
+            return self
+
+        self.centroids = self._kmeans(vectors, n_lists)
+        self._lists = [dict() for _ in range(n_lists)]
+        for key, vector, list_no in zip(ids, vectors, np.argmax(vectors @ self.centroids.T, axis=1)):
+            self._lists[list_no][key] = vector
+            self._list_of[key] = int(list_no)
+        return self
+
+    # ------------------------------------------------------------------
+    # Incremental updates
+    # ------------------------------------------------------------------
+
+    def add(self, ids: Sequence[Hashable], vectors: np.ndarray) -> None:
+        """إضافة أو استبدال متجهات (يُبنى الفهرس من الدفعة الأولى إن كان فارغاً)"""
+        vectors = self._normalize(np.atleast_2d(vectors))
+        if self.centroids is None:
+            self.build(vectors, list(ids))
+            return
+        self.remove(ids)
+        for key, vector, list_no in zip(ids, vectors, np.argmax(vectors @ self.centroids.T, axis=1)):
+            self._lists[list_no][key] = vector
+            self._list_of[key] = int(list_no)
+            self._packed.pop(int(list_no), None)
+
+    def remove(self, ids: Sequence[Hashable]) -> None:
+        for key in ids:
+            list_no = self._list_of.pop(key, None)
+            if list_no is not None:
+                del self._lists[list_no][key]
+                self._packed.pop(list_no, None)
+
+    # ------------------------------------------------------------------
+    # Query
+    # ------------------------------------------------------------------
+
+    def _pack(self, list_no: int) -> Tuple[List[Hashable], np.ndarray]:
+        packed = self._packed.get(list_no)
+        if packed is None:
+            entries = self._lists[list_no]
+            matrix = np.stack(list(entries.values())) if entries else np.zeros((0, self.centroids.shape[1]), dtype=np.float32)
+            packed = self._packed[list_no] = (list(entries), matrix)
+        return packed
+
+    def query(self, vector: np.ndarray, k: int, n_probe: Optional[int] = None) -> List[Tuple[Hashable, float]]:
+        """أفضل k معرفات حسب تشابه جيب التمام داخل أقرب n_probe مجموعات"""
+        if self.centroids is None or not len(self) or k <= 0:
+            return []
+        vector = self._normalize(np.asarray(vector).reshape(-1))
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+
+        probe = np.argsort(-(self.centroids @ vector), kind="stable")[:n_probe]
+        keys: List[Hashable] = []
+        blocks = []
+        for list_no in probe:
+            list_keys, matrix = self._pack(int(list_no))
+            keys.extend(list_keys)
+            blocks.append(matrix @ vector)
+        if not keys:
+            return []
+
+        scores = np.concatenate(blocks)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(keys[i], float(scores[i])) for i in top]
+
+
+def brute_force(vectors: np.ndarray, ids: Sequence[Hashable], vector: np.ndarray, k: int) -> List[Tuple[Hashable, float]]:
+    """المسح الكامل على متجهات مطبعة (المرجع لحساب recall)"""
+    scores = np.asarray(vectors, dtype=np.float32) @ IVFIndex._normalize(np.asarray(vector).reshape(-1))
+    k = min(k, len(scores))
+    top = np.argsort(-scores, kind="stable")[:k]
+    return [(ids[i], float(scores[i])) for i in top]
+
+
+def recall_at_k(index: IVFIndex, vectors: np.ndarray, ids: Sequence[Hashable], queries: np.ndarray, k: int) -> float:
+    """متوسط نسبة نتائج المسح الكامل التي يعيدها الفهرس ضمن أفضل k"""
+    if not len(queries):
+        return 1.0
+    total = 0.0
+    for query in queries:
+        exact = {key for key, _ in brute_force(vectors, ids, query, k)}
+        found = {key for key, _ in index.query(query, k)}
+        total += len(exact & found) / max(len(exact), 1)
+    return total / len(queries)
+
+
+# ------------------------------------------------------------------
+# Process-wide resume index
+# ------------------------------------------------------------------
+
+_resume_index: Optional[IVFIndex] = None
+_resume_index_built_at = 0.0
+_resume_index_lock = threading.Lock()
+
+
+def _load_resume_vectors() -> Tuple[np.ndarray, List[Tuple[str, int]]]:
+    """
+    المتجهات من ResumeEmbedding مباشرة (لا من المصفوفة المصدّرة عند الإقلاع):
+    كل إعادة بناء تلتقط السير التي حفظتها العمليات الأخرى منذ ذلك الحين
+    """
+    from matching.models import ResumeEmbedding
+    from matching.services.embedding_cache import get_cache, vector_from_bytes
+
+    rows = list(
+        ResumeEmbedding.objects.filter(model_id=get_cache().model_id, resume__is_processed=True)
+        .values_list('resume_id', 'vector')
+    )
+    built = list(
+        ResumeEmbedding.objects.filter(model_id=get_cache().model_id, built_resume__is_active=True)
+        .values_list('built_resume_id', 'vector')
+    )
+    ids = [('uploaded', rid) for rid, _ in rows] + [('built', bid) for bid, _ in built]
+    if not ids:
+        return np.zeros((0, 0), dtype=np.float32), []
+    return np.stack([vector_from_bytes(blob) for _, blob in rows + built]), ids
+
+
+def get_resume_index() -> IVFIndex:
+    """فهرس السير لهذه العملية (يُعاد بناؤه كل ANN_INDEX_TTL ثانية ليلتقط تعديلات العمّال الآخرين)"""
+    global _resume_index, _resume_index_built_at
+    ttl = getattr(settings, "ANN_INDEX_TTL", 300)
+    with _resume_index_lock:
+        if _resume_index is None or time.monotonic() - _resume_index_built_at > ttl:
+            vectors, ids = _load_resume_vectors()
+            _resume_index = IVFIndex(n_probe=getattr(settings, "ANN_N_PROBE", 8)).build(vectors, ids)
+            _resume_index_built_at = time.monotonic()
+            logger.debug("Built resume ANN index with %d vectors", len(ids))
+        return _resume_index
+
+
+def update_resume_index(resume) -> None:
+    """تحديث الفهرس المحلي بعد حفظ سيرة (إن كان مبنياً في هذه العملية)"""
+    from matching.models import ResumeEmbedding
+    from matching.services.embedding_cache import vector_from_bytes
+    from matching.services.match_store import _is_matchable, _resume_key
+
+    if _resume_index is None:
+        return
+    key = _resume_key(resume)
+    row = ResumeEmbedding.objects.filter(**{
+        'built_resume' if key[0] == 'built' else 'resume': resume
+    }).values_list('vector', flat=True).first()
+    with _resume_index_lock:
+        if row is None or not _is_matchable(resume):
+            _resume_index.remove([key])
+        else:
+            _resume_index.add([key], vector_from_bytes(row)[None, :])
+
+
+def shortlist_resume_ids(job, k: int) -> Optional[List[int]]:
+    """
+    معرفات أقرب k سير مرفوعة دلالياً للوظيفة
+    يرجع None إذا لم يتوفر متجه للوظيفة أو الفهرس فارغ (المستدعي يرجع للمسح الكامل)
+    تقريبي ويعتمد على الدلالي وحده (ربع الدرجة): لأفضل k صريحة فقط، لا لقص قائمة كاملة
+    """
+    from matching.models import JobEmbedding
+    from matching.services.embedding_cache import get_cache, vector_from_bytes
+
+    blob = JobEmbedding.objects.filter(
+        job=job, model_id=get_cache().model_id
+    ).values_list('vector', flat=True).first()
+    index = get_resume_index()
+    if blob is None or not len(index):
+        return None
+    hits = index.query(vector_from_bytes(blob), k)
+    return [resume_id for (resume_type, resume_id), _ in hits if resume_type == 'uploaded']
@@ -4,16 +4,17 @@ from django.db.models import Q
 from jobs.models import Job
 from resumes.models.builder import BuiltResume, Experience, Education, Skill, Language
 from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.match_context import memoized_document
 import json
 
 def match_built_resume_to_jobs(built_resume, jobs):
     """
     مطابقة سيرة ذاتية مبنية مع قائمة الوظائف
     """
+    jobs = list(jobs)
     matches = []
     
-    for job in jobs:
-        match_result = calculate_built_resume_match(built_resume, job)
+    for job, match_result in zip(jobs, calculate_built_resume_matches(built_resume, jobs)):
         if match_result['score'] > 0:
             matches.append({
                 'job': job,
@@ -41,6 +42,33 @@ def calculate_built_resume_match(built_resume, job):
     
     return result
 
+def calculate_built_resume_matches(built_resume, jobs):
+    """
+    مطابقة سيرة مبنية مع عدة وظائف دفعة واحدة (البيانات تُستخرج مرة واحدة)
+    النتائج بنفس ترتيب jobs ومطابقة لـ calculate_built_resume_match
+    """
+    resume_data = extract_resume_data(built_resume)
+    results = EnhancedMatcher().score_many(resume_data, list(jobs))
+    for result in results:
+        result['built_resume_id'] = built_resume.id
+        result['resume_title'] = built_resume.title
+    return results
+
+def calculate_built_resumes_matches_for_job(built_resumes, job):
+    """
+    مطابقة عدة سير مبنية مع وظيفة واحدة دفعة واحدة
+    النتائج بنفس ترتيب built_resumes
+    """
+    built_resumes = list(built_resumes)
+    results = EnhancedMatcher().score_resumes(
+        [extract_resume_data(built_resume) for built_resume in built_resumes], job
+    )
+    for built_resume, result in zip(built_resumes, results):
+        result['built_resume_id'] = built_resume.id
+        result['resume_title'] = built_resume.title
+    return results
+
+@memoized_document("built_resume_data")
 def extract_resume_data(built_resume):
     """
     استخراج البيانات من السيرة الذاتية المبنية بصيغة مناسبة للمطابقة
@@ -0,0 +1,263 @@
+# matching/services/embedding_cache.py
+"""
+ذاكرة مؤقتة لمتجهات المستندات (مستند واحد = مفتاح واحد)
+
+- المفتاح: sha256 لمحتوى النص + معرف النموذج، فكل سيرة وكل وظيفة تُضمَّن مرة واحدة
+- الطبقة الأولى: LRU داخل العملية (EMBEDDING_CACHE_SIZE)
+- الطبقة الثانية: جدول DocumentEmbedding (EMBEDDING_CACHE_PERSIST)
+- النص الناقص يُضمَّن مرة واحدة حتى لو طلبته عدة threads أو عمّال معاً (single_flight)
+- التشابه = dot product بين متجهين مطبعين، فمقارنة N سيرة × M وظيفة تكلف N + M تضمين فقط
+
+Usage:
+    from matching.services.embedding_cache import get_embeddings, similarity
+    vectors = get_embeddings(texts)     # (n, dim) float32
+    score = similarity(cv_text, job_text)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.db import DatabaseError
+
+from .embedding_engine import EmbeddingBackend, get_vector_backend
+from .match_context import current_context, memoize_many
+from .single_flight import coalesce_many
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 10_000
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def vector_to_bytes(vector: np.ndarray) -> bytes:
+    return np.ascontiguousarray(vector, dtype=np.float32).tobytes()
+
+
+def vector_from_bytes(data) -> np.ndarray:
+    return np.frombuffer(bytes(data), dtype=np.float32)
+
+
+def _model_id(backend: EmbeddingBackend) -> str:
+    return getattr(backend, "model_id", backend.name)
+
+
+class EmbeddingCache:
+    """LRU داخل العملية أمام جدول DocumentEmbedding"""
+
+    def __init__(
+        self,
+        backend: Optional[EmbeddingBackend] = None,
+        max_size: int = DEFAULT_CACHE_SIZE,
+        persistent: bool = True,
+    ):
+        self._backend = backend
+        self.max_size = max_size
+        self.persistent = persistent
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+
+    @property
+    def backend(self) -> EmbeddingBackend:
+        return self._backend or get_vector_backend()
+
+    @property
+    def model_id(self) -> str:
+        return _model_id(self.backend)
+
+    # ------------------------------------------------------------------
+    # In-process LRU
+    # ------------------------------------------------------------------
+
+    def _lru_get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is not None:
+                self._entries.move_to_end(key)
+            return vector
+
+    def _lru_put(self, key: str, vector: np.ndarray) -> None:
+        vector.setflags(write=False)
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def prime(self, model_id: str, vectors: Dict[str, np.ndarray]) -> None:
+        """إدخال متجهات محملة مسبقاً (مفتاحها hash النص) دون المرور بالطبقة الدائمة"""
+        for h, vector in vectors.items():
+            self._lru_put(f"{model_id}:{h}", vector)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.persistent_hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------------------------------------------
+    # Persistent tier
+    # ------------------------------------------------------------------
+
+    def _load_persistent(self, model_id: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        if not self.persistent or not hashes:
+            return {}
+        from matching.models import DocumentEmbedding
+
+        try:
+            rows = DocumentEmbedding.objects.filter(
+                model_id=model_id, content_hash__in=hashes
+            ).values_list('content_hash', 'vector')
+            return {h: vector_from_bytes(blob) for h, blob in rows}
+        except DatabaseError:
+            logger.exception("Failed to read persisted embeddings")
+            return {}
+
+    def _store_persistent(self, model_id: str, vectors: Dict[str, np.ndarray]) -> None:
+        if not self.persistent or not vectors:
+            return
+        from matching.models import DocumentEmbedding
+
+        try:
+            DocumentEmbedding.objects.bulk_create(
+                [
+                    DocumentEmbedding(
+                        content_hash=h, model_id=model_id,
+                        dim=vector.shape[0], vector=vector_to_bytes(vector),
+                    )
+                    for h, vector in vectors.items()
+                ],
+                ignore_conflicts=True,
+            )
+        except DatabaseError:
+            logger.exception("Failed to persist embeddings")
+
+    def _compute(self, backend: EmbeddingBackend, model_id: str, missing: Dict[str, str]) -> Dict[str, np.ndarray]:
+        self.misses += len(missing)
+        computed = backend.embed_many(list(missing.values()))
+        fresh = {h: np.array(vector, dtype=np.float32) for h, vector in zip(missing, computed)}
+        self._store_persistent(model_id, fresh)
+        for h, vector in fresh.items():
+            self._lru_put(f"{model_id}:{h}", vector)
+        return fresh
+
+    def _compute_shared(self, backend: EmbeddingBackend, model_id: str, missing: Dict[str, str]) -> Dict[str, np.ndarray]:
+        """
+        _compute مرة واحدة لكل نص عبر الـ threads (single-flight)، وعبر العمّال إن كانت
+        الطبقة الدائمة مفعّلة (العامل المنتظر يقرأ المتجه من DocumentEmbedding)
+        """
+        prefix = f"emb:{model_id}:"
+
+        def compute_many(keys: List[str]) -> Dict[str, np.ndarray]:
+            hashes = {key[len(prefix):]: missing[key[len(prefix):]] for key in keys}
+            return {prefix + h: vector for h, vector in self._compute(backend, model_id, hashes).items()}
+
+        def lookup_many(keys: List[str]) -> Dict[str, np.ndarray]:
+            stored = self._load_persistent(model_id, [key[len(prefix):] for key in keys])
+            for h, vector in stored.items():
+                self._lru_put(f"{model_id}:{h}", vector)
+            return {prefix + h: vector for h, vector in stored.items()}
+
+        vectors = coalesce_many(
+            [prefix + h for h in missing], compute_many, lookup_many if self.persistent else None,
+        )
+        return {key[len(prefix):]: vector for key, vector in vectors.items()}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get_many(self, texts: Sequence[str]) -> np.ndarray:
+        """متجهات النصوص بالترتيب؛ تُحسب فقط النصوص غير الموجودة في الطبقتين"""
+        texts = list(texts)
+        backend = self.backend
+        model_id = _model_id(backend)
+
+        hashes = [content_hash(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        missing: Dict[str, str] = {}
+        for text, h in zip(texts, hashes):
+            if h in found or h in missing:
+                continue
+            vector = self._lru_get(f"{model_id}:{h}")
+            if vector is not None:
+                self.hits += 1
+                found[h] = vector
+            else:
+                missing[h] = text
+
+        if missing:
+            persisted = self._load_persistent(model_id, list(missing))
+            self.persistent_hits += len(persisted)
+            for h, vector in persisted.items():
+                found[h] = vector
+                self._lru_put(f"{model_id}:{h}", vector)
+                del missing[h]
+
+        if missing:
+            found.update(self._compute_shared(backend, model_id, missing))
+
+        if not texts:
+            return np.zeros((0, getattr(backend, "dim", 0)), dtype=np.float32)
+        return np.vstack([found[h] for h in hashes])
+
+    def get(self, text: str) -> np.ndarray:
+        return self.get_many([text])[0]
+
+    def similarity(self, text1: str, text2: str) -> float:
+        vectors = self.get_many([text1, text2])
+        return float(np.dot(vectors[0], vectors[1]))
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> EmbeddingCache:
+    """نسخة واحدة لكل عملية حسب الإعدادات"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache(
+                    max_size=getattr(settings, "EMBEDDING_CACHE_SIZE", DEFAULT_CACHE_SIZE),
+                    persistent=getattr(settings, "EMBEDDING_CACHE_PERSIST", True),
+                )
+    return _cache
+
+
+def get_embeddings(texts: Sequence[str]) -> np.ndarray:
+    texts = list(texts)
+    if not texts or current_context() is None:
+        return get_cache().get_many(texts)
+    # داخل الطلب: كل نص يُجلب من الذاكرة مرة واحدة
+    return np.vstack(memoize_many("embeddings", texts, lambda missing: list(get_cache().get_many(missing))))
+
+
+def get_embedding(text: str) -> np.ndarray:
+    return get_embeddings([text])[0]
+
+
+def similarity(text1: str, text2: str) -> float:
+    """تشابه جيب التمام بين متجهين مخزنين (dot product لمتجهات مطبعة)"""
+    return get_cache().similarity(text1, text2)
+
+
+__all__ = [
+    "EmbeddingCache", "content_hash", "vector_to_bytes", "vector_from_bytes",
+    "get_cache", "get_embedding", "get_embeddings", "similarity",
+]
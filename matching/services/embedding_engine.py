@@ -1,16 +1,259 @@
-import requests
+# matching/services/embedding_engine.py
+"""
+محرك التضمين (embeddings) القابل للتبديل
+
+- local (الافتراضي): متجهات hashed لـ n-grams الحروف والكلمات مبنية بـ NumPy،
+  تعمل داخل العملية دون أي اتصال شبكي وتدعم العربية والإنجليزية
+- remote: خدمة التشابه المستضافة (Hugging Face Space) عبر HTTP، تعطي درجة تشابه فقط
+  (similarity_client: اتصالات دائمة ودفعات متوازية)
+
+الإعدادات: EMBEDDING_BACKEND ("local" | "remote")، EMBEDDING_DIM، ML_SIMILARITY_URL
+
+Usage:
+    from matching.services.embedding_engine import get_embedding, get_embeddings, similarity
+    vector = get_embedding(cv_text)            # np.ndarray (dim,) float32, L2-normalized
+    matrix = get_embeddings([cv_text, job])    # np.ndarray (n, dim)
+    score = similarity(cv_text, job_text)      # float
+    scores = similarity_many([(cv, job_a), (cv, job_b)])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import zlib
+from functools import lru_cache
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
 
 HF_ML_URL = "https://alaa95mrs-smart-recruitment-ml.hf.space/similarity"
 
+DEFAULT_DIM = 512
+
+# كلمة تبدأ بحرف/رقم وقد تحتوي + # . / - (c++, c#, node.js, ci/cd)
+_TOKEN_RE = re.compile(r"\w[\w+#./-]*", re.UNICODE)
+
+
+# ------------------------------------------------------------------
+# Backends
+# ------------------------------------------------------------------
+
+class EmbeddingBackend:
+    """الواجهة المشتركة لكل محركات التضمين"""
+
+    name = "base"
+    supports_vectors = True
+
+    @classmethod
+    def from_settings(cls) -> "EmbeddingBackend":
+        """نسخة بإعدادات المشروع (get_backend ينشئ كل المحركات المسجلة في BACKENDS بها)"""
+        return cls()
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        raise NotImplementedError
+
+    def similarity(self, text1: str, text2: str) -> float:
+        vectors = self.embed_many([text1, text2])
+        return float(np.dot(vectors[0], vectors[1]))
+
+    def similarity_many(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        """درجة لكل زوج؛ كل نص مميز يُضمَّن مرة واحدة"""
+        pairs = list(pairs)
+        if not pairs:
+            return []
+        texts = list(dict.fromkeys(text for pair in pairs for text in pair))
+        position = {text: i for i, text in enumerate(texts)}
+        vectors = self.embed_many(texts)
+        left = vectors[[position[a] for a, _ in pairs]]
+        right = vectors[[position[b] for _, b in pairs]]
+        return np.einsum("ij,ij->i", left, right).astype(float).tolist()
+
+
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    متجهات محلية: hashing لـ n-grams الحروف داخل كل كلمة + الكلمة نفسها
+    - التوحيد: حذف التشكيل، توحيد الألف/الياء/التاء المربوطة، تحويل الأرقام العربية، أحرف صغيرة
+    - الوزن: log(1 + tf) ثم تطبيع L2 (لا يعتمد على corpus، فالمتجه ثابت لنفس النص)
+    """
+
+    name = "local-hashing"
+    version = "1"
+    supports_vectors = True
+
+    def __init__(self, dim: int = DEFAULT_DIM, ngram_range: Tuple[int, int] = (3, 5)):
+        # استيراد متأخر: resumes.services يستورد هذا الملف عند التحميل
+        from resumes.services.arabic_processor import ArabicProcessor
+
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self._normalize = ArabicProcessor.normalize_arabic_text
+        self._word_features = lru_cache(maxsize=200_000)(self._compute_word_features)
+
+    @classmethod
+    def from_settings(cls) -> "HashingEmbeddingBackend":
+        return cls(dim=getattr(settings, "EMBEDDING_DIM", DEFAULT_DIM))
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}-v{self.version}-d{self.dim}-n{self.ngram_range[0]}{self.ngram_range[1]}"
+
+    def normalize(self, text: str) -> str:
+        return self._normalize(text or "")
+
+    def tokenize(self, text: str) -> List[str]:
+        return [token.rstrip("./-") for token in _TOKEN_RE.findall(self.normalize(text))]
+
+    def _compute_word_features(self, word: str) -> Tuple[int, ...]:
+        features = [f"w:{word}"]
+        padded = f" {word} "
+        low, high = self.ngram_range
+        if len(padded) <= low:
+            features.append(padded)
+        else:
+            for n in range(low, min(high, len(padded)) + 1):
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return tuple(zlib.crc32(f.encode("utf-8")) % self.dim for f in features)
+
+    def _text_indices(self, text: str) -> List[int]:
+        indices: List[int] = []
+        for word in self.tokenize(text):
+            if word:
+                indices.extend(self._word_features(word))
+        return indices
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        texts = list(texts)
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            indices = self._text_indices(text)
+            cols.extend(indices)
+            rows.extend([row] * len(indices))
+
+        flat = np.asarray(rows, dtype=np.int64) * self.dim + np.asarray(cols, dtype=np.int64)
+        counts = np.bincount(flat, minlength=len(texts) * self.dim).astype(np.float32)
+        matrix = np.log1p(counts).reshape(len(texts), self.dim)
+
+        norms = np.sqrt(np.sum(matrix * matrix, axis=1, keepdims=True))
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        return matrix
+
+
+class RemoteSimilarityBackend(EmbeddingBackend):
+    """
+    خدمة التشابه المستضافة: تعطي درجة لكل زوج نصوص ولا تكشف المتجهات
+    الطلبات عبر SimilarityClient (اتصالات دائمة، دفعات، تزامن محدود)
+    والدرجات تُحفظ في tiered_cache (LRU محلية + الذاكرة المشتركة) فلا يُرسل زوج مرتين
+    """
+
+    name = "remote"
+    supports_vectors = False
+
+    def __init__(self, url: str = HF_ML_URL, timeout: int = None):
+        # استيراد متأخر: العميل يقرأ الإعدادات عند الإنشاء فقط
+        from .similarity_client import get_similarity_client
+
+        self.url = url
+        self.client = get_similarity_client(url)
+        if timeout is not None:
+            self.client.timeout = timeout
+
+    @classmethod
+    def from_settings(cls) -> "RemoteSimilarityBackend":
+        return cls(url=getattr(settings, "ML_SIMILARITY_URL", None) or HF_ML_URL)
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        from .similarity_client import SimilarityServiceError
+
+        # supports_vectors = False: من يحتاج متجهات يستخدم get_vector_backend()
+        raise SimilarityServiceError("The remote similarity service does not expose vectors")
+
+    def _cache_key(self, text1: str, text2: str) -> str:
+        digest = hashlib.sha256("\n".join((self.url, text1, text2)).encode("utf-8")).hexdigest()
+        return f"remote:sim:{digest}"
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return self.similarity_many([(text1, text2)])[0]
+
+    def similarity_many(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        from .tiered_cache import get_tiered_cache
+
+        pairs = [tuple(pair) for pair in pairs]
+        results = get_tiered_cache()
+        keys = [self._cache_key(*pair) for pair in pairs]
+        scores = results.get_many(keys)
+        missing = {}
+        for key, pair in zip(keys, pairs):
+            if key not in scores:
+                missing.setdefault(key, pair)
+        if missing:
+            computed = dict(zip(missing, self.client.similarity_many(list(missing.values()))))
+            results.set_many(computed, getattr(settings, "ML_SERVICE_CACHE_TTL", 3600))
+            scores.update(computed)
+        return [float(scores[key]) for key in keys]
+
+
+BACKENDS = {
+    "local": HashingEmbeddingBackend,
+    "remote": RemoteSimilarityBackend,
+}
+
+_backends: Dict[str, EmbeddingBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def _create_backend(name: str) -> EmbeddingBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND: {name!r}")
+    return BACKENDS[name].from_settings()
+
+
+def get_backend(name: str = None) -> EmbeddingBackend:
+    """المحرك المُعدّ في الإعدادات (نسخة واحدة لكل عملية)"""
+    name = name or getattr(settings, "EMBEDDING_BACKEND", "local")
+    backend = _backends.get(name)
+    if backend is None:
+        with _backends_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = _create_backend(name)
+    return backend
+
+
+def get_vector_backend() -> EmbeddingBackend:
+    """المحرك المستخدم للمتجهات: المُعدّ إن كان يدعمها وإلا المحلي"""
+    backend = get_backend()
+    return backend if backend.supports_vectors else get_backend("local")
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def get_embeddings(texts: Sequence[str]) -> np.ndarray:
+    """متجهات L2-normalized لعدة نصوص دفعة واحدة: (n, dim) float32"""
+    return get_vector_backend().embed_many(texts)
+
+
+def get_embedding(text: str) -> np.ndarray:
+    """متجه L2-normalized لنص واحد: (dim,) float32"""
+    return get_embeddings([text])[0]
+
+
 def similarity(text1, text2):
-    response = requests.post(
-        HF_ML_URL,
-        json={
-            "cv": text1,
-            "job": text2
-        },
-        timeout=20
-    )
-
-    response.raise_for_status()
-    return response.json()["score"]
+    """درجة التشابه بين نصين حسب المحرك المُعدّ"""
+    return get_backend().similarity(text1, text2)
+
+
+def similarity_many(pairs: Sequence[Tuple[str, str]]) -> List[float]:
+    """درجة لكل زوج (نص، نص) بنفس الترتيب؛ البعيد يرسلها دفعات متوازية"""
+    return get_backend().similarity_many(pairs)
+
+
+__all__ = [
+    "EmbeddingBackend", "HashingEmbeddingBackend", "RemoteSimilarityBackend",
+    "get_backend", "get_vector_backend", "get_embedding", "get_embeddings", "similarity",
+    "similarity_many",
+]
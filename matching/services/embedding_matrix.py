@@ -0,0 +1,168 @@
+# matching/services/embedding_matrix.py
+"""
+مصفوفة المتجهات المشتركة بين عمّال gunicorn
+
+- export_matrix: يكتب متجهات الوظائف النشطة / السير القابلة للمطابقة في ملف .npy متصل (float32)
+  مع ملف معرفات <kind>.ids.json بنفس ترتيب الصفوف
+- load_matrix: يفتح الملف بـ np.memmap للقراءة فقط، فكل العمّال يتشاركون نسخة واحدة في page cache
+- المسح الكامل للكتالوج = ضرب مصفوفة × متجه واحد
+- لقطة يدوية (manage.py export_embeddings) للمسح دون اتصال: لا تُحدَّث بعد الحفظ، لذلك
+  مسارات الطلبات (المطابقة، فهرس ANN) تقرأ جداول المتجهات لا هذا الملف
+
+الإعدادات: EMBEDDING_MATRIX_DIR
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from matching.models import JobEmbedding, ResumeEmbedding
+from matching.services.embedding_cache import get_cache, vector_from_bytes
+
+logger = logging.getLogger(__name__)
+
+KINDS = ('jobs', 'resumes')
+
+
+def matrix_dir() -> Path:
+    return Path(getattr(settings, "EMBEDDING_MATRIX_DIR", Path(settings.BASE_DIR) / "var" / "embeddings"))
+
+
+def _paths(kind: str, directory: Optional[Path] = None) -> Tuple[Path, Path]:
+    if kind not in KINDS:
+        raise ValueError(f"Unknown embedding matrix: {kind!r}")
+    directory = Path(directory or matrix_dir())
+    return directory / f"{kind}.npy", directory / f"{kind}.ids.json"
+
+
+# ------------------------------------------------------------------
+# Export
+# ------------------------------------------------------------------
+
+def _rows(kind: str, model_id: str):
+    """(المعرف، blob) بترتيب ثابت؛ الوظائف: job_id، السير: [resume_type, id]"""
+    if kind == 'jobs':
+        rows = JobEmbedding.objects.filter(
+            model_id=model_id, job__is_active=True,
+        ).order_by('job_id').values_list('job_id', 'vector')
+        return [(job_id, blob) for job_id, blob in rows]
+
+    rows = ResumeEmbedding.objects.filter(model_id=model_id).filter(
+        resume__is_processed=True
+    ).order_by('resume_id').values_list('resume_id', 'vector')
+    built = ResumeEmbedding.objects.filter(
+        model_id=model_id, built_resume__is_active=True,
+    ).order_by('built_resume_id').values_list('built_resume_id', 'vector')
+    return [(['uploaded', rid], blob) for rid, blob in rows] + [(['built', bid], blob) for bid, blob in built]
+
+
+def export_matrix(kind: str, directory: Optional[Path] = None) -> int:
+    """كتابة المصفوفة وملف المعرفات (استبدال ذري حتى لا يقرأ عامل ملفاً نصف مكتوب)"""
+    model_id = get_cache().model_id
+    rows = _rows(kind, model_id)
+    dim = getattr(get_cache().backend, "dim", 0)
+
+    matrix = np.zeros((len(rows), dim), dtype=np.float32)
+    ids = []
+    for i, (key, blob) in enumerate(rows):
+        matrix[i] = vector_from_bytes(blob)
+        ids.append(key)
+
+    npy_path, ids_path = _paths(kind, directory)
+    npy_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_npy = npy_path.with_suffix(".npy.tmp")
+    with open(tmp_npy, "wb") as f:
+        np.save(f, matrix)
+    tmp_ids = ids_path.with_suffix(".json.tmp")
+    tmp_ids.write_text(json.dumps({
+        'model_id': model_id, 'dim': dim, 'count': len(ids), 'ids': ids,
+    }))
+
+    os.replace(tmp_npy, npy_path)
+    os.replace(tmp_ids, ids_path)
+    return len(ids)
+
+
+# ------------------------------------------------------------------
+# Load
+# ------------------------------------------------------------------
+
+class EmbeddingMatrix:
+    """مصفوفة متجهات للقراءة فقط (memmap) مع خريطة المعرف ↔ الصف"""
+
+    def __init__(self, vectors: np.ndarray, ids: List, model_id: str):
+        self.vectors = vectors
+        self.ids = [tuple(key) if isinstance(key, list) else key for key in ids]
+        self.model_id = model_id
+        self.index_of: Dict = {key: i for i, key in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def vector(self, key) -> Optional[np.ndarray]:
+        row = self.index_of.get(key)
+        return None if row is None else self.vectors[row]
+
+    def scores(self, query: np.ndarray) -> np.ndarray:
+        """تشابه جيب التمام مع كل الصفوف (المتجهات مطبعة): ضرب واحد"""
+        return self.vectors @ np.asarray(query, dtype=np.float32)
+
+    def top_k(self, query: np.ndarray, k: int) -> List[Tuple]:
+        """أفضل k صفوف: [(المعرف، الدرجة)] تنازلياً"""
+        if not len(self):
+            return []
+        scores = self.scores(query)
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+
+def read_matrix(kind: str, directory: Optional[Path] = None) -> Optional[EmbeddingMatrix]:
+    npy_path, ids_path = _paths(kind, directory)
+    if not npy_path.exists() or not ids_path.exists():
+        return None
+
+    meta = json.loads(ids_path.read_text())
+    vectors = np.load(npy_path, mmap_mode="r")
+    if vectors.shape[0] != meta['count']:
+        # تصدير جارٍ بين استبدال الملفين
+        logger.warning("Embedding matrix %s is out of sync with its id map", kind)
+        return None
+    return EmbeddingMatrix(vectors, meta['ids'], meta['model_id'])
+
+
+_loaded: Dict[str, Tuple[float, EmbeddingMatrix]] = {}
+_loaded_lock = threading.Lock()
+
+
+def load_matrix(kind: str) -> Optional[EmbeddingMatrix]:
+    """
+    المصفوفة المصدّرة لهذا النوع (تُفتح مرة لكل عملية وتُعاد عند تغيّر الملف)
+    يرجع None إذا لم تُصدَّر بعد أو كانت لنموذج تضمين مختلف
+    """
+    npy_path, ids_path = _paths(kind)
+    try:
+        mtime = max(npy_path.stat().st_mtime, ids_path.stat().st_mtime)
+    except FileNotFoundError:
+        return None
+
+    with _loaded_lock:
+        cached = _loaded.get(str(npy_path))
+        if cached is None or cached[0] != mtime:
+            matrix = read_matrix(kind)
+            if matrix is None:
+                return None
+            _loaded[str(npy_path)] = cached = (mtime, matrix)
+
+    matrix = cached[1]
+    if matrix.model_id != get_cache().model_id:
+        return None
+    return matrix
@@ -4,14 +4,37 @@
 محرك مطابقة محسّن مع دعم المرادفات والعربية
 """
 
-from typing import Dict, Any, List
+import logging
+from typing import Dict, Any, List, NamedTuple, Optional, Sequence
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 
-from .embedding_engine import get_embedding
+from .embedding_cache import get_embedding, get_embeddings
+from .skill_vocabulary import SkillVocabulary, get_language_vocabulary, get_vocabulary, overlap_counts
 from resumes.services.skill_synonyms import SkillSynonyms
 from resumes.services.arabic_processor import ArabicProcessor
 
+logger = logging.getLogger(__name__)
+
+
+class SemanticContext(NamedTuple):
+    """
+    التشابه الدلالي لزوج واحد: يُحسب مرة واحدة من متجهي المستندين (resume_text / job_text)
+    ويُشارك بين الدرجة ونقاط القوة والضعف والتوصيات (matcher.finalize_match_result)
+    """
+    similarity: float
+    score: float
+    
+    def as_details(self) -> Dict[str, Any]:
+        return {
+            'score': self.score,
+            'percentage': f"{self.similarity * 100:.1f}%",
+            'similarity': self.similarity,
+        }
+    
+    @classmethod
+    def from_details(cls, details: Dict[str, Any]) -> "SemanticContext":
+        return cls(details['similarity'], details['score'])
+
 
 class EnhancedMatcher:
     """محرك مطابقة محسّن"""
@@ -31,14 +54,54 @@ class EnhancedMatcher:
             return 0.0
         
         try:
-            v1 = np.array(get_embedding(resume_text)).reshape(1, -1)
-            v2 = np.array(get_embedding(job_text)).reshape(1, -1)
-            similarity = float(cosine_similarity(v1, v2)[0][0])
+            v1 = np.asarray(get_embedding(resume_text), dtype=np.float64).reshape(1, -1)
+            v2 = np.asarray(get_embedding(job_text), dtype=np.float64).reshape(1, -1)
+            similarity = float(self._cosine_rows(v1, v2)[0])
             return similarity
-        except Exception as e:
-            print(f"خطأ في حساب التشابه: {e}")
+        except Exception:
+            logger.exception("Semantic similarity failed")
             return 0.0
     
+    @staticmethod
+    def resume_text(resume_data: Dict) -> str:
+        """نص السيرة الذي يُضمَّن للتشابه الدلالي (ومتجهه يُخزن في ResumeEmbedding)"""
+        return " ".join(resume_data.get("skills", []) + resume_data.get("experience", []))
+    
+    @staticmethod
+    def job_text(job: Any) -> str:
+        """نص الوظيفة الذي يُضمَّن للتشابه الدلالي (ومتجهه يُخزن في JobEmbedding)"""
+        return " ".join(job.required_skills or []) + " " + (job.title or "")
+    
+    def score_upper_bound(self, job: Any, shared_required: int, shared_preferred: int) -> float:
+        """
+        أعلى درجة ممكنة لزوج يعرف عدد المهارات المشتركة فقط
+        (المهارات دقيقة، والدلالي واللغات والخبرة بحدها الأقصى إن كانت الوظيفة تطلبها)
+        """
+        required_total = len(job.required_skills or [])
+        preferred_total = len(job.preferred_skills or [])
+        bound = self.weights['semantic'] * 100
+        if required_total:
+            bound += shared_required / required_total * self.weights['required_skills'] * 100
+        if preferred_total:
+            bound += shared_preferred / preferred_total * self.weights['preferred_skills'] * 100
+        if job.languages:
+            bound += self.weights['languages'] * 100
+        if (job.experience_years or 0) > 0:
+            bound += self.weights['experience'] * 100
+        # هامش لأخطاء الفاصلة العائمة في تشابه جيب التمام
+        return bound + 1e-6
+    
+    @staticmethod
+    def _cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        تشابه جيب التمام صفاً بصف (مع البث إذا كان أحدهما صفاً واحداً)
+        نفس الصيغة تُستخدم في المسار الفردي والدفعي لضمان نتائج متطابقة
+        """
+        dots = np.sum(a * b, axis=1)
+        norms = np.sqrt(np.sum(a * a, axis=1)) * np.sqrt(np.sum(b * b, axis=1))
+        safe = np.where(norms > 0, norms, 1.0)
+        return np.where(norms > 0, dots / safe, 0.0)
+    
     def calculate_skills_match(
         self, 
         resume_skills: List[str], 
@@ -55,21 +118,14 @@ class EnhancedMatcher:
                 'missing': [],
             }
         
-        # استخدام SkillSynonyms للمطابقة
-        result = SkillSynonyms.match_skills(resume_skills, job_skills)
-        
-        matched_count = len(result['matched'])
-        total_count = len(job_skills)
-        percentage = matched_count / total_count if total_count > 0 else 0
-        
-        return {
-            'score': percentage * weight * 100,
-            'percentage': f"{percentage * 100:.1f}%",
-            'matched': result['matched'],
-            'missing': result['missing'],
-            'matched_count': matched_count,
-            'total_count': total_count,
-        }
+        # نفس مسار الدفعات: مهارات موحدة مرمّزة كبتات على المفردات العامة
+        scores, details = self._skills_batch(
+            [self._normalized(None, resume_skills)],
+            [self._normalized(None, job_skills)],
+            [len(job_skills)],
+            weight,
+        )
+        return details[0]
     
     def calculate_experience_score(
         self, 
@@ -107,22 +163,12 @@ class EnhancedMatcher:
         if not job_languages:
             return {'score': 0, 'percentage': '0%', 'matched': [], 'missing': []}
         
-        # توحيد اللغات
-        resume_langs = {lang.lower() for lang in resume_languages}
-        job_langs = {lang.lower() for lang in job_languages}
-        
-        matched = resume_langs & job_langs
-        missing = job_langs - resume_langs
-        
-        percentage = len(matched) / len(job_langs) if job_langs else 0
-        score = percentage * weight * 100
-        
-        return {
-            'score': score,
-            'percentage': f"{percentage * 100:.1f}%",
-            'matched': list(matched),
-            'missing': list(missing),
-        }
+        scores, details = self._languages_batch(
+            [self._lowered(None, resume_languages)],
+            [self._lowered(None, job_languages)],
+            weight,
+        )
+        return details[0]
     
     def calculate_match_score(self, resume_data: Dict, job: Any) -> Dict:
         """حساب درجة المطابقة الكاملة"""
@@ -131,18 +177,13 @@ class EnhancedMatcher:
         details = {}
         
         # 1. Semantic Matching
-        resume_text = " ".join(resume_data.get("skills", []) + 
-                              resume_data.get("experience", []))
-        job_text = " ".join(job.required_skills or []) + " " + (job.title or "")
+        resume_text = self.resume_text(resume_data)
+        job_text = self.job_text(job)
         
         semantic_similarity = self.calculate_semantic_score(resume_text, job_text)
-        semantic_score = semantic_similarity * self.weights['semantic'] * 100
-        details['semantic'] = {
-            'score': semantic_score,
-            'percentage': f"{semantic_similarity * 100:.1f}%",
-            'similarity': semantic_similarity,
-        }
-        total_score += semantic_score
+        semantic = SemanticContext(semantic_similarity, semantic_similarity * self.weights['semantic'] * 100)
+        details['semantic'] = semantic.as_details()
+        total_score += semantic.score
         
         # 2. Required Skills
         required_result = self.calculate_skills_match(
@@ -188,6 +229,252 @@ class EnhancedMatcher:
             'summary': self._generate_summary(details),
         }
     
+    # ------------------------------------------------------------------
+    # Batch API (نفس نتائج calculate_match_score لكن بعمليات مصفوفات)
+    # ------------------------------------------------------------------
+    
+    def score_many(self, resume_data: Dict, jobs: Sequence[Any]) -> List[Dict]:
+        """مطابقة سيرة واحدة مع عدة وظائف دفعة واحدة (النتائج بنفس ترتيب jobs)"""
+        return self._score_batch([resume_data], list(jobs))
+    
+    def score_resumes(self, resumes_data: Sequence[Dict], job: Any) -> List[Dict]:
+        """مطابقة عدة سير مع وظيفة واحدة دفعة واحدة (النتائج بنفس ترتيب resumes_data)"""
+        return self._score_batch(list(resumes_data), [job])
+    
+    def _score_batch(self, resumes_data: List[Dict], jobs: List[Any]) -> List[Dict]:
+        """
+        حساب كل الأزواج مرة واحدة: أحد الطرفين عنصر واحد والآخر قائمة (بث numpy)
+        المهارات واللغات تُرمّز كمصفوفات منطقية على مفردات مشتركة،
+        والتوحيد بالمرادفات يتم مرة واحدة لكل مهارة مميزة
+        """
+        if not resumes_data or not jobs:
+            return []
+        if len(resumes_data) > 1 and len(jobs) > 1:
+            raise ValueError("score batch expects one resume or one job")
+        
+        pairs = max(len(resumes_data), len(jobs))
+        
+        # 1. Semantic Matching
+        semantic = self._semantic_batch(
+            [self.resume_text(d) for d in resumes_data],
+            [self.job_text(job) for job in jobs],
+        )
+        semantic_scores = semantic * self.weights['semantic'] * 100
+        
+        # 2..5 المكونات المهيكلة
+        (
+            (required_scores, required_details),
+            (preferred_scores, preferred_details),
+            (languages_scores, languages_details),
+            (experience_scores, experience_details),
+        ) = self._structured_batch(resumes_data, jobs)
+        
+        # نفس ترتيب الجمع في المسار الفردي
+        totals = np.zeros(pairs)
+        totals = totals + semantic_scores
+        totals = totals + required_scores
+        totals = totals + preferred_scores
+        totals = totals + languages_scores
+        totals = totals + experience_scores
+        
+        results = []
+        for p in range(pairs):
+            details = {
+                'semantic': SemanticContext(float(semantic[p]), float(semantic_scores[p])).as_details(),
+                'required_skills': required_details[p],
+                'preferred_skills': preferred_details[p],
+                'languages': languages_details[p],
+                'experience': experience_details[p],
+            }
+            total_score = float(totals[p])
+            results.append({
+                'score': round(total_score, 2),
+                'percentage': f"{round(total_score, 1)}%",
+                'level': self._get_match_level(total_score),
+                'details': details,
+                'summary': self._generate_summary(details),
+            })
+        return results
+    
+    def structured_scores(self, resumes_data: Sequence[Dict], jobs: Sequence[Any]) -> np.ndarray:
+        """
+        مجموع المكونات الرخيصة فقط (المهارات، اللغات، الخبرة) دون التشابه الدلالي
+        للمرحلة الأولى من match_pipeline؛ الدرجة الكاملة ≤ هذه القيمة + وزن الدلالي
+        """
+        resumes_data, jobs = list(resumes_data), list(jobs)
+        if not resumes_data or not jobs:
+            return np.zeros(0)
+        totals = np.zeros(max(len(resumes_data), len(jobs)))
+        for scores, _ in self._structured_batch(resumes_data, jobs):
+            totals = totals + scores
+        return totals
+    
+    def _structured_batch(self, resumes_data: List[Dict], jobs: List[Any]):
+        """(scores, details) للمهارات المطلوبة والمفضلة واللغات والخبرة بهذا الترتيب"""
+        resume_skills = [
+            self._normalized(d.get("normalized_skills"), d.get("skills", [])) for d in resumes_data
+        ]
+        
+        # 2. Required Skills / 3. Preferred Skills
+        required = self._skills_batch(
+            resume_skills,
+            [self._normalized(getattr(job, 'normalized_required_skills', None), job.required_skills) for job in jobs],
+            [len(job.required_skills or []) for job in jobs],
+            self.weights['required_skills'],
+        )
+        preferred = self._skills_batch(
+            resume_skills,
+            [self._normalized(getattr(job, 'normalized_preferred_skills', None), job.preferred_skills) for job in jobs],
+            [len(job.preferred_skills or []) for job in jobs],
+            self.weights['preferred_skills'],
+        )
+        
+        # 4. Languages
+        languages = self._languages_batch(
+            [self._lowered(d.get("normalized_languages"), d.get("languages", [])) for d in resumes_data],
+            [self._lowered(getattr(job, 'normalized_languages', None), job.languages) for job in jobs],
+            self.weights['languages'],
+        )
+        
+        # 5. Experience
+        experience = self._experience_batch(
+            [d.get("experience_years", 0) or 0 for d in resumes_data],
+            [job.experience_years or 0 for job in jobs],
+            self.weights['experience'],
+        )
+        return required, preferred, languages, experience
+    
+    @staticmethod
+    def _normalized(stored: Optional[List[str]], raw: Optional[List[str]]) -> set:
+        """المهارات الموحدة المخزنة (Job/Resume) إن وُجدت، وإلا توحيد القائمة الخام"""
+        if stored is not None:
+            return set(stored)
+        return set(SkillSynonyms.normalize_many(raw or []))
+    
+    @staticmethod
+    def _lowered(stored: Optional[List[str]], raw: Optional[List[str]]) -> set:
+        if stored is not None:
+            return set(stored)
+        return {lang.lower() for lang in raw or []}
+    
+    def _semantic_batch(self, resume_texts: List[str], job_texts: List[str]) -> np.ndarray:
+        """تشابه دلالي لكل زوج مع حساب embedding مرة واحدة لكل نص مميز"""
+        vectors: Dict[str, Optional[np.ndarray]] = {}
+        texts = sorted({text for text in set(resume_texts) | set(job_texts) if text})
+        try:
+            # دفعة واحدة عبر ذاكرة المتجهات: النصوص المعروفة لا يُعاد تضمينها
+            matrix = np.asarray(get_embeddings(texts), dtype=np.float64) if texts else None
+            vectors = {text: matrix[i] for i, text in enumerate(texts)}
+        except Exception:
+            # الدرجة الدلالية صفر لكل الأزواج: بقية المكونات تُحسب كالمعتاد
+            logger.exception("Batch semantic similarity failed for %d texts", len(texts))
+        
+        pairs = max(len(resume_texts), len(job_texts))
+        scores = np.zeros(pairs)
+        rows = []
+        for p in range(pairs):
+            v1 = vectors.get(resume_texts[0 if len(resume_texts) == 1 else p])
+            v2 = vectors.get(job_texts[0 if len(job_texts) == 1 else p])
+            if v1 is not None and v2 is not None and v1.shape == v2.shape:
+                rows.append((p, v1, v2))
+        
+        if rows:
+            index = np.array([p for p, _, _ in rows])
+            scores[index] = self._cosine_rows(
+                np.stack([v1 for _, v1, _ in rows]),
+                np.stack([v2 for _, _, v2 in rows]),
+            )
+        return scores
+    
+    @staticmethod
+    def _overlap_batch(resume_sets: List[set], job_sets: List[set], vocabulary: SkillVocabulary):
+        """عدد العناصر المتطابقة لكل زوج (AND + popcount) + بتات المتطابق والناقص"""
+        resumes = vocabulary.encode(resume_sets)
+        jobs = vocabulary.encode(job_sets)
+        # ترميز الوظائف قد يضيف مهارات جديدة: توحيد عرض المصفوفتين
+        resumes = np.pad(resumes, ((0, 0), (0, jobs.shape[1] - resumes.shape[1])))
+        matched = resumes & jobs
+        missing = jobs & ~resumes
+        return matched, missing, overlap_counts(resumes, jobs)
+    
+    def _skills_batch(self, resume_sets, job_sets, totals, weight):
+        vocabulary = get_vocabulary()
+        matched, missing, matched_counts = self._overlap_batch(resume_sets, job_sets, vocabulary)
+        totals = np.broadcast_to(np.array(totals), matched_counts.shape)
+        has_skills = totals > 0
+        percentages = np.divide(
+            matched_counts.astype(np.float64), totals,
+            out=np.zeros(len(totals)), where=has_skills,
+        )
+        scores = np.where(has_skills, percentages * weight * 100, 0)
+        matched_terms, missing_terms = vocabulary.decode_many(matched), vocabulary.decode_many(missing)
+        
+        details = []
+        for p in range(len(totals)):
+            if not has_skills[p]:
+                details.append({'score': 0, 'percentage': 0, 'matched': [], 'missing': []})
+                continue
+            details.append({
+                'score': float(scores[p]),
+                'percentage': f"{percentages[p] * 100:.1f}%",
+                'matched': matched_terms[p],
+                'missing': missing_terms[p],
+                'matched_count': int(matched_counts[p]),
+                'total_count': int(totals[p]),
+            })
+        return scores, details
+    
+    def _languages_batch(self, resume_sets, job_sets, weight):
+        vocabulary = get_language_vocabulary()
+        matched, missing, matched_counts = self._overlap_batch(resume_sets, job_sets, vocabulary)
+        totals = np.broadcast_to(np.array([len(langs) for langs in job_sets]), matched_counts.shape)
+        has_languages = totals > 0
+        percentages = np.divide(
+            matched_counts.astype(np.float64), totals,
+            out=np.zeros(len(totals)), where=has_languages,
+        )
+        scores = np.where(has_languages, percentages * weight * 100, 0)
+        matched_terms, missing_terms = vocabulary.decode_many(matched), vocabulary.decode_many(missing)
+        
+        details = []
+        for p in range(len(totals)):
+            if not has_languages[p]:
+                details.append({'score': 0, 'percentage': '0%', 'matched': [], 'missing': []})
+                continue
+            details.append({
+                'score': float(scores[p]),
+                'percentage': f"{percentages[p] * 100:.1f}%",
+                'matched': matched_terms[p],
+                'missing': missing_terms[p],
+            })
+        return scores, details
+    
+    def _experience_batch(self, resume_years: List[int], job_years: List[int], weight):
+        pairs = max(len(resume_years), len(job_years))
+        resume_arr = np.broadcast_to(np.array(resume_years, dtype=np.float64), (pairs,))
+        job_arr = np.broadcast_to(np.array(job_years, dtype=np.float64), (pairs,))
+        has_requirement = job_arr > 0
+        ratios = np.minimum(
+            np.divide(resume_arr, job_arr, out=np.zeros(pairs), where=has_requirement), 1.0
+        )
+        scores = np.where(has_requirement, ratios * weight * 100, 0)
+        
+        details = []
+        for p in range(pairs):
+            if not has_requirement[p]:
+                details.append({'score': 0, 'percentage': '0%', 'details': 'No requirement'})
+                continue
+            r_years = resume_years[0 if len(resume_years) == 1 else p]
+            j_years = job_years[0 if len(job_years) == 1 else p]
+            details.append({
+                'score': float(scores[p]),
+                'percentage': f"{ratios[p] * 100:.1f}%",
+                'resume_years': r_years,
+                'job_years': j_years,
+                'meets_requirement': r_years >= j_years,
+            })
+        return scores, details
+    
     @staticmethod
     def _get_match_level(score: float) -> str:
         """تحديد مستوى المطابقة"""
@@ -217,10 +504,10 @@ class EnhancedMatcher:
         if details['languages']['matched']:
             summary.append(f"✓ Speaks required languages")
         
-        # خبرة
-        if details['experience']['meets_requirement']:
+        # خبرة (لا شيء يُذكر إذا لم تحدد الوظيفة سنوات خبرة)
+        if details['experience'].get('meets_requirement'):
             summary.append(f"✓ Has sufficient experience")
-        else:
+        elif 'meets_requirement' in details['experience']:
             summary.append(f"⚠ Experience slightly below requirement")
         
         return " | ".join(summary)
@@ -0,0 +1,121 @@
+# matching/services/match_context.py
+"""
+ذاكرة مطابقة على مستوى الطلب (contextvars)
+
+داخل الطلب الواحد تُحسب خصائص كل مستند (بيانات السيرة، ملف الوظيفة، المهارات الموحدة)
+ومتجهات النصوص ونتائج الأزواج مرة واحدة، ثم تُعاد من الذاكرة لأي استدعاء لاحق
+- تُفعَّل لكل طلب عبر matching.middleware.MatchingContextMiddleware
+  أو حول أي دالة بـ @with_matching_context (أوامر الإدارة، المهام)
+- خارج السياق لا تخزين: memoize تحسب مباشرة
+- حفظ وظيفة أو سيرة يمسح الذاكرة (signals) حتى لا تُقرأ نتيجة قديمة في نفس الطلب
+
+Usage:
+    with matching_context():
+        data = memoize("resume_data", document_key(resume), lambda: build(resume))
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+class MatchContext:
+    """namespace → {key: value} مع عدادات للإصابات"""
+
+    def __init__(self):
+        self._memo: Dict[str, Dict[Hashable, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, namespace: str, key: Hashable, compute: Callable[[], Any]) -> Any:
+        values = self._memo.setdefault(namespace, {})
+        if key in values:
+            self.hits += 1
+            return values[key]
+        self.misses += 1
+        value = values[key] = compute()
+        return value
+
+    def get_many(self, namespace: str, keys: Iterable[Hashable], compute: Callable[[List], List]) -> List:
+        """قيم عدة مفاتيح؛ الناقص يُحسب باستدعاء واحد compute(missing_keys)"""
+        keys = list(keys)
+        values = self._memo.setdefault(namespace, {})
+        missing = list(dict.fromkeys(key for key in keys if key not in values))
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            values.update(zip(missing, compute(missing)))
+        return [values[key] for key in keys]
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+
+_current: ContextVar[Optional[MatchContext]] = ContextVar("matching_context", default=None)
+
+
+def current_context() -> Optional[MatchContext]:
+    return _current.get()
+
+
+@contextmanager
+def matching_context():
+    """سياق جديد (أو السياق الحالي إن كان مفعّلاً: السياقات المتداخلة تتشارك الذاكرة)"""
+    context = _current.get()
+    if context is not None:
+        yield context
+        return
+    context = MatchContext()
+    token = _current.set(context)
+    try:
+        yield context
+    finally:
+        _current.reset(token)
+
+
+def with_matching_context(func):
+    """مُزخرف: تشغيل الدالة داخل matching_context"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with matching_context():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def clear() -> None:
+    context = _current.get()
+    if context is not None:
+        context.clear()
+
+
+def document_key(obj) -> Optional[Hashable]:
+    """مفتاح مستند محفوظ (النموذج، المعرف، آخر تعديل)؛ None للكائنات غير المحفوظة"""
+    pk = getattr(obj, "pk", None)
+    if pk is None:
+        return None
+    return (type(obj).__name__, pk, getattr(obj, "updated_at", None))
+
+
+def memoize(namespace: str, key: Optional[Hashable], compute: Callable[[], Any]) -> Any:
+    context = _current.get()
+    if context is None or key is None:
+        return compute()
+    return context.get_or_compute(namespace, key, compute)
+
+
+def memoize_many(namespace: str, keys: List[Hashable], compute: Callable[[List], List]) -> List:
+    context = _current.get()
+    if context is None:
+        return list(compute(keys))
+    return context.get_many(namespace, keys, compute)
+
+
+def memoized_document(namespace: str):
+    """مُزخرف لدالة تأخذ مستنداً واحداً (وظيفة أو سيرة) وترجع خصائصه"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(obj):
+            return memoize(namespace, document_key(obj), lambda: func(obj))
+        return wrapper
+    return decorator
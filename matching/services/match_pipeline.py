@@ -0,0 +1,126 @@
+# matching/services/match_pipeline.py
+"""
+مطابقة على مرحلتين (retrieve → rerank)
+
+1. ترتيب كل المرشحين بالمكونات الرخيصة فقط: المهارات (SkillSynonyms)، اللغات، سنوات الخبرة
+2. التشابه الدلالي والتفاصيل الكاملة لأفضل N فقط (MATCH_PIPELINE_TOP_N)
+
+- rank_resumes / rank_jobs: تقريبية، تقطع عند أفضل N
+- top_k: دقيقة، وهي ما تستخدمه القراءات المحدودة (match_store.get_matches(limit=...)):
+  المرحلة الثانية تعمل بدفعات N بترتيب الدرجة المهيكلة، وتتوقف حين لا يستطيع
+  (المهيكل + أقصى دلالي) لما تبقى دخول أفضل k
+
+زمن كل مرحلة يُسجَّل في logger ويُحفظ في pipeline.timings
+
+Usage:
+    pipeline = MatchPipeline(top_n=50)
+    ranked = pipeline.rank_resumes(resumes_data, job)   # [(index, result)] تنازلياً
+    ranked = pipeline.top_k(resumes_data, [job], score_chunk, k=10)
+"""
+
+import logging
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .enhanced_matcher import EnhancedMatcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_N = 50
+
+
+class MatchPipeline:
+    """retrieve بالمكونات المهيكلة ثم rerank كامل لأفضل top_n"""
+
+    def __init__(self, top_n: Optional[int] = None, matcher: Optional[EnhancedMatcher] = None):
+        self.top_n = top_n or getattr(settings, "MATCH_PIPELINE_TOP_N", DEFAULT_TOP_N)
+        self.matcher = matcher or EnhancedMatcher()
+        self.timings: Dict[str, float] = {}
+
+    def rank_resumes(self, resumes_data: Sequence[Dict], job: Any) -> List[Tuple[int, Dict]]:
+        """أفضل top_n سير لوظيفة: [(موضع السيرة في المدخلات، النتيجة الكاملة)]"""
+        resumes_data = list(resumes_data)
+        return self._run(
+            len(resumes_data),
+            lambda: self.matcher.structured_scores(resumes_data, [job]),
+            lambda survivors: self.matcher.score_resumes([resumes_data[i] for i in survivors], job),
+        )
+
+    def rank_jobs(self, resume_data: Dict, jobs: Sequence[Any]) -> List[Tuple[int, Dict]]:
+        """أفضل top_n وظائف لسيرة: [(موضع الوظيفة في المدخلات، النتيجة الكاملة)]"""
+        jobs = list(jobs)
+        return self._run(
+            len(jobs),
+            lambda: self.matcher.structured_scores([resume_data], jobs),
+            lambda survivors: self.matcher.score_many(resume_data, [jobs[i] for i in survivors]),
+        )
+
+    def top_k(
+        self,
+        resumes_data: Sequence[Dict],
+        jobs: Sequence[Any],
+        score_chunk: Callable[[List[int]], List[Dict]],
+        k: int,
+        min_score: Optional[float] = None,
+        strict: bool = False,
+    ) -> List[Tuple[int, Dict]]:
+        """
+        أفضل k أزواج بدقة؛ أحد الطرفين عنصر واحد (بث مثل EnhancedMatcher)
+        score_chunk(indices): النتائج الكاملة لمواضع الأزواج، تُستدعى بدفعات top_n
+        يرجع [(index, result)] تنازلياً (heap_top_k)
+        """
+        from .matcher import heap_top_k
+
+        resumes_data, jobs = list(resumes_data), list(jobs)
+        if not resumes_data or not jobs:
+            return []
+
+        start = time.perf_counter()
+        # الدرجة الكاملة ≤ المكونات المهيكلة + أقصى درجة دلالية
+        bounds = self.matcher.structured_scores(resumes_data, jobs) + self.matcher.weights['semantic'] * 100
+        retrieve_ms = (time.perf_counter() - start) * 1000
+
+        reranked = []
+
+        def rerank(indices):
+            reranked.extend(indices)
+            return score_chunk(indices)
+
+        start = time.perf_counter()
+        ranked = heap_top_k(bounds, rerank, k, min_score, strict, chunk_size=self.top_n)
+        rerank_ms = (time.perf_counter() - start) * 1000
+
+        self.timings = {'retrieve_ms': retrieve_ms, 'rerank_ms': rerank_ms}
+        logger.info(
+            "Match pipeline: retrieve %d candidates in %.1f ms, rerank %d for top %d in %.1f ms",
+            len(bounds), retrieve_ms, len(reranked), k, rerank_ms,
+        )
+        return ranked
+
+    def _run(self, count: int, stage1, stage2) -> List[Tuple[int, Dict]]:
+        if not count:
+            return []
+
+        start = time.perf_counter()
+        cheap = stage1()
+        keep = min(self.top_n, count)
+        # ترتيب ثابت: عند التساوي يبقى الترتيب الأصلي
+        survivors = np.argsort(-cheap, kind="stable")[:keep].tolist()
+        retrieve_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        results = stage2(survivors)
+        rerank_ms = (time.perf_counter() - start) * 1000
+
+        self.timings = {'retrieve_ms': retrieve_ms, 'rerank_ms': rerank_ms}
+        logger.info(
+            "Match pipeline: retrieve %d candidates in %.1f ms, rerank top %d in %.1f ms",
+            count, retrieve_ms, keep, rerank_ms,
+        )
+
+        ranked = list(zip(survivors, results))
+        ranked.sort(key=lambda item: item[1]['score'], reverse=True)
+        return ranked
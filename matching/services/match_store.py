@@ -0,0 +1,385 @@
+# matching/services/match_store.py
+"""
+مخزن نتائج المطابقة (MatchResult)
+
+- يُعاد حساب الصفوف المتأثرة فقط عند حفظ Job أو Resume أو BuiltResume (عبر signals):
+  تُحذف صفوف الكائن بعد الـ commit مباشرة (invalidate_*) فلا تُقرأ درجاته القديمة،
+  ومهمة recompute في الطابور تسخّنها مسبقاً؛ بدون عامل تُحسب عند أول قراءة
+- الصفحات تقرأ النتائج المرتبة من الجدول بدلاً من حساب كل زوج في كل طلب
+- الأزواج الناقصة (مثلاً قبل تشغيل rebuild_matches) تُحسب مرة واحدة عند أول قراءة ثم تُخزن
+- يُخزن الخام فقط: نقاط القوة والضعف والتوصيات والتصنيف تُولَّد عند القراءة بلغة الطلب
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Q
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from resumes.models.builder import BuiltResume
+from matching.models import MatchResult
+from matching.services.match_context import current_context, document_key, memoize_many
+
+logger = logging.getLogger(__name__)
+
+# غيّر هذه القيمة عند تعديل طريقة حساب الدرجة حتى تُهمل النتائج القديمة
+ENGINE_VERSION = "enhanced-v5"
+
+BUILT_RESUME_PREFETCH = (
+    'skills', 'experiences', 'education', 'languages', 'projects', 'certifications',
+)
+
+
+# ------------------------------------------------------------------
+# Helpers
+# ------------------------------------------------------------------
+
+def get_resume_type(resume) -> str:
+    return 'built' if isinstance(resume, BuiltResume) else 'uploaded'
+
+
+def _resume_key(resume):
+    return (get_resume_type(resume), resume.id)
+
+
+def _resume_fields(resume) -> Dict[str, Any]:
+    if get_resume_type(resume) == 'built':
+        return {'built_resume': resume, 'resume_type': 'built'}
+    return {'resume': resume, 'resume_type': 'uploaded'}
+
+
+def compute_matches(resumes: Iterable, jobs: Iterable) -> Dict[tuple, Dict]:
+    """
+    حساب دفعي لكل الأزواج (سير × وظائف) عبر واجهات EnhancedMatcher الدفعية
+    يرجع: {((resume_type, resume_id), job_id): result}
+    داخل matching_context لا يُعاد حساب زوج حُسب في نفس الطلب
+    """
+    resumes, jobs = list(resumes), list(jobs)
+    pair_of = {
+        (document_key(resume), document_key(job)): (resume, job)
+        for resume in resumes for job in jobs
+    }
+    if current_context() is None or any(None in key for key in pair_of):
+        return _compute_matches(resumes, jobs)
+
+    def compute(missing_keys):
+        missing = [pair_of[key] for key in missing_keys]
+        computed = _compute_matches(
+            list({_resume_key(resume): resume for resume, _ in missing}.values()),
+            list({job.id: job for _, job in missing}.values()),
+        )
+        return [computed[(_resume_key(resume), job.id)] for resume, job in missing]
+
+    values = memoize_many("pair_scores", list(pair_of), compute)
+    return {
+        (_resume_key(resume), job.id): value
+        for (resume, job), value in zip(pair_of.values(), values)
+    }
+
+
+def _compute_matches(resumes: List, jobs: List) -> Dict[tuple, Dict]:
+    # استيراد متأخر لتجنب الاستيراد الدائري مع matcher
+    from matching.services.matcher import calculate_resume_matches, calculate_resumes_matches_for_job
+    from matching.services.built_resume_matcher import (
+        calculate_built_resume_matches, calculate_built_resumes_matches_for_job,
+    )
+    from matching.services.stored_embeddings import load_vectors
+
+    # المتجهات المخزنة بدلاً من إعادة التضمين وقت الطلب
+    load_vectors(resumes, jobs)
+    uploaded = [r for r in resumes if get_resume_type(r) == 'uploaded']
+    built = [r for r in resumes if get_resume_type(r) == 'built']
+    results = {}
+
+    if len(jobs) == 1 or len(resumes) > len(jobs):
+        # الدفعة على محور السير: وظيفة واحدة في كل مرة
+        for job in jobs:
+            if uploaded:
+                scores = calculate_resumes_matches_for_job(uploaded, job)
+                for resume, result in zip(uploaded, scores):
+                    results[(_resume_key(resume), job.id)] = result
+            if built:
+                scores = calculate_built_resumes_matches_for_job(built, job)
+                for resume, result in zip(built, scores):
+                    results[(_resume_key(resume), job.id)] = result
+    else:
+        # الدفعة على محور الوظائف: سيرة واحدة في كل مرة
+        for resume in resumes:
+            if get_resume_type(resume) == 'built':
+                scores = calculate_built_resume_matches(resume, jobs)
+            else:
+                scores = calculate_resume_matches(resume, jobs)
+            for job, result in zip(jobs, scores):
+                results[(_resume_key(resume), job.id)] = result
+
+    return results
+
+
+def compute_match(resume, job) -> Dict:
+    """حساب مباشر لزوج واحد حسب نوع السيرة"""
+    return compute_matches([resume], [job])[(_resume_key(resume), job.id)]
+
+
+def _build_row(resume, job, result: Dict) -> MatchResult:
+    from matching.services.matcher import stored_match_result
+
+    # البيانات الخام فقط: النصوص المترجمة تُولَّد بلغة من يعرض النتيجة لا من حسبها
+    return MatchResult(
+        job=job,
+        engine_version=ENGINE_VERSION,
+        score=result['score'],
+        breakdown=stored_match_result(result),
+        **_resume_fields(resume),
+    )
+
+
+def matchable_resumes():
+    """السير المرفوعة المعالجة والسير المبنية النشطة"""
+    uploaded = Resume.objects.filter(is_processed=True).select_related('candidate')
+    built = BuiltResume.objects.filter(is_active=True).select_related(
+        'candidate', 'personal_info'
+    ).prefetch_related(*BUILT_RESUME_PREFETCH)
+    return list(uploaded) + list(built)
+
+
+def _is_matchable(resume) -> bool:
+    if get_resume_type(resume) == 'built':
+        return resume.is_active
+    return resume.is_processed
+
+
+# ------------------------------------------------------------------
+# Incremental recomputation
+# ------------------------------------------------------------------
+
+def invalidate_job(job) -> int:
+    """حذف صفوف وظيفة تغيّرت: القراءة التالية تحسبها من جديد (_fill_missing)"""
+    deleted, _ = MatchResult.objects.filter(job=job).delete()
+    return deleted
+
+
+def invalidate_resume(resume) -> int:
+    fields = _resume_fields(resume)
+    fields.pop('resume_type')
+    deleted, _ = MatchResult.objects.filter(**fields).delete()
+    return deleted
+
+
+def recompute_for_job(job) -> int:
+    """إعادة حساب صفوف وظيفة واحدة مع جميع السير القابلة للمطابقة"""
+    rows = []
+    if job.is_active:
+        resumes = matchable_resumes()
+        results = compute_matches(resumes, [job])
+        rows = [_build_row(resume, job, results[(_resume_key(resume), job.id)]) for resume in resumes]
+
+    with transaction.atomic():
+        MatchResult.objects.filter(job=job).delete()
+        MatchResult.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def recompute_for_resume(resume) -> int:
+    """إعادة حساب صفوف سيرة واحدة (مرفوعة أو مبنية) مع الوظائف النشطة"""
+    rows = []
+    if _is_matchable(resume):
+        jobs = list(Job.objects.filter(is_active=True))
+        results = compute_matches([resume], jobs)
+        rows = [_build_row(resume, job, results[(_resume_key(resume), job.id)]) for job in jobs]
+
+    fields = _resume_fields(resume)
+    fields.pop('resume_type')
+    with transaction.atomic():
+        MatchResult.objects.filter(**fields).delete()
+        MatchResult.objects.bulk_create(rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def rebuild_all() -> int:
+    """إعادة بناء الجدول بالكامل (للتعبئة الأولى أو بعد تغيير ENGINE_VERSION)"""
+    from matching.services.stored_embeddings import refresh_all
+
+    refresh_all()
+    MatchResult.objects.exclude(engine_version=ENGINE_VERSION).delete()
+    total = 0
+    for job in Job.objects.filter(is_active=True):
+        total += recompute_for_job(job)
+    return total
+
+
+def enqueue_rebuild_all() -> int:
+    """
+    rebuild_all في الخلفية: مهمة إعادة حساب لكل وظيفة نشطة في فئة backfill،
+    فإعادة البناء الشاملة لا تؤخر الرفع ولا إعادة الحساب بعد الحفظ (حفظ الوظيفة يرقّي مهمتها)
+    """
+    from matching.signals import enqueue_job_recompute
+    from tasks.models import Task
+
+    MatchResult.objects.exclude(engine_version=ENGINE_VERSION).delete()
+    total = 0
+    for job in Job.objects.filter(is_active=True).only('pk'):
+        enqueue_job_recompute(job, lane=Task.BACKFILL)
+        total += 1
+    return total
+
+
+# ------------------------------------------------------------------
+# Read API
+# ------------------------------------------------------------------
+
+def get_matches(
+    resumes: Iterable,
+    jobs: Iterable,
+    min_score: Optional[float] = None,
+    strict: bool = False,
+    limit: Optional[int] = None,
+) -> List[Dict]:
+    """
+    قراءة نتائج المطابقة المخزنة مرتبة تنازلياً حسب الدرجة
+
+    - resumes: سير مرفوعة و/أو مبنية
+    - min_score: حد أدنى للدرجة (strict=True يعني ">" بدلاً من ">=")
+    يرجع قائمة: {'resume', 'job', 'match', 'type', 'computed_at'}
+    """
+    resumes_by_key = {_resume_key(r): r for r in resumes}
+    jobs_by_id = {job.id: job for job in jobs}
+    if not resumes_by_key or not jobs_by_id:
+        return []
+
+    uploaded_ids = [rid for kind, rid in resumes_by_key if kind == 'uploaded']
+    built_ids = [rid for kind, rid in resumes_by_key if kind == 'built']
+
+    rows = MatchResult.objects.filter(
+        engine_version=ENGINE_VERSION,
+        job_id__in=list(jobs_by_id),
+    ).filter(Q(resume_id__in=uploaded_ids) | Q(built_resume_id__in=built_ids))
+
+    _fill_missing(rows, resumes_by_key, jobs_by_id, min_score, strict, limit)
+
+    if min_score is not None:
+        rows = rows.filter(score__gt=min_score) if strict else rows.filter(score__gte=min_score)
+    rows = rows.order_by('-score', 'id')
+    if limit is not None:
+        rows = rows[:limit]
+
+    from matching.services.matcher import localize_match_result
+
+    matches = []
+    for row in rows:
+        matches.append({
+            'resume': resumes_by_key[row.resume_key],
+            'job': jobs_by_id[row.job_id],
+            'match': localize_match_result(row.breakdown, jobs_by_id[row.job_id]),
+            'type': row.resume_type,
+            'computed_at': row.computed_at,
+        })
+    return matches
+
+
+def get_match(resume, job) -> Dict:
+    """نتيجة زوج واحد (من المخزن أو تُحسب وتُخزن)"""
+    matches = get_matches([resume], [job])
+    if matches:
+        return matches[0]['match']
+    return compute_match(resume, job)
+
+
+def _fill_missing(rows, resumes_by_key, jobs_by_id, min_score=None, strict=False, limit=None) -> None:
+    """
+    حساب وتخزين الأزواج التي لا تملك نتيجة بالنسخة الحالية
+    (عدا الأزواج التي لا يبلغ حدها الأعلى min_score: ستُستبعد من النتيجة على أي حال،
+    ومع limit تُحسب فقط الأزواج التي قد تدخل أفضل limit نتيجة)
+    """
+    from matching.services.skill_matrix import candidate_pairs
+
+    existing = set()
+    for resume_type, resume_id, built_id, job_id in rows.values_list(
+        'resume_type', 'resume_id', 'built_resume_id', 'job_id'
+    ):
+        existing.add((resume_type, resume_id or built_id, job_id))
+
+    # حدود كل الأزواج بضرب مصفوفتين متفرقتين (skill_matrix) بدلاً من زوج بزوج
+    missing = [
+        (key, job_id)
+        for key, job_id in candidate_pairs(resumes_by_key, jobs_by_id, min_score, strict)
+        if (key[0], key[1], job_id) not in existing
+    ]
+    if not missing:
+        return
+
+    # تجميع الأزواج الناقصة على المحور الأطول للاستفادة من الحساب الدفعي
+    results = {}
+    if limit is not None and (len(jobs_by_id) == 1 or len(resumes_by_key) == 1):
+        results = _fill_top_k(rows, missing, resumes_by_key, jobs_by_id, min_score, strict, limit)
+    elif len(jobs_by_id) <= len(resumes_by_key):
+        groups = defaultdict(list)
+        for key, job_id in missing:
+            groups[job_id].append(resumes_by_key[key])
+        for job_id, group in groups.items():
+            results.update(compute_matches(group, [jobs_by_id[job_id]]))
+    else:
+        groups = defaultdict(list)
+        for key, job_id in missing:
+            groups[key].append(jobs_by_id[job_id])
+        for key, group in groups.items():
+            results.update(compute_matches([resumes_by_key[key]], group))
+
+    new_rows = [
+        _build_row(resumes_by_key[key], jobs_by_id[job_id], results[(key, job_id)])
+        for key, job_id in missing
+        if (key, job_id) in results
+    ]
+
+    if new_rows:
+        logger.debug("Storing %d missing match results", len(new_rows))
+        MatchResult.objects.bulk_create(new_rows, ignore_conflicts=True)
+
+
+def _match_data(resume) -> Dict:
+    """مدخلات EnhancedMatcher لسيرة مرفوعة أو مبنية (محفوظة في ذاكرة الطلب)"""
+    if get_resume_type(resume) == 'built':
+        from matching.services.built_resume_matcher import extract_resume_data
+        return extract_resume_data(resume)
+    from matching.services.matcher import resume_match_data
+    return resume_match_data(resume)
+
+
+def _fill_top_k(rows, missing, resumes_by_key, jobs_by_id, min_score, strict, limit) -> Dict:
+    """
+    حساب الأزواج الناقصة على مرحلتين (MatchPipeline.top_k): ترتيب بالمكونات المهيكلة،
+    ثم الدرجة الكاملة بدفعات MATCH_PIPELINE_TOP_N حتى يتعذر دخول أفضل limit
+    أحد الطرفين عنصر واحد، فكل دفعة = compute_matches واحدة
+    """
+    from matching.services.match_pipeline import MatchPipeline
+
+    # أضعف درجة مخزنة ضمن أفضل limit: ما دونها لا يدخل النتيجة
+    stored = rows
+    if min_score is not None:
+        stored = stored.filter(score__gt=min_score) if strict else stored.filter(score__gte=min_score)
+    scores = list(stored.order_by('-score').values_list('score', flat=True)[:limit])
+    if len(scores) == limit and (min_score is None or scores[-1] > min_score):
+        min_score, strict = scores[-1], False
+
+    resumes = [resumes_by_key[key] for key, _ in missing]
+    jobs = [jobs_by_id[job_id] for _, job_id in missing]
+    if len(jobs_by_id) == 1:
+        jobs = jobs[:1]
+    else:
+        resumes = resumes[:1]
+
+    results = {}
+
+    def score_chunk(indices):
+        pairs = [missing[i] for i in indices]
+        computed = compute_matches(
+            list({key: resumes_by_key[key] for key, _ in pairs}.values()),
+            list({job_id: jobs_by_id[job_id] for _, job_id in pairs}.values()),
+        )
+        results.update(computed)
+        return [computed[pair] for pair in pairs]
+
+    MatchPipeline().top_k([_match_data(resume) for resume in resumes], jobs, score_chunk, limit, min_score, strict)
+    return results
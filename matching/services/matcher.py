@@ -1,9 +1,13 @@
 # matching/services/matcher.py
 
-from typing import Dict, Any, List
+import heapq
+from typing import Dict, Any, Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
 from django.utils.translation import gettext as _
-from .embedding_engine import similarity
-from .enhanced_matcher import EnhancedMatcher
+from .enhanced_matcher import EnhancedMatcher, SemanticContext
+from .match_context import memoized_document
+from .match_pipeline import MatchPipeline
 
 
 # ------------------------------------------------------------------
@@ -14,22 +18,6 @@ def normalize_list(values: List[str]) -> set:
     return set(v.lower().strip() for v in values or [] if v)
 
 
-def build_resume_text(resume_parsed: Dict) -> str:
-    return " ".join(
-        resume_parsed.get("skills", []) +
-        resume_parsed.get("education", []) +
-        resume_parsed.get("experience", [])
-    )
-
-
-def build_job_text(job: Any) -> str:
-    return " ".join(
-        (job.required_skills or []) +
-        (job.preferred_skills or []) +
-        [job.title or "", job.description or ""]
-    )
-
-
 def extract_experience_years(experience_list: List[str]) -> int:
     """استخراج سنوات الخبرة من نصوص الخبرة"""
     import re
@@ -43,25 +31,30 @@ def extract_experience_years(experience_list: List[str]) -> int:
 
 
 # ------------------------------------------------------------------
-# Semantic Matching
+# Enhanced Match Score (NEW)
 # ------------------------------------------------------------------
 
-def calculate_semantic_score(resume_parsed: Dict, job: Any) -> float:
-    """
-    حساب التشابه الدلالي (Semantic Similarity) باستخدام embeddings
-    """
-    resume_text = build_resume_text(resume_parsed)
-    job_text = build_job_text(job)
-
-    if not resume_text or not job_text:
-        return 0.0
+def build_resume_data(resume_parsed: Dict) -> Dict:
+    """تحويل parsed_data إلى المدخلات التي يتوقعها EnhancedMatcher"""
+    return {
+        "skills": resume_parsed.get("skills", []),
+        "languages": resume_parsed.get("languages", []),
+        "experience_years": extract_experience_years(
+            resume_parsed.get("experience", [])
+        ),
+    }
 
-    return similarity(resume_text, job_text)
 
+@memoized_document("resume_data")
+def resume_match_data(resume) -> Dict:
+    """build_resume_data لسيرة مرفوعة مع المهارات واللغات الموحدة المخزنة عليها"""
+    data = build_resume_data(resume.parsed_data or {})
+    for field in ("normalized_skills", "normalized_languages"):
+        value = getattr(resume, field, None)
+        if isinstance(value, list):
+            data[field] = value
+    return data
 
-# ------------------------------------------------------------------
-# Enhanced Match Score (NEW)
-# ------------------------------------------------------------------
 
 def calculate_match_score(resume_parsed: Dict, job: Any) -> Dict:
     """
@@ -69,45 +62,97 @@ def calculate_match_score(resume_parsed: Dict, job: Any) -> Dict:
     """
 
     matcher = EnhancedMatcher()
+    result = matcher.calculate_match_score(build_resume_data(resume_parsed), job)
+    return finalize_match_result(result, job)
 
-    resume_data = {
-        "skills": resume_parsed.get("skills", []),
-        "languages": resume_parsed.get("languages", []),
-        "experience_years": extract_experience_years(
-            resume_parsed.get("experience", [])
-        ),
-    }
 
-    result = matcher.calculate_match_score(resume_data, job)
+def calculate_match_scores_for_resume(resume_parsed: Dict, jobs: List[Any]) -> List[Dict]:
+    """
+    مطابقة سيرة واحدة مع عدة وظائف دفعة واحدة
+    (نفس نتائج calculate_match_score لكل زوج، وبنفس ترتيب jobs)
+    """
+    results = EnhancedMatcher().score_many(build_resume_data(resume_parsed), jobs)
+    return [
+        finalize_match_result(result, job)
+        for result, job in zip(results, jobs)
+    ]
+
+
+def calculate_match_scores_for_job(resumes_parsed: List[Dict], job: Any) -> List[Dict]:
+    """
+    مطابقة عدة سير مع وظيفة واحدة دفعة واحدة
+    (نفس نتائج calculate_match_score لكل زوج، وبنفس ترتيب resumes_parsed)
+    """
+    results = EnhancedMatcher().score_resumes(
+        [build_resume_data(parsed) for parsed in resumes_parsed], job
+    )
+    return [finalize_match_result(result, job) for result in results]
+
 
-    # تهيئة المفاتيح إن لم تكن موجودة
-    if "strengths" not in result:
-        result["strengths"] = []
-    if "weaknesses" not in result:
-        result["weaknesses"] = []
-    if "recommendations" not in result:
-        result["recommendations"] = []
+def calculate_resume_matches(resume, jobs: List[Any]) -> List[Dict]:
+    """calculate_match_scores_for_resume لسيرة مرفوعة (تستخدم الحقول الموحدة المخزنة)"""
+    results = EnhancedMatcher().score_many(resume_match_data(resume), jobs)
+    return [
+        finalize_match_result(result, job)
+        for result, job in zip(results, jobs)
+    ]
 
-    # إضافة التشابه الدلالي كعامل داعم (غير مكسِر)
-    semantic_similarity = calculate_semantic_score(resume_parsed, job)
-    result["details"]["semantic"] = round(semantic_similarity * 100, 1)
 
-    if semantic_similarity >= 0.7:
+def calculate_resumes_matches_for_job(resumes: List[Any], job: Any) -> List[Dict]:
+    """calculate_match_scores_for_job لسير مرفوعة (تستخدم الحقول الموحدة المخزنة)"""
+    results = EnhancedMatcher().score_resumes([resume_match_data(resume) for resume in resumes], job)
+    return [finalize_match_result(result, job) for result in results]
+
+
+# نصوص تُولَّد بلغة العرض: لا تُخزن مع النتيجة (MatchResult.breakdown) بل تُعاد عند القراءة
+LOCALIZED_KEYS = ("strengths", "weaknesses", "recommendations", "label")
+
+
+def finalize_match_result(result: Dict, job: Any) -> Dict:
+    """إضافة نقاط القوة والضعف والتوصيات والألوان لنتيجة EnhancedMatcher"""
+
+    # التشابه الدلالي نفسه الذي دخل في الدرجة (لا حساب ثانٍ بنصوص مختلفة)
+    semantic = SemanticContext.from_details(result["details"]["semantic"])
+    result["details"]["semantic"] = round(semantic.similarity * 100, 1)
+    result["semantic"] = semantic.as_details()
+
+    # إضافة اللون
+    result["color_class"] = get_score_color_class(result["score"])
+
+    return localize_match_result(result, job)
+
+
+def localize_match_result(result: Dict, job: Any) -> Dict:
+    """
+    النصوص المترجمة (نقاط القوة والضعف، التوصيات، التصنيف) بلغة الطلب الحالية
+    من البيانات الخام للنتيجة؛ النتائج المخزنة تمر بها عند كل قراءة
+    """
+    if "semantic" not in result:
+        return result
+    semantic = SemanticContext.from_details(result["semantic"])
+
+    result["strengths"] = []
+    result["weaknesses"] = []
+    if semantic.similarity >= 0.7:
         result["strengths"].append(_("Strong semantic alignment with job description"))
-    elif semantic_similarity < 0.4:
+    elif semantic.similarity < 0.4:
         result["weaknesses"].append(_("Low semantic similarity with job description"))
 
     # إضافة التوصيات
-    result["recommendations"] = generate_recommendations(result, job)
+    result["recommendations"] = generate_recommendations(result, job, semantic)
 
-    # إضافة اللون والتصنيف
-    result["color_class"] = get_score_color_class(result["score"])
+    # إضافة التصنيف
     result["label"] = get_score_label(result["score"])
 
     return result
 
 
-def generate_recommendations(result: Dict, job: Any) -> List[str]:
+def stored_match_result(result: Dict) -> Dict:
+    """النتيجة بلا النصوص المترجمة (تُعاد بـ localize_match_result عند العرض)"""
+    return {key: value for key, value in result.items() if key not in LOCALIZED_KEYS}
+
+
+def generate_recommendations(result: Dict, job: Any, semantic: Optional[SemanticContext] = None) -> List[str]:
     """توليد توصيات تحسينية ذكية"""
     recommendations = []
 
@@ -141,6 +186,12 @@ def generate_recommendations(result: Dict, job: Any) -> List[str]:
             _("Consider learning: {}").format(", ".join(missing_langs))
         )
 
+    # التشابه الدلالي
+    if semantic is not None and semantic.similarity < 0.4:
+        recommendations.append(
+            _("Describe your experience using the terms of the job description")
+        )
+
     return recommendations
 
 
@@ -201,28 +252,109 @@ def match_resume_to_job(resume, job) -> Dict:
     return calculate_match_score(resume.parsed_data, job)
 
 
-def batch_match_resumes_to_job(job, resumes):
-    matches = []
-    for resume in resumes:
-        if resume.is_processed:
-            matches.append({
-                "resume": resume,
-                "match": match_resume_to_job(resume, job),
-            })
+def batch_match_resumes_to_job(job, resumes, top_n=None):
+    """
+    مطابقة السير مع وظيفة مرتبة تنازلياً
+    top_n: وضع المرحلتين (match_pipeline): الدلالي والتفاصيل لأفضل top_n فقط
+    """
+    resumes = [resume for resume in resumes if resume.is_processed]
+    if top_n:
+        ranked = MatchPipeline(top_n).rank_resumes(
+            [resume_match_data(resume) for resume in resumes], job
+        )
+        return [
+            {"resume": resumes[i], "match": finalize_match_result(result, job)}
+            for i, result in ranked
+        ]
+
+    results = calculate_resumes_matches_for_job(resumes, job)
+    matches = [
+        {"resume": resume, "match": result}
+        for resume, result in zip(resumes, results)
+    ]
 
     return sorted(matches, key=lambda x: x["match"]["score"], reverse=True)
 
 
-def batch_match_jobs_to_resume(resume, jobs):
-    matches = []
-    for job in jobs:
-        if job.is_active:
-            result = match_resume_to_job(resume, job)
-            if result["score"] > 10:
-                matches.append({
-                    "job": job,
-                    "match": result,
-                })
+def batch_match_jobs_to_resume(resume, jobs, top_n=None):
+    """
+    مطابقة الوظائف مع سيرة مرتبة تنازلياً (الدرجة > 10)
+    top_n: وضع المرحلتين (match_pipeline): الدلالي والتفاصيل لأفضل top_n فقط
+    """
+    jobs = [job for job in jobs if job.is_active]
+    if top_n:
+        ranked = MatchPipeline(top_n).rank_jobs(resume_match_data(resume), jobs)
+        return [
+            {"job": jobs[i], "match": finalize_match_result(result, jobs[i])}
+            for i, result in ranked
+            if result["score"] > 10
+        ]
+
+    results = calculate_resume_matches(resume, jobs)
+    matches = [
+        {"job": job, "match": result}
+        for job, result in zip(jobs, results)
+        if result["score"] > 10
+    ]
 
     return sorted(matches, key=lambda x: x["match"]["score"], reverse=True)
+
+# ------------------------------------------------------------------
+# Top-K (bounded heap + score upper bounds)
+# ------------------------------------------------------------------
+
+# هامش فوق الحد الأعلى: الدرجة المخزنة مقربة لمنزلتين
+BOUND_MARGIN = 0.01
+
+
+def heap_top_k(
+    bounds: Sequence[float],
+    score_chunk: Callable[[List[int]], List[Dict]],
+    k: int,
+    min_score: Optional[float] = None,
+    strict: bool = False,
+    chunk_size: int = 32,
+) -> List[Tuple[int, Dict]]:
+    """
+    أفضل k نتائج دون حساب كل المرشحين
+    - bounds[i]: حد أعلى لدرجة المرشح i (لا تقل عنه الدرجة الفعلية أبداً)
+    - score_chunk(indices): النتائج الكاملة لمجموعة مرشحين
+    المرشحون يُحسبون بترتيب الحد الأعلى تنازلياً، ويتوقف الحساب حين لا يستطيع
+    الحد الأعلى التالي دخول الـ heap أو تجاوز min_score
+    يرجع [(index, result)] مرتبة تنازلياً (التعادل بترتيب المدخلات)
+    """
+    bounds = np.asarray(bounds, dtype=np.float64) + BOUND_MARGIN
+    if k <= 0 or not len(bounds):
+        return []
+
+    def passes(score):
+        if min_score is None:
+            return True
+        return score > min_score if strict else score >= min_score
+
+    order = np.argsort(-bounds, kind="stable")
+    heap: List[Tuple[float, int, Dict]] = []  # (score, -index, result): الأضعف في القمة
+    pos = 0
+    while pos < len(order):
+        floor = heap[0][0] if len(heap) == k else None
+        chunk = []
+        for i in order[pos:pos + chunk_size].tolist():
+            bound = bounds[i]
+            if (floor is not None and bound < floor) or not passes(bound):
+                continue
+            chunk.append(i)
+        if not chunk:
+            # الترتيب تنازلي: لا أحد بعد هذه الدفعة يمكنه الدخول
+            break
+        for i, result in zip(chunk, score_chunk(chunk)):
+            if not passes(result["score"]):
+                continue
+            entry = (result["score"], -i, result)
+            if len(heap) < k:
+                heapq.heappush(heap, entry)
+            elif entry[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, entry)
+        pos += chunk_size
+
+    return [(-neg_i, result) for _, neg_i, result in sorted(heap, key=lambda e: (-e[0], -e[1]))]
 # End of matching/services/matcher.py
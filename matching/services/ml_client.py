@@ -2,26 +2,42 @@
 Client to call Hugging Face Space (Gradio) for similarity predictions.
 
 Usage:
-    from matching.services.ml_client import predict_similarity
+    from matching.services.ml_client import predict_similarity, predict_similarity_many
     score = predict_similarity(cv_text, job_text)
+    scores = predict_similarity_many([(cv_text, job_a), (cv_text, job_b)])
 
 Behavior:
-- Uses gradio_client (official)
-- Optional caching via Django cache
-- Reads settings: ML_SERVICE_URL, HF_TOKEN, ML_SERVICE_CACHE_TTL
+- Uses gradio_client (official); one Client per process, created on first use
+  and health-checked (GET <space>/config) every ML_SERVICE_HEALTH_INTERVAL seconds;
+  an unhealthy or failing client is dropped and rebuilt on the next call
+- Circuit breaker: after ML_SERVICE_BREAKER_THRESHOLD consecutive failures calls fail
+  fast with MLServiceError for ML_SERVICE_BREAKER_RESET seconds, then one trial call
+  decides whether the circuit closes again
+- Optional two-tier caching (tiered_cache: in-process LRU in front of the shared
+  Django cache); batch calls only send the uncached, distinct pairs
+- Identical concurrent misses are coalesced (single_flight): one call per key, others wait
+- Reads settings: ML_SERVICE_URL, HF_TOKEN, ML_SERVICE_TIMEOUT, ML_SERVICE_CACHE_TTL,
+  ML_SERVICE_MAX_WORKERS, ML_SERVICE_HEALTH_INTERVAL, ML_SERVICE_BREAKER_THRESHOLD,
+  ML_SERVICE_BREAKER_RESET
 """
 
 from __future__ import annotations
 
 import hashlib
 import logging
-from typing import Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import requests
 from django.conf import settings
-from django.core.cache import cache
 
 from gradio_client import Client
 
+from matching.services.single_flight import coalesce
+from matching.services.tiered_cache import get_tiered_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -34,22 +50,194 @@ def _cache_key(cv_text: str, job_text: str) -> str:
     return f"ml:sim:{h}"
 
 
-def _get_client() -> Client:
+def _cache_ttl(cache_ttl: Optional[int]) -> int:
+    return cache_ttl if cache_ttl is not None else getattr(settings, "ML_SERVICE_CACHE_TTL", 3600)
+
+
+# ------------------------------------------------------------------
+# Circuit breaker
+# ------------------------------------------------------------------
+
+class CircuitBreaker:
     """
-    Create Gradio Client.
+    closed → open after `threshold` consecutive failures.
+    While open every call fails fast; after `reset_timeout` seconds one trial
+    call is let through (half-open): success closes the circuit, failure re-opens it.
     """
-    if not settings.ML_SERVICE_URL:
-        raise MLServiceError("ML_SERVICE_URL is not configured")
 
+    def __init__(self, threshold: int = 5, reset_timeout: float = 30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return
+        raise MLServiceError("ML service is unavailable (circuit open)")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.threshold:
+                if self.opened_at is None:
+                    logger.warning("ML service circuit opened after %d failures", self.failures)
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def reset(self) -> None:
+        self.record_success()
+
+
+_breaker: Optional[CircuitBreaker] = None
+
+
+def get_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        _breaker = CircuitBreaker(
+            threshold=getattr(settings, "ML_SERVICE_BREAKER_THRESHOLD", 5),
+            reset_timeout=getattr(settings, "ML_SERVICE_BREAKER_RESET", 30),
+        )
+    return _breaker
+
+
+# ------------------------------------------------------------------
+# Process-wide Gradio client
+# ------------------------------------------------------------------
+
+# keep-alive session for health checks (the Gradio client has its own httpx pool)
+_session = requests.Session()
+
+_client: Optional[Client] = None
+_client_url: Optional[str] = None
+_client_checked_at = 0.0
+_client_lock = threading.Lock()
+
+
+def _connect(url: str) -> Client:
     try:
         if getattr(settings, "HF_TOKEN", None):
-            return Client(settings.ML_SERVICE_URL, hf_token=settings.HF_TOKEN)
-        return Client(settings.ML_SERVICE_URL)
+            return Client(url, token=settings.HF_TOKEN, verbose=False)
+        return Client(url, verbose=False)
     except Exception as exc:
         logger.exception("Failed to initialize Gradio Client")
         raise MLServiceError(f"Failed to initialize ML client: {exc}") from exc
 
 
+def _is_healthy(client: Client) -> bool:
+    src = getattr(client, "src", None) or _client_url
+    try:
+        response = _session.get(
+            f"{src.rstrip('/')}/config", timeout=getattr(settings, "ML_SERVICE_TIMEOUT", 10)
+        )
+        return response.ok
+    except requests.RequestException:
+        return False
+
+
+def _get_client() -> Client:
+    """
+    The process-wide Gradio Client (connects on first use, reconnects when
+    ML_SERVICE_URL changes or the periodic health check fails).
+    """
+    global _client, _client_url, _client_checked_at
+
+    url = settings.ML_SERVICE_URL
+    if not url:
+        raise MLServiceError("ML_SERVICE_URL is not configured")
+
+    with _client_lock:
+        now = time.monotonic()
+        if _client is not None and _client_url == url:
+            interval = getattr(settings, "ML_SERVICE_HEALTH_INTERVAL", 60)
+            if now - _client_checked_at < interval:
+                return _client
+            if _is_healthy(_client):
+                _client_checked_at = now
+                return _client
+            logger.warning("ML service health check failed; reconnecting")
+
+        _client = _connect(url)
+        _client_url = url
+        _client_checked_at = now
+        return _client
+
+
+def reset_client() -> None:
+    """Drop the cached client; the next call reconnects."""
+    global _client
+    with _client_lock:
+        _client = None
+
+
+def _predict(cv_text: str, job_text: str) -> float:
+    """One uncached call through the circuit breaker."""
+    if not settings.ML_SERVICE_URL:
+        raise MLServiceError("ML_SERVICE_URL is not configured")
+    breaker = get_breaker()
+    breaker.before_call()
+    try:
+        client = _get_client()
+        result = client.predict(
+            cv_text,
+            job_text,
+            api_name="/predict",  # MUST match api_name in app.py
+        )
+        score = float(result)
+    except Exception as exc:
+        breaker.record_failure()
+        if isinstance(exc, MLServiceError):
+            raise
+        logger.exception("ML service prediction failed")
+        reset_client()
+        raise MLServiceError(f"ML service prediction failed: {exc}") from exc
+    breaker.record_success()
+    return score
+
+
+def _predict_shared(
+    key: str, cv_text: str, job_text: str, use_cache: bool, cache_ttl: Optional[int],
+) -> float:
+    """
+    _predict once per key across threads and workers (single-flight).
+    The score is cached before the lease is released so waiting workers can read it.
+    """
+    def compute() -> float:
+        score = _predict(cv_text, job_text)
+        if use_cache:
+            get_tiered_cache().set(key, score, _cache_ttl(cache_ttl))
+        return score
+
+    lookup = (lambda: get_tiered_cache().get(key)) if use_cache else None
+    return float(coalesce(key, compute, lookup))
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
 def predict_similarity(
     cv_text: str,
     job_text: str,
@@ -60,36 +248,56 @@ def predict_similarity(
     Call the Hugging Face Gradio Space and return similarity score.
     """
 
+    key = _cache_key(cv_text, job_text)
     if use_cache:
-        key = _cache_key(cv_text, job_text)
-        cached = cache.get(key)
+        cached = get_tiered_cache().get(key)
         if cached is not None:
             logger.debug("ML cache hit for %s", key)
             return float(cached)
 
-    client = _get_client()
+    return _predict_shared(key, cv_text, job_text, use_cache, cache_ttl)
 
-    try:
-        result = client.predict(
-            cv_text,
-            job_text,
-            api_name="/predict",  # MUST match api_name in app.py
-        )
-        score = float(result)
-    except Exception as exc:
-        logger.exception("ML service prediction failed")
-        raise MLServiceError(f"ML service prediction failed: {exc}") from exc
 
+def predict_similarity_many(
+    pairs: Sequence[Tuple[str, str]],
+    use_cache: bool = True,
+    cache_ttl: Optional[int] = None,
+) -> List[float]:
+    """
+    Similarity score for each (cv_text, job_text) pair, in order.
+    Cached pairs are read in one get_many per tier; the distinct misses are sent
+    concurrently (ML_SERVICE_MAX_WORKERS), each coalesced with identical
+    in-flight lookups in other threads and workers.
+    Raises MLServiceError if any miss fails.
+    """
+    pairs = [(cv_text, job_text) for cv_text, job_text in pairs]
+    if not pairs:
+        return []
+
+    keys = [_cache_key(cv_text, job_text) for cv_text, job_text in pairs]
+    scores: Dict[str, float] = {}
     if use_cache:
-        ttl = cache_ttl if cache_ttl is not None else getattr(
-            settings, "ML_SERVICE_CACHE_TTL", 3600
-        )
-        try:
-            cache.set(key, score, ttl)
-        except Exception:
-            logger.exception("Failed to write ML cache for key %s", key)
+        scores = {key: float(value) for key, value in get_tiered_cache().get_many(keys).items()}
 
-    return score
+    missing: Dict[str, Tuple[str, str]] = {}
+    for key, pair in zip(keys, pairs):
+        if key not in scores:
+            missing.setdefault(key, pair)
+
+    def predict(key: str) -> float:
+        return _predict_shared(key, *missing[key], use_cache, cache_ttl)
+
+    pending = list(missing)
+    if pending and get_breaker().state != "closed":
+        # the trial call (or the fail-fast error) comes first, before any fan-out
+        scores[pending[0]] = predict(pending.pop(0))
+
+    if pending:
+        workers = min(len(pending), getattr(settings, "ML_SERVICE_MAX_WORKERS", 8))
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            scores.update(zip(pending, executor.map(predict, pending)))
+
+    return [scores[key] for key in keys]
 
 
-__all__ = ["predict_similarity", "MLServiceError"]
+__all__ = ["predict_similarity", "predict_similarity_many", "MLServiceError", "CircuitBreaker", "reset_client"]
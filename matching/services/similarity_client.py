@@ -0,0 +1,263 @@
+# matching/services/similarity_client.py
+"""
+عميل HTTP لخدمة التشابه البعيدة (ML_SIMILARITY_URL): اتصالات دائمة، دفعات، تزامن محدود
+
+- Session واحدة لكل عميل مع HTTPAdapter (keep-alive): لا مصافحة TCP/TLS لكل زوج
+- عقد الدفعات على نفس المسار /similarity:
+    {"cv": str, "job": str}                  → {"score": float}          (زوج واحد، العقد الأصلي)
+    {"pairs": [{"cv", "job"}, ...]}          → {"scores": [float, ...]}  (أزواج كثيرة)
+    {"cv": str, "jobs": [str, ...]}          → {"scores": [float, ...]}  (نص مقابل نصوص كثيرة)
+  إذا رفضت الخدمة الدفعات (404/405/400/422) قبل أن تنجح أي دفعة يعود العميل لطلب لكل زوج،
+  ثم يعيد تجربة الدفعات بعد batch_reprobe_interval ثانية (رفض عابر لا يعطّلها طوال عمر العملية)
+- الدفعات (أو الأزواج) تُرسل بالتوازي عبر ThreadPoolExecutor بحد أقصى max_workers
+- ميزانيتان للوقت: timeout لكل طلب، و total_timeout للاستدعاء كله (كل طلب يأخذ الأقل منهما)
+
+الإعدادات: ML_SIMILARITY_TIMEOUT، ML_SIMILARITY_TOTAL_TIMEOUT، ML_SIMILARITY_MAX_WORKERS،
+ML_SIMILARITY_BATCH_SIZE، ML_SIMILARITY_BATCH_REPROBE_INTERVAL
+
+Usage:
+    client = get_similarity_client(settings.ML_SIMILARITY_URL)
+    score = client.similarity(cv_text, job_text)
+    scores = client.similarity_many([(cv_text, job_a), (cv_text, job_b)])
+    scores = client.similarity_to_many(cv_text, [job_a, job_b])
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 20
+DEFAULT_TOTAL_TIMEOUT = 60
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_REPROBE_INTERVAL = 300
+
+# رموز تعني أن الخدمة لا تفهم جسم الدفعة (نسخة قديمة من الخدمة)
+_BATCH_UNSUPPORTED = {400, 404, 405, 422}
+
+
+class SimilarityServiceError(RuntimeError):
+    pass
+
+
+class DeadlineExceeded(SimilarityServiceError):
+    pass
+
+
+class Deadline:
+    """ميزانية وقت إجمالية؛ timeout() مهلة الطلب التالي (لا تتجاوز المتبقي)"""
+
+    def __init__(self, total: Optional[float]):
+        self.expires_at = None if total is None else time.monotonic() + total
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def timeout(self, per_call: float) -> float:
+        remaining = self.remaining()
+        if remaining is None:
+            return per_call
+        if remaining <= 0:
+            raise DeadlineExceeded("Similarity request budget exhausted")
+        return min(per_call, remaining)
+
+
+class SimilarityClient:
+    """عميل واحد لكل عنوان؛ آمن للاستخدام من عدة threads"""
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = DEFAULT_TIMEOUT,
+        total_timeout: Optional[float] = DEFAULT_TOTAL_TIMEOUT,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_reprobe_interval: Optional[float] = DEFAULT_BATCH_REPROBE_INTERVAL,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.total_timeout = total_timeout
+        self.max_workers = max(1, max_workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_reprobe_interval = batch_reprobe_interval
+        # None = لم يُجرَّب بعد، False = الخدمة رفضت الدفعات (حتى _batches_retry_at إن وُجد)
+        self.supports_batches: Optional[bool] = None
+        self._batches_retry_at: Optional[float] = None
+
+        self.session = requests.Session()
+        # اتصال دائم لكل worker حتى لا ينتظر أحد اتصالاً من المجمّع
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.session.close()
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    def _post(self, payload: Dict, deadline: Deadline) -> requests.Response:
+        try:
+            return self.session.post(self.url, json=payload, timeout=deadline.timeout(self.timeout))
+        except requests.Timeout as exc:
+            raise DeadlineExceeded(f"Similarity request timed out: {exc}") from exc
+        except requests.RequestException as exc:
+            raise SimilarityServiceError(f"Similarity request failed: {exc}") from exc
+
+    @staticmethod
+    def _json(response: requests.Response) -> Dict:
+        try:
+            response.raise_for_status()
+            return response.json()
+        except (requests.RequestException, ValueError) as exc:
+            raise SimilarityServiceError(f"Invalid similarity response: {exc}") from exc
+
+    def _score_pair(self, pair: Tuple[str, str], deadline: Deadline) -> float:
+        cv, job = pair
+        return float(self._json(self._post({"cv": cv, "job": job}, deadline))["score"])
+
+    def _score_batch(self, payload: Dict, size: int, deadline: Deadline) -> Optional[List[float]]:
+        """درجات دفعة واحدة، أو None إذا كانت الخدمة لا تدعم الدفعات"""
+        response = self._post(payload, deadline)
+        if response.status_code in _BATCH_UNSUPPORTED and self.supports_batches is not True:
+            logger.info("Similarity service rejected batch payload (%s); using one request per pair",
+                        response.status_code)
+            self.supports_batches = False
+            if self.batch_reprobe_interval is not None:
+                self._batches_retry_at = time.monotonic() + self.batch_reprobe_interval
+            return None
+        scores = self._json(response).get("scores")
+        if not isinstance(scores, list) or len(scores) != size:
+            raise SimilarityServiceError("Similarity batch response does not match the request")
+        self.supports_batches = True
+        return [float(score) for score in scores]
+
+    # ------------------------------------------------------------------
+    # Fan-out
+    # ------------------------------------------------------------------
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="similarity-client",
+                    )
+        return self._executor
+
+    def _map(self, func, items: List, deadline: Deadline) -> List:
+        """func لكل عنصر بالتوازي (بالترتيب)، مع انتظار لا يتجاوز الميزانية الإجمالية"""
+        if len(items) <= 1 or self.max_workers == 1:
+            return [func(item) for item in items]
+        futures = [self._get_executor().submit(func, item) for item in items]
+        try:
+            return [future.result(timeout=deadline.remaining()) for future in futures]
+        except FutureTimeout as exc:
+            raise DeadlineExceeded("Similarity request budget exhausted") from exc
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _batches_allowed(self) -> bool:
+        """False إذا رُفضت الدفعات ولم يحن موعد إعادة التجربة بعد"""
+        if self.supports_batches is False and self._batches_retry_at is not None \
+                and time.monotonic() >= self._batches_retry_at:
+            self.supports_batches = None
+            self._batches_retry_at = None
+        return self.supports_batches is not False
+
+    def _chunks(self, items: List) -> List[List]:
+        return [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+
+    def _run_batches(self, items: List, payload, single, deadline: Deadline) -> List[float]:
+        """
+        items مقسمة لدفعات batch_size؛ payload(chunk) جسم الدفعة، single(item) زوج واحد
+        إذا تبيّن أن الخدمة لا تدعم الدفعات تُعاد كل العناصر زوجاً زوجاً
+        """
+        if self._batches_allowed():
+            chunks = self._chunks(items)
+            scored = self._map(lambda chunk: self._score_batch(payload(chunk), len(chunk), deadline), chunks, deadline)
+            if all(scores is not None for scores in scored):
+                return [score for scores in scored for score in scores]
+        return self._map(lambda item: single(item, deadline), items, deadline)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def similarity(self, text1: str, text2: str) -> float:
+        return self._score_pair((text1, text2), Deadline(self.total_timeout))
+
+    def similarity_many(self, pairs: Sequence[Tuple[str, str]]) -> List[float]:
+        """درجة لكل زوج (cv, job) بنفس الترتيب"""
+        pairs = [tuple(pair) for pair in pairs]
+        if not pairs:
+            return []
+        return self._run_batches(
+            pairs,
+            lambda chunk: {"pairs": [{"cv": cv, "job": job} for cv, job in chunk]},
+            self._score_pair,
+            Deadline(self.total_timeout),
+        )
+
+    def similarity_to_many(self, text: str, others: Sequence[str]) -> List[float]:
+        """درجة text مقابل كل نص في others (سيرة مقابل وظائف كثيرة)"""
+        others = list(others)
+        if not others:
+            return []
+        return self._run_batches(
+            others,
+            lambda chunk: {"cv": text, "jobs": chunk},
+            lambda other, deadline: self._score_pair((text, other), deadline),
+            Deadline(self.total_timeout),
+        )
+
+
+# ------------------------------------------------------------------
+# Process-wide clients
+# ------------------------------------------------------------------
+
+_clients: Dict[str, SimilarityClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_similarity_client(url: str) -> SimilarityClient:
+    """عميل واحد لكل عنوان في العملية (يتشارك الاتصالات والـ threads)"""
+    client = _clients.get(url)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(url)
+            if client is None:
+                client = _clients[url] = SimilarityClient(
+                    url,
+                    timeout=getattr(settings, "ML_SIMILARITY_TIMEOUT", DEFAULT_TIMEOUT),
+                    total_timeout=getattr(settings, "ML_SIMILARITY_TOTAL_TIMEOUT", DEFAULT_TOTAL_TIMEOUT),
+                    max_workers=getattr(settings, "ML_SIMILARITY_MAX_WORKERS", DEFAULT_MAX_WORKERS),
+                    batch_size=getattr(settings, "ML_SIMILARITY_BATCH_SIZE", DEFAULT_BATCH_SIZE),
+                    batch_reprobe_interval=getattr(
+                        settings, "ML_SIMILARITY_BATCH_REPROBE_INTERVAL", DEFAULT_BATCH_REPROBE_INTERVAL,
+                    ),
+                )
+    return client
+
+
+__all__ = [
+    "SimilarityClient", "SimilarityServiceError", "DeadlineExceeded", "Deadline", "get_similarity_client",
+]
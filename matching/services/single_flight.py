@@ -0,0 +1,312 @@
+# matching/services/single_flight.py
+"""
+دمج الطلبات المتطابقة المتزامنة (single-flight): حساب واحد لكل مفتاح والباقي ينتظر نتيجته
+
+- داخل العملية: أول thread يطلب المفتاح يحسبه، والبقية تنتظر نفس النتيجة (أو نفس الخطأ)
+- بين العمّال: إيجار في الذاكرة المشتركة (shared_cache().add على sf:lease:<key>) لمدة SINGLE_FLIGHT_LEASE_TTL
+  يتطلب add ذرياً بين العمليات (Redis أو DatabaseCache)؛ FileBasedCache.add هو has_key ثم set فلا يصلح،
+  لذلك إن كانت الذاكرة المشتركة ملفات يُؤخذ الإيجار بإنشاء ملف O_CREAT | O_EXCL في مجلدها (FileLeases)
+  من يملك الإيجار يحسب وينشر النتيجة في مخزنه المشترك قبل تحريره، والآخرون يستطلعون
+  lookup() حتى تظهر النتيجة أو يختفي الإيجار (مات صاحبه) أو تنتهي SINGLE_FLIGHT_WAIT فيحسبون بأنفسهم
+- بدون lookup لا يوجد مكان مشترك للنتيجة، فالدمج داخل العملية فقط
+
+Usage:
+    score = coalesce(key, compute=lambda: predict_and_store(), lookup=lambda: results.get(key))
+    vectors = coalesce_many(hashes, compute_many=embed_and_store, lookup_many=load_stored)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+
+from matching.services.tiered_cache import shared_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_TTL = 30
+DEFAULT_WAIT = 30
+POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
+
+
+class _Call:
+    """حساب جارٍ لمفتاح واحد"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+    def result(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class SingleFlight:
+    """مفتاح → الحساب الجاري له داخل العملية"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.shared = 0
+
+    def _claim(self, keys: List[Hashable]):
+        """(المفاتيح التي يحسبها هذا الـ thread مع سجلاتها، الحسابات الجارية لغيرها)"""
+        lead: Dict[Hashable, _Call] = {}
+        follow: Dict[Hashable, _Call] = {}
+        with self._lock:
+            for key in keys:
+                call = self._calls.get(key)
+                if call is None:
+                    call = self._calls[key] = lead[key] = _Call()
+                else:
+                    follow[key] = call
+            self.shared += len(follow)
+        return lead, follow
+
+    def _finish(self, calls: Dict[Hashable, _Call], values: Dict, error: Optional[BaseException]) -> None:
+        with self._lock:
+            for key in calls:
+                self._calls.pop(key, None)
+        for key, call in calls.items():
+            if error is not None:
+                call.error = error
+            elif key not in values:
+                call.error = KeyError(key)
+            else:
+                call.value = values[key]
+            call.done.set()
+
+    def do(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        return self.do_many([key], lambda keys: {key: compute()})[key]
+
+    def do_many(self, keys: List[Hashable], compute_many: Callable[[List], Dict]) -> Dict:
+        """قيمة كل مفتاح؛ compute_many(keys) تُستدعى مرة واحدة للمفاتيح غير الجارية في thread آخر"""
+        keys = list(dict.fromkeys(keys))
+        lead, follow = self._claim(keys)
+        values: Dict = {}
+        if lead:
+            error = None
+            try:
+                values = dict(compute_many(list(lead)))
+            except BaseException as exc:
+                error = exc
+                raise
+            finally:
+                self._finish(lead, values, error)
+        for key, call in follow.items():
+            values[key] = call.result()
+        return {key: values[key] for key in keys}
+
+
+_group = SingleFlight()
+
+
+# ------------------------------------------------------------------
+# Cross-worker leases
+# ------------------------------------------------------------------
+
+def _lease_key(key: Hashable) -> str:
+    return f"sf:lease:{key}"
+
+
+class FileLeases:
+    """
+    إيجارات بملفات في مجلد الذاكرة المشتركة: os.open(O_CREAT | O_EXCL) ذري بين العمليات على نفس القرص
+    الملف يحمل "token expires_at"؛ الإيجار المنتهي يُزال بإعادة تسمية ذرية فيأخذه عامل واحد فقط
+    """
+
+    SUFFIX = ".lease"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + self.SUFFIX)
+
+    def _read(self, path: str):
+        """(token, expires_at) أو None إن لم يوجد الملف"""
+        try:
+            with open(path) as handle:
+                token, _, expires = handle.read().partition(" ")
+            if expires:
+                return token, float(expires)
+            # أُنشئ الملف ولم يُكتب بعد: محجوز حتى مرور المدة الافتراضية على إنشائه
+            return "", os.stat(path).st_mtime + getattr(settings, "SINGLE_FLIGHT_LEASE_TTL", DEFAULT_LEASE_TTL)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _break(self, path: str) -> bool:
+        """إزالة إيجار منتهٍ؛ False إن جدّده عامل آخر قبلنا"""
+        stale = f"{path}.{uuid.uuid4().hex}"
+        try:
+            os.rename(path, stale)
+        except FileNotFoundError:
+            return True
+        lease = self._read(stale)
+        if lease is not None and lease[1] > time.time():
+            # أخذه عامل آخر بين الفحص وإعادة التسمية: نعيده دون الكتابة فوق إيجار أحدث
+            try:
+                os.link(stale, path)
+            except FileExistsError:
+                pass
+            os.unlink(stale)
+            return False
+        os.unlink(stale)
+        return True
+
+    def add(self, key: str, token: str, ttl: int) -> bool:
+        path = self._path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                lease = self._read(path)
+                if lease is not None and lease[1] > time.time():
+                    return False
+                if not self._break(path):
+                    return False
+                continue
+            with os.fdopen(fd, "w") as handle:
+                handle.write(f"{token} {time.time() + ttl}")
+            return True
+        return False
+
+    def get(self, key: str) -> Optional[str]:
+        lease = self._read(self._path(key))
+        if lease is None or lease[1] <= time.time():
+            return None
+        return lease[0]
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+def _leases():
+    """مخزن الإيجارات: ملفات O_EXCL فوق FileBasedCache، وadd الذاكرة المشتركة لغيرها"""
+    cache = shared_cache()
+    if isinstance(cache, FileBasedCache):
+        return FileLeases(os.path.join(cache._dir, "leases"))
+    return cache
+
+
+def acquire_lease(key: Hashable, ttl: Optional[int] = None) -> Optional[str]:
+    """رمز الإيجار إن حصلنا عليه، أو None إن كان عامل آخر يحسب المفتاح"""
+    token = uuid.uuid4().hex
+    ttl = ttl or getattr(settings, "SINGLE_FLIGHT_LEASE_TTL", DEFAULT_LEASE_TTL)
+    try:
+        return token if _leases().add(_lease_key(key), token, ttl) else None
+    except Exception:
+        # الذاكرة المشتركة غير متاحة: نحسب دون تنسيق بدل أن نتوقف
+        logger.exception("Failed to acquire single-flight lease for %s", key)
+        return token
+
+
+def release_lease(key: Hashable, token: str) -> None:
+    try:
+        leases = _leases()
+        if leases.get(_lease_key(key)) == token:
+            leases.delete(_lease_key(key))
+    except Exception:
+        logger.exception("Failed to release single-flight lease for %s", key)
+
+
+def _lease_held(key: Hashable) -> bool:
+    try:
+        return _leases().get(_lease_key(key)) is not None
+    except Exception:
+        return False
+
+
+def _wait_for(keys: List[Hashable], lookup_many: Callable[[List], Dict]) -> Dict:
+    """استطلاع النتائج التي ينشرها أصحاب الإيجارات حتى تظهر أو تختفي الإيجارات أو تنتهي المهلة"""
+    deadline = time.monotonic() + getattr(settings, "SINGLE_FLIGHT_WAIT", DEFAULT_WAIT)
+    interval = POLL_INTERVAL
+    found: Dict = {}
+    pending = list(keys)
+    while pending:
+        found.update(lookup_many(pending))
+        pending = [key for key in pending if key not in found]
+        if not pending or time.monotonic() >= deadline:
+            break
+        if not any(_lease_held(key) for key in pending):
+            # صاحب الإيجار انتهى دون نشر (خطأ أو مات): نتيجة أخيرة ثم نحسب بأنفسنا
+            found.update(lookup_many(pending))
+            break
+        time.sleep(interval)
+        interval = min(interval * 2, MAX_POLL_INTERVAL)
+    return found
+
+
+# ------------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------------
+
+def coalesce_many(
+    keys: List[Hashable],
+    compute_many: Callable[[List], Dict],
+    lookup_many: Optional[Callable[[List], Dict]] = None,
+) -> Dict:
+    """
+    key → قيمة لكل مفتاح
+    compute_many(keys) → {key: value} ويجب أن تنشر القيم في المخزن الذي يقرؤه lookup_many
+    lookup_many(keys) → {key: value} للموجود فقط (None: دمج داخل العملية فقط)
+    """
+    if lookup_many is None:
+        return _group.do_many(keys, compute_many)
+
+    def lead(lead_keys: List) -> Dict:
+        tokens = {key: acquire_lease(key) for key in lead_keys}
+        mine = [key for key in lead_keys if tokens[key] is not None]
+        others = [key for key in lead_keys if tokens[key] is None]
+        values: Dict = {}
+        try:
+            if mine:
+                # عامل آخر قد يكون أنهى المفتاح بين إخفاقنا في القراءة وحصولنا على الإيجار
+                values.update(lookup_many(mine))
+                todo = [key for key in mine if key not in values]
+                if todo:
+                    values.update(compute_many(todo))
+        finally:
+            for key in mine:
+                release_lease(key, tokens[key])
+        if others:
+            values.update(_wait_for(others, lookup_many))
+            remaining = [key for key in others if key not in values]
+            if remaining:
+                logger.info("Single-flight wait ended without a result for %d keys; computing", len(remaining))
+                values.update(compute_many(remaining))
+        return values
+
+    return _group.do_many(keys, lead)
+
+
+def coalesce(
+    key: Hashable,
+    compute: Callable[[], Any],
+    lookup: Optional[Callable[[], Any]] = None,
+) -> Any:
+    """coalesce_many لمفتاح واحد؛ lookup() ترجع None إن لم تُنشر القيمة بعد"""
+    def lookup_many(keys):
+        value = lookup()
+        return {} if value is None else {key: value}
+
+    return coalesce_many(
+        [key], lambda keys: {key: compute()}, lookup_many if lookup is not None else None,
+    )[key]
+
+
+__all__ = ["FileLeases", "SingleFlight", "acquire_lease", "release_lease", "coalesce", "coalesce_many"]
@@ -0,0 +1,263 @@
+# matching/services/skill_index.py
+"""
+فهرس مقلوب للمهارات الموحدة (SkillSynonyms) وحدود الدرجة العليا
+
+- skill → السير التي تملكها، skill → الوظائف التي تطلبها (مطلوبة أو مفضلة)
+- الحد الأعلى لزوج يُحسب من عدد المهارات المشتركة فقط (EnhancedMatcher.score_upper_bound)،
+  فالأزواج التي لا يمكن أن تتجاوز حد الصفحة (> 10، >= 30، >= 50) لا تُحسب أصلاً
+- الفهرس داخل العملية: يُحدَّث عند الحفظ (signals) ويُعاد بناؤه كل SKILL_INDEX_TTL ثانية
+  ليلتقط ما حفظه العمّال الآخرون
+- التقليص يستبعد فقط السير التي يعرفها الفهرس ولم تتغير بعد بنائه: سيرة حفظها عامل آخر
+  (أو run_workers) تُحسب كالمعتاد حتى إعادة البناء
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, NamedTuple, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from resumes.models.uploaded import Resume
+from resumes.models.builder import BuiltResume, Skill
+from jobs.models import Job
+from resumes.services.skill_synonyms import SkillSynonyms
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.match_context import document_key, memoize, memoized_document
+
+logger = logging.getLogger(__name__)
+
+ResumeKey = Tuple[str, int]
+
+
+def normalize_skill(skill: str) -> str:
+    return SkillSynonyms.get_normalized_skill(skill)
+
+
+def normalize_skills(skills: Iterable[str], stored: Optional[list] = None) -> FrozenSet[str]:
+    """stored: النسخة الموحدة المحفوظة على Job/Resume (تُستخدم كما هي إن وُجدت)"""
+    if stored is not None:
+        return frozenset(stored)
+    return frozenset(SkillSynonyms.normalize_many(skills or []))
+
+
+@memoized_document("resume_skills")
+def resume_skills(resume) -> FrozenSet[str]:
+    """المهارات الموحدة لسيرة مرفوعة (normalized_skills) أو مبنية (Skill)"""
+    if isinstance(resume, BuiltResume):
+        return normalize_skills(skill.name for skill in resume.skills.all())
+    return normalize_skills((resume.parsed_data or {}).get("skills", []), resume.normalized_skills)
+
+
+class JobProfile(NamedTuple):
+    """ما يلزم لحساب الحد الأعلى دون كائن Job (نفس أسماء حقول Job)"""
+    required: FrozenSet[str]
+    preferred: FrozenSet[str]
+    required_skills: list
+    preferred_skills: list
+    languages: list
+    experience_years: int
+
+    @classmethod
+    def from_job(cls, job) -> "JobProfile":
+        return memoize("job_profile", document_key(job), lambda: cls._build(job))
+
+    @classmethod
+    def _build(cls, job) -> "JobProfile":
+        return cls(
+            required=normalize_skills(job.required_skills, getattr(job, 'normalized_required_skills', None)),
+            preferred=normalize_skills(job.preferred_skills, getattr(job, 'normalized_preferred_skills', None)),
+            required_skills=list(job.required_skills or []),
+            preferred_skills=list(job.preferred_skills or []),
+            languages=list(job.languages or []),
+            experience_years=job.experience_years or 0,
+        )
+
+
+def passes(score: float, min_score: Optional[float], strict: bool) -> bool:
+    if min_score is None:
+        return True
+    return score > min_score if strict else score >= min_score
+
+
+def upper_bound(skills: FrozenSet[str], profile: JobProfile, matcher: EnhancedMatcher = None) -> float:
+    matcher = matcher or EnhancedMatcher()
+    return matcher.score_upper_bound(
+        profile, len(skills & profile.required), len(skills & profile.preferred)
+    )
+
+
+class SkillIndex:
+    """skill → {resume keys} و skill → {job ids} مع المهارات الحالية لكل مستند"""
+
+    def __init__(self):
+        self.resumes_by_skill: Dict[str, Set[ResumeKey]] = defaultdict(set)
+        self.jobs_by_skill: Dict[str, Set[int]] = defaultdict(set)
+        self._resume_skills: Dict[ResumeKey, FrozenSet[str]] = {}
+        self._job_profiles: Dict[int, JobProfile] = {}
+        self._lock = threading.RLock()
+        self._matcher = EnhancedMatcher()
+        # وقت قراءة قاعدة البيانات (from_database): ما تغيّر بعده قد لا يطابق الفهرس
+        self.built_at = None
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def set_resume(self, key: ResumeKey, skills: FrozenSet[str]) -> None:
+        with self._lock:
+            self.remove_resume(key)
+            self._resume_skills[key] = skills
+            for skill in skills:
+                self.resumes_by_skill[skill].add(key)
+
+    def remove_resume(self, key: ResumeKey) -> None:
+        with self._lock:
+            for skill in self._resume_skills.pop(key, ()):
+                self.resumes_by_skill[skill].discard(key)
+
+    def set_job(self, job_id: int, profile: JobProfile) -> None:
+        with self._lock:
+            self.remove_job(job_id)
+            self._job_profiles[job_id] = profile
+            for skill in profile.required | profile.preferred:
+                self.jobs_by_skill[skill].add(job_id)
+
+    def remove_job(self, job_id: int) -> None:
+        with self._lock:
+            profile = self._job_profiles.pop(job_id, None)
+            if profile is not None:
+                for skill in profile.required | profile.preferred:
+                    self.jobs_by_skill[skill].discard(job_id)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def resumes_sharing_skills(self, skills: Iterable[str]) -> Set[ResumeKey]:
+        with self._lock:
+            keys: Set[ResumeKey] = set()
+            for skill in skills:
+                keys |= self.resumes_by_skill.get(skill, set())
+            return keys
+
+    def jobs_sharing_skills(self, skills: Iterable[str]) -> Set[int]:
+        with self._lock:
+            job_ids: Set[int] = set()
+            for skill in skills:
+                job_ids |= self.jobs_by_skill.get(skill, set())
+            return job_ids
+
+    def candidate_resume_keys(self, job, min_score: float, strict: bool = False) -> Optional[Set[ResumeKey]]:
+        """
+        السير التي قد تتجاوز الحد لهذه الوظيفة
+        None = لا تقليص ممكن (حتى السيرة بلا مهارات مشتركة قد تتجاوز الحد)
+        """
+        profile = JobProfile.from_job(job)
+        if passes(self._matcher.score_upper_bound(profile, 0, 0), min_score, strict):
+            return None
+        with self._lock:
+            return {
+                key for key in self.resumes_sharing_skills(profile.required | profile.preferred)
+                if passes(upper_bound(self._resume_skills[key], profile, self._matcher), min_score, strict)
+            }
+
+    def excluded_resume_keys(self, job, min_score: float, strict: bool = False) -> Set[ResumeKey]:
+        """السير المفهرسة التي لا يمكن أن تتجاوز الحد لهذه الوظيفة (ما لم يره الفهرس لا يُستبعد)"""
+        candidates = self.candidate_resume_keys(job, min_score, strict)
+        if candidates is None:
+            return set()
+        with self._lock:
+            return set(self._resume_skills) - candidates
+
+    def candidate_job_ids(self, resume, min_score: float, strict: bool = False) -> Set[int]:
+        """الوظائف المفهرسة التي قد تتجاوز الحد لهذه السيرة"""
+        skills = resume_skills(resume)
+        with self._lock:
+            return {
+                job_id for job_id, profile in self._job_profiles.items()
+                if passes(upper_bound(skills, profile, self._matcher), min_score, strict)
+            }
+
+    @classmethod
+    def from_database(cls) -> "SkillIndex":
+        index = cls()
+        index.built_at = timezone.now()
+        uploaded = Resume.objects.filter(is_processed=True)
+        for resume_id, stored in uploaded.filter(normalized_skills__isnull=False).values_list('id', 'normalized_skills'):
+            index.set_resume(('uploaded', resume_id), frozenset(stored))
+        # سير لم تُعبأ حقولها الموحدة بعد
+        for resume_id, parsed_data in uploaded.filter(normalized_skills__isnull=True).values_list('id', 'parsed_data'):
+            index.set_resume(('uploaded', resume_id), normalize_skills((parsed_data or {}).get("skills", [])))
+
+        built_skills = defaultdict(list)
+        for resume_id, name in Skill.objects.filter(resume__is_active=True).values_list('resume_id', 'name'):
+            built_skills[resume_id].append(name)
+        for resume_id in BuiltResume.objects.filter(is_active=True).values_list('id', flat=True):
+            index.set_resume(('built', resume_id), normalize_skills(built_skills.get(resume_id, [])))
+
+        for job in Job.objects.filter(is_active=True).only(
+            'id', 'required_skills', 'preferred_skills', 'languages', 'experience_years',
+            'normalized_required_skills', 'normalized_preferred_skills',
+        ):
+            index.set_job(job.id, JobProfile.from_job(job))
+        return index
+
+
+# ------------------------------------------------------------------
+# Process-wide index
+# ------------------------------------------------------------------
+
+_index: Optional[SkillIndex] = None
+_index_built_at = 0.0
+_index_lock = threading.Lock()
+
+
+def get_skill_index() -> SkillIndex:
+    global _index, _index_built_at
+    ttl = getattr(settings, "SKILL_INDEX_TTL", 300)
+    with _index_lock:
+        if _index is None or time.monotonic() - _index_built_at > ttl:
+            _index = SkillIndex.from_database()
+            _index_built_at = time.monotonic()
+            logger.debug("Built skill index")
+        return _index
+
+
+def update_job(job) -> None:
+    """بعد حفظ وظيفة (إن كان الفهرس مبنياً في هذه العملية)"""
+    if _index is None:
+        return
+    if job.is_active:
+        _index.set_job(job.id, JobProfile.from_job(job))
+    else:
+        _index.remove_job(job.id)
+
+
+def update_resume(resume) -> None:
+    """بعد حفظ سيرة مرفوعة أو مبنية (إن كان الفهرس مبنياً في هذه العملية)"""
+    from matching.services.match_store import _is_matchable, _resume_key
+
+    if _index is None:
+        return
+    if _is_matchable(resume):
+        _index.set_resume(_resume_key(resume), resume_skills(resume))
+    else:
+        _index.remove_resume(_resume_key(resume))
+
+
+def prune_resumes(resumes, job, min_score: float, strict: bool = False):
+    """
+    استبعاد السير المرفوعة التي لا يمكن أن تتجاوز الحد من queryset
+    المستبعدة: المفهرسة التي لم تُحفظ أو تُعالج بعد بناء الفهرس (غيرها قد تختلف مهاراتها عنه)
+    """
+    index = get_skill_index()
+    excluded = [resume_id for resume_type, resume_id in index.excluded_resume_keys(job, min_score, strict)
+                if resume_type == 'uploaded']
+    if not excluded or index.built_at is None:
+        return resumes
+    unchanged = Q(updated_at__lte=index.built_at) & (Q(processed_at__isnull=True) | Q(processed_at__lte=index.built_at))
+    return resumes.exclude(Q(id__in=excluded) & unchanged)
@@ -0,0 +1,188 @@
+# matching/services/skill_matrix.py
+"""
+مصفوفات تواجد المهارات (CSR) لمطابقة كتالوج كامل دفعة واحدة
+
+- السير × المهارات، والوظائف × المهارات (المطلوبة والمفضلة كل في مصفوفة)
+- الأعمدة أرقام skill_vocabulary، فعدد المهارات المشتركة لكل الأزواج = ضرب مصفوفتين متفرقتين
+- صفوف كل مستند محفوظة في الذاكرة مع updated_at: تُحدَّث عند الحفظ (signals)
+  ويُعاد حساب الصف تلقائياً إذا كان الكائن المعطى أحدث من المحفوظ
+- الاستخدام: مرشّح بالحد الأعلى فقط (candidate_pairs في match_store._fill_missing)؛
+  الأزواج التي تبقى تُحسب درجتها الكاملة بـ EnhancedMatcher لأن كل صف مخزن يحتاج
+  المهارات المتطابقة والناقصة بأسمائها لا عددها فقط
+
+Usage:
+    required, preferred = get_skill_matrices().overlap(resumes_by_key, jobs_by_id)
+    pairs = candidate_pairs(resumes_by_key, jobs_by_id, min_score=10, strict=True)
+"""
+
+import threading
+from typing import Callable, Dict, FrozenSet, Hashable, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from resumes.models.builder import BuiltResume
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.skill_index import JobProfile, resume_skills
+from matching.services.skill_vocabulary import SkillVocabulary, get_vocabulary
+
+
+class SkillMatrix:
+    """مفتاح → أرقام المهارات (صف CSR)، مع ختم زمني لاكتشاف الصفوف القديمة"""
+
+    def __init__(self, vocabulary: SkillVocabulary):
+        self.vocabulary = vocabulary
+        self._rows: Dict[Hashable, Tuple[object, np.ndarray]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def set(self, key: Hashable, skills: FrozenSet[str], stamp=None) -> None:
+        ids = np.array(sorted(self.vocabulary.add(skill) for skill in skills), dtype=np.int32)
+        with self._lock:
+            self._rows[key] = (stamp, ids)
+
+    def remove(self, key: Hashable) -> None:
+        with self._lock:
+            self._rows.pop(key, None)
+
+    def sync(self, objects: Dict[Hashable, object], skills: Callable, stamp: Callable) -> None:
+        """تحديث صفوف الكائنات الغائبة أو الأحدث من المحفوظ (stamp=None: يُعاد دائماً)"""
+        for key, obj in objects.items():
+            current = stamp(obj)
+            row = self._rows.get(key)
+            if row is None or current is None or row[0] != current:
+                self.set(key, skills(obj), current)
+
+    def csr(self, keys: List[Hashable], width: int) -> sparse.csr_matrix:
+        """مصفوفة (len(keys), width) بصف لكل مفتاح بنفس الترتيب"""
+        with self._lock:
+            rows = [self._rows[key][1] for key in keys]
+        lengths = np.fromiter((len(ids) for ids in rows), dtype=np.int64, count=len(rows))
+        indptr = np.concatenate(([0], np.cumsum(lengths)))
+        indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+        data = np.ones(len(indices), dtype=np.int32)
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(keys), width))
+
+
+def _stamp(obj):
+    # عناصر السيرة المبنية (Skill) لا تغيّر updated_at الخاص بها: تُقرأ دائماً من الكائن
+    if isinstance(obj, BuiltResume):
+        return None
+    return getattr(obj, 'updated_at', None)
+
+
+class SkillMatrices:
+    """السير × المهارات، الوظائف × المطلوبة، الوظائف × المفضلة"""
+
+    def __init__(self, vocabulary: Optional[SkillVocabulary] = None):
+        self.vocabulary = vocabulary or get_vocabulary()
+        self.resumes = SkillMatrix(self.vocabulary)
+        self.required = SkillMatrix(self.vocabulary)
+        self.preferred = SkillMatrix(self.vocabulary)
+
+    def set_resume(self, key, resume) -> None:
+        self.resumes.set(key, resume_skills(resume), _stamp(resume))
+
+    def remove_resume(self, key) -> None:
+        self.resumes.remove(key)
+
+    def set_job(self, job) -> None:
+        profile = JobProfile.from_job(job)
+        self.required.set(job.id, profile.required, _stamp(job))
+        self.preferred.set(job.id, profile.preferred, _stamp(job))
+
+    def remove_job(self, job_id) -> None:
+        self.required.remove(job_id)
+        self.preferred.remove(job_id)
+
+    def overlap(self, resumes_by_key: Dict, jobs_by_id: Dict) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        عدد المهارات المطلوبة والمفضلة المشتركة لكل زوج: مصفوفتان (سير × وظائف)
+        بترتيب مفاتيح resumes_by_key و jobs_by_id
+        """
+        self.resumes.sync(resumes_by_key, resume_skills, _stamp)
+        profiles = {}
+
+        def profile(job):
+            if job.id not in profiles:
+                profiles[job.id] = JobProfile.from_job(job)
+            return profiles[job.id]
+
+        self.required.sync(jobs_by_id, lambda job: profile(job).required, _stamp)
+        self.preferred.sync(jobs_by_id, lambda job: profile(job).preferred, _stamp)
+
+        width = len(self.vocabulary)
+        resumes = self.resumes.csr(list(resumes_by_key), width)
+        job_ids = list(jobs_by_id)
+        required = resumes @ self.required.csr(job_ids, width).T
+        preferred = resumes @ self.preferred.csr(job_ids, width).T
+        return required.toarray(), preferred.toarray()
+
+    def upper_bounds(self, resumes_by_key: Dict, jobs_by_id: Dict, matcher: EnhancedMatcher = None) -> np.ndarray:
+        """EnhancedMatcher.score_upper_bound لكل الأزواج (سير × وظائف) دفعة واحدة"""
+        matcher = matcher or EnhancedMatcher()
+        required, preferred = self.overlap(resumes_by_key, jobs_by_id)
+        bounds = np.empty(required.shape, dtype=np.float64)
+        for column, job in enumerate(jobs_by_id.values()):
+            bounds[:, column] = matcher.score_upper_bound(job, required[:, column], preferred[:, column])
+        return bounds
+
+
+# ------------------------------------------------------------------
+# Process-wide matrices
+# ------------------------------------------------------------------
+
+_matrices: Optional[SkillMatrices] = None
+_matrices_lock = threading.Lock()
+
+
+def get_skill_matrices() -> SkillMatrices:
+    """المصفوفات لهذه العملية؛ تُعاد (وتُملأ عند الاستخدام) إذا أُعيد تحميل المفردات"""
+    global _matrices
+    vocabulary = get_vocabulary()
+    if _matrices is None or _matrices.vocabulary is not vocabulary:
+        with _matrices_lock:
+            if _matrices is None or _matrices.vocabulary is not vocabulary:
+                _matrices = SkillMatrices(vocabulary)
+    return _matrices
+
+
+def update_job(job) -> None:
+    """بعد حفظ وظيفة (الصفوف تُملأ عند أول استخدام، فلا شيء قبل ذلك)"""
+    if _matrices is None:
+        return
+    if job.is_active:
+        _matrices.set_job(job)
+    else:
+        _matrices.remove_job(job.id)
+
+
+def update_resume(resume) -> None:
+    """بعد حفظ سيرة مرفوعة أو مبنية"""
+    from matching.services.match_store import _is_matchable, _resume_key
+
+    if _matrices is None:
+        return
+    if _is_matchable(resume):
+        _matrices.set_resume(_resume_key(resume), resume)
+    else:
+        _matrices.remove_resume(_resume_key(resume))
+
+
+def candidate_pairs(
+    resumes_by_key: Dict, jobs_by_id: Dict, min_score: Optional[float], strict: bool = False,
+) -> List[Tuple[Hashable, int]]:
+    """الأزواج (key, job_id) التي قد يتجاوز حدها الأعلى min_score (كل الأزواج إن كان None)"""
+    keys, job_ids = list(resumes_by_key), list(jobs_by_id)
+    if min_score is None:
+        return [(key, job_id) for key in keys for job_id in job_ids]
+
+    bounds = get_skill_matrices().upper_bounds(resumes_by_key, jobs_by_id)
+    keep = bounds > min_score if strict else bounds >= min_score
+    rows, columns = np.nonzero(keep)
+    return [(keys[r], job_ids[c]) for r, c in zip(rows.tolist(), columns.tolist())]
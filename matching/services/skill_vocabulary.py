@@ -0,0 +1,226 @@
+# matching/services/skill_vocabulary.py
+"""
+مفردات المهارات الموحدة: كل مهارة رقم ثابت، وكل مجموعة مهارات مصفوفة بتات (uint64)
+
+- الأرقام تُمنح تزايدياً: مهارة جديدة تأخذ الرقم التالي ولا يتغير رقم مهارة موجودة أبداً
+- الملف (SKILL_VOCABULARY_PATH) قائمة JSON بالمهارات بترتيب أرقامها؛ يُحمّل عند أول استخدام
+  والمهارات الجديدة تُضاف إليه بـ save_vocabulary (manage.py backfill_normalized_skills)
+- عدد المتطابق بين سيرة وكل الوظائف = AND ثم popcount على الكلمات
+- المهارات غير المحفوظة في الملف (من نصوص حرة وقت المطابقة) محدودة بـ
+  SKILL_VOCABULARY_MAX_TRANSIENT: عند تجاوزها تُعاد المفردات من الملف في الاستدعاء التالي
+  لـ get_vocabulary (المستدعي يأخذ المفردات مرة واحدة لكل عملية ترميز/فك)
+
+Usage:
+    vocabulary = get_vocabulary()
+    resumes = vocabulary.encode([{'python', 'django'}])
+    jobs = vocabulary.encode([{'python'}, {'sql'}], words=resumes.shape[1])
+    overlap_counts(resumes, jobs)   # array([1, 0])
+"""
+
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+DEFAULT_MAX_TRANSIENT = 10_000
+
+# popcount لكل بايت (بديل np.bitwise_count في NumPy < 2.0)
+_BYTE_COUNTS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    """عدد البتات المضاءة في كل كلمة uint64"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(*words.shape, 8)
+    return _BYTE_COUNTS[as_bytes].sum(axis=-1)
+
+
+def overlap_counts(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """|A ∩ B| لكل صف (مع البث إذا كان أحدهما صفاً واحداً)"""
+    return popcount(a & b).sum(axis=-1, dtype=np.int64)
+
+
+class SkillVocabulary:
+    """مهارة ↔ رقم، مع ترميز المجموعات كبتات مضغوطة"""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self.terms: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._sorted = (0, np.zeros(0, dtype=np.int64))
+        # عدد المهارات الأولى المحفوظة في الملف (ما بعدها عابر)
+        self.persisted = 0
+        for term in terms:
+            self.add(term)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def __contains__(self, term) -> bool:
+        return term in self.ids
+
+    @property
+    def transient(self) -> int:
+        return len(self.terms) - self.persisted
+
+    @property
+    def words(self) -> int:
+        return max(1, -(-len(self.terms) // WORD_BITS))
+
+    def add(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            with self._lock:
+                term_id = self.ids.get(term)
+                if term_id is None:
+                    term_id = self.ids[term] = len(self.terms)
+                    self.terms.append(term)
+        return term_id
+
+    def encode(self, sets: List[Iterable[str]], words: Optional[int] = None) -> np.ndarray:
+        """
+        مصفوفة (len(sets), words) من uint64؛ المهارات الجديدة تُضاف للمفردات
+        words: عرض موحد عند ترميز مجموعتين للمقارنة (خذ الأكبر بعد ترميز الاثنتين)
+        """
+        rows, ids = [], []
+        for row, items in enumerate(sets):
+            for term in items:
+                rows.append(row)
+                ids.append(self.add(term))
+        words = max(words or 0, self.words)
+        bits = np.zeros((len(sets), words), dtype=np.uint64)
+        if ids:
+            ids = np.asarray(ids, dtype=np.uint64)
+            np.bitwise_or.at(
+                bits,
+                (np.asarray(rows), (ids // WORD_BITS).astype(np.intp)),
+                np.left_shift(np.uint64(1), ids % np.uint64(WORD_BITS)),
+            )
+        return bits
+
+    def _ranks(self) -> np.ndarray:
+        """رتبة كل رقم في الترتيب الأبجدي (تُعاد عند نمو المفردات)"""
+        size, ranks = self._sorted
+        if size != len(self.terms):
+            terms = self.terms[:]
+            ranks = np.empty(len(terms), dtype=np.int64)
+            ranks[sorted(range(len(terms)), key=terms.__getitem__)] = np.arange(len(terms))
+            self._sorted = (len(terms), ranks)
+        return ranks
+
+    def decode(self, row: np.ndarray) -> List[str]:
+        """المهارات المضاءة في صف واحد مرتبة أبجدياً"""
+        return self.decode_many(np.atleast_2d(row))[0]
+
+    def decode_many(self, bits: np.ndarray) -> List[List[str]]:
+        """
+        decode لكل صف دفعة واحدة؛ تُفك الكلمات غير الصفرية فقط (64 بايت لكل كلمة بها مهارة)
+        لا بايت لكل بت في المفردات لكل زوج
+        """
+        bits = np.ascontiguousarray(bits, dtype="<u8")
+        rows, cols = np.nonzero(bits)
+        if not len(rows):
+            return [[] for _ in range(len(bits))]
+        words = np.ascontiguousarray(bits[rows, cols])
+        flags = np.unpackbits(words.view(np.uint8).reshape(len(words), 8), axis=1, bitorder="little")
+        word_index, offsets = np.nonzero(flags)
+        rows = rows[word_index]
+        ids = cols[word_index].astype(np.int64) * WORD_BITS + offsets
+        order = np.lexsort((self._ranks()[ids], rows))
+        rows, ids = rows[order], ids[order].tolist()
+        bounds = np.searchsorted(rows, np.arange(len(bits) + 1)).tolist()
+        terms = self.terms
+        return [[terms[i] for i in ids[bounds[r]:bounds[r + 1]]] for r in range(len(bits))]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: Path) -> "SkillVocabulary":
+        try:
+            vocabulary = cls(json.loads(Path(path).read_text()))
+        except FileNotFoundError:
+            return cls()
+        vocabulary.persisted = len(vocabulary)
+        return vocabulary
+
+    def save(self, path: Path) -> int:
+        """
+        كتابة المفردات (استبدال ذري)؛ ما في الملف يحتفظ بأرقامه ويُلحق به الجديد
+        يرجع عدد المهارات المكتوبة
+        """
+        path = Path(path)
+        snapshot = list(self.terms)
+        on_disk = SkillVocabulary.load(path).terms
+        known = set(on_disk)
+        terms = on_disk + [term for term in snapshot if term not in known]
+        if terms[:len(self.terms)] != self.terms:
+            # عامل آخر أضاف مهارات بترتيب مختلف: أرقام هذه العملية صالحة حتى إعادة التحميل
+            logger.info("Skill vocabulary on disk diverged; ids are reassigned on next load")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(terms, ensure_ascii=False))
+        os.replace(tmp, path)
+        self.persisted = max(self.persisted, len(snapshot))
+        return len(terms)
+
+
+# ------------------------------------------------------------------
+# Process-wide vocabularies
+# ------------------------------------------------------------------
+
+_vocabulary: Optional[SkillVocabulary] = None
+_language_vocabulary: Optional[SkillVocabulary] = None
+_vocabulary_lock = threading.Lock()
+
+
+def vocabulary_path() -> Path:
+    return Path(getattr(
+        settings, "SKILL_VOCABULARY_PATH", Path(settings.BASE_DIR) / "var" / "skill_vocabulary.json"
+    ))
+
+
+def _max_transient() -> int:
+    return getattr(settings, "SKILL_VOCABULARY_MAX_TRANSIENT", DEFAULT_MAX_TRANSIENT)
+
+
+def get_vocabulary() -> SkillVocabulary:
+    """مفردات المهارات لهذه العملية (تُعاد من الملف إذا تجاوزت المهارات العابرة الحد)"""
+    global _vocabulary
+    vocabulary = _vocabulary
+    if vocabulary is None or vocabulary.transient > _max_transient():
+        with _vocabulary_lock:
+            if _vocabulary is None or _vocabulary.transient > _max_transient():
+                if _vocabulary is not None:
+                    logger.info("Skill vocabulary reloaded after %d unsaved skills", _vocabulary.transient)
+                _vocabulary = SkillVocabulary.load(vocabulary_path())
+            vocabulary = _vocabulary
+    return vocabulary
+
+
+def get_language_vocabulary() -> SkillVocabulary:
+    """اللغات مفردات صغيرة منفصلة لا تحتاج ملفاً (تُفرغ عند تجاوز نفس الحد)"""
+    global _language_vocabulary
+    vocabulary = _language_vocabulary
+    if vocabulary is None or vocabulary.transient > _max_transient():
+        with _vocabulary_lock:
+            if _language_vocabulary is None or _language_vocabulary.transient > _max_transient():
+                _language_vocabulary = SkillVocabulary()
+            vocabulary = _language_vocabulary
+    return vocabulary
+
+
+def save_vocabulary() -> int:
+    return get_vocabulary().save(vocabulary_path())
@@ -0,0 +1,136 @@
+# matching/services/stored_embeddings.py
+"""
+متجهات الوظائف والسير المخزنة (JobEmbedding / ResumeEmbedding)
+
+- تُملأ عند حفظ الكائن (signals) وتُحدَّث فقط إذا تغيّر hash النص أو نموذج التضمين
+- قبل المطابقة تُحمّل المتجهات في ذاكرة embedding_cache، فلا يُعاد تضمين أي مستند وقت الطلب
+"""
+
+import logging
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+from jobs.models import Job
+from resumes.models.builder import BuiltResume
+from matching.models import JobEmbedding, ResumeEmbedding
+from matching.services.embedding_cache import (
+    content_hash, get_cache, vector_from_bytes, vector_to_bytes,
+)
+from matching.services.enhanced_matcher import EnhancedMatcher
+
+logger = logging.getLogger(__name__)
+
+
+# ------------------------------------------------------------------
+# Document texts
+# ------------------------------------------------------------------
+
+def job_text(job) -> str:
+    return EnhancedMatcher.job_text(job)
+
+
+def resume_text(resume) -> str:
+    """نص السيرة كما يراه EnhancedMatcher (مرفوعة: parsed_data، مبنية: بيانات المنشئ)"""
+    if isinstance(resume, BuiltResume):
+        from matching.services.built_resume_matcher import extract_resume_data
+        return EnhancedMatcher.resume_text(extract_resume_data(resume))
+
+    from matching.services.matcher import build_resume_data
+    return EnhancedMatcher.resume_text(build_resume_data(resume.parsed_data or {}))
+
+
+def _resume_lookup(resume) -> Dict:
+    if isinstance(resume, BuiltResume):
+        return {'built_resume': resume}
+    return {'resume': resume}
+
+
+def _embed(text: str) -> Tuple[str, np.ndarray]:
+    cache = get_cache()
+    model_id = cache.model_id
+    vector = np.asarray(cache.backend.embed_many([text])[0], dtype=np.float32)
+    cache.prime(model_id, {content_hash(text): vector})
+    return model_id, vector
+
+
+def _save_vector(model, lookup: Dict, text: str, defaults: Dict = None) -> bool:
+    """تحديث صف المتجه إن تغيّر النص أو النموذج؛ يرجع True إذا أُعيد التضمين"""
+    text_hash = content_hash(text)
+    model_id = get_cache().model_id
+    if model.objects.filter(text_hash=text_hash, model_id=model_id, **lookup).exists():
+        return False
+
+    model_id, vector = _embed(text)
+    model.objects.update_or_create(
+        **lookup,
+        defaults={
+            'model_id': model_id,
+            'dim': vector.shape[0],
+            'text_hash': text_hash,
+            'vector': vector_to_bytes(vector),
+            **(defaults or {}),
+        },
+    )
+    return True
+
+
+# ------------------------------------------------------------------
+# Refresh (on save)
+# ------------------------------------------------------------------
+
+def refresh_job_embedding(job) -> bool:
+    return _save_vector(JobEmbedding, {'job': job}, job_text(job))
+
+
+def refresh_resume_embedding(resume) -> bool:
+    resume_type = 'built' if isinstance(resume, BuiltResume) else 'uploaded'
+    return _save_vector(
+        ResumeEmbedding, _resume_lookup(resume), resume_text(resume),
+        defaults={'resume_type': resume_type},
+    )
+
+
+def refresh_all() -> int:
+    """تعبئة/تحديث متجهات كل الوظائف النشطة والسير القابلة للمطابقة"""
+    from matching.services.match_store import matchable_resumes
+
+    updated = 0
+    for job in Job.objects.filter(is_active=True):
+        updated += refresh_job_embedding(job)
+    for resume in matchable_resumes():
+        updated += refresh_resume_embedding(resume)
+    return updated
+
+
+# ------------------------------------------------------------------
+# Load (at match time)
+# ------------------------------------------------------------------
+
+def load_vectors(resumes: Iterable, jobs: Iterable) -> int:
+    """
+    تحميل المتجهات المخزنة للسير والوظائف المعطاة في ذاكرة embedding_cache
+    المفتاح hash النص، فالصف القديم (نص تغيّر) لا يطابق ويُعاد حسابه تلقائياً
+    """
+    uploaded_ids, built_ids = [], []
+    for resume in resumes:
+        (built_ids if isinstance(resume, BuiltResume) else uploaded_ids).append(resume.id)
+    job_ids = [job.id for job in jobs]
+
+    cache = get_cache()
+    model_id = cache.model_id
+    vectors = {}
+    querysets = []
+    if job_ids:
+        querysets.append(JobEmbedding.objects.filter(job_id__in=job_ids))
+    if uploaded_ids:
+        querysets.append(ResumeEmbedding.objects.filter(resume_id__in=uploaded_ids))
+    if built_ids:
+        querysets.append(ResumeEmbedding.objects.filter(built_resume_id__in=built_ids))
+
+    for queryset in querysets:
+        for text_hash, blob in queryset.filter(model_id=model_id).values_list('text_hash', 'vector'):
+            vectors[text_hash] = vector_from_bytes(blob)
+
+    cache.prime(model_id, vectors)
+    return len(vectors)
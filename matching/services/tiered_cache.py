@@ -0,0 +1,223 @@
+# matching/services/tiered_cache.py
+"""
+ذاكرة مؤقتة بطبقتين لنتائج ML (درجات التشابه)
+
+- الطبقة الأولى: LRU داخل العملية محدودة الحجم (ML_LOCAL_CACHE_SIZE) ومدة الصلاحية (ML_LOCAL_CACHE_TTL)
+- الطبقة الثانية: ذاكرة Django مشتركة بين العمّال (CACHES[SHARED_CACHE_ALIAS])
+  افتراضياً FileBasedCache في var/cache/shared؛ في الإنتاج Redis أو DatabaseCache بتغيير
+  SHARED_CACHE_BACKEND و SHARED_CACHE_LOCATION فقط
+- إصابة في الطبقة الثانية تُنسخ للأولى؛ الكتابة تذهب للطبقتين
+- أخطاء الطبقة المشتركة تُسجَّل ولا تُوقف الحساب (تُعامل كإخفاق)
+- عدادات الإصابات لكل طبقة ونسبة الإصابة: stats()
+
+Usage:
+    results = get_tiered_cache()
+    score = results.get(key)
+    results.set(key, score, ttl=3600)
+    results.stats()   # {'local_hits': .., 'shared_hits': .., 'misses': .., 'hit_rate': ..}
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCAL_SIZE = 10_000
+DEFAULT_LOCAL_TTL = 300
+SHARED_ALIAS = "shared"
+
+
+class LRUCache:
+    """LRU داخل العملية: حد للعدد وصلاحية بالثواني لكل مفتاح (ttl=None: بلا انتهاء)"""
+
+    def __init__(self, max_size: int = DEFAULT_LOCAL_SIZE, ttl: Optional[float] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key: Hashable, default=None, count: bool = True):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if count:
+                        self.hits += 1
+                    return value
+                del self._entries[key]
+            if count:
+                self.misses += 1
+            return default
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict:
+        found = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                found[key] = value
+        return found
+
+    def set(self, key: Hashable, value, ttl: Optional[float] = None) -> None:
+        ttls = [t for t in (ttl, self.ttl) if t is not None]
+        expires_at = time.monotonic() + min(ttls) if ttls else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_many(self, values: Dict, ttl: Optional[float] = None) -> None:
+        for key, value in values.items():
+            self.set(key, value, ttl)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+
+class TieredCache:
+    """LRU محلية أمام ذاكرة Django مشتركة (نفس واجهة get/set/get_many/set_many)"""
+
+    def __init__(
+        self,
+        alias: Optional[str] = None,
+        max_size: int = DEFAULT_LOCAL_SIZE,
+        local_ttl: Optional[float] = DEFAULT_LOCAL_TTL,
+    ):
+        self.alias = alias or getattr(settings, "SHARED_CACHE_ALIAS", SHARED_ALIAS)
+        self.local = LRUCache(max_size=max_size, ttl=local_ttl)
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def get(self, key: str, default=None):
+        value = self.local.get(key)
+        if value is not None:
+            self.local_hits += 1
+            return value
+        try:
+            value = self.shared.get(key)
+        except Exception:
+            logger.exception("Failed to read shared cache key %s", key)
+            value = None
+        if value is None:
+            self.misses += 1
+            return default
+        self.shared_hits += 1
+        self.local.set(key, value)
+        return value
+
+    def get_many(self, keys: Iterable[str]) -> Dict:
+        keys = list(dict.fromkeys(keys))
+        found = self.local.get_many(keys)
+        self.local_hits += len(found)
+        remote_keys = [key for key in keys if key not in found]
+        if remote_keys:
+            try:
+                remote = self.shared.get_many(remote_keys)
+            except Exception:
+                logger.exception("Failed to read shared cache")
+                remote = {}
+            self.shared_hits += len(remote)
+            self.misses += len(remote_keys) - len(remote)
+            self.local.set_many(remote)
+            found.update(remote)
+        return found
+
+    def set(self, key: str, value, ttl: Optional[int] = None) -> None:
+        self.local.set(key, value, ttl)
+        try:
+            self.shared.set(key, value, DEFAULT_TIMEOUT if ttl is None else ttl)
+        except Exception:
+            logger.exception("Failed to write shared cache key %s", key)
+
+    def set_many(self, values: Dict, ttl: Optional[int] = None) -> None:
+        if not values:
+            return
+        self.local.set_many(values, ttl)
+        try:
+            self.shared.set_many(values, DEFAULT_TIMEOUT if ttl is None else ttl)
+        except Exception:
+            logger.exception("Failed to write shared cache")
+
+    def delete(self, key: str) -> None:
+        self.local.delete(key)
+        try:
+            self.shared.delete(key)
+        except Exception:
+            logger.exception("Failed to delete shared cache key %s", key)
+
+    def clear(self, shared: bool = True) -> None:
+        """مسح الطبقة المحلية والعدادات (والمشتركة إن طُلب: تخص هذه الذاكرة وحدها)"""
+        self.local.clear()
+        self.local_hits = self.shared_hits = self.misses = 0
+        if shared:
+            self.shared.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.local_hits + self.shared_hits + self.misses
+        return (self.local_hits + self.shared_hits) / total if total else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "local_size": len(self.local),
+            "local_evictions": self.local.evictions,
+        }
+
+
+_cache: Optional[TieredCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tiered_cache() -> TieredCache:
+    """نسخة واحدة لكل عملية حسب الإعدادات"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TieredCache(
+                    max_size=getattr(settings, "ML_LOCAL_CACHE_SIZE", DEFAULT_LOCAL_SIZE),
+                    local_ttl=getattr(settings, "ML_LOCAL_CACHE_TTL", DEFAULT_LOCAL_TTL),
+                )
+    return _cache
+
+
+def shared_cache():
+    """الطبقة المشتركة وحدها (الإيجارات والعدادات التي لا تُنسخ محلياً)"""
+    return caches[getattr(settings, "SHARED_CACHE_ALIAS", SHARED_ALIAS)]
+
+
+__all__ = ["LRUCache", "TieredCache", "get_tiered_cache", "shared_cache"]
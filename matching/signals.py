@@ -0,0 +1,110 @@
+# matching/signals.py
+"""
+إعادة حساب نتائج المطابقة المتأثرة فقط عند حفظ وظيفة أو سيرة ذاتية
+(بعد تحديث متجه الكائن المخزن إن تغيّر نصه)
+
+المتجه والفهارس تُحدَّث وصفوف الكائن تُحذف بعد الـ commit مباشرة (لا تُعرض درجات قديمة)؛
+إعادة حسابها على كل الكتالوج مهمة في فئة recompute من طابور tasks للتسخين فقط، فلا يُحجب
+الطلب الذي حفظ الكائن، وبدون عامل تُحسب الصفوف الناقصة عند أول قراءة
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from tasks.models import Task
+from tasks.services.queue import enqueue
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from resumes.models.builder import (
+    BuiltResume, PersonalInfo, Experience, Education,
+    Skill, Language, Project, Certification
+)
+from matching.services import ann_index, match_context, match_store, skill_index, skill_matrix, stored_embeddings
+
+logger = logging.getLogger(__name__)
+
+# النماذج الفرعية التي تدخل في بيانات مطابقة السيرة المبنية
+BUILT_RESUME_PARTS = (PersonalInfo, Experience, Education, Skill, Language, Project, Certification)
+
+
+def enqueue_job_recompute(job, lane: str = Task.RECOMPUTE) -> Task:
+    """مهمة واحدة منتظرة لكل وظيفة: الحفظ المتكرر قبل وصول العامل لا يضيف غيرها"""
+    from matching.tasks import RECOMPUTE_JOB_TASK
+
+    return enqueue(RECOMPUTE_JOB_TASK, {"job_id": job.pk}, key=f"job:{job.pk}", unique=True, lane=lane)
+
+
+def enqueue_resume_recompute(resume) -> Task:
+    from matching.tasks import RECOMPUTE_RESUME_TASK
+
+    resume_type = match_store.get_resume_type(resume)
+    return enqueue(
+        RECOMPUTE_RESUME_TASK, {"resume_id": resume.pk, "resume_type": resume_type},
+        key=f"{resume_type}:{resume.pk}", unique=True, lane=Task.RECOMPUTE,
+    )
+
+
+def _run_after_commit(instance, *funcs):
+    model, pk = type(instance), instance.pk
+    # خصائص المستند ونتائج أزواجه المحفوظة في ذاكرة الطلب لم تعد صالحة
+    match_context.clear()
+
+    def callback():
+        match_context.clear()
+        # إعادة الجلب بعد الـ commit: قد يكون الكائن حُذف ضمن نفس المعاملة
+        queryset = model.objects.filter(pk=pk)
+        if model is BuiltResume:
+            queryset = queryset.prefetch_related(*match_store.BUILT_RESUME_PREFETCH)
+        current = queryset.first()
+        if current is None:
+            return
+        for func in funcs:
+            try:
+                func(current)
+            except Exception:
+                # المتجهات والنتائج الناقصة تُحسب عند أول قراءة، لذلك لا نكسر عملية الحفظ
+                logger.exception("%s failed for %s #%s", func.__name__, model.__name__, pk)
+
+    transaction.on_commit(callback)
+
+
+@receiver(post_save, sender=Job)
+def refresh_job_matches(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _run_after_commit(
+        instance,
+        stored_embeddings.refresh_job_embedding, skill_index.update_job, skill_matrix.update_job,
+        match_store.invalidate_job, enqueue_job_recompute,
+    )
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=BuiltResume)
+def refresh_resume_matches(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _run_after_commit(
+        instance,
+        stored_embeddings.refresh_resume_embedding, ann_index.update_resume_index, skill_index.update_resume,
+        skill_matrix.update_resume, match_store.invalidate_resume, enqueue_resume_recompute,
+    )
+
+
+def refresh_built_resume_part(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _run_after_commit(
+        BuiltResume(pk=instance.resume_id),
+        stored_embeddings.refresh_resume_embedding, ann_index.update_resume_index, skill_index.update_resume,
+        skill_matrix.update_resume, match_store.invalidate_resume, enqueue_resume_recompute,
+    )
+
+
+for part in BUILT_RESUME_PARTS:
+    post_save.connect(refresh_built_resume_part, sender=part, dispatch_uid=f"match_refresh_save_{part.__name__}")
+    post_delete.connect(refresh_built_resume_part, sender=part, dispatch_uid=f"match_refresh_delete_{part.__name__}")
@@ -0,0 +1,30 @@
+# matching/tasks.py
+from tasks.services.queue import task
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from resumes.models.builder import BuiltResume
+from .services import match_store
+
+RECOMPUTE_JOB_TASK = "matching.recompute_job"
+RECOMPUTE_RESUME_TASK = "matching.recompute_resume"
+
+
+@task(RECOMPUTE_JOB_TASK)
+def recompute_job_task(job_id):
+    job = Job.objects.filter(pk=job_id).first()
+    if job is None:
+        # حُذفت الوظيفة قبل أن يصل إليها العامل (صفوفها حُذفت معها)
+        return
+    match_store.recompute_for_job(job)
+
+
+@task(RECOMPUTE_RESUME_TASK)
+def recompute_resume_task(resume_id, resume_type="uploaded"):
+    if resume_type == "built":
+        queryset = BuiltResume.objects.prefetch_related(*match_store.BUILT_RESUME_PREFETCH)
+    else:
+        queryset = Resume.objects.all()
+    resume = queryset.filter(pk=resume_id).first()
+    if resume is None:
+        return
+    match_store.recompute_for_resume(resume)
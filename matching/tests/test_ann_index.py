@@ -0,0 +1,102 @@
+# matching/tests/test_ann_index.py
+import tempfile
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.services import ann_index, embedding_matrix, skill_index
+from matching.services.ann_index import IVFIndex, brute_force, recall_at_k
+
+
+def clustered_vectors(n=2000, dim=32, clusters=20, seed=0):
+    rng = np.random.RandomState(seed)
+    centers = rng.randn(clusters, dim)
+    vectors = centers[rng.randint(clusters, size=n)] + 0.5 * rng.randn(n, dim)
+    return IVFIndex._normalize(vectors), list(range(n))
+
+
+class IVFIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.vectors, self.ids = clustered_vectors()
+        self.index = IVFIndex(n_lists=40, n_probe=6).build(self.vectors, self.ids)
+
+    def test_recall_against_brute_force(self):
+        queries = self.vectors[:50]
+        self.assertGreaterEqual(recall_at_k(self.index, self.vectors, self.ids, queries, 10), 0.9)
+
+    def test_query_returns_sorted_scores(self):
+        hits = self.index.query(self.vectors[3], 5)
+        self.assertEqual(hits[0][0], 3)
+        scores = [score for _, score in hits]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+
+    def test_add_and_remove(self):
+        self.index.remove([3])
+        self.assertNotIn(3, [key for key, _ in self.index.query(self.vectors[3], 5)])
+        self.index.add(["new"], self.vectors[3])
+        self.assertEqual(self.index.query(self.vectors[3], 1)[0][0], "new")
+        self.assertEqual(len(self.index), len(self.ids))
+
+    def test_full_probe_equals_brute_force(self):
+        exact = brute_force(self.vectors, self.ids, self.vectors[7], 10)
+        found = self.index.query(self.vectors[7], 10, n_probe=40)
+        self.assertEqual([key for key, _ in found], [key for key, _ in exact])
+
+    def test_empty_index(self):
+        self.assertEqual(IVFIndex().query(self.vectors[0], 5), [])
+        index = IVFIndex()
+        index.add([1], self.vectors[0])
+        self.assertEqual(index.query(self.vectors[0], 5)[0][0], 1)
+
+
+class ResumeIndexTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(EMBEDDING_MATRIX_DIR=tmp.name, ANN_INDEX_TTL=0)
+        override.enable()
+        self.addCleanup(override.disable)
+        ann_index._resume_index = None
+        self.addCleanup(setattr, ann_index, "_resume_index", None)
+
+        User = get_user_model()
+        self.employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        self.candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+
+    def _resume(self, skills):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Resume.objects.create(
+                candidate=self.candidate, original_filename="r.pdf",
+                parsed_data={"skills": skills}, is_processed=True,
+            )
+
+    def test_rebuild_picks_up_resumes_saved_after_the_export(self):
+        first = self._resume(["Python"])
+        embedding_matrix.export_matrix("resumes")  # لقطة سابقة من export_embeddings
+        # سيرة حفظتها عملية أخرى: لا تظهر في المصفوفة المصدّرة ولا في فهرس هذه العملية
+        ann_index._resume_index = None
+        later = self._resume(["Python", "Django"])
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(
+                employer=self.employer, title="Backend", description="d", required_skills=["Python", "Django"],
+            )
+
+        self.assertEqual(set(ann_index.shortlist_resume_ids(job, 10)), {first.id, later.id})
+
+    def test_job_summary_is_not_cut_to_the_semantic_shortlist(self):
+        resume = self._resume(["Python", "Django"])
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(
+                employer=self.employer, title="Backend", description="d", required_skills=["Python", "Django"],
+            )
+        self.client.force_login(self.employer)
+        # الصفحة تبني فهرس المهارات لهذه العملية
+        self.addCleanup(setattr, skill_index, "_index", None)
+        with patch.object(ann_index, "shortlist_resume_ids", return_value=[]):
+            response = self.client.get(reverse("matching:job_matches", args=[job.pk]))
+        self.assertEqual([m["resume"] for m in response.context["top_matches"]], [resume])
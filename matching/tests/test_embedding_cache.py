@@ -0,0 +1,43 @@
+# matching/tests/test_embedding_cache.py
+import numpy as np
+from django.test import TestCase
+from unittest.mock import patch
+
+from matching.models import DocumentEmbedding
+from matching.services.embedding_cache import EmbeddingCache, content_hash
+from matching.services.embedding_engine import HashingEmbeddingBackend
+
+
+class EmbeddingCacheTests(TestCase):
+    def setUp(self):
+        self.backend = HashingEmbeddingBackend(dim=64)
+
+    def test_each_document_is_embedded_once(self):
+        cache = EmbeddingCache(backend=self.backend)
+        with patch.object(self.backend, "embed_many", wraps=self.backend.embed_many) as embed:
+            cache.get_many(["cv one", "job one", "cv one"])
+            cache.get_many(["job one", "cv one"])
+        self.assertEqual(embed.call_count, 1)
+        self.assertEqual(embed.call_args[0][0], ["cv one", "job one"])
+        self.assertEqual(cache.misses, 2)
+
+    def test_persistent_tier_survives_new_process_cache(self):
+        EmbeddingCache(backend=self.backend).get_many(["python developer"])
+        row = DocumentEmbedding.objects.get(content_hash=content_hash("python developer"))
+        self.assertEqual(row.model_id, self.backend.model_id)
+
+        cache = EmbeddingCache(backend=self.backend)
+        with patch.object(self.backend, "embed_many") as embed:
+            vector = cache.get("python developer")
+        embed.assert_not_called()
+        np.testing.assert_array_equal(vector, self.backend.embed_many(["python developer"])[0])
+
+    def test_lru_eviction(self):
+        cache = EmbeddingCache(backend=self.backend, max_size=2, persistent=False)
+        cache.get_many(["a1", "b2", "c3"])
+        self.assertEqual(len(cache), 2)
+
+    def test_similarity_is_dot_product(self):
+        cache = EmbeddingCache(backend=self.backend, persistent=False)
+        vectors = self.backend.embed_many(["django api", "rest api"])
+        self.assertAlmostEqual(cache.similarity("django api", "rest api"), float(vectors[0] @ vectors[1]), places=6)
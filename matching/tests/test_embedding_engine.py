@@ -0,0 +1,53 @@
+# matching/tests/test_embedding_engine.py
+from unittest.mock import patch
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from matching.services import embedding_engine
+from matching.services.embedding_engine import (
+    HashingEmbeddingBackend, get_embedding, get_embeddings,
+)
+
+
+class HashingEmbeddingBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = HashingEmbeddingBackend(dim=256)
+
+    def test_vectors_are_deterministic_and_normalized(self):
+        first = self.backend.embed_many(["Python Django developer"])
+        second = HashingEmbeddingBackend(dim=256).embed_many(["Python Django developer"])
+        np.testing.assert_array_equal(first, second)
+        self.assertEqual(first.dtype, np.float32)
+        self.assertAlmostEqual(float(np.linalg.norm(first[0])), 1.0, places=5)
+
+    def test_arabic_text_and_variants(self):
+        vectors = self.backend.embed_many(["مطوّر برمجيات", "مطور برمجيات", ""])
+        self.assertGreater(float(np.dot(vectors[0], vectors[1])), 0.99)
+        self.assertFalse(vectors[2].any())
+
+    def test_related_texts_score_higher(self):
+        vectors = self.backend.embed_many(["python django rest api", "django python developer", "nursing care"])
+        self.assertGreater(float(vectors[0] @ vectors[1]), float(vectors[0] @ vectors[2]))
+
+    def test_single_equals_batch_row(self):
+        texts = ["Python", "تحليل البيانات", "C++ and C#"]
+        matrix = get_embeddings(texts)
+        for i, text in enumerate(texts):
+            np.testing.assert_array_equal(get_embedding(text), matrix[i])
+
+
+class BackendRegistryTests(SimpleTestCase):
+    @override_settings(EMBEDDING_DIM=64)
+    def test_backends_are_built_through_the_registry(self):
+        class WideHashing(HashingEmbeddingBackend):
+            name = "wide"
+
+        with patch.dict(embedding_engine.BACKENDS, {"wide": WideHashing}), \
+                patch.dict(embedding_engine._backends, clear=True):
+            backend = embedding_engine.get_backend("wide")
+            self.assertIsInstance(backend, WideHashing)
+            self.assertEqual(backend.dim, 64)
+            self.assertIs(embedding_engine.get_backend("wide"), backend)
+        with self.assertRaises(ValueError):
+            embedding_engine.get_backend("missing")
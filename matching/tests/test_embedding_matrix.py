@@ -0,0 +1,54 @@
+# matching/tests/test_embedding_matrix.py
+import tempfile
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.models import JobEmbedding
+from matching.services import embedding_matrix
+from matching.services.embedding_cache import vector_from_bytes
+
+User = get_user_model()
+
+
+class EmbeddingMatrixTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        override = override_settings(EMBEDDING_MATRIX_DIR=self.tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.jobs = [
+                Job.objects.create(employer=employer, title=title, description="d", required_skills=skills)
+                for title, skills in [("Backend", ["Python"]), ("Frontend", ["React"]), ("Data", ["SQL"])]
+            ]
+            self.resume = Resume.objects.create(
+                candidate=candidate, original_filename="r.pdf",
+                parsed_data={"skills": ["React"]}, is_processed=True,
+            )
+
+    def test_export_then_memmap_load(self):
+        self.assertEqual(embedding_matrix.export_matrix("jobs"), 3)
+        self.assertEqual(embedding_matrix.export_matrix("resumes"), 1)
+
+        jobs = embedding_matrix.load_matrix("jobs")
+        self.assertIsInstance(jobs.vectors, np.memmap)
+        self.assertFalse(jobs.vectors.flags.writeable)
+        self.assertEqual(jobs.ids, [job.id for job in self.jobs])
+
+        stored = vector_from_bytes(JobEmbedding.objects.get(job=self.jobs[1]).vector)
+        np.testing.assert_array_equal(jobs.vector(self.jobs[1].id), stored)
+
+        resumes = embedding_matrix.load_matrix("resumes")
+        query = resumes.vector(("uploaded", self.resume.id))
+        self.assertEqual(jobs.top_k(query, 1)[0][0], self.jobs[1].id)
+
+    def test_missing_export_returns_none(self):
+        self.assertIsNone(embedding_matrix.load_matrix("jobs"))
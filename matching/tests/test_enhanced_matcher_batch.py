@@ -0,0 +1,106 @@
+# matching/tests/test_enhanced_matcher_batch.py
+import hashlib
+import random
+
+import numpy as np
+from django.test import SimpleTestCase
+from unittest.mock import patch
+
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services import matcher
+
+
+def fake_embedding(text):
+    seed = int(hashlib.md5(text.encode("utf-8")).hexdigest()[:8], 16)
+    return np.random.RandomState(seed).rand(16).tolist()
+
+
+def fake_embeddings(texts):
+    return np.array([fake_embedding(text) for text in texts])
+
+
+class FakeJob:
+    def __init__(self, **kwargs):
+        self.title = kwargs.get("title", "")
+        self.description = kwargs.get("description", "")
+        self.required_skills = kwargs.get("required_skills")
+        self.preferred_skills = kwargs.get("preferred_skills")
+        self.languages = kwargs.get("languages")
+        self.experience_years = kwargs.get("experience_years")
+        self.is_active = True
+
+
+SKILLS = ["Python", "python3", "Django", "JS", "React", "Docker", "k8s", "AWS", "SQL", "بايثون", "Git", "github"]
+LANGUAGES = ["English", "Arabic", "french", "ARABIC"]
+
+
+def random_resume(rng):
+    return {
+        "skills": rng.sample(SKILLS, rng.randint(0, 6)),
+        "languages": rng.sample(LANGUAGES, rng.randint(0, 3)),
+        "experience_years": rng.choice([0, 1, 3, 5, None]),
+        "experience": rng.sample(["Backend developer", "Team lead", ""], rng.randint(0, 2)),
+    }
+
+
+def random_job(rng, i):
+    return FakeJob(
+        title=f"Job {i}",
+        required_skills=rng.sample(SKILLS, rng.randint(0, 5)) or None,
+        preferred_skills=rng.sample(SKILLS, rng.randint(0, 3)),
+        languages=rng.sample(LANGUAGES, rng.randint(0, 2)),
+        experience_years=rng.choice([None, 0, 2, 4]),
+    )
+
+
+@patch("matching.services.enhanced_matcher.get_embeddings", side_effect=fake_embeddings)
+@patch("matching.services.enhanced_matcher.get_embedding", side_effect=fake_embedding)
+class EnhancedMatcherBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.rng = random.Random(42)
+        self.matcher = EnhancedMatcher()
+
+    def test_score_many_matches_per_pair_path(self, *_):
+        jobs = [random_job(self.rng, i) for i in range(40)]
+        for _ in range(10):
+            resume = random_resume(self.rng)
+            batch = self.matcher.score_many(resume, jobs)
+            single = [self.matcher.calculate_match_score(resume, job) for job in jobs]
+            self.assertEqual(batch, single)
+
+    def test_score_resumes_matches_per_pair_path(self, *_):
+        resumes = [random_resume(self.rng) for _ in range(40)]
+        for i in range(10):
+            job = random_job(self.rng, i)
+            batch = self.matcher.score_resumes(resumes, job)
+            single = [self.matcher.calculate_match_score(resume, job) for resume in resumes]
+            self.assertEqual(batch, single)
+
+    def test_empty_inputs(self, *_):
+        self.assertEqual(self.matcher.score_many(random_resume(self.rng), []), [])
+        self.assertEqual(self.matcher.score_resumes([], random_job(self.rng, 0)), [])
+
+
+@patch("matching.services.enhanced_matcher.get_embeddings", side_effect=fake_embeddings)
+@patch("matching.services.enhanced_matcher.get_embedding", side_effect=fake_embedding)
+class MatcherBatchTests(SimpleTestCase):
+    def test_batch_functions_match_calculate_match_score(self, *_):
+        rng = random.Random(7)
+        parsed = {"skills": ["Python", "Django"], "languages": ["English"], "experience": ["3 years experience"]}
+        jobs = [random_job(rng, i) for i in range(15)]
+        batch = matcher.calculate_match_scores_for_resume(parsed, jobs)
+        single = [matcher.calculate_match_score(parsed, job) for job in jobs]
+        self.assertEqual(batch, single)
+
+    def test_semantic_is_computed_once_and_shared(self, mock_embedding, mock_embeddings):
+        parsed = {"skills": ["Python"], "languages": [], "experience": []}
+        job = FakeJob(title="Backend", required_skills=["Python"])
+        raw = EnhancedMatcher().calculate_match_score(matcher.build_resume_data(parsed), job)
+        mock_embedding.reset_mock()
+
+        result = matcher.calculate_match_score(parsed, job)
+        # نصان فقط (السيرة والوظيفة): لا حساب دلالي ثانٍ في finalize_match_result
+        self.assertEqual(mock_embedding.call_count, 2)
+        similarity = raw["details"]["semantic"]["similarity"]
+        self.assertEqual(result["details"]["semantic"], round(similarity * 100, 1))
+        self.assertEqual(result["score"], raw["score"])
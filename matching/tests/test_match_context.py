@@ -0,0 +1,82 @@
+# matching/tests/test_match_context.py
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from unittest.mock import patch
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.middleware import MatchingContextMiddleware
+from matching.services import match_context, match_store
+from matching.services.match_context import current_context, matching_context, memoize
+
+User = get_user_model()
+
+
+def fake_compute(resumes, jobs):
+    return {
+        (("uploaded", resume.id), job.id): {"score": float(resume.id + job.id)}
+        for resume in resumes for job in jobs
+    }
+
+
+class MatchContextTests(SimpleTestCase):
+    def test_memoize_only_inside_context(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+
+        self.assertEqual(memoize("ns", "k", compute), 1)
+        self.assertEqual(memoize("ns", "k", compute), 2)
+        with matching_context() as context:
+            self.assertEqual(memoize("ns", "k", compute), 3)
+            self.assertEqual(memoize("ns", "k", compute), 3)
+            with matching_context() as nested:
+                self.assertIs(nested, context)
+            self.assertEqual((context.hits, context.misses), (1, 1))
+        self.assertIsNone(current_context())
+
+    def test_middleware_scopes_context_to_request(self):
+        seen = []
+
+        def view(request):
+            seen.append(current_context())
+            return HttpResponse()
+
+        middleware = MatchingContextMiddleware(view)
+        middleware(RequestFactory().get("/"))
+        middleware(RequestFactory().get("/"))
+        self.assertIsNotNone(seen[0])
+        self.assertIsNot(seen[0], seen[1])
+        self.assertIsNone(current_context())
+
+
+@patch("matching.services.match_store._compute_matches", side_effect=fake_compute)
+class PairMemoTests(TestCase):
+    def setUp(self):
+        employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        self.jobs = [Job.objects.create(employer=employer, title=f"J{i}", description="d") for i in range(2)]
+        self.resumes = [
+            Resume.objects.create(candidate=candidate, parsed_data={"skills": ["python"]}, is_processed=True)
+            for _ in range(2)
+        ]
+
+    def test_pairs_are_computed_once_per_request(self, mock_compute):
+        with matching_context():
+            first = match_store.compute_matches(self.resumes, self.jobs[:1])
+            mock_compute.reset_mock()
+            second = match_store.compute_matches(self.resumes, self.jobs)
+            # الزوجان مع الوظيفة الأولى من الذاكرة، والوظيفة الثانية فقط تُحسب
+            self.assertEqual(mock_compute.call_args[0], (self.resumes, [self.jobs[1]]))
+            self.assertEqual({k: second[k] for k in first}, first)
+
+    def test_clear_drops_request_memo(self, mock_compute):
+        with matching_context():
+            match_store.compute_matches(self.resumes[:1], self.jobs[:1])
+            match_context.clear()
+            mock_compute.reset_mock()
+            match_store.compute_matches(self.resumes[:1], self.jobs[:1])
+            self.assertEqual(mock_compute.call_count, 1)
@@ -0,0 +1,81 @@
+# matching/tests/test_match_pipeline.py
+import random
+
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.match_pipeline import MatchPipeline
+
+SKILLS = ["Python", "python3", "Django", "JS", "React", "Docker", "AWS", "SQL", "بايثون"]
+
+
+class FakeJob:
+    def __init__(self, rng, i):
+        self.title = f"Job {i}"
+        self.required_skills = rng.sample(SKILLS, rng.randint(1, 4))
+        self.preferred_skills = rng.sample(SKILLS, rng.randint(0, 2))
+        self.languages = rng.sample(["English", "Arabic"], rng.randint(0, 2))
+        self.experience_years = rng.choice([None, 2, 4])
+
+
+def fake_embeddings(texts):
+    return [[1.0, float(len(text) % 5), float(len(text) % 3)] for text in texts]
+
+
+@patch("matching.services.enhanced_matcher.get_embeddings", side_effect=fake_embeddings)
+class MatchPipelineTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.resumes = [
+            {
+                "skills": rng.sample(SKILLS, rng.randint(0, 5)),
+                "languages": rng.sample(["English", "Arabic"], rng.randint(0, 2)),
+                "experience_years": rng.choice([0, 1, 3, 5]),
+            }
+            for _ in range(60)
+        ]
+        self.job = FakeJob(rng, 0)
+        self.jobs = [FakeJob(rng, i) for i in range(30)]
+
+    def test_structured_scores_plus_semantic_equals_full_score(self, _):
+        matcher = EnhancedMatcher()
+        cheap = matcher.structured_scores(self.resumes, [self.job])
+        full = matcher.score_resumes(self.resumes, self.job)
+        for value, result in zip(cheap, full):
+            self.assertAlmostEqual(
+                value + result["details"]["semantic"]["score"], result["score"], places=1
+            )
+
+    def test_full_top_n_equals_full_ranking(self, _):
+        ranked = MatchPipeline(top_n=len(self.resumes)).rank_resumes(self.resumes, self.job)
+        full = EnhancedMatcher().score_resumes(self.resumes, self.job)
+        self.assertEqual(sorted(r["score"] for _, r in ranked), sorted(r["score"] for r in full))
+
+    def test_only_top_n_survivors_get_semantic_scoring(self, mock_embeddings):
+        pipeline = MatchPipeline(top_n=5)
+        ranked = pipeline.rank_jobs(self.resumes[0], self.jobs)
+        self.assertEqual(len(ranked), 5)
+        self.assertEqual(mock_embeddings.call_count, 1)
+        self.assertLessEqual(len(mock_embeddings.call_args[0][0]), 6)
+        scores = [result["score"] for _, result in ranked]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertEqual(set(pipeline.timings), {"retrieve_ms", "rerank_ms"})
+
+    @override_settings(MATCH_PIPELINE_TOP_N=7)
+    def test_top_n_from_settings(self, _):
+        self.assertEqual(len(MatchPipeline().rank_resumes(self.resumes, self.job)), 7)
+
+    def test_top_k_is_exact_and_reranks_in_batches_of_top_n(self, _):
+        matcher = EnhancedMatcher()
+        full = sorted((r["score"] for r in matcher.score_resumes(self.resumes, self.job)), reverse=True)
+        chunks = []
+
+        def score_chunk(indices):
+            chunks.append(len(indices))
+            return matcher.score_resumes([self.resumes[i] for i in indices], self.job)
+
+        ranked = MatchPipeline(top_n=5, matcher=matcher).top_k(self.resumes, [self.job], score_chunk, 3)
+        self.assertEqual([result["score"] for _, result in ranked], full[:3])
+        self.assertTrue(all(size <= 5 for size in chunks))
+        self.assertLess(sum(chunks), len(self.resumes))
@@ -0,0 +1,172 @@
+# matching/tests/test_match_store.py
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+from unittest.mock import patch
+
+from resumes.models.uploaded import Resume
+from jobs.models import Job
+from matching.models import MatchResult
+from matching.services import match_store
+from tasks.models import Task
+from tasks.services.queue import Worker
+
+User = get_user_model()
+
+
+def fake_match(resume, job):
+    score = float(len(resume.parsed_data.get("skills", [])) * 10 + job.id % 3)
+    return {"score": score, "details": {}, "level": "", "strengths": []}
+
+
+def fake_matches(resumes, jobs):
+    return {
+        (("uploaded", resume.id), job.id): fake_match(resume, job)
+        for resume in resumes for job in jobs
+    }
+
+
+@patch("matching.services.match_store.compute_matches", side_effect=fake_matches)
+class MatchStoreTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        self.candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+
+    def _resume(self, skills):
+        return Resume.objects.create(
+            candidate=self.candidate,
+            original_filename="r.pdf",
+            parsed_data={"skills": skills},
+            is_processed=True,
+        )
+
+    def _job(self, title="J"):
+        return Job.objects.create(employer=self.employer, title=title, description="d")
+
+    def _save(self, instance):
+        with self.captureOnCommitCallbacks(execute=True):
+            instance.save()
+        Worker(worker_id="test").run(burst=True)
+
+    def test_missing_pairs_are_computed_once_then_read(self, mock_compute):
+        resumes = [self._resume(["a"]), self._resume(["a", "b", "c"])]
+        job = self._job()
+        mock_compute.reset_mock()
+
+        first = match_store.get_matches(resumes, [job])
+        self.assertEqual(mock_compute.call_count, 1)
+        self.assertEqual([m["resume"] for m in first], [resumes[1], resumes[0]])
+
+        second = match_store.get_matches(resumes, [job])
+        self.assertEqual(mock_compute.call_count, 1)
+        self.assertEqual([m["match"]["score"] for m in second], [m["match"]["score"] for m in first])
+
+    def test_min_score_and_limit(self, mock_compute):
+        resumes = [self._resume(["a"] * n) for n in range(1, 5)]
+        job = self._job()
+        matches = match_store.get_matches(resumes, [job], min_score=20, limit=2)
+        self.assertEqual(len(matches), 2)
+        self.assertTrue(all(m["match"]["score"] >= 20 for m in matches))
+
+    def test_save_enqueues_recompute_instead_of_blocking(self, mock_compute):
+        self._resume(["a"])
+        job = self._job()
+        mock_compute.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+            job.save()
+        mock_compute.assert_not_called()
+        task = Task.objects.get(key=f"job:{job.pk}")
+        self.assertEqual((task.lane, task.status), (Task.RECOMPUTE, Task.PENDING))
+
+        Worker(worker_id="test").run(burst=True)
+        self.assertEqual(mock_compute.call_count, 1)
+        self.assertEqual(MatchResult.objects.filter(job=job).count(), 1)
+
+    def test_save_drops_stale_rows_without_a_worker(self, mock_compute):
+        resume = self._resume(["a"])
+        job = self._job()
+        self._save(job)
+        self.assertEqual(match_store.get_matches([resume], [job])[0]["match"]["score"], 10.0 + job.id % 3)
+
+        resume.parsed_data = {"skills": ["a", "b"]}
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.save()
+        # لا عامل يعمل: القراءة التالية تحسب الدرجة الجديدة بدل الصف القديم
+        self.assertFalse(MatchResult.objects.filter(resume=resume).exists())
+        self.assertEqual(match_store.get_matches([resume], [job])[0]["match"]["score"], 20.0 + job.id % 3)
+
+    def test_background_rebuild_queues_backfill_tasks(self, mock_compute):
+        self._resume(["a"])
+        job = self._job()
+        Job.objects.create(employer=self.employer, title="old", description="d", is_active=False)
+
+        self.assertEqual(match_store.enqueue_rebuild_all(), 1)
+        task = Task.objects.get(key=f"job:{job.pk}")
+        self.assertEqual(task.lane, Task.BACKFILL)
+
+        # حفظ الوظيفة أثناء إعادة البناء يرقّي مهمتها بدل إضافة أخرى
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        task.refresh_from_db()
+        self.assertEqual((task.lane, Task.objects.count()), (Task.RECOMPUTE, 1))
+
+        Worker(worker_id="test").run(burst=True)
+        self.assertEqual(MatchResult.objects.filter(job=job).count(), 1)
+
+    def test_job_save_recomputes_only_its_rows(self, mock_compute):
+        resume = self._resume(["a"])
+        job1, job2 = self._job("one"), self._job("two")
+        self._save(job1)
+        self.assertEqual(MatchResult.objects.filter(job=job1).count(), 1)
+
+        mock_compute.reset_mock()
+        with self.captureOnCommitCallbacks(execute=True):
+            job2.save()
+        Worker(worker_id="test").run(burst=True)
+        self.assertEqual(mock_compute.call_count, 1)
+        self.assertEqual(mock_compute.call_args[0], ([resume], [job2]))
+
+    def test_deactivated_job_drops_rows(self, mock_compute):
+        self._resume(["a"])
+        job = self._job()
+        self._save(job)
+        self.assertTrue(MatchResult.objects.filter(job=job).exists())
+        job.is_active = False
+        self._save(job)
+        self.assertFalse(MatchResult.objects.filter(job=job).exists())
+
+    def test_stale_engine_version_is_ignored(self, mock_compute):
+        resume = self._resume(["a"])
+        job = self._job()
+        MatchResult.objects.create(
+            resume=resume, resume_type="uploaded", job=job,
+            engine_version="old", score=99, breakdown={"score": 99},
+        )
+        matches = match_store.get_matches([resume], [job])
+        self.assertEqual(len(matches), 1)
+        self.assertEqual(matches[0]["match"]["score"], 10.0 + job.id % 3)
+
+    def test_localized_texts_follow_the_reading_language(self, mock_compute):
+        from django.utils import translation
+
+        def finalized(resumes, jobs):
+            results = fake_matches(resumes, jobs)
+            for result in results.values():
+                result.update(semantic={"similarity": 0.9, "score": 22.5, "percentage": "90.0%"})
+                result.update(strengths=["computed in the writer's language"], label="writer")
+            return results
+
+        mock_compute.side_effect = finalized
+        resume = self._resume(["a"])
+        job = self._job()
+        match_store.get_matches([resume], [job])
+
+        stored = MatchResult.objects.get(resume=resume, job=job).breakdown
+        self.assertNotIn("strengths", stored)
+        self.assertNotIn("label", stored)
+
+        with patch("matching.services.matcher._", side_effect=lambda s: f"{translation.get_language()}:{s}"):
+            with translation.override("ar"):
+                match = match_store.get_matches([resume], [job])[0]["match"]
+        self.assertEqual(match["strengths"], ["ar:Strong semantic alignment with job description"])
+        self.assertTrue(match["label"].startswith("ar:"))
@@ -1,39 +1,82 @@
 # matching/tests/test_ml_client.py
 from django.test import TestCase, override_settings
-from django.core.cache import cache
 from unittest.mock import patch, Mock
-import requests
 
 from matching.services import ml_client
 from matching.services.ml_client import MLServiceError
+from matching.services.tiered_cache import get_tiered_cache
 
 
+@override_settings(ML_SERVICE_URL="https://example.hf.space", ML_SERVICE_BREAKER_THRESHOLD=2)
 class MLClientTests(TestCase):
     def setUp(self):
-        cache.clear()
+        get_tiered_cache().clear()
+        ml_client.reset_client()
+        ml_client._breaker = None
+
+    def fake_client(self, **kwargs):
+        client = Mock(**kwargs)
+        client.src = "https://example.hf.space"
+        return client
 
-    @override_settings(ML_SERVICE_URL="https://example.hf.space")
     def test_predict_success_and_cache(self):
-        mock_resp = Mock()
-        mock_resp.raise_for_status.return_value = None
-        mock_resp.json.return_value = {"data": [0.66]}
+        client = self.fake_client(**{"predict.return_value": 0.66})
 
-        with patch.object(ml_client._session, "post", return_value=mock_resp) as mock_post:
+        with patch.object(ml_client, "_connect", return_value=client) as connect:
             score = ml_client.predict_similarity("cv text", "job text")
             self.assertAlmostEqual(score, 0.66)
 
-            # second call should hit cache (so post not called again)
+            # second call should hit cache (so predict not called again)
             score2 = ml_client.predict_similarity("cv text", "job text")
             self.assertAlmostEqual(score2, 0.66)
-            self.assertEqual(mock_post.call_count, 1)
+            self.assertEqual(client.predict.call_count, 1)
+
+            # the client is reused across uncached calls
+            ml_client.predict_similarity("other cv", "job text")
+            self.assertEqual(connect.call_count, 1)
 
-    @override_settings(ML_SERVICE_URL="https://example.hf.space")
     def test_network_error_raises_MLServiceError(self):
-        with patch.object(ml_client._session, "post", side_effect=requests.RequestException("fail")):
+        client = self.fake_client(**{"predict.side_effect": ConnectionError("fail")})
+        with patch.object(ml_client, "_connect", return_value=client) as connect:
+            with self.assertRaises(MLServiceError):
+                ml_client.predict_similarity("a", "b")
+            # a failed client is dropped and rebuilt on the next call
             with self.assertRaises(MLServiceError):
                 ml_client.predict_similarity("a", "b")
+            self.assertEqual(connect.call_count, 2)
 
     @override_settings(ML_SERVICE_URL=None)
     def test_missing_url_raises(self):
         with self.assertRaises(MLServiceError):
             ml_client.predict_similarity("a", "b")
+
+    def test_circuit_opens_and_fails_fast(self):
+        client = self.fake_client(**{"predict.side_effect": ConnectionError("down")})
+        with patch.object(ml_client, "_connect", return_value=client):
+            for _ in range(2):
+                with self.assertRaises(MLServiceError):
+                    ml_client.predict_similarity("a", "b")
+            self.assertEqual(ml_client.get_breaker().state, "open")
+
+            with self.assertRaises(MLServiceError):
+                ml_client.predict_similarity("c", "d")
+            self.assertEqual(client.predict.call_count, 2)
+
+            # half-open: one trial call closes the circuit again
+            client.predict.side_effect = None
+            client.predict.return_value = 0.5
+            ml_client.get_breaker().opened_at -= ml_client.get_breaker().reset_timeout
+            self.assertAlmostEqual(ml_client.predict_similarity("c", "d"), 0.5)
+            self.assertEqual(ml_client.get_breaker().state, "closed")
+
+    def test_predict_many_dedupes_against_cache(self):
+        client = self.fake_client(**{"predict.side_effect": lambda cv, job, api_name: len(cv) / 10})
+        with patch.object(ml_client, "_connect", return_value=client):
+            ml_client.predict_similarity("a", "job")
+
+            scores = ml_client.predict_similarity_many([("a", "job"), ("bb", "job"), ("bb", "job"), ("ccc", "job")])
+
+            self.assertEqual(scores, [0.1, 0.2, 0.2, 0.3])
+            # "a" from the cache, "bb" once
+            self.assertEqual(client.predict.call_count, 3)
+            self.assertAlmostEqual(get_tiered_cache().shared.get(ml_client._cache_key("ccc", "job")), 0.3)
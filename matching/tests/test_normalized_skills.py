@@ -0,0 +1,105 @@
+# matching/tests/test_normalized_skills.py
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from unittest.mock import patch
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.matcher import resume_match_data
+
+User = get_user_model()
+
+
+def fake_embeddings(texts):
+    return [[1.0, float(len(text) % 7)] for text in texts]
+
+
+def fake_embedding(text):
+    return fake_embeddings([text])[0]
+
+
+class NormalizedFieldsTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        self.candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+
+    def test_fields_are_synced_on_save(self):
+        job = Job.objects.create(
+            employer=self.employer, title="J", description="d",
+            required_skills=["Python3", "JS", "python"], preferred_skills=["بايثون"], languages=["English"],
+        )
+        self.assertEqual(job.normalized_required_skills, ["javascript", "python"])
+        self.assertEqual(job.normalized_preferred_skills, ["python"])
+        self.assertEqual(job.normalized_languages, ["english"])
+
+        job.required_skills = ["Docker"]
+        job.save(update_fields=["required_skills"])
+        job.refresh_from_db()
+        self.assertEqual(job.normalized_required_skills, ["docker"])
+
+        resume = Resume.objects.create(
+            candidate=self.candidate, parsed_data={"skills": ["JS"], "languages": ["Arabic"]},
+        )
+        resume.refresh_from_db()
+        self.assertEqual(resume.normalized_skills, ["javascript"])
+        self.assertEqual(resume.normalized_languages, ["arabic"])
+
+    def test_backfill_fills_rows_written_without_save(self):
+        job = Job.objects.create(employer=self.employer, title="J", description="d", required_skills=["JS"])
+        resume = Resume.objects.create(candidate=self.candidate, parsed_data={"skills": ["Python3"]})
+        Job.objects.filter(pk=job.pk).update(normalized_required_skills=None)
+        Resume.objects.filter(pk=resume.pk).update(normalized_skills=None)
+
+        with tempfile.TemporaryDirectory() as directory, \
+                override_settings(SKILL_VOCABULARY_PATH=Path(directory) / "vocabulary.json"):
+            call_command("backfill_normalized_skills", "--missing-only", stdout=StringIO())
+        job.refresh_from_db()
+        resume.refresh_from_db()
+        self.assertEqual(job.normalized_required_skills, ["javascript"])
+        self.assertEqual(resume.normalized_skills, ["python"])
+
+    @patch("matching.services.enhanced_matcher.get_embeddings", side_effect=fake_embeddings)
+    @patch("matching.services.enhanced_matcher.get_embedding", side_effect=fake_embedding)
+    def test_stored_fields_give_same_scores_as_raw(self, *_):
+        job = Job.objects.create(
+            employer=self.employer, title="J", description="d",
+            required_skills=["Python", "python3", "JS", "SQL"], languages=["English"], experience_years=2,
+        )
+        resume = Resume.objects.create(
+            candidate=self.candidate,
+            parsed_data={"skills": ["python", "React", "js"], "languages": ["english"]},
+        )
+        matcher = EnhancedMatcher()
+        stored = matcher.score_resumes([resume_match_data(resume)], job)[0]
+
+        job.normalized_required_skills = job.normalized_preferred_skills = job.normalized_languages = None
+        raw = matcher.score_resumes([{"skills": resume.parsed_data["skills"], "languages": ["english"]}], job)[0]
+        self.assertEqual(stored["score"], raw["score"])
+        # total_count يبقى عدد المهارات الخام في الوظيفة
+        self.assertEqual(stored["details"]["required_skills"]["total_count"], 4)
+
+    def test_match_detail_reads_the_analysis_from_the_match(self):
+        job = Job.objects.create(
+            employer=self.employer, title="J", description="d",
+            required_skills=["Python", "JS", "Go"], languages=["English", "French"],
+        )
+        resume = Resume.objects.create(
+            candidate=self.candidate, is_processed=True,
+            parsed_data={"skills": ["python3", "javascript"], "languages": ["english"]},
+        )
+        self.client.force_login(self.employer)
+        response = self.client.get(reverse("matching:match_detail", args=[resume.pk, job.pk]))
+
+        analysis = response.context["analysis"]
+        details = response.context["match"]["details"]
+        # المرادفات تُحتسب كما في الدرجة (python3 = Python و javascript = JS)
+        self.assertEqual(sorted(analysis["skills_analysis"]["required_matched"]), ["javascript", "python"])
+        self.assertEqual(analysis["skills_analysis"]["required_missing"], details["required_skills"]["missing"])
+        self.assertEqual(analysis["languages_analysis"], {"matched": ["english"], "missing": ["french"]})
@@ -0,0 +1,121 @@
+# matching/tests/test_similarity_client.py
+from django.test import SimpleTestCase
+
+from matching.management.commands.benchmark_similarity_client import StandInSimilarityServer, stand_in_score
+from matching.services.embedding_engine import RemoteSimilarityBackend
+from matching.services.similarity_client import DeadlineExceeded, SimilarityClient, SimilarityServiceError
+from matching.services.tiered_cache import get_tiered_cache
+
+PAIRS = [
+    ("python django sql", "python django developer"),
+    ("react css", "frontend react developer"),
+    ("docker linux", "python backend"),
+    ("aws docker", "aws devops docker"),
+    ("git", "git"),
+]
+
+
+class SimilarityClientTests(SimpleTestCase):
+    def serve(self, **kwargs):
+        server = StandInSimilarityServer(**kwargs).start()
+        self.addCleanup(server.stop)
+        return server
+
+    def make_client(self, server, **kwargs):
+        client = SimilarityClient(server.url, **kwargs)
+        self.addCleanup(client.close)
+        return client
+
+    def test_batches_pairs_in_order(self):
+        server = self.serve()
+        client = self.make_client(server, batch_size=2, max_workers=4)
+
+        scores = client.similarity_many(PAIRS)
+
+        self.assertEqual(scores, [stand_in_score(cv, job) for cv, job in PAIRS])
+        self.assertEqual(server.requests, 3)
+        self.assertTrue(client.supports_batches)
+
+    def test_one_text_against_many(self):
+        server = self.serve()
+        client = self.make_client(server)
+        jobs = [job for _, job in PAIRS]
+
+        scores = client.similarity_to_many("python docker", jobs)
+
+        self.assertEqual(scores, [stand_in_score("python docker", job) for job in jobs])
+        self.assertEqual(server.requests, 1)
+
+    def test_falls_back_to_single_pairs_when_batches_rejected(self):
+        server = self.serve(batches=False)
+        client = self.make_client(server, batch_size=10)
+
+        self.assertEqual(client.similarity_many(PAIRS), [stand_in_score(cv, job) for cv, job in PAIRS])
+        self.assertFalse(client.supports_batches)
+        self.assertEqual(server.requests, 1 + len(PAIRS))
+
+        # لا محاولة دفعات بعد الرفض
+        server.requests = 0
+        client.similarity_many(PAIRS[:2])
+        self.assertEqual(server.requests, 2)
+
+    def test_remote_backend_has_no_vectors(self):
+        backend = RemoteSimilarityBackend(url=self.serve().url)
+        self.assertFalse(backend.supports_vectors)
+        with self.assertRaises(SimilarityServiceError):
+            backend.embed_many(["python"])
+
+    def test_reprobes_batches_after_rejection(self):
+        server = self.serve(batches=False)
+        client = self.make_client(server, batch_size=10, batch_reprobe_interval=0)
+        client.similarity_many(PAIRS)
+        self.assertFalse(client.supports_batches)
+
+        # رفض واحد لا يعطّل الدفعات طوال عمر العملية
+        server.batches = True
+        server.requests = 0
+        self.assertEqual(client.similarity_many(PAIRS), [stand_in_score(cv, job) for cv, job in PAIRS])
+        self.assertEqual(server.requests, 1)
+        self.assertTrue(client.supports_batches)
+
+    def test_reuses_connection(self):
+        server = self.serve()
+        client = self.make_client(server)
+        for cv, job in PAIRS:
+            client.similarity(cv, job)
+        self.assertEqual(server.requests, len(PAIRS))
+        self.assertEqual(server.connections, 1)
+
+    def test_total_deadline(self):
+        server = self.serve(latency=0.3)
+        client = self.make_client(server, timeout=5, total_timeout=0.1, batch_size=1, max_workers=2)
+        with self.assertRaises(DeadlineExceeded):
+            client.similarity_many(PAIRS)
+
+    def test_unreachable_service(self):
+        server = self.serve()
+        url = server.url
+        server.stop()
+        client = SimilarityClient(url)
+        self.addCleanup(client.close)
+        with self.assertRaises(SimilarityServiceError):
+            client.similarity("a", "b")
+
+    def test_remote_backend_uses_client(self):
+        server = self.serve()
+        backend = RemoteSimilarityBackend(url=server.url)
+        get_tiered_cache().clear()
+
+        self.assertEqual(backend.similarity_many(PAIRS), [stand_in_score(cv, job) for cv, job in PAIRS])
+        self.assertEqual(server.requests, 1)
+
+        # الأزواج المعروفة تُقرأ من tiered_cache دون طلب جديد
+        self.assertAlmostEqual(backend.similarity(*PAIRS[0]), stand_in_score(*PAIRS[0]))
+        self.assertEqual(backend.similarity_many([PAIRS[1], ("new cv", "new job")])[0], stand_in_score(*PAIRS[1]))
+        self.assertEqual(server.requests, 2)
+
+    def test_remote_backend_has_no_vectors(self):
+        backend = RemoteSimilarityBackend(url=self.serve().url)
+        self.assertFalse(backend.supports_vectors)
+        with self.assertRaises(SimilarityServiceError):
+            backend.embed_many(["python"])
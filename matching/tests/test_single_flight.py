@@ -0,0 +1,168 @@
+# matching/tests/test_single_flight.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase, override_settings
+
+from matching.services import ml_client, single_flight
+from matching.services.embedding_cache import EmbeddingCache
+from matching.services.embedding_engine import HashingEmbeddingBackend
+from matching.services.single_flight import SingleFlight, coalesce, coalesce_many
+from matching.services.tiered_cache import get_tiered_cache
+
+
+def run_concurrently(func, count=8):
+    barrier = threading.Barrier(count)
+
+    def call(_):
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        get_tiered_cache().clear()
+
+    def test_concurrent_calls_share_one_computation(self):
+        group = SingleFlight()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.1)
+            return 42
+
+        results = run_concurrently(lambda: group.do("k", compute))
+
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(group.shared, 7)
+
+    def test_error_reaches_waiting_callers(self):
+        group = SingleFlight()
+
+        def compute():
+            time.sleep(0.1)
+            raise ValueError("boom")
+
+        def call():
+            try:
+                group.do("k", compute)
+            except ValueError as exc:
+                return str(exc)
+
+        self.assertEqual(run_concurrently(call, 4), ["boom"] * 4)
+        # المفتاح لم يعد جارياً: المحاولة التالية تحسب من جديد
+        self.assertEqual(group.do("k", lambda: 1), 1)
+
+    def test_do_many_computes_only_keys_not_in_flight(self):
+        group = SingleFlight()
+        started = threading.Event()
+        seen = []
+
+        def slow(keys):
+            seen.append(list(keys))
+            started.set()
+            time.sleep(0.1)
+            return {key: key * 10 for key in keys}
+
+        thread = threading.Thread(target=group.do_many, args=([1, 2], slow))
+        thread.start()
+        started.wait()
+        values = group.do_many([2, 3], lambda keys: seen.append(list(keys)) or {key: key * 10 for key in keys})
+        thread.join()
+
+        self.assertEqual(values, {2: 20, 3: 30})
+        self.assertEqual(seen, [[1, 2], [3]])
+
+    @override_settings(SINGLE_FLIGHT_WAIT=5)
+    def test_waits_for_lease_held_by_another_worker(self):
+        store = {}
+        token = single_flight.acquire_lease("k")
+
+        def other_worker():
+            time.sleep(0.1)
+            store["k"] = 7
+            single_flight.release_lease("k", token)
+
+        threading.Thread(target=other_worker).start()
+        compute = Mock(return_value=1)
+
+        self.assertEqual(coalesce("k", compute, lookup=lambda: store.get("k")), 7)
+        compute.assert_not_called()
+
+    @override_settings(SINGLE_FLIGHT_WAIT=5)
+    def test_computes_when_lease_holder_gives_up(self):
+        token = single_flight.acquire_lease("k")
+        threading.Timer(0.1, single_flight.release_lease, args=("k", token)).start()
+
+        self.assertEqual(coalesce("k", lambda: 3, lookup=lambda: None), 3)
+
+    def test_leader_rechecks_store_after_lease(self):
+        compute = Mock(return_value={})
+        values = coalesce_many(["a", "b"], compute, lookup_many=lambda keys: {key: 0 for key in keys})
+        self.assertEqual(values, {"a": 0, "b": 0})
+        compute.assert_not_called()
+        self.assertIsNone(single_flight._leases().get("sf:lease:a"))
+
+    def test_only_one_worker_acquires_a_lease(self):
+        tokens = run_concurrently(lambda: single_flight.acquire_lease("race"))
+        mine = [token for token in tokens if token is not None]
+        self.assertEqual(len(mine), 1)
+        single_flight.release_lease("race", mine[0])
+        self.assertFalse(single_flight._lease_held("race"))
+
+    def test_expired_lease_is_taken_over(self):
+        self.assertIsNotNone(single_flight.acquire_lease("old", ttl=0.05))
+        self.assertIsNone(single_flight.acquire_lease("old"))
+        time.sleep(0.1)
+        token = single_flight.acquire_lease("old")
+        self.assertIsNotNone(token)
+        single_flight.release_lease("old", token)
+
+
+@override_settings(ML_SERVICE_URL="https://example.hf.space")
+class CoalescedPredictionTests(SimpleTestCase):
+    def setUp(self):
+        get_tiered_cache().clear()
+        ml_client.reset_client()
+        ml_client._breaker = None
+
+    def test_identical_misses_call_the_space_once(self):
+        def predict(cv, job, api_name):
+            time.sleep(0.1)
+            return 0.8
+
+        client = Mock(**{"predict.side_effect": predict})
+        client.src = "https://example.hf.space"
+        with patch.object(ml_client, "_connect", return_value=client):
+            scores = run_concurrently(lambda: ml_client.predict_similarity("popular cv", "popular job"))
+
+        self.assertEqual(scores, [0.8] * 8)
+        self.assertEqual(client.predict.call_count, 1)
+
+
+class CoalescedEmbeddingTests(SimpleTestCase):
+    def test_same_text_is_embedded_once(self):
+        backend = HashingEmbeddingBackend(dim=64)
+        embed_many = backend.embed_many
+        calls = []
+
+        def slow_embed(texts):
+            calls.append(list(texts))
+            time.sleep(0.1)
+            return embed_many(texts)
+
+        backend.embed_many = slow_embed
+        embeddings = EmbeddingCache(backend=backend, persistent=False)
+
+        vectors = run_concurrently(lambda: embeddings.get("python developer"), 4)
+
+        self.assertEqual(len(calls), 1)
+        for vector in vectors[1:]:
+            self.assertTrue((vector == vectors[0]).all())
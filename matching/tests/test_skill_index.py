@@ -0,0 +1,126 @@
+# matching/tests/test_skill_index.py
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from unittest.mock import patch
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.services import match_store, skill_index
+from matching.services.enhanced_matcher import EnhancedMatcher
+from matching.services.skill_index import JobProfile, SkillIndex, normalize_skills, upper_bound
+
+User = get_user_model()
+
+SKILLS = ["Python", "python3", "Django", "JS", "React", "Docker", "AWS", "SQL", "بايثون"]
+
+
+class FakeJob:
+    def __init__(self, required_skills=None, preferred_skills=None, languages=None, experience_years=None):
+        self.title = "Job"
+        self.required_skills = required_skills
+        self.preferred_skills = preferred_skills
+        self.languages = languages
+        self.experience_years = experience_years
+
+
+def fake_embeddings(texts):
+    return [[1.0, float(len(text) % 7)] for text in texts]
+
+
+def fake_embedding(text):
+    return fake_embeddings([text])[0]
+
+
+@patch("matching.services.enhanced_matcher.get_embeddings", side_effect=fake_embeddings)
+@patch("matching.services.enhanced_matcher.get_embedding", side_effect=fake_embedding)
+class UpperBoundTests(SimpleTestCase):
+    def test_bound_never_below_actual_score(self, *_):
+        rng = random.Random(3)
+        matcher = EnhancedMatcher()
+        for _ in range(200):
+            resume = {
+                "skills": rng.sample(SKILLS, rng.randint(0, 5)),
+                "languages": rng.sample(["English", "Arabic"], rng.randint(0, 2)),
+                "experience_years": rng.choice([0, 2, 5]),
+            }
+            job = FakeJob(
+                required_skills=rng.sample(SKILLS, rng.randint(0, 4)) or None,
+                preferred_skills=rng.sample(SKILLS, rng.randint(0, 2)),
+                languages=rng.sample(["English", "Arabic"], rng.randint(0, 2)),
+                experience_years=rng.choice([None, 0, 3]),
+            )
+            bound = upper_bound(normalize_skills(resume["skills"]), JobProfile.from_job(job))
+            self.assertGreaterEqual(bound, matcher.calculate_match_score(resume, job)["score"])
+
+
+class SkillIndexTests(SimpleTestCase):
+    def test_candidates_share_a_skill_when_threshold_requires_it(self):
+        index = SkillIndex()
+        index.set_resume(("uploaded", 1), normalize_skills(["Python", "Django"]))
+        index.set_resume(("uploaded", 2), normalize_skills(["React"]))
+        index.set_resume(("built", 3), normalize_skills(["python3"]))
+        job = FakeJob(required_skills=["Python"])
+
+        self.assertEqual(index.candidate_resume_keys(job, 50), {("uploaded", 1), ("built", 3)})
+        self.assertIsNone(index.candidate_resume_keys(job, 10, strict=True))
+
+        index.remove_resume(("uploaded", 1))
+        self.assertEqual(index.candidate_resume_keys(job, 50), {("built", 3)})
+
+    def test_only_indexed_resumes_are_excluded(self):
+        index = SkillIndex()
+        index.set_resume(("uploaded", 1), normalize_skills(["Python"]))
+        index.set_resume(("uploaded", 2), normalize_skills(["React"]))
+        job = FakeJob(required_skills=["Python"])
+
+        self.assertEqual(index.excluded_resume_keys(job, 50), {("uploaded", 2)})
+        self.assertEqual(index.excluded_resume_keys(job, 10, strict=True), set())
+
+
+@patch("matching.services.match_store.compute_matches", side_effect=lambda resumes, jobs: {
+    (match_store._resume_key(r), j.id): {"score": 60.0} for r in resumes for j in jobs
+})
+class PruneMissingPairsTests(TestCase):
+    def test_pairs_below_threshold_are_not_computed(self, mock_compute):
+        employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        job = Job.objects.create(employer=employer, title="J", description="d", required_skills=["Python"])
+        match = Resume.objects.create(candidate=candidate, original_filename="a.pdf",
+                                      parsed_data={"skills": ["python"]}, is_processed=True)
+        other = Resume.objects.create(candidate=candidate, original_filename="b.pdf",
+                                      parsed_data={"skills": ["nursing"]}, is_processed=True)
+        mock_compute.reset_mock()
+
+        matches = match_store.get_matches([match, other], [job], min_score=50)
+        self.assertEqual([m["resume"] for m in matches], [match])
+        self.assertEqual(mock_compute.call_args[0][0], [match])
+        self.assertIsNone(skill_index._index)
+
+
+class PruneResumesTests(TestCase):
+    def setUp(self):
+        self.addCleanup(setattr, skill_index, "_index", None)
+        skill_index._index = None
+        employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        self.candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        self.job = Job.objects.create(employer=employer, title="J", description="d", required_skills=["Python"])
+
+    def _resume(self, skills):
+        return Resume.objects.create(candidate=self.candidate, original_filename="r.pdf",
+                                     parsed_data={"skills": skills}, is_processed=True)
+
+    def test_resumes_saved_elsewhere_after_the_build_are_kept(self):
+        match, other = self._resume(["python"]), self._resume(["nursing"])
+        edited = self._resume(["nursing"])
+        skill_index.get_skill_index()
+
+        # عامل آخر: سيرة جديدة وتعديل مهارات سيرة مفهرسة، دون تحديث فهرس هذه العملية
+        unseen = self._resume(["python"])
+        edited.parsed_data = {"skills": ["python"]}
+        edited.save()
+
+        pruned = skill_index.prune_resumes(Resume.objects.all(), self.job, 50)
+        self.assertEqual(set(pruned), {match, unseen, edited})
+        self.assertNotIn(other, pruned)
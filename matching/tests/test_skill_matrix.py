@@ -0,0 +1,70 @@
+# matching/tests/test_skill_matrix.py
+import random
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from matching.services.skill_index import JobProfile, normalize_skills, upper_bound
+from matching.services.skill_matrix import SkillMatrices
+from matching.services.skill_vocabulary import SkillVocabulary
+
+SKILLS = ["Python", "python3", "Django", "JS", "React", "Docker", "AWS", "SQL", "بايثون", "Go", "Rust"]
+
+
+class FakeJob:
+    def __init__(self, job_id, required_skills, preferred_skills, languages=None, experience_years=None):
+        self.id = job_id
+        self.updated_at = 0
+        self.required_skills = required_skills
+        self.preferred_skills = preferred_skills
+        self.languages = languages or []
+        self.experience_years = experience_years
+
+
+class FakeResume:
+    def __init__(self, skills):
+        self.updated_at = 0
+        self.parsed_data = {"skills": skills}
+        self.normalized_skills = None
+
+
+class SkillMatricesTests(SimpleTestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        self.resumes = {
+            ("uploaded", i): FakeResume(rng.sample(SKILLS, rng.randint(0, 6))) for i in range(60)
+        }
+        self.jobs = {
+            j: FakeJob(j, rng.sample(SKILLS, rng.randint(0, 4)), rng.sample(SKILLS, rng.randint(0, 3)),
+                       rng.sample(["English", "Arabic"], rng.randint(0, 1)), rng.choice([None, 2]))
+            for j in range(1, 9)
+        }
+        self.matrices = SkillMatrices(SkillVocabulary())
+
+    def test_overlap_matches_set_intersections(self):
+        required, preferred = self.matrices.overlap(self.resumes, self.jobs)
+        for r, resume in enumerate(self.resumes.values()):
+            skills = normalize_skills(resume.parsed_data["skills"])
+            for c, job in enumerate(self.jobs.values()):
+                profile = JobProfile.from_job(job)
+                self.assertEqual(required[r, c], len(skills & profile.required))
+                self.assertEqual(preferred[r, c], len(skills & profile.preferred))
+
+    def test_upper_bounds_match_per_pair_bound(self):
+        bounds = self.matrices.upper_bounds(self.resumes, self.jobs)
+        expected = np.array([
+            [upper_bound(normalize_skills(resume.parsed_data["skills"]), JobProfile.from_job(job))
+             for job in self.jobs.values()]
+            for resume in self.resumes.values()
+        ])
+        np.testing.assert_allclose(bounds, expected)
+
+    def test_newer_objects_replace_cached_rows(self):
+        key = ("uploaded", 0)
+        job = {1: FakeJob(1, ["Go"], [])}
+        self.matrices.overlap({key: FakeResume(["Python"])}, job)
+
+        changed = FakeResume(["Go"])
+        changed.updated_at = 1
+        required, _ = self.matrices.overlap({key: changed}, job)
+        self.assertEqual(required.tolist(), [[1]])
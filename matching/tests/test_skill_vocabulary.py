@@ -0,0 +1,100 @@
+# matching/tests/test_skill_vocabulary.py
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+from unittest.mock import patch
+
+from matching.services import skill_matrix, skill_vocabulary
+from matching.services.skill_vocabulary import SkillVocabulary, overlap_counts, popcount
+
+TERMS = [f"skill-{i}" for i in range(150)]
+
+
+class SkillVocabularyTests(SimpleTestCase):
+    def test_overlap_counts_match_set_intersections(self):
+        rng = random.Random(5)
+        vocabulary = SkillVocabulary()
+        resume = set(rng.sample(TERMS, 40))
+        jobs = [set(rng.sample(TERMS, rng.randint(0, 30))) for _ in range(50)]
+
+        resume_bits = vocabulary.encode([resume])
+        job_bits = vocabulary.encode(jobs, words=resume_bits.shape[1])
+        resume_bits = vocabulary.encode([resume], words=job_bits.shape[1])
+
+        self.assertEqual(overlap_counts(resume_bits, job_bits).tolist(), [len(resume & job) for job in jobs])
+        for job, bits in zip(jobs, job_bits & resume_bits):
+            self.assertEqual(vocabulary.decode(bits), sorted(resume & job))
+
+    def test_decode_many_unpacks_only_non_empty_words(self):
+        vocabulary = SkillVocabulary(f"term-{i}" for i in range(10_000))
+        sets = [{"term-3", "term-9000", "term-64"}, set(), {"term-9999"}]
+        bits = vocabulary.encode(sets)
+
+        with patch.object(np, "unpackbits", wraps=np.unpackbits) as unpack:
+            decoded = vocabulary.decode_many(bits)
+        self.assertEqual(decoded, [sorted(terms) for terms in sets])
+        # 4 كلمات بها بتات من 3 × 157 كلمة
+        self.assertEqual(unpack.call_args[0][0].shape, (4, 8))
+
+    def test_popcount(self):
+        words = np.array([0, 1, 2 ** 63, 2 ** 64 - 1], dtype=np.uint64)
+        self.assertEqual(popcount(words).tolist(), [0, 1, 1, 64])
+
+    def test_ids_are_stable_across_saves(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "vocabulary.json"
+            first = SkillVocabulary(["python", "django"])
+            first.save(path)
+
+            # عملية أخرى أضافت مهارة: الأرقام القديمة لا تتغير والجديد يُلحق
+            other = SkillVocabulary.load(path)
+            other.add("sql")
+            other.save(path)
+            first.add("react")
+            first.save(path)
+
+            loaded = SkillVocabulary.load(path)
+            self.assertEqual(loaded.terms, ["python", "django", "sql", "react"])
+            self.assertEqual(loaded.ids["django"], 1)
+
+
+class ProcessVocabularyTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "vocabulary.json"
+        SkillVocabulary(["python", "django"]).save(self.path)
+        override = override_settings(SKILL_VOCABULARY_PATH=str(self.path), SKILL_VOCABULARY_MAX_TRANSIENT=5)
+        override.enable()
+        self.addCleanup(override.disable)
+        for name in ("_vocabulary", "_language_vocabulary"):
+            self.addCleanup(setattr, skill_vocabulary, name, None)
+            setattr(skill_vocabulary, name, None)
+        self.addCleanup(setattr, skill_matrix, "_matrices", None)
+
+    def test_unsaved_skills_are_bounded(self):
+        vocabulary = skill_vocabulary.get_vocabulary()
+        vocabulary.encode([{f"free text {i}" for i in range(5)}])
+        self.assertIs(skill_vocabulary.get_vocabulary(), vocabulary)
+        matrices = skill_matrix.get_skill_matrices()
+
+        vocabulary.add("one too many")
+        reloaded = skill_vocabulary.get_vocabulary()
+        self.assertIsNot(reloaded, vocabulary)
+        self.assertEqual(reloaded.terms, ["python", "django"])
+        self.assertIsNot(skill_matrix.get_skill_matrices(), matrices)
+
+    def test_saved_skills_survive_a_reload(self):
+        vocabulary = skill_vocabulary.get_vocabulary()
+        vocabulary.encode([{f"stored {i}" for i in range(10)}])
+        vocabulary.save(self.path)
+        self.assertEqual(vocabulary.transient, 0)
+        self.assertIs(skill_vocabulary.get_vocabulary(), vocabulary)
+
+    def test_language_vocabulary_is_bounded(self):
+        languages = skill_vocabulary.get_language_vocabulary()
+        languages.encode([{f"lang {i}" for i in range(6)}])
+        self.assertEqual(len(skill_vocabulary.get_language_vocabulary()), 0)
@@ -0,0 +1,60 @@
+# matching/tests/test_stored_embeddings.py
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from unittest.mock import patch
+
+from jobs.models import Job
+from resumes.models.uploaded import Resume
+from matching.models import JobEmbedding, ResumeEmbedding
+from matching.services import stored_embeddings
+from matching.services.embedding_cache import get_cache, vector_from_bytes
+
+User = get_user_model()
+
+
+class StoredEmbeddingsTests(TestCase):
+    def setUp(self):
+        self.employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        self.candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        get_cache().clear()
+
+    def _job(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Job.objects.create(
+                employer=self.employer, title="Backend", description="d",
+                required_skills=["Python", "Django"], **kwargs
+            )
+
+    def test_job_vector_filled_on_save_and_refreshed_on_text_change(self):
+        job = self._job()
+        row = JobEmbedding.objects.get(job=job)
+        self.assertEqual(row.dim, vector_from_bytes(row.vector).shape[0])
+        first_hash = row.text_hash
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.description = "changed but not embedded"
+            job.save()
+        self.assertEqual(JobEmbedding.objects.get(job=job).text_hash, first_hash)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.title = "Data Engineer"
+            job.save()
+        self.assertNotEqual(JobEmbedding.objects.get(job=job).text_hash, first_hash)
+
+    def test_resume_vector_and_matching_reuses_stored_vectors(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = Resume.objects.create(
+                candidate=self.candidate, original_filename="r.pdf",
+                parsed_data={"skills": ["Python"]}, is_processed=True,
+            )
+        job = self._job()
+        row = ResumeEmbedding.objects.get(resume=resume)
+        self.assertEqual(row.resume_type, "uploaded")
+
+        get_cache().clear()
+        self.assertEqual(stored_embeddings.load_vectors([resume], [job]), 2)
+        with patch.object(get_cache().backend, "embed_many") as embed:
+            vector = get_cache().get(stored_embeddings.resume_text(resume))
+        embed.assert_not_called()
+        np.testing.assert_array_equal(vector, vector_from_bytes(row.vector))
@@ -0,0 +1,59 @@
+# matching/tests/test_tiered_cache.py
+import time
+
+from django.test import SimpleTestCase
+
+from matching.services.tiered_cache import LRUCache, TieredCache
+
+
+class LRUCacheTests(SimpleTestCase):
+    def test_size_eviction_keeps_recent(self):
+        lru = LRUCache(max_size=2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertEqual(lru.get_many(["a", "b", "c"]), {"a": 1, "c": 3})
+        self.assertEqual(lru.evictions, 1)
+
+    def test_ttl_eviction(self):
+        lru = LRUCache(max_size=10, ttl=0.05)
+        lru.set("a", 1)
+        lru.set("b", 2, ttl=60)  # لا يتجاوز ttl الطبقة
+        self.assertEqual(lru.get("a"), 1)
+        time.sleep(0.06)
+        self.assertIsNone(lru.get("a"))
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(len(lru), 0)
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.cache = TieredCache(max_size=10, local_ttl=60)
+        self.cache.clear()
+
+    def test_shared_hit_is_promoted_to_local(self):
+        self.cache.set("k", 0.5, 60)
+        # عامل آخر: طبقة محلية فارغة وطبقة مشتركة واحدة
+        other = TieredCache(max_size=10, local_ttl=60)
+
+        self.assertEqual(other.get("k"), 0.5)
+        self.assertEqual(other.get("k"), 0.5)
+        self.assertIsNone(other.get("missing"))
+        self.assertEqual((other.local_hits, other.shared_hits, other.misses), (1, 1, 1))
+        self.assertAlmostEqual(other.hit_rate, 2 / 3)
+
+    def test_get_many_reads_each_tier_once(self):
+        self.cache.set_many({"a": 1, "b": 2}, 60)
+        self.cache.local.delete("b")
+
+        self.assertEqual(self.cache.get_many(["a", "b", "c", "a"]), {"a": 1, "b": 2})
+        stats = self.cache.stats()
+        self.assertEqual((stats["local_hits"], stats["shared_hits"], stats["misses"]), (1, 1, 1))
+        self.assertIn("b", self.cache.local)
+
+    def test_delete_clears_both_tiers(self):
+        self.cache.set("k", 1, 60)
+        self.cache.delete("k")
+        self.assertIsNone(self.cache.shared.get("k"))
+        self.assertIsNone(self.cache.get("k"))
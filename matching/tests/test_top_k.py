@@ -0,0 +1,63 @@
+# matching/tests/test_top_k.py
+import random
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from unittest.mock import patch
+
+from jobs.models import Job
+from matching.models import MatchResult
+from matching.services import match_store
+from matching.services.matcher import heap_top_k
+from resumes.models.uploaded import Resume
+
+SKILLS = ["Python", "python3", "Django", "JS", "React", "Docker", "AWS", "SQL", "بايثون"]
+
+User = get_user_model()
+
+
+class HeapTopKTests(SimpleTestCase):
+    def test_heap_stops_when_bounds_cannot_enter(self):
+        scored = []
+
+        def score_chunk(indices):
+            scored.extend(indices)
+            return [{"score": 100 - i} for i in indices]
+
+        ranked = heap_top_k([100 - i for i in range(200)], score_chunk, 3, chunk_size=8)
+        self.assertEqual([i for i, _ in ranked], [0, 1, 2])
+        self.assertEqual(len(scored), 8)
+
+
+class StoredTopKTests(TestCase):
+    def setUp(self):
+        rng = random.Random(5)
+        employer = User.objects.create_user(username="emp", password="pw", role=User.EMPLOYER)
+        candidate = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        self.resumes = [
+            Resume.objects.create(
+                candidate=candidate, original_filename="cv.pdf", is_processed=True,
+                parsed_data={
+                    "skills": rng.sample(SKILLS, rng.randint(0, 5)),
+                    "languages": rng.sample(["English", "Arabic"], rng.randint(0, 2)),
+                    "experience": rng.choice([["3 years experience"], []]),
+                },
+            )
+            for _ in range(40)
+        ]
+        self.job = Job.objects.create(
+            employer=employer, title="Backend", description="Python backend developer",
+            required_skills=["Python", "Django", "SQL"], preferred_skills=["Docker"],
+            languages=["English"], experience_years=2,
+        )
+
+    @override_settings(MATCH_PIPELINE_TOP_N=5)
+    def test_limited_read_matches_full_ranking_without_scoring_everything(self):
+        with patch("matching.services.match_store.compute_matches", wraps=match_store.compute_matches) as compute:
+            top = match_store.get_matches(self.resumes, [self.job], min_score=10, limit=5)
+        scored = sum(len(call.args[0]) for call in compute.call_args_list)
+        self.assertLess(scored, len(self.resumes))
+        self.assertLess(MatchResult.objects.count(), len(self.resumes))
+
+        full = match_store.get_matches(self.resumes, [self.job], min_score=10)
+        self.assertEqual([m["match"]["score"] for m in top], [m["match"]["score"] for m in full[:5]])
@@ -1,13 +1,13 @@
 # matching/views/analytics.py
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db.models import Count, Avg, Q
 from datetime import datetime, timedelta
 from resumes.models import Resume
 from jobs.models import Job, Application
-from matching.services.matcher import batch_match_jobs_to_resume
+from matching.services.match_store import get_matches
+from matching.services.skill_index import prune_resumes
 import json
-from matching.services.matcher import calculate_match_score
 
 
 @login_required
@@ -50,16 +50,9 @@ def analytics_dashboard(request):
         if completeness_scores else 0
     )
     
-    # 3. تحليل المطابقات
-    from matching.services.matcher import batch_match_jobs_to_resume
-    all_matches = []
-    monthly_matches = {}  # للرسم البياني الشهري
-    
-    for resume in resumes:
-        matches = batch_match_jobs_to_resume(resume, jobs)
-        for match in matches:
-            score = match['match']['score']
-            all_matches.extend([m['match']['score'] for m in matches])
+    # 3. تحليل المطابقات (من النتائج المخزنة)
+    all_matches = get_matches(resumes, jobs, min_score=10, strict=True)
+    all_match_scores = [m['match']['score'] for m in all_matches]
     
     match_stats = {
         'excellent': len([m for m in all_match_scores if m >= 80]),
@@ -125,7 +118,7 @@ def analytics_dashboard(request):
         date = datetime.now() - timedelta(days=i)
         # احسب المطابقات في هذا اليوم
         daily_matches = len([m for m in all_matches 
-                           if m.created_at.date() == date.date()])
+                           if m['computed_at'].date() == date.date()])
         monthly_matches.append(daily_matches)
     
     context = {
@@ -173,32 +166,24 @@ def top_candidates_for_job(request, job_id):
     user = request.user
     job = get_object_or_404(Job, id=job_id, employer=user)
     
-    # جميع السير المعالجة
-    resumes = Resume.objects.filter(is_processed=True)
+    # كل السير التي يمكن أن تبلغ 30 (الإحصائيات على القائمة كاملة لا على أول 50)
+    resumes = Resume.objects.filter(is_processed=True).select_related('candidate')
+    resumes = prune_resumes(resumes, job, 30)
+    applied_ids = set(job.applications.values_list('candidate_id', flat=True))
     
-    # حساب المطابقة لكل سيرة
+    # النتائج المخزنة مرتبة حسب درجة المطابقة (حد أدنى معقول 30)
     candidates_matches = []
     
-    for resume in resumes:
-        match = calculate_match_score(resume.parsed_data, job)
-        
-        if match['score'] >= 30:  # حد أدنى معقول
-            candidates_matches.append({
-                'resume': resume,
-                'candidate': resume.candidate,
-                'match_score': match['score'],
-                'match_level': match['level'],
-                'details': match['details'],
-                'applied': job.applications.filter(
-                    candidate=resume.candidate
-                ).exists(),
-            })
-    
-    # ترتيب حسب درجة المطابقة
-    candidates_matches.sort(
-        key=lambda x: x['match_score'],
-        reverse=True
-    )
+    for entry in get_matches(resumes, [job], min_score=30):
+        resume, match = entry['resume'], entry['match']
+        candidates_matches.append({
+            'resume': resume,
+            'candidate': resume.candidate,
+            'match_score': match['score'],
+            'match_level': match['level'],
+            'details': match['details'],
+            'applied': resume.candidate_id in applied_ids,
+        })
     
     # إحصائيات
     stats = {
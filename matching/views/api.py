@@ -6,11 +6,12 @@ from rest_framework import status
 
 from resumes.models import Resume
 from jobs.models import Job
-from matching.services.matcher import match_resume_to_job, batch_match_resumes_to_job, batch_match_jobs_to_resume
+from matching.services.match_store import get_matches
 from accounts.permissions import IsEmployer, IsCandidate
 
 # ML client
-from matching.services.ml_client import predict_similarity, MLServiceError
+from matching.services import ml_client
+from matching.services.ml_client import MLServiceError
 
 
 
@@ -33,27 +34,16 @@ class MatchResumeJobsAPIView(APIView):
         # 2. جلب الوظائف النشطة فقط
         jobs = Job.objects.filter(is_active=True).select_related("employer")
         
-        # ⚠️ استخدام الدالة المحسنة للمطابقة الدفعية
-        matches = batch_match_jobs_to_resume(resume, jobs)
+        # 3. قراءة المطابقات المخزنة مرتبة تنازلياً
         results = []
-
-        # 3. حلقة المطابقة
-        for job in jobs:
-            match_result = match_resume_to_job(resume, job)
-
-            if match_result["score"] > 10:
-                results.append({
-                    "job_id": job.id,
-                    "job_title": job.title,
-                    "employer": job.employer.username,
-                    "match": match_result,
-                })
-
-        # 4. الترتيب
-        results.sort(
-            key=lambda x: x["match"]["score"],
-            reverse=True
-        )
+        for entry in get_matches([resume], jobs, min_score=10, strict=True):
+            job = entry["job"]
+            results.append({
+                "job_id": job.id,
+                "job_title": job.title,
+                "employer": job.employer.username,
+                "match": entry["match"],
+            })
 
         return Response({
             "resume_id": resume.id,
@@ -81,30 +71,18 @@ class MatchJobsResumeAPIView(APIView):
         # 2. جلب السير الذاتية المعالجة فقط
         resumes = Resume.objects.filter(is_processed=True).select_related('candidate')
         
-        # ⚠️ استخدام الدالة المحسنة للمطابقة الدفعية
-        matches = batch_match_resumes_to_job(job, resumes)
+        # 3. قراءة المطابقات المخزنة مرتبة تنازلياً (فلترة ذكية لتجنب الضجيج)
         results = []
-
-        # 3. المطابقة
-        for resume in resumes:
-            match = match_resume_to_job(resume, job)
-
-            # فلترة ذكية (نتجنب الضجيج)
-            if match["score"] >= 20:
-                results.append({
-                    "resume_id": resume.id,
-                    "candidate": resume.candidate.username,
-                    "score": match["score"],
-                    "color": match["color"],
-                    "reasons": match["reasons"],
-                    "details": match["details"],
-                })
-
-        # 4. ترتيب تنازلي
-        results.sort(
-            key=lambda x: x["score"],
-            reverse=True
-        )
+        for entry in get_matches(resumes, [job], min_score=20):
+            resume, match = entry["resume"], entry["match"]
+            results.append({
+                "resume_id": resume.id,
+                "candidate": resume.candidate.username,
+                "score": match["score"],
+                "color": match.get("color_class"),
+                "reasons": match.get("strengths", []),
+                "details": match["details"],
+            })
 
         return Response({
             "job_id": job.id,
@@ -151,7 +129,7 @@ class MLPredictAPIView(APIView):
             return Response({"error": "Provide cv_text and job_text or resume_id and job_id"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            score = predict_similarity(cv_text, job_text)
+            score = ml_client.predict_similarity(cv_text, job_text)
         except MLServiceError as exc:
             return Response({"error": str(exc)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
 
@@ -3,7 +3,7 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from resumes.models import Resume
 from jobs.models import Job
-from matching.services.matcher import match_resume_to_job
+from matching.services.match_store import get_match
 
 @login_required
 def debug_matches(request):
@@ -51,7 +51,7 @@ def debug_matches(request):
             job = jobs.first()
             
             if resume.is_processed:
-                match_result = match_resume_to_job(resume, job)
+                match_result = get_match(resume, job)
                 data['matches'].append({
                     'resume_id': resume.id,
                     'job_id': job.id,
@@ -10,8 +10,8 @@ from resumes.models.uploaded import Resume
 from resumes.models.builder import BuiltResume
 from resumes.models.profile import CandidateResumeProfile
 from jobs.models import Job
-from matching.services.matcher import match_resume_to_job, calculate_match_score
-from matching.services.built_resume_matcher import match_built_resume_to_jobs, calculate_built_resume_match
+from matching.services.match_store import get_matches, get_match
+from matching.services.skill_index import prune_resumes
 import json
 
 # matching/views/web.py - تصحيح دالة my_matches_view
@@ -55,28 +55,14 @@ def my_matches_view(request):
         # جلب الوظائف النشطة فقط
         jobs = Job.objects.filter(is_active=True).select_related('employer')
         
-        # مطابقة السيرة الذاتية الرئيسية مع الوظائف
+        # مطابقة السيرة الذاتية الرئيسية مع الوظائف (من النتائج المخزنة)
         if hasattr(primary_resume, 'title'):  # سيرة مبنية
-            matches = match_built_resume_to_jobs(primary_resume, jobs)
-            for match in matches:
-                all_matches.append({
-                    'resume': primary_resume,
-                    'job': match['job'],
-                    'match': match['match'],
-                    'type': 'built',
-                    'profile': profile
-                })
+            matches = get_matches([primary_resume], jobs, min_score=0, strict=True)
         else:  # سيرة مرفوعة
-            from matching.services.matcher import batch_match_jobs_to_resume
-            matches = batch_match_jobs_to_resume(primary_resume, jobs)
-            for match in matches:
-                all_matches.append({
-                    'resume': primary_resume,
-                    'job': match['job'],
-                    'match': match['match'],
-                    'type': 'uploaded',
-                    'profile': profile
-                })
+            matches = get_matches([primary_resume], jobs, min_score=10, strict=True)
+        for match in matches:
+            match['profile'] = profile
+            all_matches.append(match)
         
         # ترتيب حسب درجة المطابقة
         all_matches.sort(key=lambda x: x['match']['score'], reverse=True)
@@ -117,28 +103,22 @@ def my_matches_view(request):
             built_resume__isnull=False
         ).select_related('candidate', 'built_resume')
         
-        # مطابقة كل ملف تعريف مع وظائف صاحب العمل
+        # السيرة الرئيسية لكل ملف تعريف
+        primary_resumes = []
+        profiles_by_resume = {}
         for profile in profiles:
             primary_resume = profile.get_primary_resume()
             if not primary_resume:
                 continue
-                
-            for job in jobs:
-                if hasattr(primary_resume, 'title'):  # سيرة مبنية
-                    match_result = calculate_built_resume_match(primary_resume, job)
-                    resume_type = 'built'
-                else:  # سيرة مرفوعة
-                    match_result = match_resume_to_job(primary_resume, job)
-                    resume_type = 'uploaded'
-                
-                if match_result["score"] > 10:
-                    all_matches.append({
-                        'resume': primary_resume,
-                        'profile': profile,
-                        'job': job,
-                        'match': match_result,
-                        'type': resume_type
-                    })
+            resume_type = 'built' if hasattr(primary_resume, 'title') else 'uploaded'
+            primary_resumes.append(primary_resume)
+            profiles_by_resume[(resume_type, primary_resume.id)] = profile
+        
+        # قراءة المطابقات المخزنة مع وظائف صاحب العمل
+        # (الأزواج الناقصة تُصفّى بحدها الأعلى لكل الكتالوج دفعة واحدة: skill_matrix)
+        for match in get_matches(primary_resumes, jobs, min_score=10, strict=True):
+            match['profile'] = profiles_by_resume[(match['type'], match['resume'].id)]
+            all_matches.append(match)
         
         # ترتيب حسب درجة المطابقة
         all_matches.sort(key=lambda x: x['match']['score'], reverse=True)
@@ -186,17 +166,8 @@ def match_resume_jobs_view(request, resume_id):
     # جلب الوظائف النشطة
     jobs = Job.objects.filter(is_active=True).select_related('employer')
     
-    matches = []
-    for job in jobs:
-        match_result = match_resume_to_job(resume, job)
-        if match_result["score"] > 0:
-            matches.append({
-                'job': job,
-                'match': match_result,
-            })
-    
-    # ترتيب حسب درجة المطابقة
-    matches.sort(key=lambda x: x['match']['score'], reverse=True)
+    # النتائج المخزنة مرتبة حسب درجة المطابقة
+    matches = get_matches([resume], jobs, min_score=0, strict=True)
     
     context = {
         'resume': resume,
@@ -219,23 +190,17 @@ def match_job_resumes_view(request, job_id):
     
     # جلب السير الذاتية المعالجة
     resumes = Resume.objects.filter(is_processed=True).select_related('candidate')
+    total_resumes = resumes.count()
+    # السير التي يمكن أن تتجاوز الحد حسب المهارات المشتركة فقط
+    resumes = prune_resumes(resumes, job, 10, strict=True)
     
-    matches = []
-    for resume in resumes:
-        match_result = match_resume_to_job(resume, job)
-        if match_result["score"] > 10:
-            matches.append({
-                'resume': resume,
-                'match': match_result,
-            })
-    
-    # ترتيب حسب درجة المطابقة
-    matches.sort(key=lambda x: x['match']['score'], reverse=True)
+    # النتائج المخزنة مرتبة حسب درجة المطابقة
+    matches = get_matches(resumes, [job], min_score=10, strict=True)
     
     context = {
         'job': job,
         'matches': matches,
-        'total_resumes': resumes.count(),
+        'total_resumes': total_resumes,
         'matched_resumes': len(matches),
         'top_matches': matches[:10],
     }
@@ -250,20 +215,11 @@ def job_matches_view(request, pk):
         messages.error(request, _("Access denied."))
         return redirect('jobs:detail', pk=job.id)
     
-    # جلب أفضل 10 مطابقات فقط للعرض السريع
+    # أفضل 10 مطابقات فقط للعرض السريع: ترتيب دقيق للصفوف المخزنة (get_matches مع limit)،
+    # بلا قص دلالي تقريبي يُسقط مرشحاً قوياً في المهارات والخبرة
     resumes = Resume.objects.filter(is_processed=True).select_related('candidate')
-    top_matches = []
-    
-    for resume in resumes:
-        match_result = match_resume_to_job(resume, job)
-        if match_result["score"] >= 50:
-            top_matches.append({
-                'resume': resume,
-                'match': match_result,
-            })
-    
-    top_matches.sort(key=lambda x: x['match']['score'], reverse=True)
-    top_matches = top_matches[:10]
+    resumes = prune_resumes(resumes, job, 50)
+    top_matches = get_matches(resumes, [job], min_score=50, limit=10)
     
     context = {
         'job': job,
@@ -297,32 +253,20 @@ def match_detail_view(request, resume_id, job_id):
         messages.error(request, _("Access denied."))
         return redirect('matching:my_matches')
     
-    # حساب المطابقة حسب نوع السيرة
-    if resume_type == 'built':
-        from matching.services.built_resume_matcher import calculate_built_resume_match
-        match_result = calculate_built_resume_match(resume, job)
-    else:
-        match_result = match_resume_to_job(resume, job)
+    # نتيجة المطابقة المخزنة (تُحسب مرة واحدة إن لم تكن موجودة)
+    match_result = get_match(resume, job)
     
-    # تحليل مفصل
-    analysis = {}
+    # تحليل مفصل من تفاصيل النتيجة نفسها (نفس التوحيد والمرادفات التي حسبت الدرجة)
+    details = match_result.get('details', {})
+    analysis = {
+        'skills_analysis': skills_analysis(details),
+        'languages_analysis': languages_analysis(details),
+        'recommendations': get_recommendations(match_result),
+    }
     
     if resume_type == 'built':
-        # تحليل خاص بالسيرة المبنية
-        from matching.services.built_resume_matcher import analyze_skills_match as analyze_built_skills_match
         from matching.services.built_resume_matcher import analyze_experience_match as analyze_built_experience_match
-        analysis = {
-            'skills_analysis': analyze_built_skills_match(resume, job),
-            'experience_analysis': analyze_built_experience_match(resume, job),
-            'recommendations': get_recommendations(match_result),
-        }
-    else:
-        # تحليل السيرة المرفوعة
-        analysis = {
-            'skills_analysis': analyze_skills_match(resume, job),
-            'languages_analysis': analyze_languages_match(resume, job),
-            'recommendations': get_recommendations(match_result),
-        }
+        analysis['experience_analysis'] = analyze_built_experience_match(resume, job)
     
     context = {
         'resume': resume,
@@ -336,28 +280,23 @@ def match_detail_view(request, resume_id, job_id):
     return render(request, 'matching/match_detail.html', context)
 
 # دوال مساعدة
-def analyze_skills_match(resume, job):
-    """تحليل مطابقة المهارات"""
-    resume_skills = set(s.lower() for s in resume.parsed_data.get('skills', []))
-    required_skills = set(s.lower() for s in (job.required_skills or []))
-    preferred_skills = set(s.lower() for s in (job.preferred_skills or []))
-    
+def skills_analysis(details):
+    """المهارات المطلوبة والمفضلة المطابقة والناقصة كما حسبها محرك المطابقة"""
+    required = details.get('required_skills') or {}
+    preferred = details.get('preferred_skills') or {}
     return {
-        'required_matched': list(required_skills & resume_skills),
-        'required_missing': list(required_skills - resume_skills),
-        'preferred_matched': list(preferred_skills & resume_skills),
-        'preferred_missing': list(preferred_skills - resume_skills),
-        'extra_skills': list(resume_skills - (required_skills | preferred_skills)),
+        'required_matched': list(required.get('matched', [])),
+        'required_missing': list(required.get('missing', [])),
+        'preferred_matched': list(preferred.get('matched', [])),
+        'preferred_missing': list(preferred.get('missing', [])),
     }
 
-def analyze_languages_match(resume, job):
-    """تحليل مطابقة اللغات"""
-    resume_langs = set(l.lower() for l in resume.parsed_data.get('languages', []))
-    job_langs = set(l.lower() for l in (job.languages or []))
-    
+def languages_analysis(details):
+    """اللغات المطابقة والناقصة كما حسبها محرك المطابقة"""
+    languages = details.get('languages') or {}
     return {
-        'matched': list(job_langs & resume_langs),
-        'missing': list(job_langs - resume_langs),
+        'matched': list(languages.get('matched', [])),
+        'missing': list(languages.get('missing', [])),
     }
 
 def get_recommendations(match_result):
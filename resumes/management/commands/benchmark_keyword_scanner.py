@@ -0,0 +1,56 @@
+# resumes/management/commands/benchmark_keyword_scanner.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes.services.keyword_scanner import KeywordScanner, labels
+from resumes.services.parsing import TECH_SKILLS
+from resumes.testing import scan_skills_with_regex
+
+SAMPLE_WORDS = (
+    "developer engineer team project built designed maintained services api backend frontend "
+    "experience years university degree english arabic python django react docker aws sql "
+    "agile scrum leadership systems jobs cloud data pipelines testing deployment"
+).split()
+
+
+class Command(BaseCommand):
+    help = "Compare the single-pass keyword automaton against one regex per skill as the vocabulary grows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--texts", type=int, default=200, help="Resume texts per run")
+        parser.add_argument("--words", type=int, default=600, help="Words per resume text")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        base = [skill for skills in TECH_SKILLS.values() for skill in skills]
+        texts = [
+            " ".join(rng.choice(SAMPLE_WORDS) for _ in range(options["words"]))
+            for _ in range(options["texts"])
+        ]
+
+        self.stdout.write(f"texts={len(texts)} words/text={options['words']}")
+        for factor in (1, 4, 16):
+            # مهارات إضافية مصطنعة لقياس النمو مع حجم القاموس
+            skills = base + [f"{skill} {i}" for i in range(factor - 1) for skill in base]
+            scanner = KeywordScanner()
+            for skill in skills:
+                scanner.add(skill, "skill", skill.title())
+            scanner.build()
+
+            start = time.perf_counter()
+            legacy = [scan_skills_with_regex(text, skills) for text in texts]
+            legacy_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            single_pass = [labels(scanner.scan(text), "skill") for text in texts]
+            scan_time = time.perf_counter() - start
+
+            mismatches = sum(a != b for a, b in zip(legacy, single_pass))
+            self.stdout.write(
+                f"keywords={len(skills):>5}  regex per skill: {legacy_time / len(texts) * 1000:7.3f}ms/text  "
+                f"automaton: {scan_time / len(texts) * 1000:7.3f}ms/text ({legacy_time / scan_time:5.1f}x)  "
+                f"mismatches: {mismatches}"
+            )
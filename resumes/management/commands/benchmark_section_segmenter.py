@@ -0,0 +1,38 @@
+# resumes/management/commands/benchmark_section_segmenter.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes.services.parsing import parse_many
+from resumes.testing import build_corpus, regex_simple_parse_resume
+
+
+class Command(BaseCommand):
+    help = "Compare the one-pass section segmenter against the nine DOTALL regexes of simple_parse_resume"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--texts", type=int, default=200)
+        parser.add_argument("--sections", type=int, default=200, help="Sections per resume (large resumes)")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        corpus = build_corpus(options["texts"], options["seed"], options["sections"])
+        chars = sum(len(text) for text in corpus)
+
+        start = time.perf_counter()
+        legacy = [regex_simple_parse_resume(text) for text in corpus]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        segmented = list(parse_many(corpus))
+        segment_time = time.perf_counter() - start
+
+        mismatches = sum(
+            any(sorted(a[key]) != sorted(b[key]) for key in a) for a, b in zip(legacy, segmented)
+        )
+        self.stdout.write(
+            f"texts={len(corpus)} avg chars={chars // len(corpus)}\n"
+            f"nine regexes: {legacy_time / len(corpus) * 1000:.3f}ms/text\n"
+            f"segmenter:    {segment_time / len(corpus) * 1000:.3f}ms/text ({legacy_time / segment_time:.1f}x)\n"
+            f"mismatches: {mismatches}"
+        )
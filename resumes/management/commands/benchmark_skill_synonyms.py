@@ -0,0 +1,44 @@
+# resumes/management/commands/benchmark_skill_synonyms.py
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from resumes.services.skill_synonyms import SkillSynonyms, _normalize
+from resumes.testing import scan_normalized_skill
+
+
+class Command(BaseCommand):
+    help = "Compare the compiled SkillSynonyms lookup against the linear synonym scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=100000, help="Skills to normalize")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def _timed(self, func, skills):
+        start = time.perf_counter()
+        result = func(skills)
+        return result, time.perf_counter() - start
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # خليط واقعي: أسماء مستعارة، ترجمات عربية، ومهارات غير معروفة بحالات أحرف مختلفة
+        vocabulary = list(SkillSynonyms.ALIASES) + [f"unknown skill {i}" for i in range(200)]
+        skills = [
+            rng.choice(vocabulary).upper() if rng.random() < 0.3 else rng.choice(vocabulary)
+            for _ in range(options["size"])
+        ]
+
+        legacy, legacy_time = self._timed(lambda items: [scan_normalized_skill(s) for s in items], skills)
+        _normalize.cache_clear()
+        compiled, cold_time = self._timed(SkillSynonyms.normalize_many, skills)
+        _, warm_time = self._timed(SkillSynonyms.normalize_many, skills)
+
+        mismatches = sum(a != b for a, b in zip(legacy, compiled))
+        self.stdout.write(
+            f"skills={len(skills)} aliases={len(SkillSynonyms.ALIASES)}\n"
+            f"linear scan: {legacy_time * 1000:.1f}ms\n"
+            f"compiled (cold cache): {cold_time * 1000:.1f}ms ({legacy_time / cold_time:.1f}x)\n"
+            f"compiled (warm cache): {warm_time * 1000:.1f}ms ({legacy_time / warm_time:.1f}x)\n"
+            f"mismatches: {mismatches}"
+        )
@@ -0,0 +1,59 @@
+# resumes/management/commands/reprocess_resumes.py
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from resumes.services.processing import PARSERS
+from resumes.services.reprocessor import DEFAULT_CHUNK_SIZE, checkpoint_path, load_checkpoint, reprocess_resumes
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-parse every uploaded resume that has extracted text, in parallel and in chunks. "
+        "An interrupted run resumes from its checkpoint."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--parser", choices=sorted(PARSERS), default="full")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                            help="Parser processes (1 = parse in this process)")
+        parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and start from the first resume")
+        parser.add_argument("--checkpoint", default=None, help=f"Checkpoint file (default: {checkpoint_path()})")
+        parser.add_argument("--skip-rebuild", action="store_true",
+                            help="Do not rebuild stored match results afterwards (bulk_update sends no signals)")
+
+    def _progress(self, stats):
+        self.stdout.write(
+            f"  up to #{stats['last_pk']}: {stats['run_processed']} parsed, {stats['run_errors']} errors, "
+            f"{stats['rate']:.1f} resumes/s"
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1 or options["workers"] < 1:
+            raise CommandError("--chunk-size and --workers must be positive")
+
+        checkpoint = None if options["restart"] else load_checkpoint(options["checkpoint"])
+        if checkpoint and checkpoint.get("parser") == options["parser"]:
+            self.stdout.write(f"Resuming after #{checkpoint['last_pk']} (checkpoint {options['checkpoint'] or checkpoint_path()})")
+        stats = reprocess_resumes(
+            parser=options["parser"],
+            chunk_size=options["chunk_size"],
+            workers=options["workers"],
+            restart=options["restart"],
+            path=options["checkpoint"],
+            on_chunk=self._progress,
+        )
+        style = self.style.WARNING if stats["errors"] else self.style.SUCCESS
+        self.stdout.write(style(
+            f"Reparsed {stats['run_processed']} resumes in {stats['elapsed']:.1f}s "
+            f"({stats['rate']:.1f} resumes/s, {options['workers']} workers); "
+            f"{stats['run_errors']} errors. Total including earlier runs: "
+            f"{stats['processed']} parsed, {stats['errors']} errors"
+        ))
+
+        if not options["skip_rebuild"] and stats["run_processed"]:
+            from matching.services import match_store
+
+            total = match_store.rebuild_all()
+            self.stdout.write(f"Rebuilt {total} stored match results")
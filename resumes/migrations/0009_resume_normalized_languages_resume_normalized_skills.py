@@ -0,0 +1,23 @@
+# Generated by Django 5.2.10 on 2026-10-18 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0008_merge_20260124_1805'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='normalized_languages',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='normalized_skills',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
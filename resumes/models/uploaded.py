@@ -21,6 +21,11 @@ class Resume(models.Model):
 
     parsed_data = models.JSONField(default=dict)
 
+    # مهارات ولغات parsed_data موحدة (SkillSynonyms) تُحسب عند الحفظ للمطابقة
+    # None = لم تُحسب بعد (manage.py backfill_normalized_skills)
+    normalized_skills = models.JSONField(null=True, blank=True, editable=False)
+    normalized_languages = models.JSONField(null=True, blank=True, editable=False)
+
     is_processed = models.BooleanField(default=False)  # للتعامل مع الفشل
     processed_at = models.DateTimeField(null=True, blank=True)
     
@@ -34,10 +39,24 @@ class Resume(models.Model):
         """الحصول على الرابط المطلق للسيرة الذاتية"""
         return f"/resumes/{self.id}/"
     
+    NORMALIZED_FIELDS = ('normalized_skills', 'normalized_languages')
+    SKILL_FIELDS = ('normalized_skills',)
+
+    def sync_normalized_fields(self):
+        """تحديث الحقول الموحدة من parsed_data"""
+        from resumes.services.skill_synonyms import SkillSynonyms
+
+        parsed = self.parsed_data or {}
+        self.normalized_skills = SkillSynonyms.normalize_set(parsed.get("skills", []))
+        self.normalized_languages = sorted({lang.lower() for lang in parsed.get("languages", [])})
+
     def save(self, *args, **kwargs):
         """
         عند حفظ السيرة الذاتية المرفوعة، تحديث ملف التعريف الخاص بالمرشح
         """
+        self.sync_normalized_fields()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], *self.NORMALIZED_FIELDS}
         super().save(*args, **kwargs)
         
         # تحديث أو إنشاء ملف تعريف المرشح فقط إذا كانت السيرة معالجة
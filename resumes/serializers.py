@@ -5,5 +5,5 @@ from .models import Resume
 class ResumeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Resume
-        fields = ("id", "file", "raw_text", "parsed_data", "created_at")
-        read_only_fields = ("raw_text", "parsed_data")
+        fields = ("id", "file", "raw_text", "parsed_data", "is_processed", "processed_at", "created_at")
+        read_only_fields = ("raw_text", "parsed_data", "is_processed", "processed_at")
@@ -1,6 +1,23 @@
 # resumes/services/ai_fallback.py
+"""
+استخراج احتياطي للمهارات من السير الضعيفة (أقل من 3 مهارات بالأسطر)
+
+- قاموس المهارات يُضمَّن مرة واحدة ويُحفظ مصفوفة (مهارة × بعد) لكل نموذج
+- نص السيرة يُضمَّن مرة واحدة، والدرجات كلها dot product واحد: matrix @ vector
+- المحرك البعيد لا يكشف المتجهات: كل الأزواج في استدعاء similarity_many واحد
+  (دفعات متوازية مع ذاكرة النتائج) بدل طلب HTTP لكل مهارة
+- القاموس = COMMON_SKILLS + المهارات الموحدة في SkillSynonyms (AI_FALLBACK_SYNONYM_SKILLS)؛
+  المعرّفات الموحدة (machinelearning، csharp) تُضمَّن وتُعاد باسمها المقروء من SYNONYM_SKILL_LABELS
+"""
 import re
-from matching.services.embedding_engine import get_embedding, similarity
+import threading
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from matching.services.embedding_engine import get_backend
+from .skill_synonyms import SkillSynonyms
 
 STOPWORDS = {
     "and", "or", "with", "using", "experience",
@@ -62,33 +79,105 @@ def ai_extract_skills(text: str) -> list:
     return skills_list
 
 
+# المهارات الشائعة في الموارد البشرية والتقنية
+COMMON_SKILLS = (
+    "recruitment", "talent acquisition", "performance management", "hr policies",
+    "ats systems", "candidate screening", "interview coordination", "onboarding",
+    "employee relations", "compensation and benefits", "training and development",
+    "hr analytics", "workforce planning", "employee engagement", "hr compliance",
+    "python", "javascript", "java", "react", "django", "sql", "html", "css",
+    "docker", "kubernetes", "aws", "git", "agile", "scrum",
+)
+
+SIMILARITY_THRESHOLD = 0.3
+MAX_SKILLS = 10
+
+
+# الاسم المقروء للمعرّفات الموحدة في SkillSynonyms (الباقي: canonical.title())
+SYNONYM_SKILL_LABELS = {
+    "csharp": "C#",
+    "cpp": "C++",
+    "fastapi": "FastAPI",
+    "postgresql": "PostgreSQL",
+    "mysql": "MySQL",
+    "mongodb": "MongoDB",
+    "sqlserver": "SQL Server",
+    "gcp": "GCP",
+    "machinelearning": "Machine Learning",
+    "deeplearning": "Deep Learning",
+    "numpy": "NumPy",
+    "restapi": "REST API",
+    "graphql": "GraphQL",
+    "devops": "DevOps",
+}
+
+# نص القاموس (كما يُضمَّن) → الاسم المعروض
+_LABELS = {label.lower(): label for label in SYNONYM_SKILL_LABELS.values()}
+
+
+def skill_label(skill: str) -> str:
+    """الاسم المعروض لمهارة من القاموس"""
+    return _LABELS.get(skill, skill.title())
+
+
+def skill_vocabulary() -> Tuple[str, ...]:
+    """COMMON_SKILLS ثم المهارات الموحدة في SkillSynonyms بأسمائها المقروءة (بلا تكرار وبنفس الترتيب)"""
+    skills = list(COMMON_SKILLS)
+    if getattr(settings, "AI_FALLBACK_SYNONYM_SKILLS", True):
+        skills.extend(
+            SYNONYM_SKILL_LABELS.get(canonical, canonical).lower() for canonical in SkillSynonyms.SYNONYMS_MAP
+        )
+    return tuple(dict.fromkeys(skills))
+
+
+class VocabularyMatrix(NamedTuple):
+    skills: Tuple[str, ...]
+    matrix: np.ndarray  # (len(skills), dim) float32, L2-normalized
+
+
+_matrices: Dict[Tuple[str, Tuple[str, ...]], VocabularyMatrix] = {}
+_matrices_lock = threading.Lock()
+
+
+def get_vocabulary_matrix(backend=None) -> VocabularyMatrix:
+    """متجهات القاموس (تُحسب مرة واحدة لكل نموذج وقاموس في العملية)"""
+    backend = backend or get_backend()
+    skills = skill_vocabulary()
+    key = (getattr(backend, "model_id", backend.name), skills)
+    vocabulary = _matrices.get(key)
+    if vocabulary is None:
+        with _matrices_lock:
+            vocabulary = _matrices.get(key)
+            if vocabulary is None:
+                vocabulary = _matrices[key] = VocabularyMatrix(skills, backend.embed_many(skills))
+    return vocabulary
+
+
+def clear_vocabulary_matrix() -> None:
+    with _matrices_lock:
+        _matrices.clear()
+
+
+def score_skills(text: str) -> List[Tuple[str, float]]:
+    """(مهارة، درجة التشابه مع النص) لكل مهارات القاموس بترتيبه"""
+    backend = get_backend()
+    text_lower = text.lower()
+    if backend.supports_vectors:
+        vocabulary = get_vocabulary_matrix(backend)
+        scores = vocabulary.matrix @ backend.embed_many([text_lower])[0]
+        return list(zip(vocabulary.skills, scores.astype(float).tolist()))
+    skills = skill_vocabulary()
+    return list(zip(skills, backend.similarity_many([(text_lower, skill) for skill in skills])))
+
+
 def extract_skills_with_embedding(text: str) -> list:
     """
-    استخراج المهارات باستخدام النموذج المدمج (paraphrase-multilingual-MiniLM-L12-v2)
+    استخراج المهارات بالتشابه الدلالي بين النص وقاموس المهارات
+    المهارات التي تتجاوز SIMILARITY_THRESHOLD مرتبة حسب الدرجة، وأفضل MAX_SKILLS منها
     """
-    # قائمة المهارات الشائعة في الموارد البشرية والتقنية
-    common_skills = [
-        "recruitment", "talent acquisition", "performance management", "hr policies",
-        "ats systems", "candidate screening", "interview coordination", "onboarding",
-        "employee relations", "compensation and benefits", "training and development",
-        "hr analytics", "workforce planning", "employee engagement", "hr compliance",
-        "python", "javascript", "java", "react", "django", "sql", "html", "css",
-        "docker", "kubernetes", "aws", "git", "agile", "scrum"
+    found_skills = [
+        (skill_label(skill), score) for skill, score in score_skills(text) if score > SIMILARITY_THRESHOLD
     ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in common_skills:
-        # حساب التشابه الدلالي بين النص والمهارة
-        similarity_score = similarity(text_lower, skill)
-        
-        # إذا كان التشابه عالٍ (> 0.3)، أضف المهارة
-        if similarity_score > 0.3:
-            found_skills.append((skill.title(), similarity_score))
-    
-    # ترتيب المهارات حسب درجة التشابه
+    # sort مستقر: المتساويات تبقى بترتيب القاموس كما كانت
     found_skills.sort(key=lambda x: x[1], reverse=True)
-    
-    # إرجاع أفضل 10 مهارات
-    return [skill[0] for skill in found_skills[:10]]
+    return [skill for skill, _ in found_skills[:MAX_SKILLS]]
@@ -14,7 +14,9 @@ class ArabicProcessor:
     
     # الحروف المتشابهة العربية
     SIMILAR_CHARS = {
-        'ا': 'ا',  # ألف مختلفة
+        'أ': 'ا',  # ألف مختلفة
+        'إ': 'ا',
+        'آ': 'ا',
         'ى': 'ي',  # ألف مقصورة
         'ة': 'ه',  # تاء مربوطة
     }
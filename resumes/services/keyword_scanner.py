@@ -0,0 +1,135 @@
+# resumes/services/keyword_scanner.py
+"""
+ماسح كلمات مفتاحية بخوارزمية Aho–Corasick: كل الكلمات في مرور واحد على النص
+
+- الآلة تُبنى مرة واحدة (عند الاستيراد) من كل القواميس، وزمن المسح يتبع طول النص
+  وعدد الإصابات لا عدد الكلمات
+- انتقالات محسوبة مسبقاً (DFA): بحث واحد في dict لكل حرف بلا تتبع لروابط الفشل أثناء المسح
+- whole_word: الطرف الذي يبدأ أو ينتهي بحرف كلمة يجب ألا يجاوره حرف كلمة
+  (مثل \\b في regex، و"c++" تُقبل قبل مسافة أو رقم)؛ بدونه مطابقة جزئية كـ `in`
+- الإصابات المتداخلة كلها تُرجع ("react" و "react native")
+
+Usage:
+    scanner = KeywordScanner()
+    scanner.add("python", category="skill", label="Python")
+    scanner.add("عربي", category="language", label="Arabic", whole_word=False)
+    hits = scanner.scan(text.lower())
+    labels(hits, "skill")   # ['Python', ...] بترتيب الإضافة
+"""
+
+from collections import deque
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+class Keyword(NamedTuple):
+    text: str
+    category: str
+    label: str
+    whole_word: bool
+    order: int  # ترتيب الإضافة: المستخرجات ترتب النتائج به كما كانت تمر على القواميس
+
+
+class Hit(NamedTuple):
+    keyword: Keyword
+    start: int
+    end: int
+
+    @property
+    def category(self) -> str:
+        return self.keyword.category
+
+    @property
+    def label(self) -> str:
+        return self.keyword.label
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordScanner:
+    """آلة Aho–Corasick للكلمات المضافة؛ تُبنى تلقائياً عند أول scan بعد أي إضافة"""
+
+    def __init__(self):
+        self.keywords: List[Keyword] = []
+        self._delta: List[Dict[str, int]] = []
+        self._outputs: List[tuple] = []
+        self._built = False
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def add(self, text: str, category: str, label: Optional[str] = None, whole_word: bool = True) -> None:
+        if not text:
+            raise ValueError("Empty keyword")
+        self.keywords.append(Keyword(text, category, label or text, whole_word, len(self.keywords)))
+        self._built = False
+
+    def add_many(self, texts: Iterable[str], category: str, label: Optional[str] = None,
+                 whole_word: bool = True) -> None:
+        for text in texts:
+            self.add(text, category, label, whole_word)
+
+    def build(self) -> "KeywordScanner":
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Keyword]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for ch in keyword.text:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(keyword)
+
+        # روابط الفشل بالعرض، ثم دمج انتقالات رابط الفشل في كل حالة (DFA)
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])] + [None] * (len(goto) - 1)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                outputs[nxt] = outputs[nxt] + outputs[fail[nxt]]
+            delta[state] = {**delta[fail[state]], **goto[state]}
+
+        self._delta = delta
+        self._outputs = [tuple(out) for out in outputs]
+        self._built = True
+        return self
+
+    def scan(self, text: str) -> List[Hit]:
+        """كل الإصابات بترتيب ظهورها في النص (حسب نهايتها)"""
+        if not self._built:
+            self.build()
+        delta, outputs = self._delta, self._outputs
+        hits: List[Hit] = []
+        state = 0
+        length = len(text)
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+            end = i + 1
+            for keyword in outputs[state]:
+                start = end - len(keyword.text)
+                if keyword.whole_word:
+                    if _is_word_char(keyword.text[0]) and start > 0 and _is_word_char(text[start - 1]):
+                        continue
+                    if _is_word_char(keyword.text[-1]) and end < length and _is_word_char(text[end]):
+                        continue
+                hits.append(Hit(keyword, start, end))
+        return hits
+
+
+def labels(hits: Iterable[Hit], category: str) -> List[str]:
+    """تسميات فئة واحدة بلا تكرار، بترتيب إضافة الكلمات لا بترتيب ظهورها"""
+    found = sorted((hit.keyword for hit in hits if hit.keyword.category == category), key=lambda k: k.order)
+    return list(dict.fromkeys(keyword.label for keyword in found))
+
+
+__all__ = ["Keyword", "Hit", "KeywordScanner", "labels"]
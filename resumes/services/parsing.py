@@ -1,73 +1,20 @@
 # resumes/services/parsing.py
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
 from .ai_fallback import ai_extract_skills
+from .keyword_scanner import Hit, KeywordScanner, labels
+from .sections import section_items, segment
 
 
 def simple_parse_resume(raw_text):
-    """دالة بسيطة لتحليل النص واستخراج المعلومات الأساسية"""
-    parsed_data = {
-        'skills': [],
-        'languages': [],
-        'education': [],
-        'experience': []
-    }
-    
-    # استخراج المهارات
-    skills_patterns = [
-        r'(?:Skills?|المهارات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
-        r'(?:Technical Skills?|المهارات التقنية)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
-        r'(?:Core Competencies|الكفاءات الأساسية)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)'
-    ]
-    
-    for pattern in skills_patterns:
-        matches = re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            skills = [skill.strip() for skill in re.split(r'[,;•\n]', match) if skill.strip()]
-            parsed_data['skills'].extend(skills)
-    
-    # استخراج اللغات
-    languages_patterns = [
-        r'(?:Languages?|اللغات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
-        r'(?:Language Proficiency|إجادة اللغات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)'
-    ]
-    
-    for pattern in languages_patterns:
-        matches = re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            languages = [lang.strip() for lang in re.split(r'[,;•\n]', match) if lang.strip()]
-            parsed_data['languages'].extend(languages)
-    
-    # استخراج التعليم
-    education_patterns = [
-        r'(?:Education|التعليم|Educational Background|الخلفية التعليمية)[:\n](.*?)(?:\n\n|\nExperience|\nSkills|\n[A-Z]|\Z)',
-        r'(?:Degree|درجة)[\s:](.*?)(?:\n\n|\nExperience|\nSkills|\n[A-Z]|\Z)'
-    ]
-    
-    for pattern in education_patterns:
-        matches = re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            education = [edu.strip() for edu in re.split(r'[,;•\n]', match) if edu.strip()]
-            parsed_data['education'].extend(education)
-    
-    # استخراج الخبرة
-    experience_patterns = [
-        r'(?:Experience|الخبرة|Work Experience|الخبرة العملية|Professional Experience|الخبرة المهنية)[:\n](.*?)(?:\n\n|\nEducation|\nSkills|\n[A-Z]|\Z)',
-        r'(?:Employment History|سجل التوظيف)[:\n](.*?)(?:\n\n|\nEducation|\nSkills|\n[A-Z]|\Z)'
-    ]
-    
-    for pattern in experience_patterns:
-        matches = re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL)
-        for match in matches:
-            experience = [exp.strip() for exp in re.split(r'[,;•\n]', match) if exp.strip()]
-            parsed_data['experience'].extend(experience)
-    
-    # إزالة التكرارات وتنظيف البيانات
-    for key in parsed_data:
-        parsed_data[key] = list(set(parsed_data[key]))  # إزالة التكرارات
-        parsed_data[key] = [item for item in parsed_data[key] if len(item) > 2]  # إزالة العناصر القصيرة جداً
-    
-    return parsed_data
+    """دالة بسيطة لتحليل النص واستخراج المعلومات الأساسية من الأقسام المعنونة"""
+    return section_items(segment(raw_text or ""))
+
+
+def parse_many(texts: Iterable[str], parser: Callable[[str], Dict[str, Any]] = simple_parse_resume) -> Iterator[Dict[str, Any]]:
+    """تحليل مستندات كثيرة بالتتابع (الأنماط مجمّعة مرة واحدة عند الاستيراد)"""
+    for text in texts:
+        yield parser(text)
 
 
 def parse_resume(text: str) -> Dict[str, Any]:
@@ -80,8 +27,11 @@ def parse_resume(text: str) -> Dict[str, Any]:
 
     text_lower = text.lower()
 
-    # 1️⃣ استخراج المهارات بالـ regex
-    skills = extract_skills_advanced(text_lower)
+    # مرور واحد على النص لكل القواميس
+    hits = scan_keywords(text_lower)
+
+    # 1️⃣ استخراج المهارات
+    skills = extract_skills_advanced(text_lower, hits)
 
     # 2️⃣ AI fallback إذا كانت المهارات قليلة (أقل من 3)
     if len(skills) < 3:
@@ -89,10 +39,10 @@ def parse_resume(text: str) -> Dict[str, Any]:
 
     return {
         "skills": skills,
-        "languages": extract_languages_advanced(text_lower),
-        "education": extract_education_advanced(text_lower),
-        "experience": extract_experience_advanced(text_lower),
-        "certifications": extract_certifications(text_lower),
+        "languages": extract_languages_advanced(text_lower, hits),
+        "education": extract_education_advanced(text_lower, hits),
+        "experience": extract_experience_advanced(text_lower, hits),
+        "certifications": extract_certifications(text_lower, hits),
         "summary": extract_summary(text),
     }
 
@@ -109,126 +59,158 @@ def get_default_parsed_data() -> Dict[str, Any]:
     }
 
 
-def extract_skills_advanced(text: str) -> List[str]:
-    """استخراج المهارات بشكل متقدم (Regex)"""
-
-    TECH_SKILLS = {
-        "programming_languages": [
-            "python", "javascript", "java", "c++", "c#", "php", "ruby", "go", "rust",
-            "typescript", "swift", "kotlin", "scala", "r", "matlab", "perl", "shell"
-        ],
-        "web_frameworks": [
-            "django", "flask", "fastapi", "react", "vue", "angular", "node.js", "express",
-            "spring", "laravel", "ruby on rails", "asp.net", "jquery", "bootstrap"
-        ],
-        "databases": [
-            "postgresql", "mysql", "mongodb", "redis", "sqlite", "oracle", "sql server",
-            "cassandra", "elasticsearch", "dynamodb", "firebase"
-        ],
-        "devops_tools": [
-            "docker", "kubernetes", "jenkins", "git", "github", "gitlab", "aws",
-            "azure", "gcp", "terraform", "ansible", "nginx", "apache"
-        ],
-        "data_science": [
-            "pandas", "numpy", "tensorflow", "pytorch", "scikit-learn", "keras",
-            "opencv", "spark", "hadoop", "tableau", "power bi"
-        ],
-        "mobile": [
-            "android", "ios", "react native", "flutter", "xamarin"
-        ],
-        "other_tech": [
-            "rest api", "graphql", "websocket", "microservices", "agile", "scrum",
-            "ci/cd", "tdd", "oop", "functional programming", "linux", "windows"
-        ]
-    }
-
-    found_skills = []
-
+# ------------------------------------------------------------------
+# قواميس الكلمات المفتاحية: تُجمع كلها في آلة Aho–Corasick واحدة عند الاستيراد
+# فيمرّ التحليل على النص مرة واحدة مهما كبرت القواميس
+# ------------------------------------------------------------------
+
+TECH_SKILLS = {
+    "programming_languages": [
+        "python", "javascript", "java", "c++", "c#", "php", "ruby", "go", "rust",
+        "typescript", "swift", "kotlin", "scala", "r", "matlab", "perl", "shell"
+    ],
+    "web_frameworks": [
+        "django", "flask", "fastapi", "react", "vue", "angular", "node.js", "express",
+        "spring", "laravel", "ruby on rails", "asp.net", "jquery", "bootstrap"
+    ],
+    "databases": [
+        "postgresql", "mysql", "mongodb", "redis", "sqlite", "oracle", "sql server",
+        "cassandra", "elasticsearch", "dynamodb", "firebase"
+    ],
+    "devops_tools": [
+        "docker", "kubernetes", "jenkins", "git", "github", "gitlab", "aws",
+        "azure", "gcp", "terraform", "ansible", "nginx", "apache"
+    ],
+    "data_science": [
+        "pandas", "numpy", "tensorflow", "pytorch", "scikit-learn", "keras",
+        "opencv", "spark", "hadoop", "tableau", "power bi"
+    ],
+    "mobile": [
+        "android", "ios", "react native", "flutter", "xamarin"
+    ],
+    "other_tech": [
+        "rest api", "graphql", "websocket", "microservices", "agile", "scrum",
+        "ci/cd", "tdd", "oop", "functional programming", "linux", "windows"
+    ]
+}
+
+# fallback بسيط عندما لا توجد أي مهارة من TECH_SKILLS (مطابقة جزئية)
+FALLBACK_SKILLS = ["python", "django", "javascript", "sql", "html", "css"]
+
+# تنظيف كلمات غير مفيدة
+SKILL_BLACKLIST = {"present", "optional", "additions"}
+
+LANGUAGES = {
+    "arabic": ["arabic", "العربية", "عربي"],
+    "english": ["english", "الإنجليزية", "انجليزي", "إنجليزي"],
+    "french": ["french", "الفرنسية", "فرنسي"],
+    "spanish": ["spanish", "الإسبانية", "اسباني"],
+    "german": ["german", "الألمانية", "الماني"],
+    "chinese": ["chinese", "الصينية", "صيني", "mandarin"],
+    "japanese": ["japanese", "اليابانية", "ياباني"],
+    "russian": ["russian", "الروسية", "روسي"],
+    "turkish": ["turkish", "التركية", "تركي"],
+    "hindi": ["hindi", "الهندية", "هندي"],
+}
+
+DEGREES = [
+    ("Bachelor", ["bachelor", "bsc", "bs", "بكالوريوس"]),
+    ("Master", ["master", "msc", "ms", "ماجستير"]),
+    ("PhD", ["phd", "doctorate", "دكتوراه"]),
+    ("Diploma", ["diploma", "دبلوم"]),
+]
+
+MAJORS = [
+    "computer science", "software engineering", "information technology",
+    "architecture", "civil engineering", "business administration",
+    "data science", "artificial intelligence"
+]
+
+EXPERIENCE_LEVELS = [
+    ("Intern", ["intern", "internship", "متدرب"]),
+    ("Junior", ["junior", "entry level", "مبتدئ"]),
+    ("Mid-Level", ["mid-level", "mid level", "متوسط"]),
+    ("Senior", ["senior", "كبير", "خبير"]),
+    ("Lead", ["lead", "team lead", "قائد"]),
+    ("Manager", ["manager", "مدير"]),
+]
+
+KNOWN_CERTIFICATIONS = [
+    "aws certified", "azure certified", "google cloud certified",
+    "pmp", "scrum master", "six sigma", "ccna", "ccnp"
+]
+
+
+def _is_arabic(keyword: str) -> bool:
+    return any('\u0600' <= c <= '\u06FF' for c in keyword)
+
+
+def _build_keyword_scanner() -> KeywordScanner:
+    """
+    حدود الكلمة لكل الكلمات اللاتينية (لا "bs" داخل "jobs" ولا "lead" داخل "leadership")،
+    ومطابقة جزئية للعربية لأن السوابق واللواحق تتصل بالكلمة (الانجليزية ← انجليزي)
+    """
+    scanner = KeywordScanner()
     for skills in TECH_SKILLS.values():
         for skill in skills:
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text):
-                found_skills.append(skill.title())
-
-    # إزالة التكرار مع الحفاظ على الترتيب
-    unique_skills = list(dict.fromkeys(found_skills))
-
-    # fallback بسيط داخل regex
-    if not unique_skills:
-        common_words = ["python", "django", "javascript", "sql", "html", "css"]
-        for word in common_words:
-            if word in text:
-                unique_skills.append(word.title())
-
-    # تنظيف كلمات غير مفيدة
-    BLACKLIST = {"present", "optional", "additions"}
-    unique_skills = [
-        s for s in unique_skills if s.lower() not in BLACKLIST
-    ]
+            scanner.add(skill, "skill", skill.title())
+    scanner.add_many(FALLBACK_SKILLS, "skill_fallback", whole_word=False)
+    for lang, keywords in LANGUAGES.items():
+        for keyword in keywords:
+            scanner.add(keyword, "language", lang.title(), whole_word=not _is_arabic(keyword))
+    for degree, keywords in DEGREES:
+        for keyword in keywords:
+            scanner.add(keyword, "degree", degree, whole_word=not _is_arabic(keyword))
+    for major in MAJORS:
+        scanner.add(major, "major", major.title())
+    for level, keywords in EXPERIENCE_LEVELS:
+        for keyword in keywords:
+            scanner.add(keyword, "level", level.title(), whole_word=not _is_arabic(keyword))
+    for cert in KNOWN_CERTIFICATIONS:
+        scanner.add(cert, "certification", cert.title())
+    return scanner.build()
 
-    return unique_skills[:20]
 
+KEYWORD_SCANNER = _build_keyword_scanner()
 
-def extract_languages_advanced(text: str) -> List[str]:
-    """استخراج اللغات"""
 
-    LANGUAGES = {
-        "arabic": ["arabic", "العربية", "عربي"],
-        "english": ["english", "الإنجليزية", "انجليزي", "إنجليزي"],
-        "french": ["french", "الفرنسية", "فرنسي"],
-        "spanish": ["spanish", "الإسبانية", "اسباني"],
-        "german": ["german", "الألمانية", "الماني"],
-        "chinese": ["chinese", "الصينية", "صيني", "mandarin"],
-        "japanese": ["japanese", "اليابانية", "ياباني"],
-        "russian": ["russian", "الروسية", "روسي"],
-        "turkish": ["turkish", "التركية", "تركي"],
-        "hindi": ["hindi", "الهندية", "هندي"],
-    }
+def scan_keywords(text: str) -> List[Hit]:
+    """كل إصابات القواميس في النص (بحروف صغيرة) في مرور واحد"""
+    return KEYWORD_SCANNER.scan(text)
 
-    found_languages = []
 
-    for lang, keywords in LANGUAGES.items():
-        for keyword in keywords:
-            if keyword in text:
-                found_languages.append(lang.title())
-                break
+def extract_skills_advanced(text: str, hits: Optional[List[Hit]] = None) -> List[str]:
+    """استخراج المهارات من إصابات TECH_SKILLS (بترتيب القاموس)"""
+    hits = scan_keywords(text) if hits is None else hits
 
-    return list(dict.fromkeys(found_languages))
+    unique_skills = labels(hits, "skill")
 
+    if not unique_skills:
+        unique_skills = [word.title() for word in labels(hits, "skill_fallback")]
 
-def extract_education_advanced(text: str) -> List[str]:
-    """استخراج التعليم"""
+    unique_skills = [
+        s for s in unique_skills if s.lower() not in SKILL_BLACKLIST
+    ]
 
-    education_levels = []
+    return unique_skills[:20]
 
-    degrees = [
-        ("Bachelor", ["bachelor", "bsc", "bs", "بكالوريوس"]),
-        ("Master", ["master", "msc", "ms", "ماجستير"]),
-        ("PhD", ["phd", "doctorate", "دكتوراه"]),
-        ("Diploma", ["diploma", "دبلوم"]),
-    ]
 
-    for degree, keywords in degrees:
-        for keyword in keywords:
-            if keyword in text:
-                education_levels.append(degree)
-                break
-
-    majors = [
-        "computer science", "software engineering", "information technology",
-        "architecture", "civil engineering", "business administration",
-        "data science", "artificial intelligence"
-    ]
+def extract_languages_advanced(text: str, hits: Optional[List[Hit]] = None) -> List[str]:
+    """استخراج اللغات"""
+    hits = scan_keywords(text) if hits is None else hits
+    return labels(hits, "language")
 
-    for major in majors:
-        if major in text:
-            education_levels.append(major.title())
 
+def extract_education_advanced(text: str, hits: Optional[List[Hit]] = None) -> List[str]:
+    """استخراج التعليم: الدرجات ثم التخصصات"""
+    hits = scan_keywords(text) if hits is None else hits
+    education_levels = labels(hits, "degree") + labels(hits, "major")
     return list(dict.fromkeys(education_levels))[:5]
 
 
-def extract_experience_advanced(text: str) -> List[str]:
+def extract_experience_advanced(text: str, hits: Optional[List[Hit]] = None) -> List[str]:
     """استخراج الخبرة"""
+    hits = scan_keywords(text) if hits is None else hits
 
     experience_info = []
 
@@ -247,20 +229,7 @@ def extract_experience_advanced(text: str) -> List[str]:
                 experience_info.append(f"{match} Years Experience")
 
     # مستويات الخبرة
-    levels = [
-        ("Intern", ["intern", "internship", "متدرب"]),
-        ("Junior", ["junior", "entry level", "مبتدئ"]),
-        ("Mid-Level", ["mid-level", "mid level", "متوسط"]),
-        ("Senior", ["senior", "كبير", "خبير"]),
-        ("Lead", ["lead", "team lead", "قائد"]),
-        ("Manager", ["manager", "مدير"]),
-    ]
-
-    for level, keywords in levels:
-        for keyword in keywords:
-            if keyword in text:
-                experience_info.append(level.title())
-                break
+    experience_info.extend(labels(hits, "level"))
 
     year_patterns = [
         r'(\d+)\s*\+?\s*years?\s*(of)?\s*experience',
@@ -276,21 +245,10 @@ def extract_experience_advanced(text: str) -> List[str]:
     return list(dict.fromkeys(experience_info))[:5]
 
 
-def extract_certifications(text: str) -> List[str]:
+def extract_certifications(text: str, hits: Optional[List[Hit]] = None) -> List[str]:
     """استخراج الشهادات"""
-
-    certifications = []
-
-    known_certs = [
-        "aws certified", "azure certified", "google cloud certified",
-        "pmp", "scrum master", "six sigma", "ccna", "ccnp"
-    ]
-
-    for cert in known_certs:
-        if cert in text:
-            certifications.append(cert.title())
-
-    return list(dict.fromkeys(certifications))[:5]
+    hits = scan_keywords(text) if hits is None else hits
+    return labels(hits, "certification")[:5]
 
 
 def extract_summary(text: str) -> str:
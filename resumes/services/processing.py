@@ -0,0 +1,78 @@
+# resumes/services/processing.py
+"""
+معالجة السير المرفوعة في الخلفية (طابور tasks)
+
+- الرفع يحفظ السيرة بـ is_processed=False ويضيف مهمة resumes.process_resume في نفس المعاملة
+- العامل (manage.py run_workers) يستخرج النص ويحلله ويحفظ النتيجة
+- processing_status(resume) لنقاط الاستعلام عن الحالة
+- الرفع في فئة interactive؛ إعادة التحليل الجماعية في recompute أو backfill حتى لا تؤخر الرفع
+
+Usage:
+    enqueue_processing(resume, parser="simple")
+    enqueue_processing(resume, lane=Task.BACKFILL)
+    processing_status(resume)   # {'id': .., 'status': 'pending' | 'processing' | 'processed' | 'failed', ...}
+"""
+
+from django.utils import timezone
+
+from tasks.services.queue import enqueue, latest_task
+from tasks.models import Task
+from .file_extractor import extract_text
+from .parsing import parse_resume, simple_parse_resume
+
+PROCESS_TASK = "resumes.process_resume"
+
+# المحلل المستخدم لكل مدخل: الواجهة تستخدم البسيط والـ API المتقدم كما كانت قبل الطابور
+PARSERS = {
+    "simple": simple_parse_resume,
+    "full": parse_resume,
+}
+
+
+def task_key(resume) -> str:
+    return f"resume:{resume.pk}"
+
+
+def process_resume(resume, parser: str = "full") -> None:
+    """استخراج النص وتحليله وحفظ السيرة (يرفع الاستثناء ليعيد الطابور المحاولة)"""
+    raw_text = extract_text(resume.file.path)
+    resume.raw_text = raw_text
+    resume.parsed_data = PARSERS[parser](raw_text)
+    resume.is_processed = True
+    resume.processed_at = timezone.now()
+    resume.save()
+
+
+def enqueue_processing(resume, parser: str = "full", lane: str = Task.INTERACTIVE) -> Task:
+    """إضافة مهمة المعالجة (مهمة واحدة منتظرة لكل سيرة)"""
+    return enqueue(
+        PROCESS_TASK,
+        {"resume_id": resume.pk, "parser": parser},
+        key=task_key(resume),
+        unique=True,
+        lane=lane,
+    )
+
+
+def processing_status(resume) -> dict:
+    task = latest_task(task_key(resume), PROCESS_TASK)
+    if resume.is_processed and (task is None or task.is_finished):
+        state = "processed"
+    elif task is None:
+        # سيرة قديمة فشلت معالجتها قبل الطابور
+        state = "failed"
+    elif task.status == Task.FAILED:
+        state = "failed"
+    elif task.status == Task.RUNNING:
+        state = "processing"
+    else:
+        state = "pending"
+
+    return {
+        "id": resume.pk,
+        "status": state,
+        "is_processed": resume.is_processed,
+        "processed_at": resume.processed_at,
+        "attempts": task.attempts if task else 0,
+        "error": task.last_error.strip().splitlines()[-1] if task and task.status == Task.FAILED and task.last_error else None,
+    }
@@ -1,27 +1,64 @@
 # resumes/services/reprocessor.py
+"""
+إعادة تحليل السير المرفوعة (بعد تحديث المحلل)
+
+- reprocess_resumes: يمرّ على المعرّفات بـ iterator(chunk_size) دون تحميل الجدول كاملاً،
+  يحلل كل دفعة في ProcessPoolExecutor (التحليل CPU ولا يلمس قاعدة البيانات)،
+  ويكتب الدفعة بـ bulk_update واحد مع الحقول الموحدة
+- bulk_update لا يستدعي save() ولا signals: ملف تعريف المرشح يُنشأ هنا للسير التي أصبحت
+  معالجة فقط، والمطابقات تُعاد مرة واحدة في النهاية (manage.py reprocess_resumes و reprocess_all_resumes)
+- workers افتراضياً 1: المستدعون داخل عملية الويب لا ينسخون العملية بعدد المعالجات؛ الأمر يمرر العدد صراحة
+- نقطة استئناف (آخر معرّف مكتوب) تُحفظ بعد كل دفعة في REPROCESS_CHECKPOINT_PATH،
+  فالتشغيل المقطوع يكمل من حيث توقف
+
+Usage:
+    stats = reprocess_resumes(parser="full", chunk_size=200, workers=4)
+    # {'processed': .., 'errors': .., 'elapsed': .., 'rate': .., 'last_pk': ..}
+"""
+
+import json
+import logging
+import multiprocessing
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from django.conf import settings
 from django.core.files.base import ContentFile
+from django.db import connections, transaction
+from django.utils import timezone
+
 from ..models import Resume
-from .nlp_parser import parse_resume
+from .parsing import parse_resume
+from .processing import PARSERS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+UPDATE_FIELDS = ('parsed_data', 'is_processed', 'processed_at', *Resume.NORMALIZED_FIELDS)
+
 
 def create_test_resume(user, text_content, filename="test_resume.txt"):
     """إنشاء سيرة ذاتية اختبارية"""
-    
+
     # إنشاء سيرة ذاتية جديدة
     resume = Resume.objects.create(
         candidate=user,
         original_filename=filename
     )
-    
+
     # حفظ النص كملف
     resume.file.save(filename, ContentFile(text_content.encode('utf-8')))
-    
+
     # معالجة السيرة الذاتية
     resume.raw_text = text_content
     resume.parsed_data = parse_resume(text_content)
     resume.is_processed = True
     resume.save()
-    
+
     print(f"Created resume with {len(resume.parsed_data.get('skills', []))} skills")
     return resume
 
@@ -39,12 +76,190 @@ def reprocess_resume(resume):
     return False
 
 def reprocess_all_resumes():
-    """إعادة معالجة جميع السير الذاتية"""
-    resumes = Resume.objects.all()
-    success_count = 0
-    
+    """إعادة معالجة جميع السير الذاتية (في نفس العملية) ثم إعادة بناء المطابقات المخزنة"""
+    from matching.services import match_store
+
+    stats = reprocess_resumes(restart=True, workers=1)
+    if stats['run_processed']:
+        # bulk_update لا يرسل signals: المطابقات لا تُحدَّث وحدها
+        match_store.rebuild_all()
+    return f"Reprocessed {stats['processed']} of {stats['processed'] + stats['errors']} resumes"
+
+
+# ------------------------------------------------------------------
+# Checkpoint
+# ------------------------------------------------------------------
+
+def checkpoint_path() -> Path:
+    return Path(getattr(
+        settings, "REPROCESS_CHECKPOINT_PATH", Path(settings.BASE_DIR) / "var" / "reprocess_resumes.json"
+    ))
+
+
+def load_checkpoint(path: Optional[Path] = None) -> Optional[dict]:
+    path = Path(path or checkpoint_path())
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError):
+        logger.exception("Ignoring unreadable reprocess checkpoint %s", path)
+        return None
+
+
+def save_checkpoint(state: dict, path: Optional[Path] = None) -> None:
+    path = Path(path or checkpoint_path())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(state))
+    os.replace(tmp, path)  # لا نقطة استئناف نصف مكتوبة إن قُطع التشغيل أثناء الكتابة
+
+
+def clear_checkpoint(path: Optional[Path] = None) -> None:
+    Path(path or checkpoint_path()).unlink(missing_ok=True)
+
+
+# ------------------------------------------------------------------
+# Parallel reprocessing
+# ------------------------------------------------------------------
+
+def _parse_one(item):
+    """يعمل في عملية فرعية: (pk, parsed_data, None) أو (pk, None, رسالة الخطأ)"""
+    pk, text, parser = item
+    try:
+        return pk, PARSERS[parser](text), None
+    except Exception as exc:
+        return pk, None, f"{type(exc).__name__}: {exc}"
+
+
+def _chunks(ids: Iterator[int], size: int) -> Iterator[List[int]]:
+    while True:
+        chunk = list(islice(ids, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _attach_profiles(resumes: List[Resume]) -> None:
+    """ما كان Resume.save() يفعله للسير التي أصبحت معالجة للتو"""
+    from ..models.profile import CandidateResumeProfile
+
     for resume in resumes:
-        if reprocess_resume(resume):
-            success_count += 1
-    
-    return f"Reprocessed {success_count} of {resumes.count()} resumes"
\ No newline at end of file
+        profile, _ = CandidateResumeProfile.objects.get_or_create(candidate_id=resume.candidate_id)
+        if profile.primary_resume_type == 'uploaded' or not profile.has_resume():
+            profile.set_primary_resume('uploaded', resume)
+
+
+def _write_chunk(resumes: Dict[int, Resume], results) -> List[tuple]:
+    """تطبيق نتائج التحليل وكتابتها؛ يرجع [(pk, error)] للسير التي فشل تحليلها"""
+    from matching.services.skill_vocabulary import get_vocabulary, vocabulary_path
+
+    now = timezone.now()
+    updated, newly_processed, errors = [], [], []
+    for pk, parsed, error in results:
+        if error is not None:
+            errors.append((pk, error))
+            continue
+        resume = resumes[pk]
+        if not resume.is_processed:
+            newly_processed.append(resume)
+        resume.parsed_data = parsed
+        resume.is_processed = True
+        resume.processed_at = now
+        resume.sync_normalized_fields()
+        updated.append(resume)
+
+    vocabulary = get_vocabulary()
+    vocabulary.encode([getattr(resume, field) for resume in updated for field in Resume.SKILL_FIELDS])
+    with transaction.atomic():
+        Resume.objects.bulk_update(updated, UPDATE_FIELDS)
+        _attach_profiles(newly_processed)
+    # بعد كل دفعة: المهارات المحفوظة لا تُسقط إذا أُعيد تحميل المفردات (الحد من العابرة)
+    vocabulary.save(vocabulary_path())
+    return errors
+
+
+def reprocess_resumes(
+    parser: str = "full",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: int = 1,
+    restart: bool = False,
+    path: Optional[Path] = None,
+    on_chunk: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    إعادة تحليل كل السير التي لها نص مستخرج
+    workers: عدد عمليات التحليل (1: في نفس العملية)
+    restart: تجاهل نقطة الاستئناف (وإلا نكمل منها إن كانت لنفس المحلل)
+    on_chunk(stats): يُستدعى بعد كتابة كل دفعة (لطباعة التقدم)
+    """
+    if parser not in PARSERS:
+        raise ValueError(f"Unknown parser: {parser!r}")
+    path = Path(path or checkpoint_path())
+    workers = max(1, workers)
+
+    checkpoint = None if restart else load_checkpoint(path)
+    if checkpoint and checkpoint.get("parser") != parser:
+        checkpoint = None
+    stats = {
+        "parser": parser,
+        "last_pk": 0,
+        "processed": 0,
+        "errors": 0,
+        **(checkpoint or {}),
+    }
+    stats["resumed_from"] = stats["last_pk"] if checkpoint else None
+
+    pool = None
+    if workers > 1:
+        # العمليات الفرعية لا ترث اتصالات قاعدة البيانات المفتوحة
+        connections.close_all()
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"))
+        # مع fork تُنشأ كل العمليات عند أول مهمة: قبل فتح مؤشر المعرّفات
+        pool.submit(int).result()
+
+    started = time.monotonic()
+    run_processed = run_errors = 0
+    try:
+        ids = (
+            Resume.objects.filter(pk__gt=stats["last_pk"]).exclude(raw_text='')
+            .order_by('pk').values_list('pk', flat=True).iterator(chunk_size=chunk_size)
+        )
+        for chunk in _chunks(ids, chunk_size):
+            resumes = Resume.objects.only('id', 'candidate_id', 'raw_text', 'is_processed').in_bulk(chunk)
+            items = [(pk, resumes[pk].raw_text, parser) for pk in chunk if pk in resumes]
+            if pool is not None:
+                results = list(pool.map(_parse_one, items, chunksize=max(1, len(items) // (workers * 4))))
+            else:
+                results = [_parse_one(item) for item in items]
+
+            errors = _write_chunk(resumes, results)
+            for pk, error in errors:
+                logger.warning("Failed to reparse resume %s: %s", pk, error)
+
+            run_processed += len(results) - len(errors)
+            run_errors += len(errors)
+            elapsed = time.monotonic() - started
+            stats.update(
+                last_pk=chunk[-1],
+                processed=stats["processed"] + len(results) - len(errors),
+                errors=stats["errors"] + len(errors),
+                elapsed=round(elapsed, 3),
+                rate=round(run_processed / elapsed, 2) if elapsed else 0.0,
+            )
+            save_checkpoint({key: stats[key] for key in ("parser", "last_pk", "processed", "errors")}, path)
+            if on_chunk is not None:
+                on_chunk(dict(stats, run_processed=run_processed, run_errors=run_errors))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    clear_checkpoint(path)
+    elapsed = time.monotonic() - started
+    stats.update(
+        elapsed=round(elapsed, 3),
+        rate=round(run_processed / elapsed, 2) if elapsed else 0.0,
+        run_processed=run_processed,
+        run_errors=run_errors,
+    )
+    return stats
@@ -0,0 +1,157 @@
+# resumes/services/sections.py
+"""
+تقسيم نص السيرة إلى أقسام معنونة (Skills / المهارات، Languages، Education، Experience ...)
+
+- كل العناوين الإنجليزية والعربية في regex واحد مُجمَّع مسبقاً، وحدود الأقسام في regex ثانٍ:
+  مروران على النص بدل تسعة regex بـ DOTALL يعيد كل منها إيجاد الحدود
+- القسم يبدأ بعد العنوان وينتهي عند أول سطر فارغ أو سطر يبدأ بحرف لاتيني (كما في
+  simple_parse_resume سابقاً)؛ نفس القواعد تماماً بما فيها العناوين داخل السطر
+- المطابقة على text.lower() بلا IGNORECASE؛ النصوص التي فيها حروف تختلف فيها
+  lower() عن IGNORECASE (İ ı ſ) تمر على regex كل قسم كما كانت
+
+Usage:
+    for section in segment(text):
+        section.field, section.heading, section.content
+"""
+
+import re
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class SectionPattern(NamedTuple):
+    field: str
+    headings: Tuple[str, ...]  # بحروف صغيرة
+    follow: str                # الحرف المسموح بعد العنوان (فئة regex)
+    stop_words: Tuple[str, ...] = ()  # عناوين تُستهلك مع نهاية القسم (\nExperience ...)
+
+
+SECTION_PATTERNS = (
+    SectionPattern("skills", ("skills", "skill", "المهارات"), r"[:\n]"),
+    SectionPattern("skills", ("technical skills", "technical skill", "المهارات التقنية"), r"[:\n]"),
+    SectionPattern("skills", ("core competencies", "الكفاءات الأساسية"), r"[:\n]"),
+    SectionPattern("languages", ("languages", "language", "اللغات"), r"[:\n]"),
+    SectionPattern("languages", ("language proficiency", "إجادة اللغات"), r"[:\n]"),
+    SectionPattern(
+        "education", ("education", "التعليم", "educational background", "الخلفية التعليمية"), r"[:\n]",
+        ("experience", "skills"),
+    ),
+    SectionPattern("education", ("degree", "درجة"), r"[\s:]", ("experience", "skills")),
+    SectionPattern(
+        "experience",
+        ("experience", "الخبرة", "work experience", "الخبرة العملية", "professional experience", "الخبرة المهنية"),
+        r"[:\n]", ("education", "skills"),
+    ),
+    SectionPattern("experience", ("employment history", "سجل التوظيف"), r"[:\n]", ("education", "skills")),
+)
+
+FIELDS = ("skills", "languages", "education", "experience")
+
+
+class Section(NamedTuple):
+    field: str
+    heading: str
+    content: str
+    start: int  # بداية المحتوى
+    end: int
+
+
+def _legacy_regex(pattern: SectionPattern) -> "re.Pattern":
+    headings = "|".join(re.escape(h) for h in pattern.headings)
+    stops = "".join(rf"|\n{re.escape(w)}" for w in pattern.stop_words)
+    return re.compile(rf"(?:{headings}){pattern.follow}(.*?)(?:\n\n{stops}|\n[A-Z]|\Z)", re.IGNORECASE | re.DOTALL)
+
+
+# المسار الاحتياطي: regex لكل قسم بنفس صيغة simple_parse_resume القديمة
+LEGACY_REGEXES = [_legacy_regex(pattern) for pattern in SECTION_PATTERNS]
+
+# عنوان → رقم النمط؛ والعناوين التي تنتهي بعنوان آخر (technical skills ← skills) تُسجل له أيضاً
+_HEADING_KIND: Dict[str, int] = {
+    heading: kind for kind, pattern in enumerate(SECTION_PATTERNS) for heading in pattern.headings
+}
+_SUFFIXES: Dict[str, List[Tuple[int, int]]] = {
+    heading: [
+        (len(heading) - len(other), other_kind)
+        for other, other_kind in _HEADING_KIND.items()
+        if other != heading and heading.endswith(other)
+    ]
+    for heading in _HEADING_KIND
+}
+_FOLLOW = [re.compile(pattern.follow) for pattern in SECTION_PATTERNS]
+
+# الأطول أولاً: "language proficiency" قبل "language"؛ بلا مجموعات مسماة ليبقى البحث سريعاً
+HEADING_RE = re.compile(
+    "(?:" + "|".join(re.escape(h) for h in sorted(_HEADING_KIND, key=len, reverse=True)) + r")[:\s]"
+)
+BOUNDARY_RE = re.compile(r"\n(?=[\na-z])")
+SPLIT_RE = re.compile(r"[,;•\n]")
+# حروف تطابق [A-Z] أو حروف العناوين مع IGNORECASE لكن lower() لا تحولها (أو تغير طول النص)
+_CASE_SPECIAL = re.compile("[İıſ]")
+
+
+def _segment_with_regexes(text: str) -> List[Section]:
+    sections = []
+    for pattern, regex in zip(SECTION_PATTERNS, LEGACY_REGEXES):
+        for match in regex.finditer(text):
+            sections.append(Section(
+                pattern.field, text[match.start():match.start(1) - 1], match.group(1), match.start(1), match.end(1),
+            ))
+    return sections
+
+
+def segment(text: str) -> List[Section]:
+    """الأقسام المعنونة في النص (قد تتداخل كما كانت مطابقات الأنماط المنفصلة)"""
+    if not text:
+        return []
+    lowered = text.lower()
+    if len(lowered) != len(text) or _CASE_SPECIAL.search(text):
+        return _segment_with_regexes(text)
+
+    boundaries = [m.start() for m in BOUNDARY_RE.finditer(lowered)]
+
+    # أحداث العناوين بالترتيب: (بداية العنوان، بداية المحتوى، رقم النمط)
+    events = []
+    for match in HEADING_RE.finditer(lowered):
+        heading_start, content_start = match.start(), match.end()
+        heading = match.group()[:-1]
+        follow = match.group()[-1]
+        for offset, kind in [(0, _HEADING_KIND[heading])] + _SUFFIXES[heading]:
+            if _FOLLOW[kind].match(follow):
+                events.append((heading_start + offset, content_start, kind))
+
+    sections = []
+    next_allowed = [0] * len(SECTION_PATTERNS)
+    length = len(text)
+    for heading_start, content_start, kind in events:
+        # مطابقات النمط الواحد لا تتداخل: العنوان داخل قسم سابق من نفس النمط يُتجاهل
+        if heading_start < next_allowed[kind]:
+            continue
+        i = bisect_left(boundaries, content_start)
+        if i == len(boundaries):
+            end, consumed = length, 0
+        else:
+            end, consumed = boundaries[i], 2
+            for word in SECTION_PATTERNS[kind].stop_words:
+                if lowered.startswith(word, end + 1):
+                    consumed = len(word) + 1
+                    break
+        next_allowed[kind] = end + consumed
+        sections.append(Section(
+            SECTION_PATTERNS[kind].field, text[heading_start:content_start - 1], text[content_start:end],
+            content_start, end,
+        ))
+    return sections
+
+
+def section_items(sections: List[Section]) -> Dict[str, List[str]]:
+    """عناصر كل حقل: المحتوى مقسم على , ; • وأسطر، بلا تكرار وبلا عناصر أقصر من 3 أحرف"""
+    items: Dict[str, Dict[str, None]] = {field: {} for field in FIELDS}
+    for section in sections:
+        for item in SPLIT_RE.split(section.content):
+            item = item.strip()
+            if len(item) > 2:
+                items[section.field][item] = None
+    return {field: list(values) for field, values in items.items()}
+
+
+__all__ = ["Section", "SECTION_PATTERNS", "segment", "section_items"]
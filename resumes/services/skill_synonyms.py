@@ -2,9 +2,13 @@
 """
 قاموس المرادفات للمهارات التقنية
 يدعم العربية والإنجليزية
+
+SYNONYMS_MAP و ARABIC_TRANSLATION تُجمعان عند الاستيراد في قاموس مسطح alias → canonical
+(ALIASES)، فالتوحيد بحث واحد في dict بدلاً من المرور على كل المرادفات
 """
 
-from typing import Dict, Set, List
+from functools import lru_cache
+from typing import Dict, Iterable, Set, List
 
 class SkillSynonyms:
     """إدارة المرادفات والمهارات المتشابهة"""
@@ -33,7 +37,7 @@ class SkillSynonyms:
         'sqlserver': {'sql server', 'mssql', 'ms sql', 't-sql'},
         
         # DevOps & Cloud
-        'docker': {'containerization', 'docker containers', 'dockerization'},
+        'docker': {'containerization', 'docker containers', 'dockerization', 'container'},
         'kubernetes': {'k8s', 'kube', 'container orchestration'},
         'aws': {'amazon web services', 'amazon cloud'},
         'gcp': {'google cloud platform', 'google cloud'},
@@ -55,7 +59,6 @@ class SkillSynonyms:
         'agile': {'scrum', 'agile methodology'},
         'devops': {'dev ops', 'deployment operations'},
         'linux': {'unix', 'linux operating system'},
-        'docker': {'container', 'containerization'},
     }
     
     # العربية -> الإنجليزية
@@ -87,24 +90,50 @@ class SkillSynonyms:
         'أوركسترا': 'orchestration',
     }
     
+    # alias → canonical (يُبنى بـ compile() عند الاستيراد)
+    ALIASES: Dict[str, str] = {}
+    
+    @staticmethod
+    def _clean(skill: str) -> str:
+        return skill.strip().lower()
+    
+    @classmethod
+    def compile(cls) -> Dict[str, str]:
+        """
+        بناء القاموس المسطح بنفس أولوية البحث القديم:
+        أول مهارة رئيسية (بترتيب SYNONYMS_MAP) تحتوي الاسم المستعار هي التي تُعتمد
+        الترجمات العربية تُوجَّه إلى الشكل الموحد لترجمتها
+        """
+        aliases: Dict[str, str] = {}
+        for main_skill, synonyms in cls.SYNONYMS_MAP.items():
+            aliases.setdefault(main_skill, main_skill)
+            for synonym in sorted(synonyms):
+                aliases.setdefault(synonym, main_skill)
+        
+        for arabic, english in cls.ARABIC_TRANSLATION.items():
+            aliases.setdefault(cls._clean(arabic), aliases.get(english, english))
+        
+        cls.ALIASES = aliases
+        _normalize.cache_clear()
+        return aliases
+    
     @classmethod
     def get_normalized_skill(cls, skill: str) -> str:
         """
         توحيد المهارة إلى شكل موحد
         مثال: "python3" → "python"
         """
-        skill = skill.strip().lower()
-        
-        # ترجمة العربية أولاً
-        if any('\u0600' <= c <= '\u06FF' for c in skill):
-            skill = cls.ARABIC_TRANSLATION.get(skill, skill)
-        
-        # البحث عن المهارة في الخريطة
-        for main_skill, synonyms in cls.SYNONYMS_MAP.items():
-            if skill in synonyms or skill == main_skill:
-                return main_skill
-        
-        return skill
+        return _normalize(skill)
+    
+    @classmethod
+    def normalize_many(cls, skills: Iterable[str]) -> List[str]:
+        """توحيد قائمة مهارات دفعة واحدة (نفس الترتيب، مع تجاهل القيم الفارغة)"""
+        return [_normalize(skill) for skill in skills if skill]
+    
+    @classmethod
+    def normalize_set(cls, skills: Iterable[str]) -> List[str]:
+        """مهارات موحدة بلا تكرار ومرتبة (للحقول المخزنة مثل Job.normalized_required_skills)"""
+        return sorted(set(cls.normalize_many(skills or [])))
     
     @classmethod
     def get_all_forms(cls, skill: str) -> Set[str]:
@@ -122,8 +151,8 @@ class SkillSynonyms:
         يرجع: (matched_skills, missing_skills, partial_match)
         """
         # توحيد المهارات
-        resume_normalized = {cls.get_normalized_skill(s) for s in resume_skills}
-        job_normalized = {cls.get_normalized_skill(s) for s in job_skills}
+        resume_normalized = {_normalize(s) for s in resume_skills}
+        job_normalized = {_normalize(s) for s in job_skills}
         
         # المطابقة
         matched = resume_normalized & job_normalized
@@ -136,6 +165,15 @@ class SkillSynonyms:
         }
 
 
+@lru_cache(maxsize=65536)
+def _normalize(skill: str) -> str:
+    cleaned = SkillSynonyms._clean(skill)
+    return SkillSynonyms.ALIASES.get(cleaned, cleaned)
+
+
+SkillSynonyms.compile()
+
+
 # الاستخدام:
 if __name__ == "__main__":
     # مثال 1: توحيد مهارة واحدة
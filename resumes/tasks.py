@@ -0,0 +1,13 @@
+# resumes/tasks.py
+from tasks.services.queue import task
+from .models.uploaded import Resume
+from .services.processing import PROCESS_TASK, process_resume
+
+
+@task(PROCESS_TASK)
+def process_resume_task(resume_id, parser="full"):
+    resume = Resume.objects.filter(pk=resume_id).first()
+    if resume is None:
+        # حُذفت السيرة قبل أن يصل إليها العامل
+        return
+    process_resume(resume, parser)
@@ -0,0 +1,123 @@
+# resumes/testing.py
+"""
+التطبيقات المرجعية القديمة ومولدات البيانات المصطنعة: تقارنها الاختبارات وأوامر benchmark_* بالمسارات الحالية
+"""
+import random
+import re
+
+from matching.services import embedding_engine
+from resumes.services import ai_fallback
+from resumes.services.skill_synonyms import SkillSynonyms
+
+
+def scan_normalized_skill(skill: str) -> str:
+    """التوحيد القديم: ترجمة ثم المرور على كل SYNONYMS_MAP (المرجع للمقارنة)"""
+    skill = skill.strip().lower()
+    if any('\u0600' <= c <= '\u06FF' for c in skill):
+        skill = SkillSynonyms.ARABIC_TRANSLATION.get(skill, skill)
+    for main_skill, synonyms in SkillSynonyms.SYNONYMS_MAP.items():
+        if skill == main_skill or skill in synonyms:
+            return main_skill
+    return skill
+
+
+def scan_skills_with_regex(text, skills):
+    """المسح القديم: regex \\b...\\b منفصل لكل مهارة (المرجع للمقارنة)"""
+    found = []
+    for skill in skills:
+        if re.search(r'\b' + re.escape(skill) + r'\b', text):
+            found.append(skill.title())
+    return list(dict.fromkeys(found))
+
+
+def regex_simple_parse_resume(raw_text):
+    """simple_parse_resume القديمة: تسعة regex بـ DOTALL على النص كاملاً (المرجع للمقارنة)"""
+    parsed_data = {
+        'skills': [],
+        'languages': [],
+        'education': [],
+        'experience': []
+    }
+
+    skills_patterns = [
+        r'(?:Skills?|المهارات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
+        r'(?:Technical Skills?|المهارات التقنية)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
+        r'(?:Core Competencies|الكفاءات الأساسية)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)'
+    ]
+    for pattern in skills_patterns:
+        for match in re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL):
+            parsed_data['skills'].extend(skill.strip() for skill in re.split(r'[,;•\n]', match) if skill.strip())
+
+    languages_patterns = [
+        r'(?:Languages?|اللغات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)',
+        r'(?:Language Proficiency|إجادة اللغات)[:\n](.*?)(?:\n\n|\n[A-Z]|\Z)'
+    ]
+    for pattern in languages_patterns:
+        for match in re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL):
+            parsed_data['languages'].extend(lang.strip() for lang in re.split(r'[,;•\n]', match) if lang.strip())
+
+    education_patterns = [
+        r'(?:Education|التعليم|Educational Background|الخلفية التعليمية)[:\n](.*?)(?:\n\n|\nExperience|\nSkills|\n[A-Z]|\Z)',
+        r'(?:Degree|درجة)[\s:](.*?)(?:\n\n|\nExperience|\nSkills|\n[A-Z]|\Z)'
+    ]
+    for pattern in education_patterns:
+        for match in re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL):
+            parsed_data['education'].extend(edu.strip() for edu in re.split(r'[,;•\n]', match) if edu.strip())
+
+    experience_patterns = [
+        r'(?:Experience|الخبرة|Work Experience|الخبرة العملية|Professional Experience|الخبرة المهنية)[:\n](.*?)(?:\n\n|\nEducation|\nSkills|\n[A-Z]|\Z)',
+        r'(?:Employment History|سجل التوظيف)[:\n](.*?)(?:\n\n|\nEducation|\nSkills|\n[A-Z]|\Z)'
+    ]
+    for pattern in experience_patterns:
+        for match in re.findall(pattern, raw_text, re.IGNORECASE | re.DOTALL):
+            parsed_data['experience'].extend(exp.strip() for exp in re.split(r'[,;•\n]', match) if exp.strip())
+
+    for key in parsed_data:
+        parsed_data[key] = list(set(parsed_data[key]))
+        parsed_data[key] = [item for item in parsed_data[key] if len(item) > 2]
+
+    return parsed_data
+
+
+HEADINGS = [
+    "Skills", "SKILLS", "skill", "Technical Skills", "Core Competencies", "Languages", "Language",
+    "Language Proficiency", "Education", "Educational Background", "Degree", "Experience",
+    "Work Experience", "Professional Experience", "Employment History",
+    "المهارات", "المهارات التقنية", "الكفاءات الأساسية", "اللغات", "إجادة اللغات", "التعليم",
+    "الخلفية التعليمية", "درجة", "الخبرة", "الخبرة العملية", "الخبرة المهنية", "سجل التوظيف",
+]
+LINES = [
+    "Python, Django; REST", "- docker • kubernetes", "• Team lead at Acme (2019-2023)",
+    "2015 - 2019 BSc Computer Science", "الإنجليزية، العربية", "بايثون، جانغو", "English: fluent",
+    "built data pipelines for 3 teams", "a degree in physics", "upskills: mentoring", "",
+    "Experience", "Skills", "Education", "senior backend developer", "   indented line; with, items",
+]
+SEPARATORS = [":", "\n", ":\n", " :", " ", "\t", ":  "]
+
+
+def build_corpus(count, seed=0, sections=8, special=False):
+    """سير مصطنعة بعناوين وفواصل وأسطر متنوعة (بما فيها حالات الحدود في الأنماط القديمة)"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(1, sections)):
+            heading = rng.choice(HEADINGS)
+            if rng.random() < 0.3:
+                heading = heading.lower() if rng.random() < 0.5 else heading.upper()
+            body = "\n".join(rng.choice(LINES) for _ in range(rng.randint(0, 6)))
+            parts.append(heading + rng.choice(SEPARATORS) + body)
+        text = rng.choice(["\n", "\n\n", "\n\n\n", " "]).join(parts)
+        if special and rng.random() < 0.5:
+            # حروف تختلف فيها lower() عن IGNORECASE: المسار الاحتياطي
+            text = text.replace("s", rng.choice("ſK"), 1).replace("i", rng.choice("İı"), 1)
+        corpus.append(text)
+    return corpus
+
+
+def per_skill_extract(text, skills):
+    """الاستخراج القديم بالتضمين: similarity() لكل مهارة على حدة (المرجع للمقارنة)"""
+    found = [(ai_fallback.skill_label(s), embedding_engine.similarity(text.lower(), s)) for s in skills]
+    found = [item for item in found if item[1] > 0.3]
+    found.sort(key=lambda x: x[1], reverse=True)
+    return [skill for skill, _ in found[:10]]
@@ -1,3 +1,322 @@
-from django.test import TestCase
+# resumes/tests.py
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from matching.services import embedding_engine
+from resumes.models.profile import CandidateResumeProfile
+from resumes.models.uploaded import Resume
+from resumes.services import ai_fallback, parsing, reprocessor
+from resumes.services.keyword_scanner import KeywordScanner, labels
+from resumes.services.sections import segment
+from resumes.services.skill_synonyms import SkillSynonyms
+from resumes.testing import (
+    build_corpus,
+    per_skill_extract,
+    regex_simple_parse_resume,
+    scan_normalized_skill,
+    scan_skills_with_regex,
+)
+from tasks.models import Task
+from tasks.services.queue import Worker
+
+
+class SkillSynonymsRegistryTests(SimpleTestCase):
+    def test_compiled_lookup_matches_linear_scan(self):
+        skills = list(SkillSynonyms.ALIASES) + ['  Python3 ', 'JS', 'بايثون', 'unknown skill', 'DevOps']
+        for skill in skills:
+            self.assertEqual(SkillSynonyms.get_normalized_skill(skill), scan_normalized_skill(skill), skill)
+
+    def test_arabic_translations_resolve_to_canonical(self):
+        self.assertEqual(SkillSynonyms.get_normalized_skill('بايثون'), 'python')
+        for arabic in SkillSynonyms.ARABIC_TRANSLATION:
+            self.assertIn(arabic, SkillSynonyms.ALIASES)
+
+    def test_docker_aliases_are_merged(self):
+        for alias in ('container', 'containerization', 'docker containers', 'dockerization'):
+            self.assertEqual(SkillSynonyms.get_normalized_skill(alias), 'docker')
+
+    def test_normalize_many_keeps_order_and_skips_empty(self):
+        self.assertEqual(
+            SkillSynonyms.normalize_many(['Python3', '', 'js', None, 'Rust']),
+            ['python', 'javascript', 'rust'],
+        )
+
+
+@override_settings(MEDIA_ROOT='/tmp/test-media', TASK_RETRY_DELAY=0)
+class BackgroundProcessingTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        self.api = APIClient()
+        self.api.force_authenticate(self.user)
+
+    def upload(self):
+        file = SimpleUploadedFile("cv.pdf", b"%PDF-1.4 stub", content_type="application/pdf")
+        return self.api.post(reverse('api_resume_upload'), {"file": file}, format='multipart')
+
+    def test_upload_returns_immediately_and_worker_processes(self):
+        with patch('resumes.services.processing.extract_text') as extract:
+            resp = self.upload()
+            extract.assert_not_called()
+
+        self.assertEqual(resp.status_code, 202)
+        self.assertFalse(resp.data["is_processed"])
+        self.assertEqual(resp.data["processing"]["status"], "pending")
+        resume_id = resp.data["id"]
+
+        with patch('resumes.services.processing.extract_text', return_value="Python developer"):
+            Worker(worker_id="w1").run(burst=True)
+
+        resume = Resume.objects.get(pk=resume_id)
+        self.assertTrue(resume.is_processed)
+        self.assertEqual(resume.raw_text, "Python developer")
+        status = self.api.get(resp.data["status_url"]).data
+        self.assertEqual((status["status"], status["attempts"]), ("processed", 1))
+
+    def test_status_reports_failure_after_retries(self):
+        resp = self.upload()
+        with patch('resumes.services.processing.extract_text', side_effect=ValueError("unreadable")):
+            Worker(worker_id="w1").run(burst=True)
+
+        status = self.api.get(resp.data["status_url"]).data
+        self.assertEqual(status["status"], "failed")
+        self.assertFalse(status["is_processed"])
+        self.assertIn("unreadable", status["error"])
+        self.assertEqual(Task.objects.get().attempts, Task.objects.get().max_attempts)
+
+    def test_status_is_private_to_owner(self):
+        resp = self.upload()
+        User = get_user_model()
+        other = User.objects.create_user(username="other", password="pw", role=User.CANDIDATE)
+        self.api.force_authenticate(other)
+        self.assertEqual(self.api.get(resp.data["status_url"]).status_code, 404)
+
+
+CV_TEXT = "Skills:\nPython, Django\n\nLanguages:\nEnglish, Arabic"
+
+
+def failing_parser(text):
+    if "broken" in text:
+        raise ValueError("cannot parse")
+    return {"skills": ["Python3"], "languages": ["English"]}
+
+
+class ReprocessResumesTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkpoint = Path(tmp.name) / "checkpoint.json"
+        settings_patch = override_settings(SKILL_VOCABULARY_PATH=str(Path(tmp.name) / "vocabulary.json"))
+        settings_patch.enable()
+        self.addCleanup(settings_patch.disable)
+        parsers = patch.dict(reprocessor.PARSERS, {"simple": failing_parser})
+        parsers.start()
+        self.addCleanup(parsers.stop)
+
+    def make(self, text, **fields):
+        return Resume.objects.create(candidate=self.user, raw_text=text, original_filename="cv.pdf", **fields)
+
+    def test_chunks_are_parsed_and_written_in_bulk(self):
+        resumes = [self.make(f"cv {i}") for i in range(5)]
+        broken = self.make("broken cv")
+        self.make("")
+
+        stats = reprocessor.reprocess_resumes(parser="simple", chunk_size=2, workers=1, path=self.checkpoint)
+
+        self.assertEqual((stats["processed"], stats["errors"]), (5, 1))
+        self.assertGreater(stats["rate"], 0)
+        self.assertFalse(self.checkpoint.exists())
+        for resume in resumes:
+            resume.refresh_from_db()
+            self.assertTrue(resume.is_processed)
+            self.assertEqual(resume.normalized_skills, ["python"])
+        broken.refresh_from_db()
+        self.assertFalse(broken.is_processed)
+        # ما كان save() ينشئه للسير التي أصبحت معالجة
+        self.assertEqual(CandidateResumeProfile.objects.get(candidate=self.user).uploaded_resume_id, resumes[-1].pk)
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        done = self.make("cv 1")
+        later = self.make("cv 2")
+        reprocessor.save_checkpoint(
+            {"parser": "simple", "last_pk": done.pk, "processed": 1, "errors": 0}, self.checkpoint
+        )
+
+        stats = reprocessor.reprocess_resumes(parser="simple", chunk_size=10, workers=1, path=self.checkpoint)
+
+        self.assertEqual((stats["resumed_from"], stats["run_processed"], stats["processed"]), (done.pk, 1, 2))
+        done.refresh_from_db()
+        later.refresh_from_db()
+        self.assertFalse(done.is_processed)
+        self.assertTrue(later.is_processed)
+
+    def test_checkpoint_is_written_per_chunk(self):
+        first = self.make("cv 1")
+        self.make("cv 2")
+        seen = []
+
+        def on_chunk(stats):
+            seen.append(reprocessor.load_checkpoint(self.checkpoint)["last_pk"])
+
+        reprocessor.reprocess_resumes(
+            parser="simple", chunk_size=1, workers=1, path=self.checkpoint, on_chunk=on_chunk,
+        )
+        self.assertEqual(seen, [first.pk, first.pk + 1])
+
+    def test_reprocess_all_runs_in_process_and_rebuilds_matches(self):
+        resume = self.make("cv 1")
+        with patch.dict(reprocessor.PARSERS, {"full": failing_parser}), \
+                patch.object(reprocessor, "ProcessPoolExecutor", side_effect=AssertionError("forked")), \
+                patch("matching.services.match_store.rebuild_all") as rebuild_all, \
+                override_settings(REPROCESS_CHECKPOINT_PATH=str(self.checkpoint)):
+            message = reprocessor.reprocess_all_resumes()
+
+        self.assertEqual(message, "Reprocessed 1 of 1 resumes")
+        rebuild_all.assert_called_once_with()
+        resume.refresh_from_db()
+        self.assertTrue(resume.is_processed)
+
+
+class ParallelReprocessTests(TransactionTestCase):
+    def test_process_pool_matches_serial_parse(self):
+        User = get_user_model()
+        user = User.objects.create_user(username="cand", password="pw", role=User.CANDIDATE)
+        resumes = [
+            Resume.objects.create(candidate=user, raw_text=f"{CV_TEXT}, Skill{i}", original_filename="cv.pdf")
+            for i in range(6)
+        ]
+        with tempfile.TemporaryDirectory() as tmp, \
+                override_settings(SKILL_VOCABULARY_PATH=str(Path(tmp) / "vocabulary.json")):
+            stats = reprocessor.reprocess_resumes(
+                parser="simple", chunk_size=4, workers=2, path=Path(tmp) / "checkpoint.json",
+            )
+
+        self.assertEqual((stats["processed"], stats["errors"]), (6, 0))
+        for resume in resumes:
+            resume.refresh_from_db()
+            self.assertEqual(resume.parsed_data, reprocessor.PARSERS["simple"](resume.raw_text))
+
+
+class KeywordScannerTests(SimpleTestCase):
+    def test_overlapping_keywords_and_word_boundaries(self):
+        scanner = KeywordScanner()
+        scanner.add_many(["react", "react native", "java", "go"], "skill")
+        hits = scanner.scan("react native, javascript and go-to django")
+        self.assertEqual([(h.label, h.start) for h in hits], [("react", 0), ("react native", 0), ("go", 29)])
+
+    def test_substring_keywords_ignore_boundaries(self):
+        scanner = KeywordScanner()
+        scanner.add("انجليزي", "language", "English", whole_word=False)
+        self.assertEqual(labels(scanner.scan("اللغة الانجليزية"), "language"), ["English"])
+
+    def test_labels_follow_keyword_order(self):
+        scanner = KeywordScanner()
+        scanner.add_many(["docker", "python"], "skill")
+        self.assertEqual(labels(scanner.scan("python, docker, python"), "skill"), ["docker", "python"])
+
+
+class KeywordParsingTests(SimpleTestCase):
+    def test_skills_match_one_regex_per_skill(self):
+        skills = [skill for group in parsing.TECH_SKILLS.values() for skill in group if skill[-1].isalnum()]
+        texts = [
+            "senior python/django developer, react native & node.js; aws, gcp, ci/cd, rest api",
+            "java (not javascript), go, r and ruby on rails; sql server, power bi, scikit-learn",
+            " ".join(skills),
+        ]
+        for text in texts:
+            legacy = scan_skills_with_regex(text, [s for group in parsing.TECH_SKILLS.values() for s in group])
+            self.assertEqual(parsing.extract_skills_advanced(text), legacy[:20], text)
+
+    def test_symbol_skills_are_found_before_spaces(self):
+        self.assertEqual(parsing.extract_skills_advanced("c++ and c# developer"), ["C++", "C#"])
+
+    def test_short_latin_keywords_need_word_boundaries(self):
+        text = "built systems for jobs and teams with leadership"
+        self.assertEqual(parsing.extract_education_advanced(text), [])
+        self.assertEqual(parsing.extract_experience_advanced(text), [])
+        self.assertEqual(parsing.extract_education_advanced("bs in computer science"), ["Bachelor", "Computer Science"])
+
+    def test_arabic_keywords_keep_attached_prefixes(self):
+        self.assertEqual(parsing.extract_languages_advanced("اللغة الانجليزية والعربية"), ["Arabic", "English"])
+
+
+class SectionSegmenterTests(SimpleTestCase):
+    def test_parity_with_regex_parser_on_corpus(self):
+        corpus = build_corpus(400, seed=7) + build_corpus(100, seed=8, special=True)
+        for text, parsed in zip(corpus, parsing.parse_many(corpus)):
+            expected = regex_simple_parse_resume(text)
+            for field in expected:
+                self.assertEqual(sorted(parsed[field]), sorted(expected[field]), (field, text))
+
+    def test_sections_and_nested_headings(self):
+        text = "Technical Skills:\n- Python; Docker\n\nاللغات:\nالعربية، English\nEducation\n- BSc"
+        sections = [(s.field, s.heading, s.content) for s in segment(text)]
+        self.assertEqual(sections, [
+            ("skills", "Technical Skills", "\n- Python; Docker"),
+            ("skills", "Skills", "\n- Python; Docker"),
+            ("languages", "اللغات", "\nالعربية، English"),
+            ("education", "Education", "- BSc"),
+        ])
+        self.assertEqual(parsing.simple_parse_resume(text)["skills"], ["- Python", "Docker"])
+
+
+@override_settings(EMBEDDING_BACKEND='local')
+class EmbeddingFallbackTests(SimpleTestCase):
+
+    TEXTS = [
+        "python",
+        "Python Django docker",
+        "talent acquisition and candidate screening",
+        "بايثون react kubernetes aws git",
+    ]
+
+    def setUp(self):
+        ai_fallback.clear_vocabulary_matrix()
+
+    def test_vocabulary_extends_common_skills_with_canonical_synonyms(self):
+        vocabulary = ai_fallback.skill_vocabulary()
+        self.assertEqual(vocabulary[:len(ai_fallback.COMMON_SKILLS)], ai_fallback.COMMON_SKILLS)
+        self.assertIn('postgresql', vocabulary)
+        self.assertIn('machine learning', vocabulary)
+        self.assertNotIn('machinelearning', vocabulary)
+        self.assertEqual(len(vocabulary), len(set(vocabulary)))
+        with override_settings(AI_FALLBACK_SYNONYM_SKILLS=False):
+            self.assertEqual(ai_fallback.skill_vocabulary(), ai_fallback.COMMON_SKILLS)
+
+    def test_synonym_skills_are_returned_by_display_name(self):
+        skills = ai_fallback.extract_skills_with_embedding("machine learning deep learning sql server c# c++")
+        self.assertIn('Machine Learning', skills)
+        self.assertIn('Deep Learning', skills)
+        raw_ids = {canonical for canonical, label in ai_fallback.SYNONYM_SKILL_LABELS.items() if label.lower() != canonical}
+        self.assertFalse({skill.lower() for skill in skills} & raw_ids)
+
+    def test_matrix_scores_match_per_skill_similarity(self):
+        skills = ai_fallback.skill_vocabulary()
+        for text in self.TEXTS:
+            self.assertEqual(ai_fallback.extract_skills_with_embedding(text), per_skill_extract(text, skills))
+
+    def test_vocabulary_embedded_once(self):
+        backend = embedding_engine.get_backend()
+        with patch.object(backend, 'embed_many', wraps=backend.embed_many) as embed:
+            for text in self.TEXTS:
+                ai_fallback.extract_skills_with_embedding(text)
+        sizes = [len(call.args[0]) for call in embed.call_args_list]
+        self.assertEqual(sizes, [len(ai_fallback.skill_vocabulary())] + [1] * len(self.TEXTS))
+
+    def test_remote_backend_scores_all_skills_in_one_call(self):
+        backend = embedding_engine.RemoteSimilarityBackend.__new__(embedding_engine.RemoteSimilarityBackend)
+        scores = {'python': 0.9, 'django': 0.5, 'docker': 0.2}
+        with patch.object(ai_fallback, 'get_backend', return_value=backend), \
+                patch.object(backend, 'similarity_many', create=True,
+                             side_effect=lambda pairs: [scores.get(skill, 0.0) for _, skill in pairs]) as many:
+            self.assertEqual(ai_fallback.extract_skills_with_embedding("Python"), ['Python', 'Django'])
+        many.assert_called_once()
@@ -5,7 +5,8 @@ from resumes.views.api import (
     MyResumesListAPIView,
     ResumeDetailAPIView,
     DeleteResumeAPIView,
-    UpdateResumeAPIView
+    UpdateResumeAPIView,
+    ResumeStatusAPIView,
 )
 
 urlpatterns = [
@@ -14,4 +15,5 @@ urlpatterns = [
     path("resumes/<int:pk>/", ResumeDetailAPIView.as_view(), name="api_resume_detail"),
     path("resumes/<int:pk>/update/", UpdateResumeAPIView.as_view(), name="api_resume_update"),
     path("resumes/<int:pk>/delete/", DeleteResumeAPIView.as_view(), name="api_resume_delete"),
+    path("resumes/<int:pk>/status/", ResumeStatusAPIView.as_view(), name="api_resume_status"),
 ]
\ No newline at end of file
@@ -13,6 +13,7 @@ urlpatterns = [
     path('<int:pk>/', web.resume_detail_view, name='detail'),
     path('<int:pk>/update/', web.update_resume_view, name='update'),
     path('<int:pk>/delete/', web.delete_resume_view, name='delete'),
+    path('<int:pk>/status/', web.resume_status_view, name='status'),
     
     # ملف تعريف السيرة الذاتية
     path('profile/', resume_profile_view, name='profile'),
@@ -3,12 +3,12 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.urls import reverse
 from ..models.uploaded import Resume
 from ..serializers import ResumeSerializer
 from ..permissions import IsCandidate
-from ..services.file_extractor import extract_text
-from ..services.parsing import parse_resume
-from datetime import datetime
+from ..services.processing import enqueue_processing, processing_status
 
 class UploadResumeAPIView(APIView):
     permission_classes = [permissions.IsAuthenticated, IsCandidate]
@@ -18,34 +18,20 @@ class UploadResumeAPIView(APIView):
         if not file:
             return Response({"error": "No file provided"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # إنشاء السجل أولاً
-        resume = Resume.objects.create(
-            candidate=request.user,
-            file=file,
-            original_filename=file.name
-        )
-
-        try:
-            # استخراج النص
-            raw_text = extract_text(resume.file.path)
-            resume.raw_text = raw_text
-            
-            # التحليل
-            resume.parsed_data = parse_resume(raw_text)
-            
-            resume.is_processed = True
-            resume.processed_at = datetime.now()
-            resume.save()
-            
-            return Response(ResumeSerializer(resume).data, status=status.HTTP_201_CREATED)
-            
-        except Exception as e:
-            resume.is_processed = False
-            resume.save()
-            return Response(
-                {"error": "Failed to process resume"}, 
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        # إنشاء السجل والمهمة معاً؛ الاستخراج والتحليل في العامل (manage.py run_workers)
+        with transaction.atomic():
+            resume = Resume.objects.create(
+                candidate=request.user,
+                file=file,
+                original_filename=file.name,
+                is_processed=False,
             )
+            enqueue_processing(resume, parser="full")
+
+        data = ResumeSerializer(resume).data
+        data["processing"] = processing_status(resume)
+        data["status_url"] = reverse("api_resume_status", kwargs={"pk": resume.pk})
+        return Response(data, status=status.HTTP_202_ACCEPTED)
 
 class MyResumesListAPIView(generics.ListAPIView):
     serializer_class = ResumeSerializer
@@ -76,21 +62,26 @@ class UpdateResumeAPIView(generics.UpdateAPIView):
     def perform_update(self, serializer):
         resume = serializer.save()
         if 'file' in self.request.FILES:
-            # إعادة معالجة الملف
-            try:
-                raw_text = extract_text(resume.file.path)
-                resume.raw_text = raw_text
-                resume.parsed_data = parse_resume(raw_text)
-                resume.is_processed = True
-                resume.processed_at = datetime.now()
-                resume.save()
-            except Exception:
-                resume.is_processed = False
-                resume.save()
+            # إعادة معالجة الملف في الخلفية
+            resume.is_processed = False
+            resume.save(update_fields=['is_processed'])
+            enqueue_processing(resume, parser="full")
 
 class DeleteResumeAPIView(generics.DestroyAPIView):
     serializer_class = ResumeSerializer
     permission_classes = [IsCandidate]
     
     def get_queryset(self):
-        return Resume.objects.filter(candidate=self.request.user)
\ No newline at end of file
+        return Resume.objects.filter(candidate=self.request.user)
+
+class ResumeStatusAPIView(APIView):
+    """حالة معالجة السيرة بعد الرفع (للاستطلاع حتى status == processed)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        user = request.user
+        if user.role == 'employer':
+            resume = get_object_or_404(Resume, pk=pk)
+        else:
+            resume = get_object_or_404(Resume, pk=pk, candidate=user)
+        return Response(processing_status(resume))
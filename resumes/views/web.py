@@ -3,19 +3,17 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils.translation import gettext as _
-from django.http import Http404
+from django.http import Http404, JsonResponse
+from django.db import transaction
 from ..models.uploaded import Resume
 from ..forms import ResumeUploadForm
 from ..permissions import IsCandidate
+from ..services.processing import enqueue_processing, processing_status
 import os
-from datetime import datetime
 from django.db.models import Count, Q
-from matching.services.matcher import batch_match_jobs_to_resume
+from matching.services.match_store import get_matches
 from jobs.models import Job
 
-from ..services.file_extractor import extract_text
-from ..services.parsing import simple_parse_resume
-
 # استيراد views_profile
 from .profile import resume_profile_view, set_primary_resume, toggle_matching_status
 
@@ -106,25 +104,16 @@ def upload_resume_view(request):
                 messages.error(request, _("Please select a file to upload."))
                 return render(request, 'resumes/resume_upload.html', {'form': form})
             
-            resume = form.save(commit=False)
-            resume.candidate = request.user
-            resume.original_filename = request.FILES['file'].name
-            resume.save()
-            
-            try:
-                raw_text = extract_text(resume.file.path)
-                resume.raw_text = raw_text
-                resume.parsed_data = simple_parse_resume(raw_text)
-                resume.is_processed = True
-                resume.processed_at = datetime.now()
-                resume.save()
-                messages.success(request, _("Resume uploaded and processed successfully!"))
-            except Exception as e:
-                print(f"Processing error: {e}")
+            with transaction.atomic():
+                resume = form.save(commit=False)
+                resume.candidate = request.user
+                resume.original_filename = request.FILES['file'].name
                 resume.is_processed = False
                 resume.save()
-                messages.warning(request, _("Resume uploaded but processing failed. Please try again later."))
-            
+                # الاستخراج والتحليل في الخلفية (manage.py run_workers)
+                enqueue_processing(resume, parser="simple")
+
+            messages.success(request, _("Resume uploaded! It is being processed and will be ready shortly."))
             return redirect('resumes:my')
         else:
             messages.error(request, _("Please correct the errors below."))
@@ -151,21 +140,12 @@ def update_resume_view(request, pk):
                 # إعادة المعالجة
                 resume.is_processed = False
                 resume.processed_at = None
-            form.save()
+            with transaction.atomic():
+                form.save()
+                if 'file' in request.FILES:
+                    enqueue_processing(resume, parser="simple")
             if 'file' in request.FILES:
-                try:
-                    raw_text = extract_text(resume.file.path)
-                    resume.raw_text = raw_text
-                    resume.parsed_data = simple_parse_resume(raw_text)
-                    resume.is_processed = True
-                    resume.processed_at = datetime.now()
-                    resume.save()
-                    messages.success(request, _("Resume updated and processed successfully!"))
-                except Exception as e:
-                    print(f"Processing error: {e}")
-                    resume.is_processed = False
-                    resume.save()
-                    messages.warning(request, _("Resume updated, but processing failed."))
+                messages.success(request, _("Resume updated! The new file is being processed."))
             else:
                 messages.success(request, _("Resume updated successfully!"))
             
@@ -199,6 +179,16 @@ def delete_resume_view(request, pk):
     context = {'resume': resume}
     return render(request, 'resumes/resume_delete.html', context)
 
+@login_required
+def resume_status_view(request, pk):
+    """حالة معالجة السيرة (JSON للاستطلاع من صفحة سيري الذاتية)"""
+    resume = get_object_or_404(Resume, id=pk)
+
+    if request.user != resume.candidate and request.user.role != 'employer':
+        raise Http404
+
+    return JsonResponse(processing_status(resume))
+
 @login_required
 def my_resumes_view(request):
     """عرض سير المستخدم الذاتية"""
@@ -212,14 +202,13 @@ def my_resumes_view(request):
     # حساب الإحصائيات
     processed_count = resumes.filter(is_processed=True).count()
     
-    # حساب عدد المطابقات لكل سيرة ذاتية
+    # حساب عدد المطابقات لكل سيرة ذاتية (من النتائج المخزنة)
+    jobs = Job.objects.filter(is_active=True)
+    match_counts = {}
+    for match in get_matches(resumes.filter(is_processed=True), jobs, min_score=50, strict=True):
+        match_counts[match['resume'].id] = match_counts.get(match['resume'].id, 0) + 1
     for resume in resumes:
-        if resume.is_processed:
-            jobs = Job.objects.filter(is_active=True)
-            matches = batch_match_jobs_to_resume(resume, jobs)
-            resume.match_count = len([m for m in matches if m['match']['score'] > 50])
-        else:
-            resume.match_count = 0
+        resume.match_count = match_counts.get(resume.id, 0) if resume.is_processed else 0
     
     # إحصائيات إضافية
     total_matches = sum(resume.match_count for resume in resumes)
@@ -4,4 +4,10 @@ set -o errexit
 
 python manage.py migrate
 python manage.py collectstatic --noinput
-gunicorn config.wsgi:application
\ No newline at end of file
+
+# عمال طابور المهام (إعادة حساب المطابقات، الرفع، الـ backfill) تعمل بجانب gunicorn وتتوقف معه
+python manage.py run_workers &
+workers_pid=$!
+trap 'kill -TERM "$workers_pid" 2>/dev/null || true' EXIT
+
+gunicorn config.wsgi:application
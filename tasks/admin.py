@@ -0,0 +1,11 @@
+# tasks/admin.py
+from django.contrib import admin
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "key", "lane", "status", "attempts", "max_attempts", "run_after", "locked_by", "finished_at")
+    list_filter = ("lane", "status", "name")
+    search_fields = ("key", "name", "last_error")
+    readonly_fields = ("created_at", "started_at", "finished_at", "locked_by", "locked_until", "last_error")
@@ -0,0 +1,14 @@
+# tasks/apps.py
+from django.apps import AppConfig
+from django.utils.translation import gettext_lazy as _
+
+
+class TasksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'tasks'
+    verbose_name = _("Background Tasks")
+
+    def ready(self):
+        # تسجيل معالجات المهام: <app>/tasks.py في كل تطبيق
+        from django.utils.module_loading import autodiscover_modules
+        autodiscover_modules('tasks')
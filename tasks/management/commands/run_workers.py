@@ -0,0 +1,84 @@
+# tasks/management/commands/run_workers.py
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from tasks.models import Task
+from tasks.services.queue import Worker
+
+
+def _run_worker(poll_interval, visibility_timeout, lanes, burst, max_tasks):
+    worker = Worker(poll_interval=poll_interval, visibility_timeout=visibility_timeout, lanes=lanes)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run(burst=burst, max_tasks=max_tasks)
+
+
+class Command(BaseCommand):
+    help = "Run background task workers (DB-backed queue, no broker)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=getattr(settings, "TASK_WORKER_PROCESSES", 2),
+            help="Worker processes",
+        )
+        parser.add_argument("--poll-interval", type=float, default=None, help="Seconds between polls when idle")
+        parser.add_argument("--visibility-timeout", type=int, default=None,
+                            help="Seconds a claimed task stays hidden from other workers")
+        parser.add_argument("--lanes", nargs="+", choices=Task.LANES, default=None,
+                            help="Only claim tasks from these lanes (default: all, weighted by TASK_LANES)")
+        parser.add_argument("--burst", action="store_true", help="Exit when the queue is empty")
+        parser.add_argument("--max-tasks", type=int, default=None,
+                            help="Restart a worker process after this many tasks")
+
+    def handle(self, *args, **options):
+        worker_args = (
+            options["poll_interval"], options["visibility_timeout"], options["lanes"],
+            options["burst"], options["max_tasks"],
+        )
+        processes = max(1, options["processes"])
+        if processes == 1:
+            _run_worker(*worker_args)
+            return
+
+        # لا تُورَّث اتصالات قاعدة البيانات للعمليات الفرعية
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        stopping = []
+
+        def start():
+            child = context.Process(target=_run_worker, args=worker_args)
+            child.start()
+            return child
+
+        def stop(*_):
+            stopping.append(True)
+            for child in children:
+                if child.is_alive():
+                    child.terminate()
+
+        signal.signal(signal.SIGTERM, stop)
+        children = [start() for _ in range(processes)]
+        self.stdout.write(f"Started {processes} workers")
+        # عامل أنهى max_tasks يُستبدل بعملية جديدة (إلا في burst أو عند الإيقاف)
+        replace = bool(options["max_tasks"]) and not options["burst"]
+        try:
+            while children:
+                time.sleep(1)
+                survivors = []
+                for child in children:
+                    if child.is_alive():
+                        survivors.append(child)
+                    elif replace and not stopping and child.exitcode == 0:
+                        survivors.append(start())
+                    else:
+                        child.join()
+                children[:] = survivors
+        except KeyboardInterrupt:
+            stop()
+            for child in children:
+                child.join()
@@ -0,0 +1,29 @@
+# tasks/management/commands/task_stats.py
+import json
+
+from django.core.management.base import BaseCommand
+
+from tasks.services.queue import DEFAULT_STATS_WINDOW, lane_stats
+
+
+class Command(BaseCommand):
+    help = "Show queue depth and wait time per priority lane"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--window", type=int, default=DEFAULT_STATS_WINDOW,
+                            help="Seconds of recently started tasks used for the wait averages")
+        parser.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+
+    def handle(self, *args, **options):
+        stats = lane_stats(window=options["window"])
+        if options["json"]:
+            self.stdout.write(json.dumps(stats, indent=2))
+            return
+
+        columns = ("pending", "scheduled", "running", "failed", "oldest_wait", "started", "avg_wait", "max_wait")
+        self.stdout.write(f"{'lane':<12} {'weight':>6} {'limit':>5} " + " ".join(f"{c:>11}" for c in columns))
+        for lane, row in stats.items():
+            limit = row["concurrency"] or "-"
+            self.stdout.write(
+                f"{lane:<12} {row['weight']:>6} {limit:>5} " + " ".join(f"{row[c]:>11}" for c in columns)
+            )
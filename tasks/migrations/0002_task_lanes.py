@@ -0,0 +1,26 @@
+# Generated by Django 5.2.10 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_claim_idx',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='lane',
+            field=models.CharField(choices=[('interactive', 'Interactive'), ('recompute', 'Recompute'), ('backfill', 'Backfill')], default='interactive', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['lane', 'status', 'run_after'], name='task_lane_claim_idx'),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# tasks/models.py
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class Task(models.Model):
+    """
+    مهمة خلفية في طابور قاعدة البيانات (بلا وسيط خارجي)
+    - name: اسم المعالج المسجل بـ @task، و payload معاملاته (JSON)
+    - العامل يحجز المهمة حتى locked_until (مهلة الظهور)؛ إن مات قبل إنهائها
+      تعود قابلة للحجز بعد انتهاء المهلة
+    - الفشل يعيد جدولة المهمة بعد run_after حتى max_attempts ثم تبقى failed
+    - lane: فئة الأولوية؛ العمّال يوزّعون الحجز بين الفئات بالأوزان وحد التزامن في TASK_LANES
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, _("Pending")),
+        (RUNNING, _("Running")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    )
+
+    # فئات الأولوية بترتيبها (الأعلى أولاً)
+    INTERACTIVE = 'interactive'
+    RECOMPUTE = 'recompute'
+    BACKFILL = 'backfill'
+    LANES = (INTERACTIVE, RECOMPUTE, BACKFILL)
+    LANE_CHOICES = (
+        (INTERACTIVE, _("Interactive")),
+        (RECOMPUTE, _("Recompute")),
+        (BACKFILL, _("Backfill")),
+    )
+
+    name = models.CharField(max_length=100, verbose_name=_("Task"))
+    # مفتاح المستند الذي تخصه المهمة (resume:42) للاستعلام عن الحالة ومنع التكرار
+    key = models.CharField(max_length=100, blank=True, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    lane = models.CharField(max_length=20, choices=LANE_CHOICES, default=INTERACTIVE)
+
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_until = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    last_error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        indexes = [
+            models.Index(fields=['lane', 'status', 'run_after'], name='task_lane_claim_idx'),
+        ]
+        verbose_name = _("Task")
+        verbose_name_plural = _("Tasks")
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.DONE, self.FAILED)
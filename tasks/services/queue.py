@@ -0,0 +1,473 @@
+# tasks/services/queue.py
+"""
+طابور مهام خلفية على قاعدة البيانات (جدول Task) بلا وسيط خارجي
+
+- المعالجات تُسجَّل بـ @task("app.name") في <app>/tasks.py (تُكتشف عند بدء التطبيق)
+- enqueue داخل نفس المعاملة التي تنشئ المستند: لا مهمة لمستند لم يُحفظ
+- الحجز بتحديث شرطي (UPDATE ... WHERE status/locked_until) فلا يأخذ عاملان نفس المهمة
+  على أي قاعدة بيانات؛ المهمة المحجوزة تُترك لغيرها إذا تجاوزت TASK_VISIBILITY_TIMEOUT
+  دون نبض: أثناء تشغيل المعالج يمدد thread النبض locked_until كل ثلث المهلة، فالمهمة الطويلة
+  (إعادة حساب وظيفة على كتالوج كبير) لا يحجزها عامل ثانٍ، والعامل الذي مات تعود مهمته بعد المهلة
+- الفشل يعيد المحاولة بعد TASK_RETRY_DELAY * 2^(المحاولة-1) ثانية حتى max_attempts
+- فئات أولوية (lane): interactive / recompute / backfill؛ كل عامل يختار الفئة التالية
+  بالتناوب الموزون السلس حسب TASK_LANES[lane]['weight'] بين الفئات الجاهزة، ولا يحجز من فئة
+  بلغ عدد مهامها الجارية TASK_LANES[lane]['concurrency'] (0 = بلا حد)؛ فالمسح الشامل لا يحجب
+  رفع مرشح ولا يأخذ كل العمّال. الحد مضمون على PostgreSQL (قفل معاملة لكل فئة أثناء الحجز)
+  و SQLite (الكتابة متسلسلة)، وتقريبي على غيرهما
+- manage.py run_workers يشغّل N عملية Worker؛ manage.py task_stats يعرض العمق والانتظار لكل فئة
+
+Usage:
+    @task("resumes.process_resume")
+    def process_resume(resume_id): ...
+
+    enqueue("resumes.process_resume", {"resume_id": resume.id}, key=f"resume:{resume.id}")
+    enqueue("resumes.process_resume", {"resume_id": 7}, lane=Task.BACKFILL)
+    Worker().run()
+    lane_stats()   # {'interactive': {'pending': .., 'running': .., 'oldest_wait': .., ...}, ...}
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import Count, F, Min, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tasks.models import Task
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT = 300
+DEFAULT_RETRY_DELAY = 10
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_STATS_WINDOW = 3600
+
+# مساحة أسماء أقفال pg_advisory_xact_lock(namespace, رقم الفئة)
+LANE_LOCK_NAMESPACE = 7301
+
+# weight: الحصة النسبية من الحجوزات عند وجود مهام في عدة فئات
+# concurrency: أقصى عدد مهام جارية من الفئة في كل العمّال (0 = بلا حد)
+DEFAULT_LANES = {
+    Task.INTERACTIVE: {"weight": 6, "concurrency": 0},
+    Task.RECOMPUTE: {"weight": 3, "concurrency": 2},
+    Task.BACKFILL: {"weight": 1, "concurrency": 1},
+}
+
+_registry: Dict[str, Callable] = {}
+
+
+def task(name: str):
+    """تسجيل دالة كمعالج للمهام باسم name؛ معاملاتها هي مفاتيح payload"""
+    def decorator(func):
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name: str) -> Optional[Callable]:
+    return _registry.get(name)
+
+
+def lane_config() -> Dict[str, dict]:
+    """إعدادات الفئات بترتيب الأولوية (TASK_LANES يغيّر القيم الافتراضية جزئياً)"""
+    configured = getattr(settings, "TASK_LANES", {})
+    lanes = {}
+    for lane in Task.LANES:
+        options = {**DEFAULT_LANES[lane], **configured.get(lane, {})}
+        lanes[lane] = {"weight": max(1, int(options["weight"])), "concurrency": max(0, int(options["concurrency"]))}
+    return lanes
+
+
+def enqueue(
+    name: str,
+    payload: Optional[dict] = None,
+    key: str = "",
+    max_attempts: Optional[int] = None,
+    delay: float = 0,
+    unique: bool = False,
+    lane: str = Task.INTERACTIVE,
+) -> Task:
+    """
+    إضافة مهمة للطابور في فئة lane
+    unique: إذا كانت هناك مهمة بنفس الاسم والمفتاح لم تبدأ بعد تُعاد بدل إنشاء أخرى
+    (وتُرقّى لفئة lane إن كانت أعلى أولوية: مرشح يرفع سيرته أثناء مسح شامل لا ينتظر المسح)
+    """
+    if name not in _registry:
+        raise ValueError(f"Unknown task: {name!r}")
+    if lane not in Task.LANES:
+        raise ValueError(f"Unknown lane: {lane!r}")
+    if unique and key:
+        existing = Task.objects.filter(name=name, key=key, status=Task.PENDING).first()
+        if existing is not None:
+            if Task.LANES.index(lane) < Task.LANES.index(existing.lane):
+                Task.objects.filter(pk=existing.pk, status=Task.PENDING).update(lane=lane)
+                existing.lane = lane
+            return existing
+    return Task.objects.create(
+        name=name,
+        key=key,
+        lane=lane,
+        payload=payload or {},
+        max_attempts=max_attempts or getattr(settings, "TASK_MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS),
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def latest_task(key: str, name: Optional[str] = None) -> Optional[Task]:
+    """آخر مهمة لمستند (لنقاط الاستعلام عن الحالة)"""
+    tasks = Task.objects.filter(key=key)
+    if name:
+        tasks = tasks.filter(name=name)
+    return tasks.order_by('-created_at', '-id').first()
+
+
+# ------------------------------------------------------------------
+# Claiming and running
+# ------------------------------------------------------------------
+
+def _claimable(now) -> Q:
+    # منتظرة حان وقتها، أو محجوزة انتهت مهلة ظهورها (العامل مات أو علق)
+    return Q(status=Task.PENDING, run_after__lte=now) | Q(status=Task.RUNNING, locked_until__lt=now)
+
+
+def _running(now) -> Q:
+    return Q(status=Task.RUNNING, locked_until__gte=now)
+
+
+def lane_counts(now=None, lanes: Optional[List[str]] = None) -> Dict[str, Dict[str, int]]:
+    """lane → {'ready': مهام قابلة للحجز الآن, 'running': مهام جارية} في استعلام واحد"""
+    now = now or timezone.now()
+    counts = {lane: {"ready": 0, "running": 0} for lane in (lanes or Task.LANES)}
+    rows = (
+        Task.objects.filter(lane__in=list(counts), status__in=(Task.PENDING, Task.RUNNING))
+        .values('lane')
+        .annotate(ready=Count('pk', filter=_claimable(now)), running=Count('pk', filter=_running(now)))
+        .order_by()
+    )
+    for row in rows:
+        counts[row['lane']] = {"ready": row['ready'], "running": row['running']}
+    return counts
+
+
+def _lock_lane(lane: str) -> None:
+    """
+    قفل حتى نهاية المعاملة لحجوزات الفئة: على PostgreSQL (READ COMMITTED) يرى كل UPDATE
+    عدد المهام الجارية بعد التزام الحجز السابق، فلا يتجاوز عاملان الحد معاً
+    """
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s, %s)", [LANE_LOCK_NAMESPACE, Task.LANES.index(lane)])
+
+
+def claim(
+    worker_id: str,
+    limit: int = 1,
+    visibility_timeout: Optional[int] = None,
+    lane: Optional[str] = None,
+    max_running: int = 0,
+) -> List[Task]:
+    """
+    حجز حتى limit مهمة لهذا العامل (الأقدم أولاً)، من فئة lane فقط إن حُددت
+    max_running: لا حجز إن كان في الفئة هذا العدد من المهام الجارية (يُفحص داخل نفس UPDATE،
+    مع قفل الفئة على PostgreSQL حتى لا يمر تحديثان متزامنان كلاهما بنفس العدد)
+    """
+    limited = lane is not None and bool(max_running)
+    with transaction.atomic():
+        if limited:
+            _lock_lane(lane)
+        return _claim(worker_id, limit, visibility_timeout, lane, max_running if limited else 0)
+
+
+def _claim(worker_id: str, limit: int, visibility_timeout: Optional[int], lane: Optional[str], max_running: int):
+    visibility_timeout = visibility_timeout or getattr(settings, "TASK_VISIBILITY_TIMEOUT", DEFAULT_VISIBILITY_TIMEOUT)
+    now = timezone.now()
+    tasks = Task.objects.filter(_claimable(now))
+    if lane is not None:
+        tasks = tasks.filter(lane=lane)
+    candidates = list(tasks.order_by('run_after', 'id').values_list('id', flat=True)[:limit * 4])
+
+    guarded = Task.objects.filter(_claimable(now))
+    if max_running:
+        running = (
+            Task.objects.filter(_running(now), lane=lane)
+            .order_by().values('lane').annotate(n=Count('pk')).values('n')
+        )
+        guarded = guarded.alias(lane_running=Coalesce(Subquery(running), 0)).filter(lane_running__lt=max_running)
+
+    claimed = []
+    for task_id in candidates:
+        won = guarded.filter(pk=task_id).update(
+            status=Task.RUNNING,
+            locked_by=worker_id,
+            locked_until=now + timedelta(seconds=visibility_timeout),
+            attempts=F('attempts') + 1,
+            started_at=now,
+        )
+        if won:
+            claimed.append(task_id)
+            if len(claimed) >= limit:
+                break
+    return list(Task.objects.filter(pk__in=claimed).order_by('run_after', 'id'))
+
+
+def _finish(task: Task, worker_id: str, **fields) -> bool:
+    """تحديث المهمة فقط إن كانت ما زالت محجوزة لهذا العامل (لم تُسحب بعد انتهاء المهلة)"""
+    return bool(Task.objects.filter(pk=task.pk, status=Task.RUNNING, locked_by=worker_id).update(**fields))
+
+
+def _fail(task: Task, worker_id: str, error: str) -> None:
+    now = timezone.now()
+    if task.attempts < task.max_attempts:
+        delay = getattr(settings, "TASK_RETRY_DELAY", DEFAULT_RETRY_DELAY) * 2 ** (task.attempts - 1)
+        _finish(
+            task, worker_id,
+            status=Task.PENDING, run_after=now + timedelta(seconds=delay),
+            locked_by="", locked_until=None, last_error=error,
+        )
+        logger.warning("Task %s #%s failed (attempt %d/%d); retrying in %ss",
+                       task.name, task.pk, task.attempts, task.max_attempts, delay)
+    else:
+        _finish(
+            task, worker_id,
+            status=Task.FAILED, finished_at=now, locked_by="", locked_until=None, last_error=error,
+        )
+        logger.error("Task %s #%s failed after %d attempts", task.name, task.pk, task.attempts)
+
+
+class Heartbeat:
+    """
+    يمدد locked_until للمهمة الجارية كل interval ثانية في thread منفصل حتى stop()
+    يتوقف وحده إن لم تعد المهمة محجوزة لهذا العامل
+    """
+
+    def __init__(self, task: Task, worker_id: str, visibility_timeout: int, interval: Optional[float] = None):
+        self.task_id = task.pk
+        self.worker_id = worker_id
+        self.visibility_timeout = visibility_timeout
+        self.interval = interval or max(visibility_timeout / 3, 0.1)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def beat(self) -> bool:
+        """تمديد الحجز الآن؛ False إذا سُحبت المهمة من هذا العامل"""
+        return bool(Task.objects.filter(pk=self.task_id, status=Task.RUNNING, locked_by=self.worker_id).update(
+            locked_until=timezone.now() + timedelta(seconds=self.visibility_timeout),
+        ))
+
+    def _run(self) -> None:
+        try:
+            while not self._stopped.wait(self.interval):
+                if not self.beat():
+                    return
+        except Exception:
+            logger.exception("Heartbeat failed for task #%s", self.task_id)
+        finally:
+            # اتصال قاعدة البيانات الخاص بهذا الـ thread
+            connection.close()
+
+    def start(self) -> "Heartbeat":
+        self._thread = threading.Thread(target=self._run, name=f"task-heartbeat-{self.task_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def execute(task: Task, worker_id: str, visibility_timeout: Optional[int] = None) -> bool:
+    """تشغيل مهمة محجوزة؛ True عند النجاح (الحجز يُمدد بالنبض طوال تشغيل المعالج)"""
+    handler = get_handler(task.name)
+    if handler is None:
+        task.attempts = task.max_attempts
+        _fail(task, worker_id, f"Unknown task: {task.name}")
+        return False
+    if task.attempts > task.max_attempts:
+        # عادت بعد انتهاء مهلة الظهور في المحاولة الأخيرة
+        task.attempts = task.max_attempts
+        _fail(task, worker_id, task.last_error or "Visibility timeout exceeded")
+        return False
+
+    visibility_timeout = visibility_timeout or getattr(settings, "TASK_VISIBILITY_TIMEOUT", DEFAULT_VISIBILITY_TIMEOUT)
+    heartbeat = Heartbeat(task, worker_id, visibility_timeout).start()
+    try:
+        handler(**task.payload)
+    except Exception:
+        _fail(task, worker_id, traceback.format_exc())
+        return False
+    finally:
+        heartbeat.stop()
+    _finish(task, worker_id, status=Task.DONE, finished_at=timezone.now(),
+            locked_by="", locked_until=None, last_error="")
+    return True
+
+
+class LaneScheduler:
+    """
+    اختيار الفئة التالية بالتناوب الموزون السلس (كما في nginx): كل فئة جاهزة تكسب وزنها
+    في كل دورة والفائزة تخسر مجموع الأوزان، فتتوزع الحجوزات بنسبة الأوزان دون تجويع
+    """
+
+    def __init__(self, lanes: Optional[Dict[str, dict]] = None):
+        self.lanes = lanes or lane_config()
+        self._current = {lane: 0 for lane in self.lanes}
+
+    def order(self, eligible: List[str]) -> List[str]:
+        """الفئات المؤهلة بترتيب المحاولة: المختارة أولاً ثم البقية بالأولوية"""
+        eligible = [lane for lane in self.lanes if lane in eligible]
+        if not eligible:
+            return []
+        total = 0
+        for lane in eligible:
+            self._current[lane] += self.lanes[lane]["weight"]
+            total += self.lanes[lane]["weight"]
+        best = max(eligible, key=lambda lane: self._current[lane])
+        self._current[best] -= total
+        return [best] + [lane for lane in eligible if lane != best]
+
+
+class Worker:
+    """حلقة حجز وتشغيل في عملية واحدة"""
+
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        poll_interval: Optional[float] = None,
+        visibility_timeout: Optional[int] = None,
+        lanes: Optional[List[str]] = None,
+    ):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.poll_interval = poll_interval or getattr(settings, "TASK_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+        self.visibility_timeout = visibility_timeout
+        config = lane_config()
+        if lanes:
+            unknown = set(lanes) - set(config)
+            if unknown:
+                raise ValueError(f"Unknown lanes: {sorted(unknown)}")
+            config = {lane: options for lane, options in config.items() if lane in lanes}
+        self.scheduler = LaneScheduler(config)
+        self.stopping = False
+        self.processed = 0
+        self.failed = 0
+
+    def stop(self, *args) -> None:
+        """إيقاف بعد المهمة الجارية (يصلح معالجاً لـ SIGTERM)"""
+        self.stopping = True
+
+    def _claim_next(self) -> List[Task]:
+        lanes = self.scheduler.lanes
+        counts = lane_counts(lanes=list(lanes))
+        eligible = [
+            lane for lane, count in counts.items()
+            if count["ready"] and not (lanes[lane]["concurrency"] and count["running"] >= lanes[lane]["concurrency"])
+        ]
+        for lane in self.scheduler.order(eligible):
+            # عامل آخر قد يسبقنا للمهمة أو لآخر مكان في الفئة: نجرّب الفئة التالية
+            tasks = claim(
+                self.worker_id, limit=1, visibility_timeout=self.visibility_timeout,
+                lane=lane, max_running=lanes[lane]["concurrency"],
+            )
+            if tasks:
+                return tasks
+        return []
+
+    def run_once(self) -> int:
+        """حجز وتشغيل مهمة واحدة؛ يرجع عدد المهام المنفذة (0 إذا لم تكن هناك مهمة متاحة)"""
+        close_old_connections()
+        tasks = self._claim_next()
+        for task in tasks:
+            if execute(task, self.worker_id, self.visibility_timeout):
+                self.processed += 1
+            else:
+                self.failed += 1
+        return len(tasks)
+
+    def run(self, burst: bool = False, max_tasks: Optional[int] = None) -> None:
+        """
+        burst: الخروج عندما لا توجد مهام جاهزة
+        max_tasks: الخروج بعد هذا العدد من المهام (لتجديد العملية دورياً)
+        """
+        logger.info("Worker %s started", self.worker_id)
+        while not self.stopping:
+            if max_tasks is not None and self.processed + self.failed >= max_tasks:
+                break
+            if not self.run_once():
+                if burst:
+                    break
+                time.sleep(self.poll_interval)
+        logger.info("Worker %s stopped (%d done, %d failed)", self.worker_id, self.processed, self.failed)
+
+
+# ------------------------------------------------------------------
+# Stats
+# ------------------------------------------------------------------
+
+def _seconds(delta) -> float:
+    return round(max(delta.total_seconds(), 0.0), 3)
+
+
+def lane_stats(window: int = DEFAULT_STATS_WINDOW, now=None) -> Dict[str, dict]:
+    """
+    لكل فئة: pending (حان وقتها)، scheduled (إعادة محاولة لاحقة)، running، failed،
+    oldest_wait (ثواني انتظار أقدم مهمة جاهزة)، ومتوسط وأقصى انتظار للمهام التي بدأت
+    خلال آخر window ثانية (من run_after حتى الحجز)
+    """
+    now = now or timezone.now()
+    config = lane_config()
+    stats = {
+        lane: {
+            "weight": options["weight"], "concurrency": options["concurrency"],
+            "pending": 0, "scheduled": 0, "running": 0, "failed": 0,
+            "oldest_wait": 0.0, "started": 0, "avg_wait": 0.0, "max_wait": 0.0,
+        }
+        for lane, options in config.items()
+    }
+    due = Q(status=Task.PENDING, run_after__lte=now)
+    rows = (
+        Task.objects.values('lane')
+        .annotate(
+            pending=Count('pk', filter=due),
+            scheduled=Count('pk', filter=Q(status=Task.PENDING, run_after__gt=now)),
+            running=Count('pk', filter=Q(status=Task.RUNNING)),
+            failed=Count('pk', filter=Q(status=Task.FAILED)),
+            oldest=Min('run_after', filter=due),
+        )
+        .order_by()
+    )
+    for row in rows:
+        lane = stats.get(row['lane'])
+        if lane is None:
+            continue
+        lane.update({key: row[key] for key in ("pending", "scheduled", "running", "failed")})
+        if row['oldest'] is not None:
+            lane["oldest_wait"] = _seconds(now - row['oldest'])
+
+    waits: Dict[str, List[float]] = {lane: [] for lane in stats}
+    recent = Task.objects.filter(started_at__gte=now - timedelta(seconds=window)).values_list(
+        'lane', 'run_after', 'started_at'
+    )
+    for lane, run_after, started_at in recent.iterator():
+        if lane in waits:
+            waits[lane].append(_seconds(started_at - run_after))
+    for lane, values in waits.items():
+        if values:
+            stats[lane].update(
+                started=len(values), avg_wait=round(sum(values) / len(values), 3), max_wait=max(values),
+            )
+    return stats
+
+
+__all__ = [
+    "task", "enqueue", "latest_task", "lane_config", "lane_counts", "lane_stats",
+    "claim", "execute", "Heartbeat", "LaneScheduler", "Worker",
+]
@@ -0,0 +1,179 @@
+# tasks/tests.py
+import time
+from datetime import timedelta
+
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from tasks.models import Task
+from tasks.services.queue import Heartbeat, LaneScheduler, Worker, claim, enqueue, execute, lane_stats, task
+
+CALLS = []
+
+
+@task("tests.record")
+def record(value, fail=0):
+    CALLS.append(value)
+    if CALLS.count(value) <= fail:
+        raise RuntimeError(f"boom {value}")
+
+
+@override_settings(TASK_RETRY_DELAY=0, TASK_MAX_ATTEMPTS=3)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_worker_runs_pending_tasks_in_order(self):
+        enqueue("tests.record", {"value": "a"})
+        enqueue("tests.record", {"value": "b"})
+
+        worker = Worker(worker_id="w1")
+        worker.run(burst=True)
+
+        self.assertEqual(CALLS, ["a", "b"])
+        self.assertEqual(worker.processed, 2)
+        task_ = Task.objects.first()
+        self.assertEqual((task_.status, task_.attempts, task_.locked_by), (Task.DONE, 1, ""))
+        self.assertIsNotNone(task_.finished_at)
+
+    def test_failure_is_retried_then_marked_failed(self):
+        flaky = enqueue("tests.record", {"value": "flaky", "fail": 1})
+        broken = enqueue("tests.record", {"value": "broken", "fail": 99})
+
+        Worker(worker_id="w1").run(burst=True)
+
+        flaky.refresh_from_db()
+        broken.refresh_from_db()
+        self.assertEqual((flaky.status, flaky.attempts), (Task.DONE, 2))
+        self.assertEqual((broken.status, broken.attempts), (Task.FAILED, 3))
+        self.assertIn("boom broken", broken.last_error)
+
+    def test_retry_waits_for_backoff(self):
+        with override_settings(TASK_RETRY_DELAY=60):
+            task_ = enqueue("tests.record", {"value": "x", "fail": 1})
+            Worker(worker_id="w1").run(burst=True)
+
+        task_.refresh_from_db()
+        self.assertEqual(task_.status, Task.PENDING)
+        self.assertGreater(task_.run_after, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(claim("w2"), [])
+
+    def test_claimed_task_is_not_claimed_twice(self):
+        enqueue("tests.record", {"value": "a"})
+
+        self.assertEqual(len(claim("w1")), 1)
+        self.assertEqual(claim("w2"), [])
+
+    def test_expired_claim_is_reclaimed_and_stale_worker_cannot_finish(self):
+        enqueue("tests.record", {"value": "a"})
+        stale = claim("w1", visibility_timeout=60)[0]
+        Task.objects.filter(pk=stale.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+
+        fresh = claim("w2")[0]
+        self.assertEqual((fresh.pk, fresh.attempts), (stale.pk, 2))
+
+        execute(stale, "w1")
+        fresh.refresh_from_db()
+        self.assertEqual((fresh.status, fresh.locked_by), (Task.RUNNING, "w2"))
+
+        self.assertTrue(execute(fresh, "w2"))
+        fresh.refresh_from_db()
+        self.assertEqual(fresh.status, Task.DONE)
+
+    def test_heartbeat_extends_only_its_own_claim(self):
+        enqueue("tests.record", {"value": "a"})
+        claimed = claim("w1", visibility_timeout=60)[0]
+
+        self.assertTrue(Heartbeat(claimed, "w1", visibility_timeout=600).beat())
+        claimed.refresh_from_db()
+        self.assertGreater(claimed.locked_until, timezone.now() + timedelta(seconds=500))
+        self.assertFalse(Heartbeat(claimed, "w2", visibility_timeout=600).beat())
+
+    def test_unique_enqueue_reuses_pending_task(self):
+        first = enqueue("tests.record", {"value": "a"}, key="doc:1", unique=True)
+        second = enqueue("tests.record", {"value": "a"}, key="doc:1", unique=True)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(ValueError):
+            enqueue("tests.missing")
+
+
+@override_settings(TASK_LANES={
+    "interactive": {"weight": 3, "concurrency": 0},
+    "recompute": {"weight": 1, "concurrency": 0},
+    "backfill": {"weight": 1, "concurrency": 1},
+})
+class LaneTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_scheduler_shares_claims_by_weight(self):
+        scheduler = LaneScheduler({"a": {"weight": 3}, "b": {"weight": 1}})
+        picks = [scheduler.order(["a", "b"])[0] for _ in range(8)]
+        self.assertEqual(picks.count("a"), 6)
+        self.assertEqual(picks.count("b"), 2)
+        self.assertNotEqual(picks[:4], ["a"] * 4)  # موزعة وليست دفعة واحدة
+        self.assertEqual(scheduler.order(["b"]), ["b"])
+
+    def test_backfill_does_not_starve_interactive(self):
+        for i in range(10):
+            enqueue("tests.record", {"value": f"bulk{i}"}, lane=Task.BACKFILL)
+        for i in range(3):
+            enqueue("tests.record", {"value": f"upload{i}"})
+
+        worker = Worker(worker_id="w1")
+        for _ in range(4):
+            worker.run_once()
+
+        # الرفع أولاً بنسبة الأوزان رغم أن مهام المسح أقدم
+        self.assertEqual(sum(v.startswith("upload") for v in CALLS), 3)
+
+    def test_lane_concurrency_limit(self):
+        enqueue("tests.record", {"value": "b1"}, lane=Task.BACKFILL)
+        enqueue("tests.record", {"value": "b2"}, lane=Task.BACKFILL)
+
+        self.assertEqual(len(claim("w1", lane=Task.BACKFILL, max_running=1)), 1)
+        self.assertEqual(claim("w2", lane=Task.BACKFILL, max_running=1), [])
+        self.assertEqual(Worker(worker_id="w2").run_once(), 0)
+
+    def test_unique_enqueue_promotes_lane(self):
+        bulk = enqueue("tests.record", {"value": "a"}, key="doc:1", unique=True, lane=Task.BACKFILL)
+        again = enqueue("tests.record", {"value": "a"}, key="doc:1", unique=True)
+        self.assertEqual(again.pk, bulk.pk)
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.lane, Task.INTERACTIVE)
+
+    def test_lane_stats_reports_depth_and_wait(self):
+        old = enqueue("tests.record", {"value": "a"}, lane=Task.RECOMPUTE)
+        Task.objects.filter(pk=old.pk).update(run_after=timezone.now() - timedelta(seconds=30))
+        enqueue("tests.record", {"value": "b"}, lane=Task.RECOMPUTE, delay=60)
+        enqueue("tests.record", {"value": "c"})
+        Worker(worker_id="w1", lanes=[Task.INTERACTIVE]).run(burst=True)
+
+        stats = lane_stats()
+        self.assertEqual((stats["recompute"]["pending"], stats["recompute"]["scheduled"]), (1, 1))
+        self.assertGreaterEqual(stats["recompute"]["oldest_wait"], 30)
+        self.assertEqual((stats["interactive"]["pending"], stats["interactive"]["started"]), (0, 1))
+        self.assertEqual(stats["backfill"]["concurrency"], 1)
+
+
+@task("tests.slow")
+def slow(seconds):
+    time.sleep(seconds)
+    # عامل آخر يحاول الحجز بعد تجاوز مهلة الظهور الأصلية
+    CALLS.append(len(claim("w2")))
+
+
+class HeartbeatTests(TransactionTestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_long_task_is_not_claimed_twice(self):
+        enqueue("tests.slow", {"seconds": 1.5})
+        Worker(worker_id="w1", visibility_timeout=1).run(burst=True)
+
+        self.assertEqual(CALLS, [0])
+        task = Task.objects.get()
+        self.assertEqual((task.status, task.attempts), (Task.DONE, 1))